@@ -229,18 +229,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-COINGECKO_BASE_URL = "https://api.coingecko.com/api/v3"
-
-# CoinGecko Proxy Cache for Serverless (Best effort)
-_cg_cache = {
-    "top30": {"data": None, "timestamp": None},
-    "global": {"data": None, "timestamp": None},
-    "trending": {"data": None, "timestamp": None},
-    "coins": {},
-    "charts": {}
-}
-CG_CACHE_TTL = 300 # 5 minutes
-
 # Best-effort cache for serverless hot instances
 _intelligence_cache = {
     "multi": {"data": None, "timestamp": None},
@@ -315,21 +303,14 @@ BREADTH_SYMBOL_MAP = {
 _verification_cache = {}
 VERIFICATION_TTL_MINUTES = 15
 
+MARKET_PRICE_IDS = ("bitcoin", "ethereum", "solana", "ripple", "cardano")
+
+
 @app.get("/api/market/prices")
 async def get_market_prices():
     try:
-        url = f"{COINGECKO_BASE_URL}/simple/price"
-        params = {
-            "ids": "bitcoin,ethereum,solana,ripple,cardano",
-            "vs_currencies": "usd",
-            "include_24hr_change": "true",
-            "include_24hr_vol": "true",
-            "include_market_cap": "true"
-        }
-        import httpx
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            return response.json()
+        from crypto_data import get_simple_prices
+        return await get_simple_prices(MARKET_PRICE_IDS)
     except Exception as e:
         print(f"Market prices error: {e}")
         # Fallback data to prevent 500s
@@ -344,119 +325,57 @@ async def get_market_prices():
 @app.get("/api/market/trending")
 async def get_trending():
     try:
-        url = f"{COINGECKO_BASE_URL}/search/trending"
-        import httpx
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url)
-            return response.json()
+        from crypto_data import get_trending as load_trending
+        return await load_trending()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/market/coins")
+async def get_coin_markets(ids: str):
+    from crypto_data import get_coins
+    try:
+        return await get_coins(ids.split(","))
+    except Exception:
+        return []
+
 @app.get("/api/market/coin/{id}")
-async def get_coin_details(id: str):
+async def get_coin_details(id: str, summary: bool = False):
+    from crypto_data import UnknownCoin, get_coin, get_coin_full
     try:
-        url = f"{COINGECKO_BASE_URL}/coins/{id}"
-        params = {
-            "localization": "false",
-            "tickers": "false",
-            "market_data": "true",
-            "community_data": "true",
-            "developer_data": "true",
-            "sparkline": "true"
-        }
-        import httpx
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            return response.json()
+        return await (get_coin(id) if summary else get_coin_full(id))
+    except UnknownCoin as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/market/top30")
 async def get_top30():
-    global _cg_cache
-    now = datetime.now(timezone.utc)
-    
-    # Best-effort cache for reused instances
-    if _cg_cache["top30"]["data"] and _cg_cache["top30"]["timestamp"]:
-        if (now - _cg_cache["top30"]["timestamp"]).total_seconds() < CG_CACHE_TTL:
-            return _cg_cache["top30"]["data"]
-
+    from crypto_data import get_top_markets
     try:
-        url = f"{COINGECKO_BASE_URL}/coins/markets"
-        params = {
-            "vs_currency": "usd",
-            "order": "market_cap_desc",
-            "per_page": 30,
-            "page": 1,
-            "sparkline": "true",
-            "price_change_percentage": "1h,24h,7d"
-        }
-        import httpx
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            
-            if response.status_code == 429:
-                return _cg_cache["top30"]["data"] if _cg_cache["top30"]["data"] else []
-                
-            data = response.json()
-            _cg_cache["top30"] = {"data": data, "timestamp": now}
-            return data
+        return await get_top_markets()
     except Exception:
-        return _cg_cache["top30"]["data"] if _cg_cache["top30"]["data"] else []
+        return []
 
 @app.get("/api/market/chart/{id}")
 async def get_coin_chart(id: str, days: int = 7):
-    global _cg_cache
-    now = datetime.now(timezone.utc)
-    cache_key = f"{id}_{days}"
-    
-    if cache_key in _cg_cache["charts"] and _cg_cache["charts"][cache_key]["timestamp"]:
-        if (now - _cg_cache["charts"][cache_key]["timestamp"]).total_seconds() < CG_CACHE_TTL:
-            return _cg_cache["charts"][cache_key]["data"]
-
+    from crypto_data import get_chart
     try:
-        url = f"{COINGECKO_BASE_URL}/coins/{id}/market_chart"
-        params = {
-            "vs_currency": "usd",
-            "days": days
-        }
-        import httpx
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            
-            if response.status_code == 429:
-                return _cg_cache["charts"].get(cache_key, {}).get("data", {"prices": []})
-                
-            data = response.json()
-            _cg_cache["charts"][cache_key] = {"data": data, "timestamp": now}
-            return data
+        return await get_chart(id, days)
     except Exception:
-        return _cg_cache["charts"].get(cache_key, {}).get("data", {"prices": []})
+        return {"prices": []}
 
 @app.get("/api/market/global")
 async def get_global_data():
-    global _cg_cache
-    now = datetime.now(timezone.utc)
-    
-    if _cg_cache["global"]["data"] and _cg_cache["global"]["timestamp"]:
-        if (now - _cg_cache["global"]["timestamp"]).total_seconds() < CG_CACHE_TTL:
-            return _cg_cache["global"]["data"]
-
+    from crypto_data import get_global
     try:
-        url = f"{COINGECKO_BASE_URL}/global"
-        import httpx
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url)
-            
-            if response.status_code == 429:
-                return _cg_cache["global"]["data"]
-
-            data = response.json()
-            result = data.get("data")
-            _cg_cache["global"] = {"data": result, "timestamp": now}
-            return result
+        return await get_global()
     except Exception:
-        return _cg_cache["global"]["data"]
+        return None
+
+@app.get("/api/market/crypto/cache-status")
+async def get_crypto_cache_status():
+    from crypto_data import crypto_cache_status
+    return crypto_cache_status()
 
 def _cache_get(key: str):
     slot = _intelligence_cache.get(key)
@@ -471,6 +390,19 @@ def _cache_set(key: str, value):
     _intelligence_cache[key] = {"data": value, "timestamp": datetime.now(timezone.utc)}
 
 
+_etag_caches: Dict[str, Any] = {}
+
+
+def _etag_cache(name: str, max_age_seconds: float):
+    """Per-endpoint encoded payload + ETag (conditional GET), created on first use."""
+    from http_cache import ETagCache
+
+    cache = _etag_caches.get(name)
+    if cache is None:
+        cache = _etag_caches[name] = ETagCache(name, max_age_seconds=max_age_seconds)
+    return cache
+
+
 def _parse_barchart_inline_payload(html: str):
     match = re.search(
         r'<script type="application/json" id="barchart-www-inline-data">(.*?)</script>',
@@ -1498,8 +1430,14 @@ async def get_cot_data():
 
 
 @app.get("/api/engine/cards")
-async def get_engine_cards():
-    return _get_intelligence_bundle()["engine"]
+async def get_engine_cards(request: Request):
+    cards = _get_intelligence_bundle()["engine"]
+    etag_cache = _etag_cache("engine_cards", INTELLIGENCE_CACHE_TTL)
+    version = _intelligence_cache["engine"]["timestamp"]
+    frozen = etag_cache.get(version)
+    if frozen is None:
+        frozen = etag_cache.put(version, cards)
+    return etag_cache.respond(request, frozen)
 
 
 @app.get("/api/news/briefing")
@@ -3353,61 +3291,116 @@ async def get_research_stats(current_user: dict = Depends(get_current_user)):
 
 
 @api_router.get("/research/matrix")
-async def get_research_matrix(current_user: dict = Depends(get_current_user)):
+async def get_research_matrix(request: Request, current_user: dict = Depends(get_current_user)):
     _ = current_user
     try:
         import local_vault_matrix
 
-        return local_vault_matrix.get_matrix_results()
+        etag_cache = _etag_cache("research_matrix", 300)
+        version = local_vault_matrix.evaluations_version()
+        frozen = etag_cache.get(version)
+        if frozen is None:
+            frozen = etag_cache.put(version, local_vault_matrix.get_matrix_results())
+        return etag_cache.respond(request, frozen)
     except Exception:
         return {}
 
 
 @api_router.get("/research/deep-research")
-async def get_research_deep(current_user: dict = Depends(get_current_user)):
+async def get_research_deep(request: Request, current_user: dict = Depends(get_current_user)):
     _ = current_user
+    try:
+        from deep_research_30 import CACHE_TTL_SECONDS, build_deep_research_report
+
+        report = await asyncio.to_thread(build_deep_research_report)
+        etag_cache = _etag_cache("research_deep_research", CACHE_TTL_SECONDS)
+        version = report.get("generated_at")
+        frozen = etag_cache.get(version)
+        if frozen is None:
+            frozen = etag_cache.put(version, report)
+        return etag_cache.respond(request, frozen)
+    except Exception as exc:
+        return _research_deep_fallback(str(exc))
+
+
+def _smart_money_context():
+    # Deep research can fail in read-only runtimes; smart-money should still run
+    # using live market/cross-asset data with a safe fallback context.
     try:
         from deep_research_30 import build_deep_research_report
+        deep_report = build_deep_research_report()
+    except Exception:
+        deep_report = {"signals": [], "risk_exposure": {}}
 
-        return build_deep_research_report()
+    intelligence = _get_intelligence_bundle()
+    return deep_report, intelligence.get("multi", {}), intelligence.get("projections", [])
+
+
+def _research_smart_money_sections(raw: str) -> Dict[str, object]:
+    from smart_money_positioning import build_positioning_sections, cached_positioning_sections, select_sections
+
+    try:
+        sections = select_sections(raw)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    try:
+        cached = cached_positioning_sections(sections)
+        if cached is not None:
+            return cached
+        deep_report, multi_snapshot, projections = _smart_money_context()
+        return build_positioning_sections(deep_report, multi_snapshot, projections, sections)
     except Exception as exc:
-        return _research_deep_fallback(str(exc))
+        fallback = _research_smart_money_fallback(str(exc))
+        return {key: fallback[key] for key in ("status", "generated_at", *sections, "cache")}
 
 
 @api_router.get("/research/smart-money")
-async def get_research_smart_money(current_user: dict = Depends(get_current_user)):
+async def get_research_smart_money(
+    request: Request, sections: Optional[str] = None, current_user: dict = Depends(get_current_user)
+):
     _ = current_user
+    if sections is not None:
+        return _research_smart_money_sections(sections)
     try:
-        from smart_money_positioning import build_smart_money_positioning
-
-        # Deep research can fail in read-only runtimes; smart-money should still run
-        # using live market/cross-asset data with a safe fallback context.
-        try:
-            from deep_research_30 import build_deep_research_report
-            deep_report = build_deep_research_report()
-        except Exception:
-            deep_report = {"signals": [], "risk_exposure": {}}
-
-        intelligence = _get_intelligence_bundle()
-        multi_snapshot = intelligence.get("multi", {})
-        projections = intelligence.get("projections", [])
+        from smart_money_positioning import CACHE_TTL_SECONDS, build_positioning_entry, cached_positioning_entry
+
+        etag_cache = _etag_cache("research_smart_money", CACHE_TTL_SECONDS)
+        cached = cached_positioning_entry()
+        if cached is not None:
+            frozen, cache_meta = cached
+            return etag_cache.respond(
+                request,
+                frozen,
+                max_age_seconds=cache_meta["ttl_seconds"] - cache_meta["age_seconds"],
+                cache=cache_meta,
+            )
 
-        return build_smart_money_positioning(
+        deep_report, multi_snapshot, projections = _smart_money_context()
+        result = build_positioning_entry(
             deep_report=deep_report,
             multi_snapshot=multi_snapshot,
             projections=projections,
         )
+        if isinstance(result, tuple):
+            frozen, cache_meta = result
+            return etag_cache.respond(request, frozen, cache=cache_meta)
+        return result
     except Exception as exc:
         return _research_smart_money_fallback(str(exc))
 
 
 @api_router.get("/research/sessions")
-async def get_research_sessions(current_user: dict = Depends(get_current_user)):
+async def get_research_sessions(request: Request, current_user: dict = Depends(get_current_user)):
     _ = current_user
     try:
-        from session_forensics import get_latest_session_report
-
-        return await asyncio.to_thread(get_latest_session_report)
+        from session_forensics import get_latest_session_report, latest_report_version
+
+        etag_cache = _etag_cache("research_sessions", 300)
+        version = latest_report_version()
+        frozen = etag_cache.get(version)
+        if frozen is None:
+            frozen = etag_cache.put(version, await asyncio.to_thread(get_latest_session_report))
+        return etag_cache.respond(request, frozen)
     except Exception as exc:
         return _research_sessions_fallback(str(exc))
 
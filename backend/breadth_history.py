@@ -0,0 +1,158 @@
+"""
+breadth_history.py
+
+Persistent market-breadth time series (one entry per 4h bucket).
+- observed breadth readings (% of components above MA50 / MA200) appended on every
+  refresh, so /market/breadth serves real history instead of a modeled curve
+- bucketed index prices kept alongside, so refreshes only fetch the recent range
+- per-index columnar arrays persisted as one JSON file (best-effort on read-only runtimes)
+"""
+from __future__ import annotations
+
+import json
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+
+BASE_DIR = Path(__file__).parent
+DATA_DIR = BASE_DIR / "data"
+try:
+    DATA_DIR.mkdir(exist_ok=True)
+except Exception:
+    # Serverless runtime can be read-only; file persistence becomes best-effort.
+    pass
+HISTORY_FILE = DATA_DIR / "breadth_history.json"
+
+MAX_READINGS = 2000   # ~2 years of 4h buckets
+MAX_PRICES = 600
+READING_FIELDS = ("above_ma50_pct", "above_ma200_pct")
+
+_LOCK = threading.Lock()
+_STORE: Optional[Dict[str, Any]] = None
+
+
+def _now_utc_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _empty_store() -> Dict[str, Any]:
+    return {"updated_at_utc": None, "indices": {}}
+
+
+def _empty_series() -> Dict[str, List[Any]]:
+    return {
+        "readings": {"date": [], **{field: [] for field in READING_FIELDS}},
+        "prices": {"date": [], "price": []},
+    }
+
+
+def _load_store() -> Dict[str, Any]:
+    global _STORE
+    if _STORE is not None:
+        return _STORE
+    store = _empty_store()
+    if HISTORY_FILE.exists():
+        try:
+            payload = json.loads(HISTORY_FILE.read_text(encoding="utf-8"))
+            if isinstance(payload, dict) and isinstance(payload.get("indices"), dict):
+                store = payload
+        except Exception:
+            pass
+    _STORE = store
+    return store
+
+
+def _write_store(store: Dict[str, Any]) -> None:
+    store["updated_at_utc"] = _now_utc_iso()
+    try:
+        HISTORY_FILE.parent.mkdir(exist_ok=True)
+        tmp = HISTORY_FILE.with_suffix(".tmp")
+        tmp.write_text(json.dumps(store, ensure_ascii=True, separators=(",", ":")), encoding="utf-8")
+        tmp.replace(HISTORY_FILE)
+    except Exception:
+        return
+
+
+def _series(store: Dict[str, Any], index_key: str) -> Dict[str, Any]:
+    return store["indices"].setdefault(index_key, _empty_series())
+
+
+def _upsert(columns: Dict[str, List[Any]], rows: Dict[str, Dict[str, Any]], max_points: int) -> int:
+    """Merge `rows` (date -> field values) into sorted columnar arrays; returns the number of new dates."""
+    fields = [name for name in columns if name != "date"]
+    merged = {d: {f: columns[f][i] for f in fields} for i, d in enumerate(columns["date"])}
+    added = sum(1 for d in rows if d not in merged)
+    for d, values in rows.items():
+        merged[d] = {f: values.get(f) for f in fields}
+    dates = sorted(merged)[-max_points:]
+    columns["date"] = dates
+    for f in fields:
+        columns[f] = [merged[d][f] for d in dates]
+    return added
+
+
+def record_reading(index_key: str, bucket: str, above_ma50_pct: float, above_ma200_pct: float) -> bool:
+    """Store one observed reading for a 4h bucket (latest observation in a bucket wins)."""
+    with _LOCK:
+        store = _load_store()
+        added = _upsert(
+            _series(store, index_key)["readings"],
+            {bucket: {"above_ma50_pct": round(float(above_ma50_pct), 2), "above_ma200_pct": round(float(above_ma200_pct), 2)}},
+            MAX_READINGS,
+        )
+        _write_store(store)
+        return bool(added)
+
+
+def readings(index_key: str) -> Dict[str, Dict[str, float]]:
+    with _LOCK:
+        columns = _load_store()["indices"].get(index_key, {}).get("readings")
+        if not columns:
+            return {}
+        return {d: {f: columns[f][i] for f in READING_FIELDS} for i, d in enumerate(columns["date"])}
+
+
+def merge_prices(index_key: str, points: Iterable[Dict[str, Any]]) -> int:
+    rows = {}
+    for point in points or []:
+        price, bucket = point.get("price"), point.get("date")
+        if isinstance(price, (int, float)) and bucket:
+            rows[str(bucket)] = {"price": float(price)}
+    if not rows:
+        return 0
+    with _LOCK:
+        store = _load_store()
+        added = _upsert(_series(store, index_key)["prices"], rows, MAX_PRICES)
+        _write_store(store)
+        return added
+
+
+def price_history(index_key: str, max_points: int) -> List[Dict[str, Any]]:
+    with _LOCK:
+        columns = _load_store()["indices"].get(index_key, {}).get("prices")
+        if not columns:
+            return []
+        dates, prices = columns["date"][-max_points:], columns["price"][-max_points:]
+        return [{"date": d, "price": p} for d, p in zip(dates, prices)]
+
+
+def history_status() -> Dict[str, Any]:
+    with _LOCK:
+        store = _load_store()
+        indices = {}
+        for key, series in store.get("indices", {}).items():
+            dates = series.get("readings", {}).get("date") or []
+            indices[key] = {
+                "readings": len(dates),
+                "first_reading": dates[0] if dates else None,
+                "last_reading": dates[-1] if dates else None,
+                "price_points": len(series.get("prices", {}).get("date") or []),
+            }
+        return {
+            "status": "ok",
+            "path": str(HISTORY_FILE),
+            "updated_at_utc": store.get("updated_at_utc"),
+            "indices": indices,
+        }
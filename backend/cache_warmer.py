@@ -0,0 +1,239 @@
+"""
+cache_warmer.py
+
+Refresh-ahead scheduling for expensive cached payloads.
+- each target declares its TTL, how to read the age of its current entry and how to
+  rebuild it; the warmer learns the observed recompute time and rebuilds an entry
+  once its remaining lifetime drops below that time (plus one tick), so readers keep
+  hitting a fresh entry instead of paying for the rebuild
+- only targets read within `recent_seconds` are kept warm: idle entries expire as before
+- targets that hit upstream feeds honor the collection control pause
+  (`can_collect_now`: manual pause / market closed)
+- per-target warm / cold read counters, refresh counts and recompute times for /system/status
+
+Refresh callables receive `max_age_seconds`: an entry at least that fresh (e.g. one a
+peer worker just published to the shared cache) is good enough to adopt.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    from .collection_control import can_collect_now
+    from .ttl_cache import DEFAULT_KEY
+except ImportError:  # pragma: no cover - script/local import fallback
+    from collection_control import can_collect_now
+    from ttl_cache import DEFAULT_KEY
+
+logger = logging.getLogger(__name__)
+
+# Scheduler cadence; also the slack added to every lead time.
+TICK_SECONDS = 10.0
+# Targets nobody read for this long are left to expire.
+DEFAULT_RECENT_SECONDS = 15 * 60
+DEFAULT_MIN_LEAD_SECONDS = 5.0
+# Recompute times jitter with upstream latency: start this much earlier than the average.
+LEAD_FACTOR = 1.5
+# However slow the recompute, an entry is rebuilt at most twice per TTL.
+MAX_LEAD_FRACTION = 0.5
+# Weight of the newest sample in the recompute-time moving average.
+EMA_ALPHA = 0.3
+
+# Set while a refresh runs, so reads it makes (dependencies) keep those targets
+# active without counting as user-facing warm / cold reads.
+_WARMING: contextvars.ContextVar[bool] = contextvars.ContextVar("cache_warming", default=False)
+
+_REGISTRY: Dict[str, "WarmTarget"] = {}
+_REGISTRY_LOCK = threading.Lock()
+_TASKS: Set[asyncio.Task] = set()
+
+
+class WarmTarget:
+    def __init__(
+        self,
+        name: str,
+        ttl_seconds: float,
+        age: Callable[[], Optional[float]],
+        refresh: Callable[[float], Any],
+        recent_seconds: float = DEFAULT_RECENT_SECONDS,
+        min_lead_seconds: float = DEFAULT_MIN_LEAD_SECONDS,
+        collection_bound: bool = True,
+    ):
+        self.name = name
+        self.ttl_seconds = float(ttl_seconds)
+        self.age = age
+        self.refresh = refresh
+        self.recent_seconds = float(recent_seconds)
+        self.min_lead_seconds = float(min_lead_seconds)
+        self.collection_bound = collection_bound
+        self._last_access: Optional[float] = None
+        self._inflight = False
+        self._lock = threading.Lock()
+        self.stats = {
+            "warm_reads": 0,
+            "cold_reads": 0,
+            "refreshes": 0,
+            "errors": 0,
+            "paused_skips": 0,
+        }
+        self._recompute = {"ema": None, "last": None, "max": 0.0}
+
+    def _current_age(self) -> Optional[float]:
+        try:
+            return self.age()
+        except Exception:
+            return None
+
+    def touch(self) -> None:
+        """Record a read. Call it before serving, so the entry's age tells warm from cold."""
+        age = self._current_age()
+        with self._lock:
+            self._last_access = time.monotonic()
+            if _WARMING.get():
+                return
+            if age is not None and age < self.ttl_seconds:
+                self.stats["warm_reads"] += 1
+            else:
+                self.stats["cold_reads"] += 1
+
+    def lead_seconds(self) -> float:
+        observed = (self._recompute["ema"] or 0.0) * LEAD_FACTOR
+        return min(max(self.min_lead_seconds, observed) + TICK_SECONDS, self.ttl_seconds * MAX_LEAD_FRACTION)
+
+    def active(self, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        return self._last_access is not None and now - self._last_access <= self.recent_seconds
+
+    def claim(self, collection_allowed: bool) -> bool:
+        """True (and marked in flight) when the entry is read, about to expire and refreshable now."""
+        with self._lock:
+            if self._inflight or not self.active():
+                return False
+        age = self._current_age()
+        if age is not None and age < self.ttl_seconds - self.lead_seconds():
+            return False
+        with self._lock:
+            if self.collection_bound and not collection_allowed:
+                self.stats["paused_skips"] += 1
+                return False
+            if self._inflight:
+                return False
+            self._inflight = True
+            return True
+
+    async def run(self) -> None:
+        """Rebuild the entry (caller claimed it); failures keep the current entry."""
+        max_age = max(0.0, self.ttl_seconds - self.lead_seconds())
+        token = _WARMING.set(True)
+        started = time.perf_counter()
+        try:
+            if asyncio.iscoroutinefunction(self.refresh):
+                await self.refresh(max_age)
+            else:
+                await asyncio.to_thread(self.refresh, max_age)
+        except Exception as exc:
+            with self._lock:
+                self.stats["errors"] += 1
+            logger.warning(f"cache warmer: {self.name} refresh failed: {exc}")
+        else:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.stats["refreshes"] += 1
+                ema = self._recompute["ema"]
+                self._recompute["ema"] = elapsed if ema is None else ema + EMA_ALPHA * (elapsed - ema)
+                self._recompute["last"] = elapsed
+                self._recompute["max"] = max(self._recompute["max"], elapsed)
+        finally:
+            _WARMING.reset(token)
+            with self._lock:
+                self._inflight = False
+
+    def status(self) -> Dict[str, Any]:
+        age = self._current_age()
+        with self._lock:
+            now = time.monotonic()
+            reads = self.stats["warm_reads"] + self.stats["cold_reads"]
+            ema, last = self._recompute["ema"], self._recompute["last"]
+            return {
+                "ttl_seconds": self.ttl_seconds,
+                "lead_seconds": round(self.lead_seconds(), 1),
+                "age_seconds": round(age, 1) if age is not None else None,
+                "last_read_seconds_ago": round(now - self._last_access, 1) if self._last_access is not None else None,
+                "active": self.active(now),
+                "inflight": self._inflight,
+                "collection_bound": self.collection_bound,
+                "warm_ratio": round(self.stats["warm_reads"] / reads, 4) if reads else None,
+                **self.stats,
+                "recompute_ms": {
+                    "last": round(last * 1000.0, 1) if last is not None else None,
+                    "avg": round(ema * 1000.0, 1) if ema is not None else None,
+                    "max": round(self._recompute["max"] * 1000.0, 1),
+                },
+            }
+
+
+def register(
+    name: str,
+    ttl_seconds: float,
+    age: Callable[[], Optional[float]],
+    refresh: Callable[[float], Any],
+    **options: Any,
+) -> WarmTarget:
+    target = WarmTarget(name, ttl_seconds, age, refresh, **options)
+    with _REGISTRY_LOCK:
+        _REGISTRY[name] = target
+    return target
+
+
+def register_ttl_cache(cache: Any, loader: Callable[[float], Any], key: Any = DEFAULT_KEY, **options: Any) -> WarmTarget:
+    """Target for one TTLCache entry; `loader(max_age_seconds)` builds the value the cache stores."""
+    return register(
+        cache.name,
+        cache.ttl_seconds,
+        age=lambda: cache.age(key),
+        refresh=lambda max_age: cache.refresh(key, lambda: loader(max_age)),
+        **options,
+    )
+
+
+def _collection_allowed() -> Tuple[bool, str]:
+    try:
+        return can_collect_now()
+    except Exception as exc:
+        logger.warning(f"cache warmer: collection state unavailable ({exc}); pausing upstream refreshes")
+        return False, "unknown"
+
+
+async def tick() -> List[asyncio.Task]:
+    """
+    Start every due refresh and return their tasks. The scheduler does not wait on
+    them, so one slow engine never delays the others (or the next tick).
+    """
+    allowed, _ = _collection_allowed()
+    with _REGISTRY_LOCK:
+        targets = list(_REGISTRY.values())
+    started: List[asyncio.Task] = []
+    for target in targets:
+        if target.claim(allowed):
+            task = asyncio.create_task(target.run())
+            _TASKS.add(task)
+            task.add_done_callback(_TASKS.discard)
+            started.append(task)
+    return started
+
+
+def cache_warmer_status() -> Dict[str, Any]:
+    allowed, reason = _collection_allowed()
+    with _REGISTRY_LOCK:
+        targets = dict(_REGISTRY)
+    return {
+        "status": "ok" if allowed else "paused",
+        "reason": reason,
+        "tick_seconds": TICK_SECONDS,
+        "targets": {name: target.status() for name, target in sorted(targets.items())},
+    }
@@ -0,0 +1,413 @@
+"""
+cot_feed.py
+
+Release-calendar-aware CFTC COT fetcher.
+- CFTC publishes the weekly reports on Friday 15:30 ET (positions as of Tuesday)
+- conditional GET (If-Modified-Since / If-None-Match) per report file
+- streaming row matching: only lines whose market name matches a target are parsed
+- parsed rows persisted on disk and served as-is until the next release
+"""
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+import requests
+
+try:
+    from .rate_limiter import acquire_budget, report_throttled
+except ImportError:  # pragma: no cover - script/local import fallback
+    from rate_limiter import acquire_budget, report_throttled
+
+
+BASE_DIR = Path(__file__).parent
+DATA_DIR = BASE_DIR / "data"
+try:
+    DATA_DIR.mkdir(exist_ok=True)
+except Exception:
+    # Serverless runtime can be read-only; file persistence becomes best-effort.
+    pass
+CACHE_FILE = DATA_DIR / "cot_live_cache.json"
+
+NEW_YORK_TZ = ZoneInfo("America/New_York")
+RELEASE_WEEKDAY = 4              # Friday
+RELEASE_HOUR_ET = 15
+RELEASE_MINUTE_ET = 30
+AS_OF_LAG_DAYS = 3               # Friday release carries Tuesday positions
+RELEASE_RETRY_SECONDS = 30 * 60  # re-check cadence while a due release is not published yet
+REQUEST_TIMEOUT_SECONDS = 20
+
+logger = logging.getLogger(__name__)
+
+# (symbol, needle, matcher): `needle` is a cheap substring pre-filter on the raw line,
+# `matcher` runs on the parsed market name only for lines that pass it.
+COT_REPORTS: Dict[str, Dict[str, Any]] = {
+    "FinComWk": {
+        "url": "https://www.cftc.gov/dea/newcot/FinComWk.txt",
+        # Financial report: Asset Manager Long/Short (columns 11/12), OI (7)
+        "participant": "asset_manager",
+        "long_col": 11,
+        "short_col": 12,
+        "min_cols": 13,
+        "targets": (
+            (
+                "NAS100",
+                "NASDAQ-100 CONSOLIDATED",
+                lambda n: ("NASDAQ-100 CONSOLIDATED" in n) and ("MICRO" not in n) and ("MINI" not in n),
+            ),
+            (
+                "SP500",
+                "S&P 500 CONSOLIDATED",
+                lambda n: ("S&P 500 CONSOLIDATED" in n) and ("MICRO" not in n) and ("E-MINI" not in n),
+            ),
+            (
+                "EURUSD",
+                "EURO FX - CHICAGO MERCANTILE EXCHANGE",
+                lambda n: n.startswith("EURO FX - CHICAGO MERCANTILE EXCHANGE"),
+            ),
+        ),
+    },
+    "deafut": {
+        "url": "https://www.cftc.gov/dea/newcot/deafut.txt",
+        # Disaggregated futures: Managed Money Long/Short (columns 14/15), OI (7)
+        "participant": "managed_money",
+        "long_col": 14,
+        "short_col": 15,
+        "min_cols": 16,
+        "targets": (
+            (
+                "XAUUSD",
+                "GOLD - COMMODITY EXCHANGE INC.",
+                lambda n: ("GOLD - COMMODITY EXCHANGE INC." in n) and ("MICRO GOLD" not in n),
+            ),
+        ),
+    },
+}
+
+_LOCK = threading.Lock()
+_STATE: Optional[Dict[str, Any]] = None
+# Held while a background refresh runs; acquired non-blocking so only one starts.
+_REFRESH_INFLIGHT = threading.Lock()
+
+
+def _to_int(value: Any, default: int = 0) -> int:
+    try:
+        if value is None:
+            return default
+        if isinstance(value, str):
+            value = value.replace(",", "").strip()
+        return int(float(value))
+    except Exception:
+        return default
+
+
+def _parse_iso(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.astimezone(timezone.utc)
+    except Exception:
+        return None
+
+
+def last_release_at(now_utc: Optional[datetime] = None) -> datetime:
+    """Most recent scheduled release (Friday 15:30 ET) at or before `now_utc`."""
+    now_utc = now_utc or datetime.now(timezone.utc)
+    now_et = now_utc.astimezone(NEW_YORK_TZ)
+    days_back = (now_et.weekday() - RELEASE_WEEKDAY) % 7
+    release_day = (now_et - timedelta(days=days_back)).date()
+    release_et = datetime(
+        release_day.year, release_day.month, release_day.day,
+        RELEASE_HOUR_ET, RELEASE_MINUTE_ET, tzinfo=NEW_YORK_TZ,
+    )
+    if release_et > now_et:
+        release_day = release_day - timedelta(days=7)
+        release_et = datetime(
+            release_day.year, release_day.month, release_day.day,
+            RELEASE_HOUR_ET, RELEASE_MINUTE_ET, tzinfo=NEW_YORK_TZ,
+        )
+    return release_et.astimezone(timezone.utc)
+
+
+def next_release_at(now_utc: Optional[datetime] = None) -> datetime:
+    """Next scheduled release (Friday 15:30 ET) strictly after `now_utc`."""
+    last_et = last_release_at(now_utc).astimezone(NEW_YORK_TZ)
+    next_day = (last_et + timedelta(days=7)).date()
+    next_et = datetime(
+        next_day.year, next_day.month, next_day.day,
+        RELEASE_HOUR_ET, RELEASE_MINUTE_ET, tzinfo=NEW_YORK_TZ,
+    )
+    return next_et.astimezone(timezone.utc)
+
+
+def expected_as_of_date(now_utc: Optional[datetime] = None) -> str:
+    """Tuesday positions date carried by the latest scheduled release."""
+    release_et = last_release_at(now_utc).astimezone(NEW_YORK_TZ)
+    return (release_et.date() - timedelta(days=AS_OF_LAG_DAYS)).isoformat()
+
+
+def _load_state() -> Dict[str, Any]:
+    global _STATE
+    if _STATE is not None:
+        return _STATE
+    state: Dict[str, Any] = {"reports": {}}
+    if CACHE_FILE.exists():
+        try:
+            payload = json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+            if isinstance(payload, dict) and isinstance(payload.get("reports"), dict):
+                state = payload
+        except Exception:
+            pass
+    _STATE = state
+    return state
+
+
+def _write_state(state: Dict[str, Any]) -> None:
+    try:
+        CACHE_FILE.parent.mkdir(exist_ok=True)
+        CACHE_FILE.write_text(json.dumps(state, ensure_ascii=True, indent=2), encoding="utf-8")
+    except Exception:
+        return
+
+
+def _normalize_as_of(raw: Any) -> str:
+    text = str(raw or "").strip()
+    for fmt in ("%Y-%m-%d", "%m/%d/%Y", "%y%m%d"):
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except Exception:
+            continue
+    return text
+
+
+def row_to_record(report_name: str, report: Dict[str, Any], row: List[str]) -> Optional[Dict[str, Any]]:
+    if len(row) < int(report["min_cols"]):
+        return None
+    open_interest = _to_int(row[7], 0)
+    long_val = _to_int(row[int(report["long_col"])], 0)
+    short_val = _to_int(row[int(report["short_col"])], 0)
+    net = long_val - short_val
+    net_pct_oi = (net / open_interest * 100.0) if open_interest > 0 else 0.0
+    return {
+        "as_of_date": str(row[2]).strip(),
+        "open_interest": open_interest,
+        "long": long_val,
+        "short": short_val,
+        "net": net,
+        "net_pct_oi": round(net_pct_oi, 2),
+        "participant": report["participant"],
+        "report": report_name,
+    }
+
+
+def iter_matching_rows(lines, targets):
+    """
+    Yield (symbol, parsed_row) for every report line matching one of `targets`.
+    Only lines passing the substring pre-filter go through csv parsing.
+    """
+    for raw in lines:
+        if not raw:
+            continue
+        if isinstance(raw, bytes):
+            raw = raw.decode("latin-1")
+        upper = raw.upper()
+        candidates = [t for t in targets if t[1] in upper]
+        if not candidates:
+            continue
+        try:
+            row = next(csv.reader([raw]))
+        except Exception:
+            continue
+        if not row:
+            continue
+        name = str(row[0]).upper()
+        for symbol, _, matcher in candidates:
+            if matcher(name):
+                yield symbol, row
+
+
+def match_report_lines(lines, targets) -> Dict[str, List[str]]:
+    """
+    Scan report lines once and return {symbol: parsed_row} for the first row matching each target.
+    Scanning stops as soon as every target has been found.
+    """
+    wanted = {t[0] for t in targets}
+    found: Dict[str, List[str]] = {}
+    for symbol, row in iter_matching_rows(lines, targets):
+        if symbol in found:
+            continue
+        found[symbol] = row
+        if len(found) == len(wanted):
+            break
+    return found
+
+
+def _fetch_report(report_name: str, entry: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    report = COT_REPORTS[report_name]
+    headers: Dict[str, str] = {}
+    if entry.get("rows"):
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = str(entry["last_modified"])
+        if entry.get("etag"):
+            headers["If-None-Match"] = str(entry["etag"])
+
+    out = dict(entry)
+    out["checked_at_utc"] = now.isoformat()
+    if not acquire_budget("cftc"):
+        out["last_status"] = "budget_exhausted"
+        return out
+    response = requests.get(report["url"], headers=headers, timeout=REQUEST_TIMEOUT_SECONDS, stream=True)
+    try:
+        if response.status_code == 304:
+            out["last_status"] = "not_modified"
+            return out
+        if response.status_code == 429:
+            report_throttled("cftc", response.headers.get("Retry-After"))
+        response.raise_for_status()
+        if not response.encoding:
+            response.encoding = "latin-1"
+        matched = match_report_lines(response.iter_lines(decode_unicode=True), report["targets"])
+    finally:
+        response.close()
+
+    rows: Dict[str, Any] = {}
+    for symbol, row in matched.items():
+        record = row_to_record(report_name, report, row)
+        if record:
+            rows[symbol] = record
+    if not rows and entry.get("rows"):
+        # Keep last good rows when the file came back empty/garbled.
+        out["last_status"] = "empty_response"
+        return out
+
+    out["rows"] = rows
+    out["fetched_at_utc"] = now.isoformat()
+    out["last_modified"] = response.headers.get("Last-Modified") or entry.get("last_modified")
+    out["etag"] = response.headers.get("ETag") or entry.get("etag")
+    out["last_status"] = "updated"
+    return out
+
+
+def _report_as_of(entry: Dict[str, Any]) -> str:
+    dates = [_normalize_as_of(r.get("as_of_date")) for r in (entry.get("rows") or {}).values() if isinstance(r, dict)]
+    return max(dates) if dates else ""
+
+
+def _report_due(entry: Dict[str, Any], now: datetime) -> bool:
+    if not entry or not entry.get("rows"):
+        return True
+    checked_at = _parse_iso(entry.get("checked_at_utc"))
+    if checked_at is None or checked_at < last_release_at(now):
+        return True
+    if _report_as_of(entry) >= expected_as_of_date(now):
+        return False
+    # Release is due but CFTC has not published it yet (holiday shifts / delays).
+    return (now - checked_at).total_seconds() >= RELEASE_RETRY_SECONDS
+
+
+def refresh_if_due(now: Optional[datetime] = None, force: bool = False) -> Dict[str, Any]:
+    """
+    Run conditional fetches only for reports whose release is due (or all with `force`).
+    `_LOCK` is held only to read the entries and to merge the results, never across the
+    CFTC round-trip, so snapshot readers are not blocked by a running refresh.
+    """
+    now = now or datetime.now(timezone.utc)
+    results: Dict[str, str] = {}
+    with _LOCK:
+        entries = {name: (_load_state().get("reports", {}).get(name) or {}) for name in COT_REPORTS}
+
+    fetched: Dict[str, Dict[str, Any]] = {}
+    for report_name, entry in entries.items():
+        if not force and not _report_due(entry, now):
+            results[report_name] = "fresh"
+            continue
+        try:
+            fetched[report_name] = _fetch_report(report_name, entry, now)
+            results[report_name] = str(fetched[report_name].get("last_status") or "updated")
+        except Exception as exc:
+            logger.warning(f"CFTC {report_name} fetch failed: {exc}")
+            failed = dict(entry)
+            failed["checked_at_utc"] = now.isoformat()
+            failed["last_status"] = "error"
+            fetched[report_name] = failed
+            results[report_name] = "error"
+
+    if fetched:
+        with _LOCK:
+            state = _load_state()
+            state.setdefault("reports", {}).update(fetched)
+            _write_state(state)
+    return {"status": "ok", "reports": results, "checked_at_utc": now.isoformat()}
+
+
+def _background_refresh() -> None:
+    try:
+        refresh_if_due()
+    finally:
+        _REFRESH_INFLIGHT.release()
+
+
+def _snapshot_from_state(state: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    symbols: Dict[str, Any] = {}
+    reports_meta: Dict[str, Any] = {}
+    updated_at = None
+    for report_name in COT_REPORTS:
+        entry = state.get("reports", {}).get(report_name) or {}
+        for symbol, row in (entry.get("rows") or {}).items():
+            if isinstance(row, dict):
+                symbols[symbol] = dict(row)
+        fetched_at = entry.get("fetched_at_utc")
+        if fetched_at and (updated_at is None or str(fetched_at) > updated_at):
+            updated_at = str(fetched_at)
+        reports_meta[report_name] = {
+            "as_of_date": _report_as_of(entry) or None,
+            "fetched_at_utc": fetched_at,
+            "checked_at_utc": entry.get("checked_at_utc"),
+            "last_modified": entry.get("last_modified"),
+            "last_status": entry.get("last_status"),
+        }
+    return {
+        "symbols": symbols,
+        "source": "CFTC",
+        "updated_at": updated_at or now.isoformat(),
+        "last_release_utc": last_release_at(now).isoformat(),
+        "next_release_utc": next_release_at(now).isoformat(),
+        "reports": reports_meta,
+    }
+
+
+def get_cot_snapshot(now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    COT rows for all tracked symbols.
+    Between releases this never touches the network; once a release is due the cached
+    rows keep being served while a single background conditional refresh runs.
+    Only a cold start (no rows on disk) fetches inline.
+    """
+    now = now or datetime.now(timezone.utc)
+    with _LOCK:
+        state = _load_state()
+        entries = state.get("reports", {})
+        have_rows = any((entries.get(name) or {}).get("rows") for name in COT_REPORTS)
+        due = any(_report_due(entries.get(name) or {}, now) for name in COT_REPORTS)
+
+    if due:
+        if not have_rows:
+            refresh_if_due(now)
+        elif _REFRESH_INFLIGHT.acquire(blocking=False):
+            try:
+                threading.Thread(target=_background_refresh, name="cot-refresh", daemon=True).start()
+            except Exception:
+                _REFRESH_INFLIGHT.release()
+                raise
+
+    with _LOCK:
+        return _snapshot_from_state(_load_state(), now)
@@ -0,0 +1,354 @@
+"""
+cot_history.py
+
+Local multi-year COT positioning history.
+- one-shot ingest of CFTC yearly archives (zip/txt files, same layout as the weekly reports)
+- weekly append from the live cot_feed snapshot
+- per-symbol columnar arrays (net, net_pct_oi, open interest) persisted on disk
+- precomputed rolling 52w/156w percentile and z-score indexes, so positioning
+  queries are dict/array lookups instead of ad hoc downloads
+"""
+from __future__ import annotations
+
+import io
+import json
+import logging
+import math
+import threading
+import zipfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import requests
+
+try:
+    from .cot_feed import COT_REPORTS, _normalize_as_of, iter_matching_rows, row_to_record
+except ImportError:
+    from cot_feed import COT_REPORTS, _normalize_as_of, iter_matching_rows, row_to_record
+
+
+BASE_DIR = Path(__file__).parent
+DATA_DIR = BASE_DIR / "data"
+try:
+    DATA_DIR.mkdir(exist_ok=True)
+except Exception:
+    # Serverless runtime can be read-only; file persistence becomes best-effort.
+    pass
+HISTORY_FILE = DATA_DIR / "cot_history.json"
+ARCHIVE_DIR = DATA_DIR / "cot_archives"
+
+# Yearly archives with the same column layout as the weekly files used by cot_feed.
+ARCHIVE_URLS = {
+    "FinComWk": "https://www.cftc.gov/files/dea/history/com_fin_txt_{year}.zip",
+    "deafut": "https://www.cftc.gov/files/dea/history/fut_disagg_txt_{year}.zip",
+}
+INDEX_WINDOWS = {"52w": 52, "156w": 156}
+INDEX_FIELDS = ("net", "net_pct_oi")
+SERIES_FIELDS = ("net", "net_pct_oi", "open_interest", "long", "short")
+MIN_WINDOW_FRACTION = 0.5
+EXTREME_HIGH_PCT = 90.0
+EXTREME_LOW_PCT = 10.0
+REQUEST_TIMEOUT_SECONDS = 60
+
+logger = logging.getLogger(__name__)
+
+_LOCK = threading.Lock()
+_STORE: Optional[Dict[str, Any]] = None
+_DATE_INDEX: Dict[str, Dict[str, int]] = {}
+
+
+def _now_utc_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _empty_store() -> Dict[str, Any]:
+    return {"updated_at_utc": None, "ingested_archives": [], "symbols": {}}
+
+
+def _rebuild_date_index(store: Dict[str, Any]) -> None:
+    _DATE_INDEX.clear()
+    for symbol, series in store.get("symbols", {}).items():
+        _DATE_INDEX[symbol] = {d: i for i, d in enumerate(series.get("as_of_date", []))}
+
+
+def _load_store() -> Dict[str, Any]:
+    global _STORE
+    if _STORE is not None:
+        return _STORE
+    store = _empty_store()
+    if HISTORY_FILE.exists():
+        try:
+            payload = json.loads(HISTORY_FILE.read_text(encoding="utf-8"))
+            if isinstance(payload, dict) and isinstance(payload.get("symbols"), dict):
+                store = payload
+        except Exception:
+            pass
+    _STORE = store
+    _rebuild_date_index(store)
+    return store
+
+
+def _write_store(store: Dict[str, Any]) -> None:
+    store["updated_at_utc"] = _now_utc_iso()
+    try:
+        HISTORY_FILE.parent.mkdir(exist_ok=True)
+        HISTORY_FILE.write_text(json.dumps(store, ensure_ascii=True, separators=(",", ":")), encoding="utf-8")
+    except Exception:
+        return
+
+
+def _window_stats(values: List[float], idx: int, window: int) -> Dict[str, Optional[float]]:
+    start = max(0, idx - window + 1)
+    sample = values[start: idx + 1]
+    if len(sample) < max(2, int(window * MIN_WINDOW_FRACTION)):
+        return {"percentile": None, "zscore": None}
+    current = values[idx]
+    below = sum(1 for v in sample if v < current)
+    equal = sum(1 for v in sample if v == current)
+    percentile = ((below + (0.5 * equal)) / len(sample)) * 100.0
+    mean = sum(sample) / len(sample)
+    var = sum((v - mean) ** 2 for v in sample) / len(sample)
+    std = math.sqrt(var)
+    zscore = ((current - mean) / std) if std > 1e-12 else 0.0
+    return {"percentile": round(percentile, 2), "zscore": round(zscore, 4)}
+
+
+def _compute_index(series: Dict[str, Any], start_idx: int = 0) -> None:
+    """(Re)compute rolling indexes from `start_idx` onwards; earlier points are left untouched."""
+    size = len(series.get("as_of_date", []))
+    index = series.setdefault("index", {})
+    for field in INDEX_FIELDS:
+        values = [float(v) for v in series.get(field, [])]
+        field_index = index.setdefault(field, {})
+        for label, window in INDEX_WINDOWS.items():
+            block = field_index.setdefault(label, {"percentile": [], "zscore": []})
+            pct = block["percentile"][:start_idx]
+            zs = block["zscore"][:start_idx]
+            for i in range(start_idx, size):
+                stats = _window_stats(values, i, window)
+                pct.append(stats["percentile"])
+                zs.append(stats["zscore"])
+            block["percentile"] = pct
+            block["zscore"] = zs
+
+
+def _merge_records(store: Dict[str, Any], symbol: str, records: Iterable[Dict[str, Any]]) -> int:
+    """Upsert weekly records for one symbol; returns number of new/changed weeks."""
+    series = store.setdefault("symbols", {}).setdefault(symbol, {})
+    dates: List[str] = list(series.get("as_of_date", []))
+    by_date: Dict[str, Dict[str, Any]] = {
+        d: {field: series[field][i] for field in SERIES_FIELDS}
+        for i, d in enumerate(dates)
+    }
+
+    changed = 0
+    first_changed: Optional[str] = None
+    for record in records:
+        day = _normalize_as_of(record.get("as_of_date"))
+        if not day:
+            continue
+        row = {field: record.get(field) for field in SERIES_FIELDS}
+        if by_date.get(day) == row:
+            continue
+        by_date[day] = row
+        series["report"] = record.get("report", series.get("report"))
+        series["participant"] = record.get("participant", series.get("participant"))
+        changed += 1
+        if first_changed is None or day < first_changed:
+            first_changed = day
+    if not changed:
+        return 0
+
+    ordered = sorted(by_date)
+    series["as_of_date"] = ordered
+    for field in SERIES_FIELDS:
+        series[field] = [by_date[d][field] for d in ordered]
+    start_idx = ordered.index(first_changed) if first_changed in ordered else 0
+    _compute_index(series, start_idx=start_idx)
+    _DATE_INDEX[symbol] = {d: i for i, d in enumerate(ordered)}
+    return changed
+
+
+def _report_for_archive(path: Path) -> Optional[str]:
+    name = path.name.lower()
+    if "disagg" in name or name.startswith("f_"):
+        return "deafut"
+    if "fin" in name:
+        return "FinComWk"
+    return None
+
+
+def _archive_lines(path: Path):
+    if path.suffix.lower() == ".zip":
+        with zipfile.ZipFile(path) as zf:
+            for member in zf.namelist():
+                if not member.lower().endswith(".txt"):
+                    continue
+                with zf.open(member) as fh:
+                    for line in io.TextIOWrapper(fh, encoding="latin-1"):
+                        yield line.rstrip("\r\n")
+        return
+    with path.open("r", encoding="latin-1") as fh:
+        for line in fh:
+            yield line.rstrip("\r\n")
+
+
+def ingest_archive_file(path: Path, report_name: Optional[str] = None, force: bool = False) -> Dict[str, Any]:
+    """Ingest one CFTC yearly archive (zip or txt). Archives already ingested are skipped."""
+    path = Path(path)
+    report_name = report_name or _report_for_archive(path)
+    if report_name not in COT_REPORTS:
+        raise ValueError(f"cannot infer COT report for archive: {path.name}")
+    report = COT_REPORTS[report_name]
+
+    with _LOCK:
+        store = _load_store()
+        if not force and path.name in store.get("ingested_archives", []):
+            return {"status": "skipped", "reason": "already_ingested", "archive": path.name}
+
+    per_symbol: Dict[str, List[Dict[str, Any]]] = {}
+    for symbol, row in iter_matching_rows(_archive_lines(path), report["targets"]):
+        record = row_to_record(report_name, report, row)
+        if record:
+            per_symbol.setdefault(symbol, []).append(record)
+
+    with _LOCK:
+        store = _load_store()
+        weeks = {symbol: _merge_records(store, symbol, rows) for symbol, rows in per_symbol.items()}
+        ingested = store.setdefault("ingested_archives", [])
+        if path.name not in ingested:
+            ingested.append(path.name)
+        _write_store(store)
+    return {"status": "ok", "archive": path.name, "report": report_name, "weeks": weeks}
+
+
+def download_archives(years: Iterable[int], report_names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Fetch yearly archives into ARCHIVE_DIR (once) and ingest them."""
+    ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+    years = [int(y) for y in years]
+    results = []
+    for report_name in (report_names or ARCHIVE_URLS.keys()):
+        for year in years:
+            url = ARCHIVE_URLS[report_name].format(year=year)
+            target = ARCHIVE_DIR / url.rsplit("/", 1)[-1]
+            try:
+                if not target.exists():
+                    response = requests.get(url, timeout=REQUEST_TIMEOUT_SECONDS)
+                    response.raise_for_status()
+                    target.write_bytes(response.content)
+                results.append(ingest_archive_file(target, report_name))
+            except Exception as exc:
+                logger.warning(f"COT archive {url} failed: {exc}")
+                results.append({"status": "error", "archive": target.name, "error": str(exc)})
+    return {"status": "ok", "results": results}
+
+
+def append_snapshot(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """Append the latest weekly rows from a cot_feed snapshot (no-op for weeks already stored)."""
+    symbols = snapshot.get("symbols", {}) if isinstance(snapshot, dict) else {}
+    appended: Dict[str, int] = {}
+    with _LOCK:
+        store = _load_store()
+        for symbol, row in symbols.items():
+            if isinstance(row, dict) and row:
+                appended[symbol] = _merge_records(store, symbol, [row])
+        if any(appended.values()):
+            _write_store(store)
+    return {"status": "ok", "appended": appended}
+
+
+def _point(series: Dict[str, Any], idx: int) -> Dict[str, Any]:
+    out: Dict[str, Any] = {"as_of_date": series["as_of_date"][idx]}
+    for field in SERIES_FIELDS:
+        out[field] = series[field][idx]
+    for field in INDEX_FIELDS:
+        for label in INDEX_WINDOWS:
+            block = series.get("index", {}).get(field, {}).get(label, {})
+            out[f"{field}_percentile_{label}"] = block.get("percentile", [None] * (idx + 1))[idx]
+            out[f"{field}_zscore_{label}"] = block.get("zscore", [None] * (idx + 1))[idx]
+    return out
+
+
+def _extreme_state(percentile: Optional[float]) -> str:
+    if percentile is None:
+        return "insufficient_history"
+    if percentile >= EXTREME_HIGH_PCT:
+        return "extreme_long"
+    if percentile <= EXTREME_LOW_PCT:
+        return "extreme_short"
+    return "normal"
+
+
+def get_positioning(symbol: str, as_of_date: Optional[str] = None, lookback_weeks: int = 4) -> Optional[Dict[str, Any]]:
+    """
+    Positioning and precomputed percentile/z-score indexes for one symbol.
+    `as_of_date` defaults to the latest stored week; previous weeks come along for rolling views.
+    """
+    symbol = str(symbol or "").upper()
+    with _LOCK:
+        store = _load_store()
+        series = store.get("symbols", {}).get(symbol)
+        if not series or not series.get("as_of_date"):
+            return None
+        if as_of_date:
+            idx = _DATE_INDEX.get(symbol, {}).get(_normalize_as_of(as_of_date))
+            if idx is None:
+                return None
+        else:
+            idx = len(series["as_of_date"]) - 1
+
+        current = _point(series, idx)
+        previous = [_point(series, i) for i in range(max(0, idx - lookback_weeks), idx)]
+        weeks = len(series["as_of_date"])
+        first_date = series["as_of_date"][0]
+        report = series.get("report")
+        participant = series.get("participant")
+
+    prev = previous[-1] if previous else None
+    return {
+        "symbol": symbol,
+        "report": report,
+        "participant": participant,
+        "current": current,
+        "previous": previous,
+        "net_change": (current["net"] - prev["net"]) if prev else 0,
+        "oi_change": (current["open_interest"] - prev["open_interest"]) if prev else 0,
+        "extreme_52w": _extreme_state(current.get("net_pct_oi_percentile_52w")),
+        "extreme_156w": _extreme_state(current.get("net_pct_oi_percentile_156w")),
+        "history_weeks": weeks,
+        "history_start": first_date,
+    }
+
+
+def history_status() -> Dict[str, Any]:
+    with _LOCK:
+        store = _load_store()
+        symbols = {
+            symbol: {
+                "weeks": len(series.get("as_of_date", [])),
+                "first": (series.get("as_of_date") or [None])[0],
+                "last": (series.get("as_of_date") or [None])[-1],
+            }
+            for symbol, series in store.get("symbols", {}).items()
+        }
+        return {
+            "status": "ok",
+            "path": str(HISTORY_FILE),
+            "updated_at_utc": store.get("updated_at_utc"),
+            "ingested_archives": list(store.get("ingested_archives", [])),
+            "symbols": symbols,
+        }
+
+
+if __name__ == "__main__":
+    # python cot_history.py 2014 2015 ...   -> download + ingest yearly archives
+    # python cot_history.py path/to/file.zip -> ingest local archive files
+    import sys
+
+    args = sys.argv[1:]
+    if args and all(a.isdigit() for a in args):
+        print(json.dumps(download_archives(args), indent=2))
+    else:
+        for arg in args:
+            print(json.dumps(ingest_archive_file(Path(arg)), indent=2))
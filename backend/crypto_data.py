@@ -0,0 +1,312 @@
+"""
+crypto_data.py
+
+CoinGecko data layer shared by the backend router and the serverless entry point.
+- ttl_cache.TTLCache per data kind (stale-while-revalidate, single-flight loads);
+  upstream failures keep serving the last good payload
+- per-coin market rows are batched into one `/coins/markets?ids=a,b,c` request
+  (opt-in per lookup; `/coins/{id}` stays the default coin document)
+- every upstream call draws from the shared `coingecko` budget in rate_limiter
+  (COINGECKO_CALLS_PER_MINUTE); a 429 cools the host down for all callers
+- hit / stale / miss / coalesced counters for the status endpoint
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional
+
+import httpx
+
+try:
+    from .rate_limiter import HOST_BUDGETS, acquire_budget, limiter_status, report_success, report_throttled
+    from .ttl_cache import TTLCache
+except ImportError:  # pragma: no cover - script/local import fallback
+    from rate_limiter import HOST_BUDGETS, acquire_budget, limiter_status, report_success, report_throttled
+    from ttl_cache import TTLCache
+
+
+COINGECKO_BASE_URL = "https://api.coingecko.com/api/v3"
+COINGECKO_HOST = "coingecko"
+COINGECKO_CALLS_PER_MINUTE = int(round(HOST_BUDGETS[COINGECKO_HOST]["rate_per_sec"] * 60))
+HTTP_TIMEOUT_SECONDS = 10.0
+# Interactive callers wait at most this long for a budget token before falling back to stale data.
+BUDGET_WAIT_SECONDS = 3.0
+
+FRESH_TTL_SECONDS = {
+    "markets": 300,
+    "global": 300,
+    "trending": 300,
+    "coins": 120,
+    "coin_full": 300,
+    "charts": 300,
+    "prices": 60,
+}
+STALE_MAX_AGE_SECONDS = 3600
+CACHE_MAX_ENTRIES = {"coins": 500, "coin_full": 100, "charts": 200, "prices": 50}
+
+MARKETS_BATCH_WINDOW_SECONDS = 0.05
+# Upper bound of `/coins/markets` per_page: a whole batch fits on one page.
+MARKETS_BATCH_MAX_IDS = 250
+TOP_MARKETS_PARAMS = {
+    "vs_currency": "usd",
+    "order": "market_cap_desc",
+    "per_page": 30,
+    "page": 1,
+    "sparkline": "true",
+    "price_change_percentage": "1h,24h,7d",
+}
+# `/coins/{id}` as the backend router always served it (CoinGecko defaults, tickers included).
+COIN_DOCUMENT_PARAMS = {"localization": "false"}
+# `/coins/{id}` as the serverless entry point always served it.
+COIN_FULL_PARAMS = {
+    "localization": "false",
+    "tickers": "false",
+    "market_data": "true",
+    "community_data": "true",
+    "developer_data": "true",
+    "sparkline": "true",
+}
+
+
+class CryptoDataUnavailable(RuntimeError):
+    """Upstream failed (or the budget is spent) and nothing is cached for the key."""
+
+
+class UnknownCoin(LookupError):
+    """`/coins/markets` returned no row for the requested id."""
+
+
+_UPSTREAM_STATS: Dict[str, Any] = {"calls": 0, "errors": 0, "throttled": 0, "budget_denied": 0, "last_error": None}
+_CALL_TIMES: Deque[float] = deque(maxlen=1000)
+
+
+async def _request(path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT_SECONDS) as client:
+        response = await client.get(f"{COINGECKO_BASE_URL}{path}", params=params)
+    if response.status_code == 429:
+        _UPSTREAM_STATS["throttled"] += 1
+        report_throttled(COINGECKO_HOST, response.headers.get("Retry-After"))
+        raise CryptoDataUnavailable(f"CoinGecko throttled {path}")
+    response.raise_for_status()
+    report_success(COINGECKO_HOST)
+    return response.json()
+
+
+async def _cg_get(path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+    """One budgeted upstream call."""
+    allowed = await asyncio.to_thread(acquire_budget, COINGECKO_HOST, 1.0, None, BUDGET_WAIT_SECONDS)
+    if not allowed:
+        _UPSTREAM_STATS["budget_denied"] += 1
+        raise CryptoDataUnavailable(f"CoinGecko budget exhausted for {path}")
+    _UPSTREAM_STATS["calls"] += 1
+    _CALL_TIMES.append(time.monotonic())
+    try:
+        return await _request(path, params)
+    except Exception as exc:
+        _UPSTREAM_STATS["errors"] += 1
+        _UPSTREAM_STATS["last_error"] = f"{path}: {exc}"
+        raise
+
+
+class MarketsBatcher:
+    """Collects coin-id lookups for a short window and resolves them with one `/coins/markets` call."""
+
+    def __init__(self, window_seconds: float = MARKETS_BATCH_WINDOW_SECONDS, max_ids: int = MARKETS_BATCH_MAX_IDS):
+        self.window_seconds = float(window_seconds)
+        self.max_ids = int(max_ids)
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self.stats = {"requests": 0, "batches": 0, "ids_requested": 0}
+
+    async def get(self, coin_id: str) -> Optional[Dict[str, Any]]:
+        self.stats["requests"] += 1
+        future = self._pending.get(coin_id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[coin_id] = future
+        if len(self._pending) >= self.max_ids:
+            await self._flush()
+        elif self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._flush_later())
+        return await asyncio.shield(future)
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.window_seconds)
+        await self._flush()
+
+    async def _flush(self) -> None:
+        pending, self._pending = self._pending, {}
+        flush_task, self._flush_task = self._flush_task, None
+        if flush_task is not None and flush_task is not asyncio.current_task():
+            flush_task.cancel()
+        if not pending:
+            return
+        self.stats["batches"] += 1
+        self.stats["ids_requested"] += len(pending)
+        try:
+            rows = await _cg_get(
+                "/coins/markets",
+                {
+                    "vs_currency": "usd",
+                    "ids": ",".join(sorted(pending)),
+                    # The default page is 100 rows; ids past it would come back missing.
+                    "per_page": len(pending),
+                    "page": 1,
+                    "sparkline": "false",
+                },
+            )
+        except Exception as exc:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        by_id = {row.get("id"): row for row in rows or [] if isinstance(row, dict)}
+        for coin_id, future in pending.items():
+            if not future.done():
+                future.set_result(by_id.get(coin_id))
+
+    def status(self) -> Dict[str, Any]:
+        return {"window_seconds": self.window_seconds, "max_ids": self.max_ids, "pending": len(self._pending), **self.stats}
+
+
+def _cache(name: str) -> TTLCache:
+    return TTLCache(
+        f"crypto_{name}",
+        FRESH_TTL_SECONDS[name],
+        stale_seconds=STALE_MAX_AGE_SECONDS,
+        max_entries=CACHE_MAX_ENTRIES.get(name, 128),
+    )
+
+
+_CACHES: Dict[str, TTLCache] = {name: _cache(name) for name in FRESH_TTL_SECONDS}
+_BATCHER = MarketsBatcher()
+_STALE_FALLBACKS: Dict[str, int] = {name: 0 for name in FRESH_TTL_SECONDS}
+
+
+async def _cached(name: str, key: Any, loader: Callable[[], Awaitable[Any]]) -> Any:
+    """Cached load; when it fails, the last good payload (however old) beats an error."""
+    cache = _CACHES[name]
+    try:
+        return await cache.aget_async(key, loader)
+    except UnknownCoin:
+        raise
+    except Exception:
+        stale = cache.peek(key)
+        if stale is None:
+            raise
+        _STALE_FALLBACKS[name] = _STALE_FALLBACKS.get(name, 0) + 1
+        return stale
+
+
+def _seed_coins(rows: Iterable[Any]) -> None:
+    """Market rows already fetched (e.g. top 30) answer later per-coin lookups without a call."""
+    coins = _CACHES["coins"]
+    for row in rows or []:
+        if isinstance(row, dict) and row.get("id"):
+            coins.set(row["id"], row)
+
+
+async def get_top_markets() -> List[Dict[str, Any]]:
+    async def _load() -> List[Dict[str, Any]]:
+        rows = await _cg_get("/coins/markets", dict(TOP_MARKETS_PARAMS))
+        if not isinstance(rows, list):
+            raise CryptoDataUnavailable("unexpected /coins/markets payload")
+        _seed_coins(rows)
+        return rows
+
+    return await _cached("markets", "top30", _load)
+
+
+async def get_trending() -> Dict[str, Any]:
+    async def _load() -> Dict[str, Any]:
+        return await _cg_get("/search/trending")
+
+    return await _cached("trending", "trending", _load)
+
+
+async def get_global() -> Dict[str, Any]:
+    async def _load() -> Dict[str, Any]:
+        payload = await _cg_get("/global")
+        return (payload or {}).get("data") or {}
+
+    return await _cached("global", "global", _load)
+
+
+async def get_coin(coin_id: str) -> Optional[Dict[str, Any]]:
+    """Market summary row for one coin, batched with concurrent lookups."""
+    coin_id = str(coin_id).strip().lower()
+
+    async def _load() -> Optional[Dict[str, Any]]:
+        row = await _BATCHER.get(coin_id)
+        if row is None:
+            raise UnknownCoin(f"unknown coin {coin_id}")
+        return row
+
+    return await _cached("coins", coin_id, _load)
+
+
+async def get_coins(coin_ids: Iterable[str]) -> List[Dict[str, Any]]:
+    """Market rows for several coins; uncached ids share one upstream request. Unknown ids are skipped."""
+    ids = list(dict.fromkeys(str(c).strip().lower() for c in coin_ids if str(c).strip()))
+    rows = await asyncio.gather(*(get_coin(coin_id) for coin_id in ids), return_exceptions=True)
+    return [row for row in rows if isinstance(row, dict)]
+
+
+async def get_coin_full(coin_id: str, params: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Full `/coins/{id}` document (description, links, community data); one call per coin and params, cached."""
+    coin_id = str(coin_id).strip().lower()
+    params = dict(COIN_FULL_PARAMS if params is None else params)
+
+    async def _load() -> Dict[str, Any]:
+        return await _cg_get(f"/coins/{coin_id}", dict(params))
+
+    return await _cached("coin_full", (coin_id, tuple(sorted(params.items()))), _load)
+
+
+async def get_chart(coin_id: str, days: int = 7) -> Dict[str, Any]:
+    coin_id = str(coin_id).strip().lower()
+
+    async def _load() -> Dict[str, Any]:
+        return await _cg_get(f"/coins/{coin_id}/market_chart", {"vs_currency": "usd", "days": days})
+
+    return await _cached("charts", (coin_id, str(days)), _load)
+
+
+async def get_simple_prices(coin_ids: Iterable[str]) -> Dict[str, Any]:
+    ids = ",".join(sorted({str(c).strip().lower() for c in coin_ids if str(c).strip()}))
+
+    async def _load() -> Dict[str, Any]:
+        return await _cg_get(
+            "/simple/price",
+            {
+                "ids": ids,
+                "vs_currencies": "usd",
+                "include_24hr_change": "true",
+                "include_24hr_vol": "true",
+                "include_market_cap": "true",
+            },
+        )
+
+    return await _cached("prices", ids, _load)
+
+
+def clear_caches() -> None:
+    for cache in _CACHES.values():
+        cache.invalidate(all_keys=True)
+
+
+def crypto_cache_status() -> Dict[str, Any]:
+    now = time.monotonic()
+    return {
+        "status": "ok",
+        "calls_per_minute_budget": COINGECKO_CALLS_PER_MINUTE,
+        "calls_last_minute": sum(1 for ts in _CALL_TIMES if now - ts < 60.0),
+        "upstream": dict(_UPSTREAM_STATS),
+        "budget": limiter_status([COINGECKO_HOST])["hosts"].get(COINGECKO_HOST),
+        "batcher": _BATCHER.status(),
+        "caches": {
+            name: {**cache.status(), "stale_fallbacks": _STALE_FALLBACKS.get(name, 0)} for name, cache in _CACHES.items()
+        },
+    }
@@ -1,55 +1,92 @@
-import httpx
 from fastapi import APIRouter, HTTPException
 
+try:
+    from .crypto_data import (
+        COIN_DOCUMENT_PARAMS,
+        CryptoDataUnavailable,
+        UnknownCoin,
+        crypto_cache_status,
+        get_chart,
+        get_coin,
+        get_coin_full,
+        get_coins,
+        get_global,
+        get_top_markets,
+        get_trending,
+    )
+except ImportError:  # pragma: no cover - script/local import fallback
+    from crypto_data import (
+        COIN_DOCUMENT_PARAMS,
+        CryptoDataUnavailable,
+        UnknownCoin,
+        crypto_cache_status,
+        get_chart,
+        get_coin,
+        get_coin_full,
+        get_coins,
+        get_global,
+        get_top_markets,
+        get_trending,
+    )
+
 crypto_router = APIRouter(prefix="/market")
-COINGECKO_BASE = "https://api.coingecko.com/api/v3"
+
+
+def _unavailable(exc: Exception) -> HTTPException:
+    status = 503 if isinstance(exc, CryptoDataUnavailable) else 500
+    return HTTPException(status_code=status, detail=str(exc))
+
 
 @crypto_router.get("/top30")
 async def get_top30():
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{COINGECKO_BASE}/coins/markets",
-                params={"vs_currency": "usd", "order": "market_cap_desc", "per_page": 30, "page": 1, "sparkline": "false"}
-            )
-            return resp.json()
+        return await get_top_markets()
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise _unavailable(e)
 
 @crypto_router.get("/trending")
-async def get_trending():
+async def get_trending_coins():
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(f"{COINGECKO_BASE}/search/trending")
-            data = resp.json()
-            # Extract just the coin data to match the expected format
-            return {"coins": [item["item"] for item in data.get("coins", [])]}
+        data = await get_trending()
+        # Extract just the coin data to match the expected format
+        return {"coins": [item["item"] for item in data.get("coins", [])]}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise _unavailable(e)
+
+@crypto_router.get("/coins")
+async def get_coin_markets(ids: str):
+    """Market rows for a comma-separated id list, fetched in one batched upstream call."""
+    try:
+        return await get_coins(ids.split(","))
+    except Exception as e:
+        raise _unavailable(e)
 
 @crypto_router.get("/coin/{coin_id}")
-async def get_coin_details(coin_id: str):
+async def get_coin_details(coin_id: str, summary: bool = False):
+    """Full `/coins/{id}` document; `summary=true` returns the batched `/coins/markets` row instead."""
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(f"{COINGECKO_BASE}/coins/{coin_id}", params={"localization": "false"})
-            return resp.json()
+        if summary:
+            return await get_coin(coin_id)
+        return await get_coin_full(coin_id, COIN_DOCUMENT_PARAMS)
+    except UnknownCoin as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise _unavailable(e)
 
 @crypto_router.get("/chart/{coin_id}")
 async def get_coin_chart(coin_id: str, days: int = 7):
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(f"{COINGECKO_BASE}/coins/{coin_id}/market_chart", params={"vs_currency": "usd", "days": days})
-            return resp.json()
+        return await get_chart(coin_id, days)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise _unavailable(e)
 
 @crypto_router.get("/global")
 async def get_global_market():
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(f"{COINGECKO_BASE}/global")
-            return resp.json().get("data", {})
+        return await get_global()
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise _unavailable(e)
+
+@crypto_router.get("/crypto/cache-status")
+async def get_crypto_cache_status():
+    return crypto_cache_status()
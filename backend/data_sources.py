@@ -1,13 +1,35 @@
 import yfinance as yf
-from tradingview_ta import TA_Handler, Interval, Exchange
 import pandas as pd
 import logging
-import random
+import os
 import time
 from datetime import datetime, timedelta
 
+try:
+    from .rate_limiter import acquire_budget
+    from .technical_indicators import compute_technicals
+except ImportError:  # pragma: no cover - script/local import fallback
+    from rate_limiter import acquire_budget
+    from technical_indicators import compute_technicals
+
+try:
+    from tradingview_ta import TA_Handler, Interval
+except ImportError:  # optional: only used as a cross-check / last-resort fallback
+    TA_Handler = None
+    Interval = None
+
 logger = logging.getLogger(__name__)
 
+TA_BARS_PERIOD = "3mo"          # ~450+ hourly bars: enough for SMA/EMA 200
+TA_BARS_INTERVAL = "1h"         # same timeframe the TradingView lookup used
+TA_BARS_TTL_SECONDS = 300
+TV_CROSSCHECK_ENABLED = os.environ.get("TV_TA_CROSSCHECK", "").strip().lower() in {"1", "true", "yes"}
+
+# Module level: callers build a new MarketDataService per request.
+# ticker -> (fetched_at_monotonic, OHLC frame) and ticker -> (last bar key, technicals)
+_TA_BARS_CACHE = {}
+_TA_MEMO = {}
+
 class MarketDataService:
     def __init__(self):
         # Symbol Map: (Symbol, Screener, Exchange) for TradingView
@@ -28,7 +50,7 @@ class MarketDataService:
         }
 
     def get_latest_data(self, symbol: str) -> dict:
-        """Get hybrid data: Price from YF, Technicals from TV."""
+        """Get hybrid data: Price from YF, Technicals from the local indicator engine."""
         # 1. Fetch Price from YFinance (Fast & Reliable)
         yf_ticker = self.yf_map.get(symbol)
         price_data = self._fetch_yf_price(yf_ticker)
@@ -36,8 +58,13 @@ class MarketDataService:
         if not price_data:
             logger.warning(f"YFinance failed for {symbol}, trying TV fallback...")
         
-        # 2. Fetch Technicals from TradingView (Rich data, but rate limited)
-        tv_data = self._fetch_tv_technicals(symbol)
+        # 2. Technicals computed in-process from cached hourly bars.
+        tv_data = self._compute_local_technicals(yf_ticker)
+        if tv_data and TV_CROSSCHECK_ENABLED:
+            tv_data = {**tv_data, "tv_crosscheck": self._tv_crosscheck(symbol, tv_data)}
+        elif not tv_data:
+            # Remote TradingView only when local bars are unavailable (rate limited, slow).
+            tv_data = self._fetch_tv_technicals(symbol)
         
         # Merge Data
         if price_data and tv_data:
@@ -156,12 +183,64 @@ class MarketDataService:
         
         return None
 
+    def _fetch_ta_bars(self, ticker: str):
+        cached = _TA_BARS_CACHE.get(ticker)
+        if cached and (time.monotonic() - cached[0]) < TA_BARS_TTL_SECONDS:
+            return cached[1]
+        if not acquire_budget("yahoo"):
+            return cached[1] if cached else None
+        try:
+            hist = yf.Ticker(ticker).history(period=TA_BARS_PERIOD, interval=TA_BARS_INTERVAL)
+        except Exception as e:
+            logger.warning(f"TA bars fetch error {ticker}: {e}")
+            return cached[1] if cached else None
+        if hist is None or hist.empty:
+            return cached[1] if cached else None
+        bars = hist[["High", "Low", "Close"]].dropna()
+        _TA_BARS_CACHE[ticker] = (time.monotonic(), bars)
+        return bars
+
+    def _compute_local_technicals(self, ticker: str) -> dict:
+        if not ticker:
+            return None
+        bars = self._fetch_ta_bars(ticker)
+        if bars is None or len(bars) < 2:
+            return None
+        # Recompute only when the bar set changed; otherwise this is a dict lookup.
+        key = (len(bars), bars.index[-1], float(bars["Close"].iloc[-1]))
+        memo = _TA_MEMO.get(ticker)
+        if memo and memo[0] == key:
+            return memo[1]
+        technicals = compute_technicals(
+            bars["High"].to_numpy(), bars["Low"].to_numpy(), bars["Close"].to_numpy()
+        )
+        if not technicals:
+            return None
+        technicals["technicals_source"] = "local"
+        _TA_MEMO[ticker] = (key, technicals)
+        return technicals
+
+    def _tv_crosscheck(self, symbol: str, local: dict) -> dict:
+        remote = self._fetch_tv_technicals(symbol)
+        if not remote:
+            return {"available": False}
+        return {
+            "available": True,
+            "recommendation": remote.get("recommendation"),
+            "rsi": remote.get("rsi"),
+            "recommendation_match": remote.get("recommendation") == local.get("recommendation"),
+            "rsi_diff": round(float(local.get("rsi", 50)) - float(remote.get("rsi") or 50), 2),
+        }
+
     def _fetch_tv_technicals(self, symbol: str) -> dict:
+        if TA_Handler is None:
+            return None
         candidates = self.tv_map.get(symbol, [])
         for ticker, screener, exchange in candidates:
             try:
-                # Random sleep to mitigate 429s
-                time.sleep(random.uniform(0.5, 2.0))
+                # Shared budget instead of random sleeps to mitigate 429s
+                if not acquire_budget("tradingview"):
+                    return None
                 
                 handler = TA_Handler(
                     symbol=ticker,
@@ -179,7 +258,8 @@ class MarketDataService:
                         "stoch_k": analysis.indicators.get("Stoch.K", 50),
                         "recommendation": analysis.summary.get("RECOMMENDATION"),
                         "buy_votes": analysis.summary.get("BUY"),
-                        "sell_votes": analysis.summary.get("SELL")
+                        "sell_votes": analysis.summary.get("SELL"),
+                        "technicals_source": "tradingview"
                     }
             except Exception:
                 continue
@@ -17,6 +17,7 @@ from itertools import combinations
 from typing import Dict, List, Tuple
 
 import local_vault_matrix
+import shared_cache
 
 
 ASSET_UNIVERSE = ("NAS100", "SP500", "XAUUSD", "EURUSD")
@@ -53,7 +54,13 @@ MONTH_NAMES = [
     "Jul", "Aug", "Sep", "Oct", "Nov", "Dec",
 ]
 
-_CACHE = {"generated_at": None, "payload": None}
+# The report is rebuilt only when its data version changes (see report_data_version);
+# this is how often clients revalidate it (Cache-Control max-age on the endpoint).
+CACHE_TTL_SECONDS = 60
+# Published reports carry their data version, so any age is fine across workers.
+SHARED_CACHE_MAX_AGE_SECONDS = 24 * 3600
+SHARED_CACHE_KEY = "deep_research_report"
+_CACHE = {"version": None, "payload": None}
 
 
 def _clamp(value: float, minimum: float, maximum: float) -> float:
@@ -657,18 +664,45 @@ def _build_summary(signals: List[Dict], diversification: List[Dict], overlay: Di
     return lines
 
 
+def report_data_version() -> Tuple:
+    """
+    Everything the report is derived from: the evaluations log stamp plus the UTC day
+    (weekday/month bias and the rolling context / correlation windows move daily).
+    """
+    return (local_vault_matrix.evaluations_version(), datetime.now(timezone.utc).date().isoformat())
+
+
+def report_is_current() -> bool:
+    """True while the cached report was built from the current data version."""
+    return _CACHE.get("payload") is not None and _CACHE.get("version") == report_data_version()
+
+
 def build_deep_research_report(force_refresh: bool = False) -> Dict:
-    now = datetime.now(timezone.utc)
-    cached_at = _CACHE.get("generated_at")
-    if (
-        not force_refresh
-        and cached_at
-        and isinstance(cached_at, datetime)
-        and (now - cached_at).total_seconds() < 60
-        and _CACHE.get("payload")
-    ):
+    version = report_data_version()
+    if not force_refresh and _CACHE.get("payload") and _CACHE.get("version") == version:
         return _CACHE["payload"]
 
+    now = datetime.now(timezone.utc)
+    if force_refresh:
+        entry = shared_cache.publish(
+            SHARED_CACHE_KEY,
+            {"version": version, "payload": _compute_report(now)},
+            SHARED_CACHE_MAX_AGE_SECONDS,
+        )
+    else:
+        # Another worker may already have built (or be building) this version.
+        entry = shared_cache.compute(
+            SHARED_CACHE_KEY,
+            SHARED_CACHE_MAX_AGE_SECONDS,
+            lambda: {"version": version, "payload": _compute_report(now)},
+            accept=lambda value: value.get("version") == version,
+        )
+    _CACHE["version"] = version
+    _CACHE["payload"] = entry.value["payload"]
+    return _CACHE["payload"]
+
+
+def _compute_report(now: datetime) -> Dict:
     evaluations = local_vault_matrix.get_matrix_evaluations()
     matrix_results = local_vault_matrix.get_matrix_results()
 
@@ -689,8 +723,6 @@ def build_deep_research_report(force_refresh: bool = False) -> Dict:
                 "Deep Research 3.0 in raccolta: attendere accumulo MFE/MAE multi-timeframe.",
             ],
         }
-        _CACHE["generated_at"] = now
-        _CACHE["payload"] = payload
         return payload
 
     signals = _build_signals(matrix_results, evaluations)
@@ -720,7 +752,4 @@ def build_deep_research_report(force_refresh: bool = False) -> Dict:
         "monthly_bias": monthly_bias,
         "summary": summary,
     }
-
-    _CACHE["generated_at"] = now
-    _CACHE["payload"] = payload
     return payload
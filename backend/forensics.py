@@ -7,6 +7,7 @@ import asyncio
 import logging
 from datetime import datetime, timezone, timedelta
 import local_vault
+from rate_limiter import acquire_budget
 
 logger = logging.getLogger("forensics")
 
@@ -77,6 +78,9 @@ async def fetch_historical_candles_for_evaluation():
             start_date = pred_time.strftime('%Y-%m-%d')
             end_date = (pred_time + timedelta(days=2)).strftime('%Y-%m-%d')
 
+            if not await asyncio.to_thread(acquire_budget, "yahoo"):
+                logger.warning(f"Yahoo budget exhausted, deferring {asset} evaluation")
+                continue
             df = await asyncio.to_thread(
                 yf.download,
                 tickers=yf_ticker,
@@ -150,6 +154,8 @@ async def save_current_predictions():
 
         for asset, ticker in TICKER_MAP.items():
             try:
+                if not await asyncio.to_thread(acquire_budget, "yahoo"):
+                    continue
                 data = await asyncio.to_thread(
                     yf.download, tickers=ticker, period="1d", interval="5m", progress=False
                 )
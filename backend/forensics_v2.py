@@ -11,6 +11,7 @@ from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Optional
 import pandas as pd
 import local_vault_matrix
+from rate_limiter import acquire_budget
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("Matrix_Daemon")
@@ -245,6 +246,9 @@ def _run_matrix_evaluations_sync():
 
         logger.info("Downloading YF data for %s from %s to %s (%s snapshots)", asset, start_str, end_str, len(items))
 
+        if not acquire_budget("yahoo"):
+            logger.warning("Yahoo budget exhausted, deferring %s evaluations", asset)
+            continue
         try:
             df = yf.download(
                 tickers=ticker,
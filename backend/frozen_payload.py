@@ -0,0 +1,170 @@
+"""
+frozen_payload.py
+
+Immutable, pre-serialized payloads for caches shared across requests.
+- `freeze` turns nested dicts/lists into read-only FrozenDict / tuple once, so a
+  cached payload can be handed to every caller without a defensive deepcopy
+- FrozenPayload keeps the JSON bytes next to the frozen structure; per-request
+  metadata (e.g. cache age) is appended as a small tail chunk, and the cached bytes
+  are streamed through a memoryview, so a hit costs the same for 10 KB or 10 MB
+- a strong ETag hashed once from the cached bytes, for conditional GETs
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, Iterable, Mapping, Optional, Tuple, Union
+
+import numpy as np
+from starlette.responses import StreamingResponse
+
+
+class FrozenDict(dict):
+    """Read-only dict. Still a dict, so json / FastAPI / isinstance checks keep working."""
+
+    __slots__ = ()
+
+    def _readonly(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("frozen payload is read-only; use thaw() for a mutable copy")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __copy__(self) -> "FrozenDict":
+        return self
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> Dict[str, Any]:
+        return thaw(self)
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def freeze(value: Any) -> Any:
+    if isinstance(value, FrozenDict):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Mutable deep copy of a frozen structure (dicts and lists again)."""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+    return value
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _finite(value: Any) -> Any:
+    """NaN/inf -> None, matching what the JSON response layer accepts."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+
+def dumps(value: Any) -> bytes:
+    try:
+        text = json.dumps(value, default=_json_default, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+    except ValueError:
+        text = json.dumps(_finite(value), default=_json_default, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+    return text.encode("utf-8")
+
+
+class FrozenPayload:
+    """
+    A payload frozen and encoded once. `exclude` keys (per-request metadata) are kept
+    out of both forms and supplied per call to `view()` / `json()`.
+    Non-dict payloads (e.g. a list of cards) are frozen as-is and take no extras.
+    """
+
+    __slots__ = ("_data", "body", "_head", "_etag")
+
+    def __init__(self, payload: Any, exclude: Iterable[str] = ()):
+        if isinstance(payload, dict):
+            skipped = set(exclude)
+            payload = {key: value for key, value in payload.items() if key not in skipped}
+        self._data = freeze(payload)
+        self.body = dumps(self._data)
+        self._head = memoryview(self.body)[:-1]  # everything but the closing brace
+        self._etag: Optional[str] = None
+
+    @property
+    def data(self) -> Any:
+        if self._data is None:
+            # Unpickled in another worker: decoded from the bytes on first structured use.
+            self._data = freeze(json.loads(self.body))
+        return self._data
+
+    @property
+    def etag(self) -> str:
+        """Strong validator for the cached bytes (per-request extras are not part of it)."""
+        if self._etag is None:
+            self._etag = '"' + hashlib.blake2b(self.body, digest_size=16).hexdigest() + '"'
+        return self._etag
+
+    def view(self, **extra: Any) -> Dict[str, Any]:
+        """Top-level dict sharing every nested (frozen) value with the cache."""
+        if not extra:
+            return self.data
+        view = dict(self.data)
+        view.update(extra)
+        return view
+
+    def json_chunks(self, **extra: Any) -> Tuple[Union[bytes, memoryview], ...]:
+        """Encoded payload with `extra` keys appended, as chunks that share the cached bytes."""
+        if not extra:
+            return (self.body,)
+        members = b",".join(dumps(key) + b":" + dumps(value) for key, value in extra.items())
+        separator = b"" if len(self.body) == 2 else b","
+        return (self._head, separator + members + b"}")
+
+    def json(self, **extra: Any) -> bytes:
+        return b"".join(self.json_chunks(**extra))
+
+    def __len__(self) -> int:
+        return len(self.body)
+
+    # Pickled as the encoded bytes only: another worker can serve them as-is and
+    # decodes the structure lazily, which is far cheaper than pickling nested dicts.
+    def __getstate__(self) -> Tuple[bytes, Optional[str]]:
+        return (self.body, self._etag)
+
+    def __setstate__(self, state: Tuple[bytes, Optional[str]]) -> None:
+        self.body, self._etag = state
+        self._data = None
+        self._head = memoryview(self.body)[:-1]
+
+
+def chunked_json_response(
+    chunks: Tuple[Union[bytes, memoryview], ...],
+    headers: Optional[Mapping[str, str]] = None,
+) -> StreamingResponse:
+    async def _body() -> AsyncIterator[Union[bytes, memoryview]]:
+        for chunk in chunks:
+            yield chunk
+
+    return StreamingResponse(
+        _body(),
+        media_type="application/json",
+        headers={**(headers or {}), "Content-Length": str(sum(len(chunk) for chunk in chunks))},
+    )
@@ -0,0 +1,171 @@
+"""
+gamma_exposure.py
+
+Vectorized Black-Scholes greeks and dealer gamma profile for one option chain.
+- gamma / delta / vanna for every contract in one numpy pass (no per-row loop)
+- strike-level call / put / net GEX profile (dollar gamma per 1% move)
+- zero-gamma level: spot where total net GEX changes sign (chain re-priced on a spot grid)
+- call wall / put wall: strikes carrying the largest call / put gamma
+"""
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+
+CONTRACT_MULTIPLIER = 100.0
+DEFAULT_IV = 0.25
+ZERO_GAMMA_GRID_PCT = 0.20   # sweep spot +/- 20%
+ZERO_GAMMA_GRID_STEPS = 81
+
+_SQRT_2PI = math.sqrt(2.0 * math.pi)
+
+
+def norm_pdf(x: np.ndarray) -> np.ndarray:
+    return np.exp(-0.5 * x * x) / _SQRT_2PI
+
+
+def norm_cdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal CDF (Abramowitz-Stegun 7.1.26 erf, |err| < 1.5e-7)."""
+    z = np.abs(x) / math.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - poly * np.exp(-z * z)
+    return 0.5 * (1.0 + np.sign(x) * erf)
+
+
+def bs_greeks(
+    spot: Any,
+    strike: Sequence[float],
+    years_to_expiry: Any,
+    iv: Sequence[float],
+    is_call: Sequence[bool],
+) -> Dict[str, np.ndarray]:
+    """
+    Zero-rate Black-Scholes gamma, delta and vanna (dDelta/dVol) per contract.
+    `spot` may be a scalar or an array broadcastable against the chain (e.g. a spot grid column).
+    Contracts with non-positive strike / expiry / IV get zero greeks.
+    """
+    strike = np.asarray(strike, dtype=float)
+    iv = np.asarray(iv, dtype=float)
+    years = np.asarray(years_to_expiry, dtype=float)
+    spot = np.asarray(spot, dtype=float)
+    valid = (strike > 0) & (iv > 0) & (years > 0) & (spot > 0)
+    safe_strike = np.where(valid, strike, 1.0)
+    safe_iv = np.where(valid, iv, 1.0)
+    safe_years = np.where(valid, years, 1.0)
+    safe_spot = np.where(valid, spot, 1.0)
+
+    denom = safe_iv * np.sqrt(safe_years)
+    d1 = (np.log(safe_spot / safe_strike) + (0.5 * safe_iv * safe_iv * safe_years)) / denom
+    d2 = d1 - denom
+    pdf = norm_pdf(d1)
+    gamma = np.where(valid, pdf / (safe_spot * denom), 0.0)
+    call_delta = norm_cdf(d1)
+    delta = np.where(valid, np.where(np.asarray(is_call, dtype=bool), call_delta, call_delta - 1.0), 0.0)
+    vanna = np.where(valid, -pdf * d2 / safe_iv, 0.0)
+    return {"gamma": gamma, "delta": delta, "vanna": vanna}
+
+
+def signed_gex(spot: Any, gamma: np.ndarray, oi: np.ndarray, is_call: np.ndarray) -> np.ndarray:
+    """Dealer dollar gamma per 1% move: calls positive, puts negative."""
+    spot = np.asarray(spot, dtype=float)
+    sign = np.where(is_call, 1.0, -1.0)
+    return sign * gamma * oi * CONTRACT_MULTIPLIER * spot * spot * 0.01
+
+
+def strike_profile(strike: np.ndarray, gex: np.ndarray, is_call: np.ndarray) -> Dict[str, np.ndarray]:
+    strikes, inverse = np.unique(strike, return_inverse=True)
+    call = np.bincount(inverse, weights=np.where(is_call, gex, 0.0), minlength=strikes.size)
+    put = np.bincount(inverse, weights=np.where(is_call, 0.0, gex), minlength=strikes.size)
+    return {"strike": strikes, "call": call, "put": put, "net": call + put}
+
+
+def profile_flip(strikes: np.ndarray, net: np.ndarray) -> Optional[float]:
+    """First zero / sign change of the strike profile (linear interpolation between strikes)."""
+    if not strikes.size:
+        return None
+    zero = np.flatnonzero(net[:-1] == 0)
+    cross = np.flatnonzero(np.sign(net[:-1]) * np.sign(net[1:]) < 0)
+    hits = np.concatenate([zero, cross])
+    if not hits.size:
+        return float(strikes[int(np.argmin(np.abs(net)))])
+    idx = int(hits.min())
+    if net[idx] == 0:
+        return float(strikes[idx])
+    current, nxt = abs(float(net[idx])), abs(float(net[idx + 1]))
+    w = current / max(current + nxt, 1e-9)
+    return float(strikes[idx] + ((strikes[idx + 1] - strikes[idx]) * w))
+
+
+def zero_gamma_level(
+    spot: float,
+    strike: np.ndarray,
+    years_to_expiry: float,
+    iv: np.ndarray,
+    oi: np.ndarray,
+    is_call: np.ndarray,
+    grid_pct: float = ZERO_GAMMA_GRID_PCT,
+    steps: int = ZERO_GAMMA_GRID_STEPS,
+) -> Optional[float]:
+    """Spot level where total net GEX crosses zero, nearest to the current spot; None if no crossing."""
+    if spot <= 0 or not strike.size:
+        return None
+    grid = np.linspace(spot * (1.0 - grid_pct), spot * (1.0 + grid_pct), steps)
+    gamma = bs_greeks(grid[:, None], strike[None, :], years_to_expiry, iv[None, :], is_call[None, :])["gamma"]
+    totals = signed_gex(grid[:, None], gamma, oi[None, :], is_call[None, :]).sum(axis=1)
+    cross = np.flatnonzero(np.sign(totals[:-1]) * np.sign(totals[1:]) <= 0)
+    cross = cross[(totals[cross] != 0) | (totals[cross + 1] != 0)]
+    if not cross.size:
+        return None
+    lefts, rights = totals[cross], totals[cross + 1]
+    levels = grid[cross] + (grid[cross + 1] - grid[cross]) * (np.abs(lefts) / np.maximum(np.abs(lefts) + np.abs(rights), 1e-12))
+    return float(levels[int(np.argmin(np.abs(levels - spot)))])
+
+
+def compute_gamma_profile(
+    spot: float,
+    strike: Sequence[float],
+    is_call: Sequence[bool],
+    oi: Sequence[float],
+    iv: Sequence[float],
+    years_to_expiry: float,
+    default_iv: float = DEFAULT_IV,
+) -> Dict[str, Any]:
+    """
+    Full-chain greeks + GEX aggregation for one expiry.
+    Missing/zero IV falls back to `default_iv`; missing OI counts as zero.
+    """
+    strike = np.asarray(strike, dtype=float)
+    is_call = np.asarray(is_call, dtype=bool)
+    oi = np.nan_to_num(np.maximum(np.asarray(oi, dtype=float), 0.0))
+    iv = np.asarray(iv, dtype=float)
+    iv = np.where(np.isfinite(iv) & (iv > 0), iv, default_iv)
+    keep = strike > 0
+    strike, is_call, oi, iv = strike[keep], is_call[keep], oi[keep], iv[keep]
+
+    greeks = bs_greeks(spot, strike, years_to_expiry, iv, is_call)
+    gex = signed_gex(spot, greeks["gamma"], oi, is_call)
+    profile = strike_profile(strike, gex, is_call)
+    sign = np.where(is_call, 1.0, -1.0)
+
+    call_wall = put_wall = None
+    if profile["strike"].size:
+        if np.any(profile["call"] > 0):
+            call_wall = float(profile["strike"][int(np.argmax(profile["call"]))])
+        if np.any(profile["put"] < 0):
+            put_wall = float(profile["strike"][int(np.argmin(profile["put"]))])
+
+    return {
+        "profile": profile,
+        "call_wall": call_wall,
+        "put_wall": put_wall,
+        "zero_gamma": zero_gamma_level(spot, strike, years_to_expiry, iv, oi, is_call),
+        "net_gex": float(gex.sum()),
+        # Dealer-side aggregates with the same sign convention as GEX (long calls / short puts).
+        "net_delta_shares": float((sign * greeks["delta"] * oi * CONTRACT_MULTIPLIER).sum()),
+        "net_vanna": float((sign * greeks["vanna"] * oi * CONTRACT_MULTIPLIER * spot * 0.01).sum()),
+        "contracts": int(strike.size),
+    }
@@ -0,0 +1,319 @@
+"""
+history_series.py
+
+Array-backed daily history series for the positioning engines.
+- timestamps | close | volume as float64 `array('d')` columns: 8 bytes per value
+  instead of a list slot plus a float object (~4x smaller), zero-copy numpy views
+- read-only Mapping over the column names, so `series.get("close")` and
+  `series["timestamps"]` call sites (and history_store) keep working
+- memoized benchmark alignment, keyed by the benchmark series' identity, and paired
+  returns memoized on each alignment: built once per history load, however many
+  engines ask
+- columns are not meant to be mutated once built (the caches assume it)
+- `ReturnPanel`: date x ticker daily returns on the benchmark's calendar with a
+  validity mask, and correlation / covariance / beta matrices per lookback from one
+  matrix product each
+"""
+from __future__ import annotations
+
+import weakref
+from array import array
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from . import series_stats
+except ImportError:  # pragma: no cover - script/local import fallback
+    import series_stats
+
+
+FIELDS = ("timestamps", "close", "volume")
+
+
+def _to_float(value: Any, default: float = 0.0) -> float:
+    try:
+        if value is None:
+            return float(default)
+        return float(value)
+    except Exception:
+        return float(default)
+
+
+def _column(values: Any) -> array:
+    if isinstance(values, array) and values.typecode == "d":
+        return array("d", values)
+    try:
+        return array("d", values)
+    except TypeError:
+        # None / numeric strings: the per-element `_safe_float` rule (unparseable -> 0.0).
+        return array("d", (_to_float(value) for value in values))
+
+
+def _frozen(arr: np.ndarray) -> np.ndarray:
+    arr.flags.writeable = False
+    return arr
+
+
+def _epoch_ints(timestamps: np.ndarray) -> np.ndarray:
+    """int(float(t)) per element; non-finite stamps count as 0, as `_safe_int` does."""
+    return np.where(np.isfinite(timestamps), timestamps, 0.0).astype(np.int64)
+
+
+class Alignment:
+    """
+    Rows of a symbol series that have a benchmark close at or before their timestamp:
+    epoch seconds, symbol close, latest benchmark close and symbol volume.
+    """
+
+    __slots__ = ("timestamps", "close", "bench_close", "volume", "_returns")
+
+    def __init__(self, timestamps: np.ndarray, close: np.ndarray, bench_close: np.ndarray, volume: np.ndarray):
+        self.timestamps = _frozen(timestamps)
+        self.close = _frozen(close)
+        self.bench_close = _frozen(bench_close)
+        self.volume = _frozen(volume)
+        self._returns: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return int(self.close.size)
+
+    def tail(self, periods: int) -> "Alignment":
+        if len(self) <= periods:
+            return self
+        return Alignment(
+            self.timestamps[-periods:],
+            self.close[-periods:],
+            self.bench_close[-periods:],
+            self.volume[-periods:],
+        )
+
+    def rows(self) -> List[Tuple[int, float, float, float]]:
+        return list(zip(self.timestamps.tolist(), self.close.tolist(), self.bench_close.tolist(), self.volume.tolist()))
+
+    def paired_returns(self, periods: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Same-day symbol / benchmark returns over the last `periods` rows, with the row of
+        each return day in that slice (`series_stats.paired_return_rows`). Memoized.
+        """
+        cached = self._returns.get(periods)
+        if cached is not None:
+            return cached
+        window = self.tail(periods)
+        if len(window) < 2:
+            out = (np.empty(0), np.empty(0), np.empty(0, dtype=np.int64))
+        else:
+            out = series_stats.paired_return_rows(window.close, window.bench_close)
+        out = tuple(_frozen(arr) for arr in out)
+        self._returns[periods] = out
+        return out
+
+
+def _align_sorted(ts_s: np.ndarray, ts_b: np.ndarray) -> np.ndarray:
+    return np.searchsorted(ts_b, ts_s, side="right") - 1
+
+
+def _align_walk(ts_s: np.ndarray, ts_b: np.ndarray) -> np.ndarray:
+    # Unsorted input: keep the original merge walk, whose benchmark cursor never moves back.
+    out = np.empty(ts_s.size, dtype=np.int64)
+    bench = ts_b.tolist()
+    bi = 0
+    for idx, ts in enumerate(ts_s.tolist()):
+        while bi < len(bench) and bench[bi] <= ts:
+            bi += 1
+        out[idx] = bi - 1
+    return out
+
+
+def align(symbol: Mapping, benchmark: Mapping) -> Alignment:
+    """Alignment of `symbol` on `benchmark`; memoized when both are HistorySeries."""
+    series = HistorySeries.of(symbol)
+    if isinstance(benchmark, HistorySeries) and series is symbol:
+        return series.aligned_to(benchmark)
+    return _build_alignment(series, HistorySeries.of(benchmark))
+
+
+def _build_alignment(series: "HistorySeries", benchmark: "HistorySeries") -> Alignment:
+    ts_s = _epoch_ints(series.column("timestamps"))
+    ts_b = _epoch_ints(benchmark.column("timestamps"))
+    if (np.diff(ts_s) >= 0).all() and (np.diff(ts_b) >= 0).all():
+        last_bench = _align_sorted(ts_s, ts_b)
+    else:
+        last_bench = _align_walk(ts_s, ts_b)
+    keep = last_bench >= 0
+    return Alignment(
+        ts_s[keep],
+        series.column("close")[keep],
+        benchmark.column("close")[last_bench[keep]],
+        series.column("volume")[keep],
+    )
+
+
+class HistorySeries(Mapping):
+    """Daily history of one ticker; columns share the row count of the shortest input column."""
+
+    __slots__ = ("timestamps", "close", "volume", "_alignments", "__weakref__")
+
+    def __init__(self, timestamps: Any = (), close: Any = (), volume: Any = ()):
+        columns = [_column(values) for values in (timestamps, close, volume)]
+        rows = min(len(col) for col in columns)
+        for col in columns:
+            del col[rows:]
+        self.timestamps, self.close, self.volume = columns
+        self._alignments: Dict[int, Tuple[weakref.ref, Alignment]] = {}
+
+    @classmethod
+    def of(cls, series: Optional[Mapping]) -> "HistorySeries":
+        """`series` itself when it already is one, else a converted copy."""
+        if isinstance(series, cls):
+            return series
+        series = series or {}
+        return cls(*(series.get(name) or () for name in FIELDS))
+
+    def __getitem__(self, name: str) -> array:
+        if name not in FIELDS:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def __repr__(self) -> str:
+        return f"HistorySeries(rows={len(self.close)})"
+
+    def __reduce__(self):
+        # Columns only: alignments are per-process caches keyed by object identity.
+        return (HistorySeries, (self.timestamps, self.close, self.volume))
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only float64 view of a column (no copy)."""
+        return _frozen(np.frombuffer(self[name], dtype=np.float64))
+
+    def aligned_to(self, benchmark: "HistorySeries") -> Alignment:
+        key = id(benchmark)
+        cached = self._alignments.get(key)
+        # The weak reference guards against a recycled id() after the benchmark is gone.
+        if cached is not None and cached[0]() is benchmark:
+            return cached[1]
+        alignment = _build_alignment(self, benchmark)
+        self._alignments[key] = (weakref.ref(benchmark), alignment)
+        return alignment
+
+
+class PanelStats:
+    """
+    Pairwise moments of the panel over one lookback, each pair on the rows where both
+    tickers have a return (pairwise-complete). Matrices are ticker x ticker:
+    `count` common rows, `cov` sample covariance, `corr` (0.0 below 3 rows or for a
+    flat series, as `pearson_corr`), `beta[i, j]` slope of ticker i on ticker j.
+    """
+
+    __slots__ = ("count", "cov", "corr", "beta")
+
+    def __init__(self, returns: np.ndarray, valid: np.ndarray):
+        mask = valid.astype(np.float64)
+        x = np.where(valid, returns, 0.0)
+        count = mask.T @ mask
+        sums = x.T @ mask  # sums[i, j]: sum of x_i over rows where j is valid too
+        squares = (x * x).T @ mask
+        products = x.T @ x
+        safe = np.maximum(count, 1.0)
+        # Deviation sums over the common rows of each pair.
+        sxy = products - sums * sums.T / safe
+        sxx = np.maximum(squares - sums * sums / safe, 0.0)
+        flat = (count < 3) | (sxx <= 1e-12) | (sxx.T <= 1e-12)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = np.clip(sxy / np.sqrt(sxx * sxx.T), -1.0, 1.0)
+            beta = sxy / sxx.T
+        corr[flat] = 0.0
+        beta[flat] = 0.0
+        self.count = count.astype(np.int64)
+        self.cov = np.where(count >= 2, sxy / np.maximum(count - 1.0, 1.0), 0.0)
+        self.corr = corr
+        self.beta = beta
+        for arr in (self.count, self.cov, self.corr, self.beta):
+            _frozen(arr)
+
+
+class ReturnPanel:
+    """
+    Daily close-to-close returns of many tickers on one calendar (the benchmark's
+    trading days), built once per history load.
+    - tickers are matched to calendar rows by UTC day (the day's last close); nothing is
+      carried forward, so `valid[r, k]` is False unless the ticker has a bar on both
+      row r and row r - 1 and both closes are positive
+    - a `periods` lookback covers the last `periods` calendar rows (returns whose
+      previous row is inside the window too), as the per-pair helpers slice rows
+    """
+
+    __slots__ = ("tickers", "timestamps", "returns", "valid", "_index", "_stats")
+
+    def __init__(self, tickers: List[str], timestamps: np.ndarray, returns: np.ndarray, valid: np.ndarray):
+        self.tickers = list(tickers)
+        self.timestamps = _frozen(timestamps)
+        self.returns = _frozen(returns)
+        self.valid = _frozen(valid)
+        self._index = {ticker: idx for idx, ticker in enumerate(self.tickers)}
+        self._stats: Dict[int, PanelStats] = {}
+
+    @classmethod
+    def build(cls, history_map: Mapping, calendar_ticker: str) -> "ReturnPanel":
+        calendar = HistorySeries.of(history_map.get(calendar_ticker))
+        cal_ts = _epoch_ints(calendar.column("timestamps"))
+        cal_days = cal_ts // 86400
+        tickers = sorted(history_map)
+        closes = np.full((cal_ts.size, len(tickers)), np.nan)
+        for k, ticker in enumerate(tickers):
+            series = HistorySeries.of(history_map[ticker])
+            days = _epoch_ints(series.column("timestamps")) // 86400
+            close = series.column("close")
+            if days.size and not (np.diff(days) >= 0).all():
+                order = np.argsort(days, kind="stable")
+                days, close = days[order], close[order]
+            pos = np.searchsorted(days, cal_days, side="right") - 1
+            has = pos >= 0
+            has[has] = days[pos[has]] == cal_days[has]
+            closes[has, k] = close[pos[has]]
+        prev, curr = closes[:-1], closes[1:]
+        with np.errstate(invalid="ignore"):
+            ok = (prev > 0.0) & (curr > 0.0) & np.isfinite(prev) & np.isfinite(curr)
+        returns = np.zeros(closes.shape)
+        valid = np.zeros(closes.shape, dtype=bool)
+        returns[1:][ok] = curr[ok] / prev[ok] - 1.0
+        valid[1:] = ok
+        return cls(tickers, cal_ts, returns, valid)
+
+    def __reduce__(self):
+        return (ReturnPanel, (self.tickers, self.timestamps, self.returns, self.valid))
+
+    def __len__(self) -> int:
+        return int(self.timestamps.size)
+
+    def __contains__(self, ticker: object) -> bool:
+        return ticker in self._index
+
+    def index(self, ticker: str) -> int:
+        return self._index[ticker]
+
+    def _window_start(self, periods: int) -> int:
+        return max(0, len(self) - int(periods) + 1)
+
+    def stats(self, periods: int) -> PanelStats:
+        """Pairwise moments over the last `periods` rows. Memoized."""
+        cached = self._stats.get(periods)
+        if cached is None:
+            start = self._window_start(periods)
+            cached = self._stats[periods] = PanelStats(self.returns[start:], self.valid[start:])
+        return cached
+
+    def pair_returns(self, a: str, b: str, periods: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns of `a` and `b` on their common valid rows of the lookback, with those rows."""
+        start = self._window_start(periods)
+        ia, ib = self._index[a], self._index[b]
+        both = self.valid[start:, ia] & self.valid[start:, ib]
+        rows = np.flatnonzero(both)
+        return self.returns[start:, ia][both], self.returns[start:, ib][both], rows
@@ -0,0 +1,146 @@
+"""
+history_store.py
+
+Compact on-disk daily history store, one binary file per ticker.
+- columnar float64 blocks: timestamps | close | volume (array('d'), no dataframe dependency)
+- small JSON header with source + refresh metadata
+- atomic writes (tmp file + replace), safe across threads
+"""
+from __future__ import annotations
+
+import json
+import re
+import struct
+import threading
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+BASE_DIR = Path(__file__).parent
+HISTORY_DIR = BASE_DIR / "data_history"
+try:
+    HISTORY_DIR.mkdir(exist_ok=True)
+except Exception:
+    # Serverless runtime can be read-only; file persistence becomes best-effort.
+    pass
+
+_MAGIC = b"KHS1"
+_HEADER = struct.Struct("<4sII")  # magic, rows, meta_len
+_LOCK = threading.Lock()
+
+
+def _now_utc_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _path_for(symbol: str) -> Path:
+    safe = re.sub(r"[^A-Za-z0-9.-]+", "_", str(symbol or "").strip().upper()) or "UNKNOWN"
+    return HISTORY_DIR / f"{safe}.bin"
+
+
+def load_series(symbol: str) -> Optional[Tuple[Dict[str, List[float]], Dict[str, Any]]]:
+    """Return (series, meta) for a stored ticker, or None when missing/corrupted."""
+    path = _path_for(symbol)
+    if not path.exists():
+        return None
+    try:
+        with path.open("rb") as fh:
+            magic, rows, meta_len = _HEADER.unpack(fh.read(_HEADER.size))
+            if magic != _MAGIC:
+                return None
+            meta = json.loads(fh.read(meta_len).decode("utf-8")) if meta_len else {}
+            columns = []
+            for _ in range(3):
+                col = array("d")
+                col.fromfile(fh, rows)
+                columns.append(col)
+    except Exception:
+        return None
+    series = {
+        "timestamps": columns[0].tolist(),
+        "close": columns[1].tolist(),
+        "volume": columns[2].tolist(),
+    }
+    return series, meta
+
+
+def save_series(symbol: str, series: Dict[str, List[float]], meta: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    timestamps = array("d", (float(v) for v in series.get("timestamps", [])))
+    close = array("d", (float(v) for v in series.get("close", [])))
+    volume = array("d", (float(v) for v in series.get("volume", [])))
+    rows = min(len(timestamps), len(close), len(volume))
+    del timestamps[rows:], close[rows:], volume[rows:]
+
+    out_meta = dict(meta or {})
+    out_meta.update(
+        {
+            "symbol": str(symbol),
+            "rows": rows,
+            "first_ts": timestamps[0] if rows else None,
+            "last_ts": timestamps[-1] if rows else None,
+            "saved_at_utc": _now_utc_iso(),
+        }
+    )
+    meta_blob = json.dumps(out_meta, ensure_ascii=True, separators=(",", ":")).encode("utf-8")
+
+    path = _path_for(symbol)
+    tmp_path = path.with_suffix(".tmp")
+    with _LOCK:
+        try:
+            path.parent.mkdir(exist_ok=True)
+            with tmp_path.open("wb") as fh:
+                fh.write(_HEADER.pack(_MAGIC, rows, len(meta_blob)))
+                fh.write(meta_blob)
+                timestamps.tofile(fh)
+                close.tofile(fh)
+                volume.tofile(fh)
+            tmp_path.replace(path)
+        except Exception:
+            tmp_path.unlink(missing_ok=True)
+    return out_meta
+
+
+def splice_tail(
+    stored: Dict[str, List[float]],
+    fresh: Dict[str, List[float]],
+    from_ts: float,
+) -> Dict[str, List[float]]:
+    """Keep stored bars strictly before `from_ts` and replace the rest with `fresh` bars."""
+    stored_ts = stored.get("timestamps", [])
+    cut = len(stored_ts)
+    while cut > 0 and float(stored_ts[cut - 1]) >= float(from_ts):
+        cut -= 1
+    fresh_rows = [
+        (float(t), float(c), float(v))
+        for t, c, v in zip(fresh.get("timestamps", []), fresh.get("close", []), fresh.get("volume", []))
+        if float(t) >= float(from_ts)
+    ]
+    fresh_rows.sort(key=lambda r: r[0])
+    return {
+        "timestamps": list(stored_ts[:cut]) + [r[0] for r in fresh_rows],
+        "close": list(stored.get("close", [])[:cut]) + [r[1] for r in fresh_rows],
+        "volume": list(stored.get("volume", [])[:cut]) + [r[2] for r in fresh_rows],
+    }
+
+
+def store_status() -> Dict[str, Any]:
+    tickers: Dict[str, Any] = {}
+    if HISTORY_DIR.exists():
+        for path in sorted(HISTORY_DIR.glob("*.bin")):
+            try:
+                with path.open("rb") as fh:
+                    magic, rows, meta_len = _HEADER.unpack(fh.read(_HEADER.size))
+                    meta = json.loads(fh.read(meta_len).decode("utf-8")) if magic == _MAGIC and meta_len else {}
+            except Exception:
+                continue
+            tickers[str(meta.get("symbol") or path.stem)] = {
+                "rows": rows,
+                "source": meta.get("source"),
+                "last_ts": meta.get("last_ts"),
+                "refreshed_at_utc": meta.get("refreshed_at_utc"),
+                "full_reload_at_utc": meta.get("full_reload_at_utc"),
+                "bytes": path.stat().st_size,
+            }
+    return {"status": "ok", "path": str(HISTORY_DIR), "tickers": tickers}
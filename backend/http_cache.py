@@ -0,0 +1,133 @@
+"""
+http_cache.py
+
+Conditional GET support for heavy JSON endpoints.
+- ETagCache keeps the last encoded payload of an endpoint next to the version token
+  it was built from (a file stamp, a `generated_at`, ...); while the version holds,
+  polls reuse the encoded bytes and their ETag instead of rebuilding / re-serializing
+- `respond()` answers a matching `If-None-Match` with an empty 304, otherwise streams
+  the cached bytes; both carry `ETag` and `Cache-Control: private, max-age=<TTL>`
+  (a weak `W/` ETag when per-request keys are merged into the cached body)
+- per-endpoint counters (encodes, reuses, 304s) for /system/status
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    from .frozen_payload import FrozenPayload, chunked_json_response
+except ImportError:  # pragma: no cover - script/local import fallback
+    from frozen_payload import FrozenPayload, chunked_json_response
+
+
+_REGISTRY: Dict[str, "ETagCache"] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses the weak comparison: `W/` prefixes are ignored, `*` matches anything."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def cache_headers(etag: str, max_age_seconds: float) -> Dict[str, str]:
+    return {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={max(0, int(max_age_seconds))}",
+    }
+
+
+class ETagCache:
+    """
+    Single-slot encoded payload for one endpoint.
+    `reuse_seconds` bounds how long an entry may be reused for a constant version
+    (endpoints without a natural version token); None means "until the version changes".
+    """
+
+    def __init__(self, name: str, max_age_seconds: float, reuse_seconds: Optional[float] = None):
+        self.name = name
+        self.max_age_seconds = float(max_age_seconds)
+        self.reuse_seconds = reuse_seconds
+        self._entry: Optional[tuple] = None  # (version, stored_at, frozen)
+        self._lock = threading.Lock()
+        self.stats = {"encodes": 0, "reuses": 0, "not_modified": 0}
+        with _REGISTRY_LOCK:
+            _REGISTRY[name] = self
+
+    def get(self, version: Hashable) -> Optional[FrozenPayload]:
+        with self._lock:
+            entry = self._entry
+            if entry is None or entry[0] != version:
+                return None
+            if self.reuse_seconds is not None and time.monotonic() - entry[1] >= self.reuse_seconds:
+                return None
+            self.stats["reuses"] += 1
+            return entry[2]
+
+    def put(self, version: Hashable, payload: Any) -> FrozenPayload:
+        frozen = payload if isinstance(payload, FrozenPayload) else FrozenPayload(payload)
+        with self._lock:
+            self._entry = (version, time.monotonic(), frozen)
+            self.stats["encodes"] += 1
+        return frozen
+
+    def age(self) -> Optional[float]:
+        """Seconds since the current entry was stored (None when empty)."""
+        with self._lock:
+            entry = self._entry
+        return time.monotonic() - entry[1] if entry else None
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entry = None
+
+    def respond(
+        self,
+        request: Request,
+        frozen: FrozenPayload,
+        max_age_seconds: Optional[float] = None,
+        **extra: Any,
+    ) -> Response:
+        """
+        304 when the client already holds these bytes, else the cached body (+ `extra` keys).
+        The ETag only covers the cached body, so it is sent weak when per-hit `extra` keys
+        change the bytes on the wire.
+        """
+        etag = f"W/{frozen.etag}" if extra else frozen.etag
+        headers = cache_headers(etag, self.max_age_seconds if max_age_seconds is None else max_age_seconds)
+        if etag_matches(request.headers.get("if-none-match"), frozen.etag):
+            with self._lock:
+                self.stats["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+        return chunked_json_response(frozen.json_chunks(**extra), headers=headers)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            entry = self._entry
+            return {
+                "max_age_seconds": self.max_age_seconds,
+                "etag": entry[2].etag if entry else None,
+                "bytes": len(entry[2]) if entry else 0,
+                "age_seconds": round(time.monotonic() - entry[1], 1) if entry else None,
+                **self.stats,
+            }
+
+
+def http_cache_status() -> Dict[str, Any]:
+    with _REGISTRY_LOCK:
+        caches = dict(_REGISTRY)
+    return {"status": "ok", "endpoints": {name: cache.status() for name, cache in sorted(caches.items())}}
@@ -2,6 +2,7 @@ import json
 import os
 import uuid
 import math
+import threading
 from itertools import combinations
 from datetime import datetime, timezone
 import logging
@@ -151,6 +152,15 @@ def save_matrix_evaluation(eval_data: dict) -> str:
 def get_matrix_evaluations() -> list:
     return _read_json(EVALUATIONS_FILE)
 
+
+def evaluations_version():
+    """Cheap change token for the evaluations file (mtime + size); None if missing."""
+    try:
+        stat = os.stat(EVALUATIONS_FILE)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
 FACTOR_KEYS = (
     ("cot_bias", "COT"),
     ("options_bias", "OPT"),
@@ -294,18 +304,18 @@ def _compute_metrics(bucket):
     }
 
 
-def _finalize_bucket(bucket, sort_by="sample_size"):
-    rows = []
-    for key, data in bucket.items():
-        metrics = _compute_metrics(data)
-        if not metrics:
-            continue
-        row = {"pattern": key, **metrics}
-        combo_size = int(data.get("combo_size", 0) or 0)
-        if combo_size > 0:
-            row["combo_size"] = combo_size
-        rows.append(row)
+def _bucket_row(key, data):
+    metrics = _compute_metrics(data)
+    if not metrics:
+        return None
+    row = {"pattern": key, **metrics}
+    combo_size = int(data.get("combo_size", 0) or 0)
+    if combo_size > 0:
+        row["combo_size"] = combo_size
+    return row
+
 
+def _sort_rows(rows, sort_by="sample_size"):
     if sort_by == "score":
         rows.sort(key=lambda r: (r.get("confluence_score", 0.0), r.get("sample_size", 0)), reverse=True)
     else:
@@ -313,69 +323,111 @@ def _finalize_bucket(bucket, sort_by="sample_size"):
     return rows
 
 
-def get_matrix_results() -> dict:
+def _finalize_bucket(bucket, sort_by="sample_size", row_cache=None, dirty_keys=None):
     """
-    Compiles raw MFE/MAE evaluations into multi-layer confluence statistics:
-    - base full-context patterns
-    - 2-way and 3-way tab confluences
-    - inverse-conflict setups (2 aligned + 1 opposite)
+    Sorted metric rows of a bucket. With a `row_cache` (pattern -> row) only `dirty_keys`
+    (all keys when None) are recomputed; the rest are reused from the cache.
     """
-    evals = get_matrix_evaluations()
-    if not evals:
-        return {}
-
-    matrix = {}
-
-    for e in evals:
-        asset = e.get("asset", "UNK")
-        tf = e.get("timeframe", "UNK")
-        hit = bool(e.get("hit", False))
-        mfe = float(e.get("mfe_pips", 0.0) or 0.0)
-        mae = float(e.get("mae_pips", 0.0) or 0.0)
-        ctx = e.get("context", {}) or {}
-
-        if asset not in matrix:
-            matrix[asset] = {}
-        if tf not in matrix[asset]:
-            matrix[asset][tf] = {
-                "patterns": {},
-                "confluence_2way": {},
-                "confluence_3way": {},
-                "confluence_4way": {},
-                "inverse_conflicts": {},
-            }
-
-        tf_block = matrix[asset][tf]
-        factors = []
-        for field, label in FACTOR_KEYS:
-            value = _normalize_factor_value(ctx.get(field, "UNKNOWN"))
-            sign = _factor_sign(value)
-            factors.append((label, value, sign))
-
-        base_pattern = " | ".join([f"{label}={value}" for label, value, _ in factors])
-        _accumulate(tf_block["patterns"], base_pattern, hit, mfe, mae)
-
-        signed_factors = [(label, value, sign) for label, value, sign in factors if sign != 0]
-
-        for combo_size, bucket_name in ((2, "confluence_2way"), (3, "confluence_3way"), (4, "confluence_4way")):
-            if len(signed_factors) < combo_size:
-                continue
-            for combo in combinations(signed_factors, combo_size):
-                labels = [entry[0] for entry in combo]
-                combo_state = " | ".join([f"{entry[0]}={entry[1]}" for entry in combo])
-                signs = [entry[2] for entry in combo]
-                total_sign = sum(signs)
-                majority = 1 if total_sign > 0 else -1 if total_sign < 0 else 0
-                if majority == 0:
-                    inverse_count = 0
-                    aligned_count = 0
-                else:
-                    inverse_count = sum(1 for sign in signs if sign != majority)
-                    aligned_count = sum(1 for sign in signs if sign == majority)
-
-                combo_key = f"{'+'.join(labels)} :: {combo_state}"
+    if row_cache is None:
+        row_cache = {}
+        dirty_keys = None
+    for key in bucket if dirty_keys is None else dirty_keys:
+        row_cache[key] = _bucket_row(key, bucket[key])
+    # Bucket (first-seen) order before the stable sort, so ties rank as a full rebuild would.
+    rows = [row_cache[key] for key in bucket if row_cache.get(key) is not None]
+    return _sort_rows(rows, sort_by)
+
+
+CONFLUENCE_BUCKETS = (
+    ("patterns", "sample_size"),
+    ("confluence_2way", "score"),
+    ("confluence_3way", "score"),
+    ("confluence_4way", "score"),
+    ("inverse_conflicts", "score"),
+)
+
+# Accumulators persist across calls: the evaluations file is append-only, so a refresh only
+# folds in the new rows and re-finalizes the buckets they touched.
+_MATRIX_LOCK = threading.Lock()
+_MATRIX_STATE = {
+    "version": None,
+    "count": 0,
+    "first": None,
+    "last": None,
+    "matrix": {},
+    "results": {},
+    "rows": {},
+    "dirty": {},
+}
+
+
+def _reset_matrix_state(state):
+    state.update(version=None, count=0, first=None, last=None, matrix={}, results={}, rows={}, dirty={})
+
+
+def _mark(dirty, asset, tf, bucket_name, key):
+    dirty.setdefault((asset, tf, bucket_name), set()).add(key)
+
+
+def _accumulate_evaluation(matrix, dirty, e):
+    asset = e.get("asset", "UNK")
+    tf = e.get("timeframe", "UNK")
+    hit = bool(e.get("hit", False))
+    mfe = float(e.get("mfe_pips", 0.0) or 0.0)
+    mae = float(e.get("mae_pips", 0.0) or 0.0)
+    ctx = e.get("context", {}) or {}
+
+    if asset not in matrix:
+        matrix[asset] = {}
+    if tf not in matrix[asset]:
+        matrix[asset][tf] = {bucket_name: {} for bucket_name, _ in CONFLUENCE_BUCKETS}
+
+    tf_block = matrix[asset][tf]
+    factors = []
+    for field, label in FACTOR_KEYS:
+        value = _normalize_factor_value(ctx.get(field, "UNKNOWN"))
+        sign = _factor_sign(value)
+        factors.append((label, value, sign))
+
+    base_pattern = " | ".join([f"{label}={value}" for label, value, _ in factors])
+    _accumulate(tf_block["patterns"], base_pattern, hit, mfe, mae)
+    _mark(dirty, asset, tf, "patterns", base_pattern)
+
+    signed_factors = [(label, value, sign) for label, value, sign in factors if sign != 0]
+
+    for combo_size, bucket_name in ((2, "confluence_2way"), (3, "confluence_3way"), (4, "confluence_4way")):
+        if len(signed_factors) < combo_size:
+            continue
+        for combo in combinations(signed_factors, combo_size):
+            labels = [entry[0] for entry in combo]
+            combo_state = " | ".join([f"{entry[0]}={entry[1]}" for entry in combo])
+            signs = [entry[2] for entry in combo]
+            total_sign = sum(signs)
+            majority = 1 if total_sign > 0 else -1 if total_sign < 0 else 0
+            if majority == 0:
+                inverse_count = 0
+                aligned_count = 0
+            else:
+                inverse_count = sum(1 for sign in signs if sign != majority)
+                aligned_count = sum(1 for sign in signs if sign == majority)
+
+            combo_key = f"{'+'.join(labels)} :: {combo_state}"
+            _mark(dirty, asset, tf, bucket_name, combo_key)
+            _accumulate(
+                tf_block[bucket_name],
+                combo_key,
+                hit,
+                mfe,
+                mae,
+                combo_size=combo_size,
+                inverse_count=inverse_count,
+                aligned_count=aligned_count,
+            )
+
+            if inverse_count > 0:
+                _mark(dirty, asset, tf, "inverse_conflicts", combo_key)
                 _accumulate(
-                    tf_block[bucket_name],
+                    tf_block["inverse_conflicts"],
                     combo_key,
                     hit,
                     mfe,
@@ -385,40 +437,65 @@ def get_matrix_results() -> dict:
                     aligned_count=aligned_count,
                 )
 
-                if inverse_count > 0:
-                    _accumulate(
-                        tf_block["inverse_conflicts"],
-                        combo_key,
-                        hit,
-                        mfe,
-                        mae,
-                        combo_size=combo_size,
-                        inverse_count=inverse_count,
-                        aligned_count=aligned_count,
-                    )
-
-    results = {}
-    for asset, tf_map in matrix.items():
-        results[asset] = {}
-        for tf, tf_block in tf_map.items():
-            patterns = _finalize_bucket(tf_block["patterns"], sort_by="sample_size")
-            confluence_2way = _finalize_bucket(tf_block["confluence_2way"], sort_by="score")
-            confluence_3way = _finalize_bucket(tf_block["confluence_3way"], sort_by="score")
-            confluence_4way = _finalize_bucket(tf_block["confluence_4way"], sort_by="score")
-            inverse_conflicts = _finalize_bucket(tf_block["inverse_conflicts"], sort_by="score")
-            results[asset][tf] = {
-                "patterns": patterns,
-                "confluence_2way": confluence_2way,
-                "confluence_3way": confluence_3way,
-                "confluence_4way": confluence_4way,
-                "inverse_conflicts": inverse_conflicts,
-                "coverage": {
-                    "patterns": len(patterns),
-                    "confluence_2way": len(confluence_2way),
-                    "confluence_3way": len(confluence_3way),
-                    "confluence_4way": len(confluence_4way),
-                    "inverse_conflicts": len(inverse_conflicts),
-                },
-            }
-
-    return results
+
+def _refresh_matrix_state(state, evals):
+    """Folds `evals` into the accumulators: only the rows appended since the last call, or all of them after a rewrite."""
+    count = state["count"]
+    appended = (
+        count <= len(evals)
+        and (count == 0 or (evals[0] == state["first"] and evals[count - 1] == state["last"]))
+    )
+    if not appended:
+        _reset_matrix_state(state)
+        count = 0
+
+    matrix, dirty = state["matrix"], state["dirty"]
+    for e in evals[count:]:
+        _accumulate_evaluation(matrix, dirty, e)
+    state["count"] = len(evals)
+    state["first"] = evals[0] if evals else None
+    state["last"] = evals[-1] if evals else None
+
+    # Lazy finalization: only the patterns that received rows since the last read get new
+    # metrics; their buckets are re-sorted.
+    sort_by = dict(CONFLUENCE_BUCKETS)
+    results, row_caches = state["results"], state["rows"]
+    for (asset, tf, bucket_name), keys in dirty.items():
+        block = results.setdefault(asset, {}).setdefault(tf, {name: [] for name, _ in CONFLUENCE_BUCKETS})
+        block[bucket_name] = _finalize_bucket(
+            matrix[asset][tf][bucket_name],
+            sort_by=sort_by[bucket_name],
+            row_cache=row_caches.setdefault((asset, tf, bucket_name), {}),
+            dirty_keys=keys,
+        )
+        block["coverage"] = {name: len(block[name]) for name, _ in CONFLUENCE_BUCKETS}
+    dirty.clear()
+
+
+def get_matrix_results() -> dict:
+    """
+    Compiles raw MFE/MAE evaluations into multi-layer confluence statistics:
+    - base full-context patterns
+    - 2-way and 3-way tab confluences
+    - inverse-conflict setups (2 aligned + 1 opposite)
+    Incremental across calls (see _MATRIX_STATE); the bucket row lists are shared
+    between calls, treat them as read-only.
+    """
+    with _MATRIX_LOCK:
+        state = _MATRIX_STATE
+        version = evaluations_version()
+        if version is None or version != state["version"]:
+            evals = get_matrix_evaluations()
+            if not evals:
+                _reset_matrix_state(state)
+                return {}
+            _refresh_matrix_state(state, evals)
+            state["version"] = version
+        if not state["count"]:
+            return {}
+
+        results = state["results"]
+        return {
+            asset: {tf: dict(results[asset][tf]) for tf in tf_map}
+            for asset, tf_map in state["matrix"].items()
+        }
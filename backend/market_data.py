@@ -1,13 +1,34 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
 import yfinance as yf
 import aiohttp
 import asyncio
 import logging
+import math
 import os
+import time
+
+try:
+    from .rate_limiter import acquire_budget
+except ImportError:  # pragma: no cover - script/local import fallback
+    from rate_limiter import acquire_budget
 
 logger = logging.getLogger(__name__)
 
+HEALTH_WINDOW = 50                 # rolling samples per provider
+HEALTH_MIN_SAMPLES = 5             # below this the p95 estimate is not trusted
+DEFAULT_HEDGE_AFTER_SECONDS = 1.5  # hedge delay while p95 is unknown
+MIN_HEDGE_AFTER_SECONDS = 0.05
+FAILURE_COOLDOWN_SECONDS = 30.0    # sidelined after consecutive failures
+FAILURE_COOLDOWN_AFTER = 3
+ROUTING_LOG_SIZE = 100
+
+
+class ProviderError(Exception):
+    """Raised by providers when they cannot return real data."""
+
 class MarketDataProvider(ABC):
     """Abstract base class for market data providers"""
     
@@ -30,37 +51,46 @@ class YFinanceProvider(MarketDataProvider):
     """Fallback provider using Yahoo Finance (delayed/simulated real-time)"""
     
     async def get_price(self, symbol: str) -> float:
-        try:
-            ticker = yf.Ticker(symbol)
+        def _fetch() -> float:
+            if not acquire_budget("yahoo"):
+                raise ProviderError("yahoo budget exhausted")
             # Fast fetch
-            data = ticker.history(period="1d")
-            if not data.empty:
-                return data["Close"].iloc[-1]
-            return 0.0
+            data = yf.Ticker(symbol).history(period="1d")
+            if data.empty:
+                raise ProviderError(f"no yfinance data for {symbol}")
+            return float(data["Close"].iloc[-1])
+
+        try:
+            return await asyncio.to_thread(_fetch)
+        except ProviderError:
+            raise
         except Exception as e:
             logger.error(f"YFinance error for {symbol}: {e}")
-            return 0.0
+            raise ProviderError(str(e)) from e
 
     async def get_prices(self, symbols: List[str]) -> Dict[str, float]:
-        results = {}
-        # YFinance can be slow in loop, better to use bulk if possible or parallel
-        # For simplicity in MVP, we iterate or use ThreadPoolExecutor if needed
-        # but yf.download is blocking.
-        # We'll use a simple loop for now as this is a fallback.
-        try:
+        # yf.download is blocking: run it off the event loop so hedged requests can race it.
+        def _fetch() -> Dict[str, float]:
+            if not acquire_budget("yahoo"):
+                raise ProviderError("yahoo budget exhausted")
             data = yf.download(symbols, period="1d", progress=False)["Close"]
-            if not data.empty:
-                # Handle single row series or dataframe
-                last_row = data.iloc[-1]
-                for sym in symbols:
-                    if sym in last_row:
-                        results[sym] = float(last_row[sym])
-                    else:
-                        results[sym] = 0.0
+            if data.empty:
+                raise ProviderError("empty yfinance bulk download")
+            # Handle single row series or dataframe
+            last_row = data.iloc[-1]
+            results = {}
+            for sym in symbols:
+                if sym in last_row and not math.isnan(float(last_row[sym])):
+                    results[sym] = float(last_row[sym])
             return results
+
+        try:
+            return await asyncio.to_thread(_fetch)
+        except ProviderError:
+            raise
         except Exception as e:
             logger.error(f"YFinance bulk error: {e}")
-            return {s: 0.0 for s in symbols}
+            raise ProviderError(str(e)) from e
 
     async def get_historical_data(self, symbol: str, timeframe: str = "1d", limit: int = 100) -> List[Dict[str, Any]]:
         # Map common timeframes to yfinance intervals
@@ -69,10 +99,14 @@ class YFinanceProvider(MarketDataProvider):
         }
         interval = interval_map.get(timeframe, "1d")
         period = "1mo" if timeframe == "1d" else "5d" # Simplification
-        
-        try:
-            ticker = yf.Ticker(symbol)
-            df = ticker.history(interval=interval, period=period)
+
+        # Ticker.history is blocking: run it off the event loop so hedged requests can race it.
+        def _fetch() -> List[Dict[str, Any]]:
+            if not acquire_budget("yahoo"):
+                raise ProviderError("yahoo budget exhausted")
+            df = yf.Ticker(symbol).history(interval=interval, period=period)
+            if df.empty:
+                raise ProviderError(f"no yfinance history for {symbol}")
             data = []
             for index, row in df.iterrows():
                 data.append({
@@ -84,9 +118,14 @@ class YFinanceProvider(MarketDataProvider):
                     "volume": row["Volume"]
                 })
             return data[-limit:]
+
+        try:
+            return await asyncio.to_thread(_fetch)
+        except ProviderError:
+            raise
         except Exception as e:
             logger.error(f"YFinance history error {symbol}: {e}")
-            return []
+            raise ProviderError(str(e)) from e
 
 class CapitalComProvider(MarketDataProvider):
     """Capital.com API Provider (Requires API KEY)"""
@@ -143,19 +182,232 @@ class OandaProvider(MarketDataProvider):
     async def get_historical_data(self, symbol: str, timeframe: str = "1d", limit: int = 100) -> List[Dict[str, Any]]:
         return []
 
+class StubProvider(MarketDataProvider):
+    """Offline deterministic provider for tests and local runs (MARKET_DATA_PROVIDER=stub)."""
+
+    def __init__(self, prices: Optional[Dict[str, float]] = None, latency: float = 0.0, fail: bool = False):
+        self.prices = dict(prices or {})
+        self.latency = latency
+        self.fail = fail
+        self.calls = 0
+
+    def _price_for(self, symbol: str) -> float:
+        if symbol in self.prices:
+            return float(self.prices[symbol])
+        # Stable pseudo-price derived from the symbol, so every run sees the same numbers.
+        return float(100 + (sum(ord(c) for c in symbol) % 900))
+
+    async def _simulate(self) -> None:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.fail:
+            raise ProviderError("stub provider configured to fail")
+
+    async def get_price(self, symbol: str) -> float:
+        await self._simulate()
+        return self._price_for(symbol)
+
+    async def get_prices(self, symbols: List[str]) -> Dict[str, float]:
+        await self._simulate()
+        return {s: self._price_for(s) for s in symbols}
+
+    async def get_historical_data(self, symbol: str, timeframe: str = "1d", limit: int = 100) -> List[Dict[str, Any]]:
+        await self._simulate()
+        price = self._price_for(symbol)
+        return [
+            {"time": i, "open": price, "high": price, "low": price, "close": price, "volume": 0.0}
+            for i in range(limit)
+        ]
+
+
+class ProviderHealth:
+    """Rolling latency / error-rate window for one provider."""
+
+    def __init__(self, window: int = HEALTH_WINDOW):
+        self.samples: deque = deque(maxlen=window)  # (latency_seconds, ok)
+        self.consecutive_failures = 0
+        self.sidelined_until = 0.0
+
+    def record(self, latency: float, ok: bool) -> None:
+        self.samples.append((float(latency), bool(ok)))
+        if ok:
+            self.consecutive_failures = 0
+            return
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= FAILURE_COOLDOWN_AFTER:
+            self.sidelined_until = time.monotonic() + FAILURE_COOLDOWN_SECONDS
+
+    @property
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+    def latency_quantile(self, q: float, min_samples: int = HEALTH_MIN_SAMPLES) -> Optional[float]:
+        latencies = sorted(lat for lat, ok in self.samples if ok)
+        if not latencies or len(latencies) < min_samples:
+            return None
+        idx = min(len(latencies) - 1, max(0, math.ceil(q * len(latencies)) - 1))
+        return latencies[idx]
+
+    def score(self) -> float:
+        """Lower is healthier: error rate dominates, median latency breaks ties."""
+        sidelined = 1.0 if time.monotonic() < self.sidelined_until else 0.0
+        # Unmeasured providers are assumed slow so they do not displace a proven one.
+        p50 = self.latency_quantile(0.5, min_samples=1)
+        latency = DEFAULT_HEDGE_AFTER_SECONDS if p50 is None else p50
+        return (sidelined * 10.0) + (self.error_rate * 5.0) + latency
+
+    def snapshot(self) -> Dict[str, Any]:
+        p50 = self.latency_quantile(0.5)
+        p95 = self.latency_quantile(0.95)
+        return {
+            "samples": len(self.samples),
+            "error_rate": round(self.error_rate, 4),
+            "p50_ms": round(p50 * 1000.0, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000.0, 1) if p95 is not None else None,
+            "consecutive_failures": self.consecutive_failures,
+            "sidelined": time.monotonic() < self.sidelined_until,
+            "score": round(self.score(), 4),
+        }
+
+
+def _validate_result(method: str, result: Any) -> Any:
+    # Legacy providers signal "no data" with zeros / empty containers instead of raising.
+    if method == "get_price":
+        if not isinstance(result, (int, float)) or not math.isfinite(float(result)) or float(result) <= 0:
+            raise ProviderError("non-positive price")
+    elif method == "get_prices":
+        if not isinstance(result, dict) or not any(float(v or 0.0) > 0 for v in result.values()):
+            raise ProviderError("no prices returned")
+    elif not result:
+        raise ProviderError("no history returned")
+    return result
+
+
+class RoutedMarketDataProvider(MarketDataProvider):
+    """
+    Routes each call to the healthiest provider.
+    When the primary runs past its own observed p95 latency, a hedged request goes to the
+    next provider and the first successful answer wins; failures fall through the ranking.
+    """
+
+    def __init__(self, providers: List[Tuple[str, MarketDataProvider]], hedge_after_default: float = DEFAULT_HEDGE_AFTER_SECONDS):
+        if not providers:
+            raise ValueError("at least one provider is required")
+        self.providers = list(providers)
+        self.health: Dict[str, ProviderHealth] = {name: ProviderHealth() for name, _ in self.providers}
+        self.hedge_after_default = float(hedge_after_default)
+        self.decisions: deque = deque(maxlen=ROUTING_LOG_SIZE)
+
+    def ranked(self) -> List[Tuple[str, MarketDataProvider]]:
+        order = {name: idx for idx, (name, _) in enumerate(self.providers)}
+        return sorted(self.providers, key=lambda item: (self.health[item[0]].score(), order[item[0]]))
+
+    def _hedge_after(self, name: str) -> float:
+        p95 = self.health[name].latency_quantile(0.95)
+        return max(MIN_HEDGE_AFTER_SECONDS, p95 if p95 is not None else self.hedge_after_default)
+
+    def _launch(self, name: str, provider: MarketDataProvider, method: str, args: tuple) -> asyncio.Task:
+        started = time.monotonic()
+
+        async def _call():
+            try:
+                result = _validate_result(method, await getattr(provider, method)(*args))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self.health[name].record(time.monotonic() - started, False)
+                raise ProviderError(f"{name}: {exc}") from exc
+            self.health[name].record(time.monotonic() - started, True)
+            return result
+
+        task = asyncio.get_running_loop().create_task(_call())
+        task.provider_name = name  # type: ignore[attr-defined]
+        return task
+
+    async def _route(self, method: str, *args):
+        started = time.monotonic()
+        queue = self.ranked()
+        decision: Dict[str, Any] = {
+            "ts_utc": datetime.now(timezone.utc).isoformat(),
+            "method": method,
+            "args": [a if not isinstance(a, list) else list(a) for a in args],
+            "ranking": [name for name, _ in queue],
+            "primary": queue[0][0],
+            "hedged_to": None,
+            "winner": None,
+            "errors": [],
+        }
+        pending: set = set()
+        try:
+            while queue or pending:
+                if not pending:
+                    name, provider = queue.pop(0)
+                    pending.add(self._launch(name, provider, method, args))
+                    timeout = self._hedge_after(name) if queue else None
+                else:
+                    timeout = None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Primary is slower than its own p95: race the next provider.
+                    name, provider = queue.pop(0)
+                    decision["hedged_to"] = name
+                    pending.add(self._launch(name, provider, method, args))
+                    continue
+                for task in done:
+                    exc = task.exception()
+                    if exc is None:
+                        decision["winner"] = task.provider_name
+                        return task.result()
+                    decision["errors"].append(str(exc))
+            raise ProviderError(f"all providers failed for {method}: {decision['errors']}")
+        finally:
+            # Losers keep running so their latency still feeds the health window.
+            for task in pending:
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            decision["latency_ms"] = round((time.monotonic() - started) * 1000.0, 1)
+            self.decisions.append(decision)
+
+    async def get_price(self, symbol: str) -> float:
+        return await self._route("get_price", symbol)
+
+    async def get_prices(self, symbols: List[str]) -> Dict[str, float]:
+        return await self._route("get_prices", list(symbols))
+
+    async def get_historical_data(self, symbol: str, timeframe: str = "1d", limit: int = 100) -> List[Dict[str, Any]]:
+        return await self._route("get_historical_data", symbol, timeframe, limit)
+
+    def routing_status(self, last: int = 20) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "ranking": [name for name, _ in self.ranked()],
+            "providers": {name: self.health[name].snapshot() for name, _ in self.providers},
+            "decisions": list(self.decisions)[-max(0, int(last)):],
+        }
+
+
 class MarketDataFactory:
     @staticmethod
-    def get_provider() -> MarketDataProvider:
-        # Check env vars to decide provider
+    def get_providers() -> List[Tuple[str, MarketDataProvider]]:
+        # Check env vars to decide which providers are available; yfinance is always the backstop.
+        if os.environ.get("MARKET_DATA_PROVIDER", "").strip().lower() == "stub":
+            return [("stub", StubProvider())]
+
+        providers: List[Tuple[str, MarketDataProvider]] = []
         cap_key = os.environ.get("CAPITAL_COM_KEY")
         oanda_key = os.environ.get("OANDA_KEY")
-        
         if cap_key:
-            return CapitalComProvider(cap_key, os.environ.get("CAPITAL_COM_ID", ""))
-        elif oanda_key:
-            return OandaProvider(oanda_key, os.environ.get("OANDA_ACCOUNT_ID", ""))
-        else:
-            return YFinanceProvider()
+            providers.append(("capital_com", CapitalComProvider(cap_key, os.environ.get("CAPITAL_COM_ID", ""))))
+        if oanda_key:
+            providers.append(("oanda", OandaProvider(oanda_key, os.environ.get("OANDA_ACCOUNT_ID", ""))))
+        providers.append(("yfinance", YFinanceProvider()))
+        return providers
+
+    @staticmethod
+    def get_provider() -> RoutedMarketDataProvider:
+        return RoutedMarketDataProvider(MarketDataFactory.get_providers())
 
 # Global instance
 market_provider = MarketDataFactory.get_provider()
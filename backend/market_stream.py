@@ -0,0 +1,210 @@
+"""
+market_stream.py
+
+Server-sent event fan-out for live dashboard feeds.
+- one internal poller per data source, shared by every subscriber
+- pollers start with the first subscriber and stop when the last one leaves
+- subscribers get a full snapshot on connect, then only changed fields
+- heartbeat frames keep proxies from closing idle connections
+- slow subscribers are resynced with a fresh snapshot instead of buffering
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+
+logger = logging.getLogger("market_stream")
+
+HEARTBEAT_SECONDS = 15.0
+SUBSCRIBER_QUEUE_SIZE = 32
+_REMOVED = None  # value pushed for keys that disappeared from a payload
+_RESYNC = object()  # queued in place of a dropped backlog
+
+
+def _now_utc_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def diff_payload(old: Any, new: Any) -> Any:
+    """
+    Return the changed part of `new` relative to `old`.
+    Dicts are diffed recursively (removed keys -> None); other values are replaced whole.
+    Returns an empty dict when nothing changed.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        out: Dict[str, Any] = {}
+        for key, value in new.items():
+            if key not in old:
+                out[key] = value
+                continue
+            if old[key] == value:
+                continue
+            sub = diff_payload(old[key], value)
+            if isinstance(value, dict) and isinstance(old[key], dict) and not sub:
+                continue
+            out[key] = sub
+        for key in old:
+            if key not in new:
+                out[key] = _REMOVED
+        return out
+    return {} if old == new else new
+
+
+def format_sse(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    payload = json.dumps(data, ensure_ascii=True, separators=(",", ":"), default=str)
+    lines.append(f"data: {payload}")
+    return "\n".join(lines) + "\n\n"
+
+
+class _Source:
+    def __init__(self, name: str, fetch: Callable[[], Awaitable[Dict[str, Any]]], interval_seconds: float):
+        self.name = name
+        self.fetch = fetch
+        self.interval = max(0.05, float(interval_seconds))
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self.snapshot_at: Optional[str] = None
+        self.version = 0
+        self.polls = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+
+class StreamHub:
+    """Registry of pollable sources and their SSE subscribers (single event loop)."""
+
+    def __init__(self, heartbeat_seconds: float = HEARTBEAT_SECONDS, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.heartbeat_seconds = float(heartbeat_seconds)
+        self.queue_size = int(queue_size)
+        self._sources: Dict[str, _Source] = {}
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._event_id = 0
+
+    def register(self, name: str, fetch: Callable[[], Awaitable[Dict[str, Any]]], interval_seconds: float) -> None:
+        self._sources[name] = _Source(name, fetch, interval_seconds)
+        self._subscribers.setdefault(name, set())
+
+    @property
+    def source_names(self) -> List[str]:
+        return list(self._sources)
+
+    def _next_id(self) -> int:
+        self._event_id += 1
+        return self._event_id
+
+    def _publish(self, name: str, frame: str) -> None:
+        for queue in list(self._subscribers.get(name, ())):
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                # Client is behind: drop its backlog and resync it from current snapshots.
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(_RESYNC)
+
+    def _snapshot_frame(self, source: _Source) -> str:
+        return format_sse(
+            "snapshot",
+            {"source": source.name, "version": source.version, "ts_utc": source.snapshot_at, "data": source.snapshot},
+            self._next_id(),
+        )
+
+    def _snapshot_frames(self, names: List[str]) -> List[str]:
+        return [self._snapshot_frame(self._sources[n]) for n in names if self._sources[n].snapshot is not None]
+
+    async def _poll_once(self, source: _Source) -> None:
+        source.polls += 1
+        try:
+            payload = await source.fetch()
+        except Exception as exc:
+            source.errors += 1
+            source.last_error = str(exc)
+            logger.warning("stream source %s poll failed: %s", source.name, exc)
+            return
+        if not isinstance(payload, dict):
+            return
+        previous = source.snapshot
+        source.snapshot = payload
+        source.snapshot_at = _now_utc_iso()
+        if previous is None:
+            source.version += 1
+            self._publish(source.name, self._snapshot_frame(source))
+            return
+        changes = diff_payload(previous, payload)
+        if not changes:
+            return
+        source.version += 1
+        frame = format_sse(
+            "delta",
+            {"source": source.name, "version": source.version, "ts_utc": source.snapshot_at, "changes": changes},
+            self._next_id(),
+        )
+        self._publish(source.name, frame)
+
+    async def _run_source(self, source: _Source) -> None:
+        try:
+            while self._subscribers.get(source.name):
+                started = time.monotonic()
+                await self._poll_once(source)
+                await asyncio.sleep(max(0.0, source.interval - (time.monotonic() - started)))
+        finally:
+            source.task = None
+
+    def _ensure_poller(self, source: _Source) -> None:
+        if source.task is None or source.task.done():
+            source.task = asyncio.get_running_loop().create_task(self._run_source(source))
+
+    async def subscribe(self, names: Optional[Iterable[str]] = None) -> AsyncIterator[str]:
+        """Yield SSE frames for `names` (all sources by default) until the consumer stops iterating."""
+        wanted = [n for n in (names or self._sources) if n in self._sources]
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        for name in wanted:
+            self._subscribers[name].add(queue)
+            self._ensure_poller(self._sources[name])
+        # Taken together with registration: later changes arrive through the queue.
+        initial = self._snapshot_frames(wanted)
+        try:
+            yield format_sse("hello", {"sources": wanted, "heartbeat_seconds": self.heartbeat_seconds}, self._next_id())
+            for frame in initial:
+                yield frame
+            while True:
+                try:
+                    frame = await asyncio.wait_for(queue.get(), timeout=self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    frame = format_sse("heartbeat", {"ts_utc": _now_utc_iso()})
+                if frame is _RESYNC:
+                    for snapshot in self._snapshot_frames(wanted):
+                        yield snapshot
+                else:
+                    yield frame
+        finally:
+            # Pollers notice the empty subscriber set on their next tick and exit.
+            for name in wanted:
+                self._subscribers[name].discard(queue)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "sources": {
+                name: {
+                    "subscribers": len(self._subscribers.get(name, ())),
+                    "interval_seconds": source.interval,
+                    "polling": source.task is not None and not source.task.done(),
+                    "version": source.version,
+                    "polls": source.polls,
+                    "errors": source.errors,
+                    "last_error": source.last_error,
+                    "snapshot_at_utc": source.snapshot_at,
+                }
+                for name, source in self._sources.items()
+            },
+        }
@@ -0,0 +1,149 @@
+"""
+option_chain.py
+
+Columnar option-chain decoding for CBOE delayed quotes.
+- OCC symbols (ROOT + YYMMDD + C/P + strike*1000) decoded as fixed-width byte arrays
+- numeric fields converted in one numpy pass (None/invalid -> 0.0)
+- short-TTL per-ticker cache of decoded chains, shared across threads
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+OCC_SUFFIX_LEN = 15  # YYMMDD + C/P + 8-digit strike
+NUMERIC_FIELDS = {
+    "volume": "volume",
+    "open_interest": "open_interest",
+    "bid": "bid",
+    "ask": "ask",
+    "last": "last_trade_price",
+    "iv": "iv",
+}
+_DIGIT_POSITIONS = [0, 1, 2, 3, 4, 5] + list(range(7, 15))
+
+
+def _numeric_column(options: List[Dict[str, Any]], key: str) -> np.ndarray:
+    values = [option.get(key) for option in options]
+    try:
+        column = np.array(values, dtype=float)
+    except (TypeError, ValueError):
+        column = np.empty(len(values), dtype=float)
+        for idx, value in enumerate(values):
+            try:
+                column[idx] = float(value)
+            except (TypeError, ValueError):
+                column[idx] = 0.0
+    column[np.isnan(column)] = 0.0
+    return column
+
+
+def empty_chain() -> Dict[str, np.ndarray]:
+    chain = {name: np.zeros(0, dtype=float) for name in NUMERIC_FIELDS}
+    chain["expiry"] = np.zeros(0, dtype="datetime64[D]")
+    chain["is_call"] = np.zeros(0, dtype=bool)
+    chain["strike"] = np.zeros(0, dtype=float)
+    return chain
+
+
+def decode_cboe_chain(options: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Decode CBOE `data.options` rows into aligned numpy columns:
+    expiry (datetime64[D]), is_call, strike, volume, open_interest, bid, ask, last, iv.
+    Rows with malformed OCC symbols are dropped.
+    """
+    if not options:
+        return empty_chain()
+
+    symbols = [str(option.get("option") or "") for option in options]
+    suffix = np.array([s[-OCC_SUFFIX_LEN:].encode("ascii", "replace") for s in symbols], dtype=f"S{OCC_SUFFIX_LEN}")
+    raw = suffix.view(np.uint8).reshape(len(symbols), OCC_SUFFIX_LEN).astype(np.int64)
+    digits = raw - ord("0")
+    side = raw[:, 6]
+
+    valid = np.array([len(s) > OCC_SUFFIX_LEN and s[:-OCC_SUFFIX_LEN].isalpha() and s[:-OCC_SUFFIX_LEN].isupper() for s in symbols])
+    valid &= ((digits[:, _DIGIT_POSITIONS] >= 0) & (digits[:, _DIGIT_POSITIONS] <= 9)).all(axis=1)
+    valid &= (side == ord("C")) | (side == ord("P"))
+
+    year = 2000 + (digits[:, 0] * 10) + digits[:, 1]
+    month = (digits[:, 2] * 10) + digits[:, 3]
+    day = (digits[:, 4] * 10) + digits[:, 5]
+    valid &= (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31)
+
+    month_start = (np.where(valid, year, 1970) - 1970) * 12 + np.where(valid, month, 1) - 1
+    month_dt = month_start.astype("datetime64[M]")
+    expiry = month_dt.astype("datetime64[D]") + (np.where(valid, day, 1) - 1)
+    # Reject impossible dates (e.g. Feb 30) that would roll into the next month.
+    valid &= expiry.astype("datetime64[M]") == month_dt
+
+    strike = np.zeros(len(symbols), dtype=float)
+    for pos in range(7, 15):
+        strike = (strike * 10.0) + digits[:, pos]
+    strike /= 1000.0
+
+    chain: Dict[str, np.ndarray] = {
+        "expiry": expiry[valid],
+        "is_call": (side == ord("C"))[valid],
+        "strike": strike[valid],
+    }
+    for name, key in NUMERIC_FIELDS.items():
+        chain[name] = _numeric_column(options, key)[valid]
+    return chain
+
+
+def chain_size(chain: Dict[str, np.ndarray]) -> int:
+    return int(chain["strike"].size)
+
+
+class ChainCache:
+    """Decoded chains per ticker with a short TTL; concurrent misses for one ticker load once."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = float(ttl_seconds)
+        self._entries: Dict[str, Tuple[float, Dict[str, np.ndarray]]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _lock_for(self, ticker: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(ticker, threading.Lock())
+
+    def get(self, ticker: str, loader: Callable[[], Optional[List[Dict[str, Any]]]]) -> Dict[str, np.ndarray]:
+        entry = self._entries.get(ticker)
+        if entry and (time.monotonic() - entry[0]) < self.ttl_seconds:
+            self.hits += 1
+            return entry[1]
+        with self._lock_for(ticker):
+            entry = self._entries.get(ticker)
+            if entry and (time.monotonic() - entry[0]) < self.ttl_seconds:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            options = loader()
+            chain = decode_cboe_chain(options or [])
+            if options:
+                # Failed/empty fetches are not cached so the next scan retries.
+                self._entries[ticker] = (time.monotonic(), chain)
+            return chain
+
+    def clear(self) -> None:
+        with self._guard:
+            self._entries.clear()
+
+    def status(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "tickers": {
+                ticker: {"rows": chain_size(chain), "age_seconds": round(now - ts, 1)}
+                for ticker, (ts, chain) in list(self._entries.items())
+            },
+        }
@@ -0,0 +1,237 @@
+"""
+rate_limiter.py
+
+Process-wide upstream rate-limit budgets.
+- one token bucket per upstream host (Yahoo, Stooq, CBOE, CFTC, Barchart, ...)
+- priority classes: interactive request > scheduled job > backfill
+- lower classes queue behind waiting higher classes and cannot drain the reserve
+  kept for interactive traffic
+- 429 feedback puts the whole host in cool-down for every caller sharing it
+- per-host metrics for /system endpoints
+
+The active priority is carried by a context variable, so deep fetch helpers do not
+need an extra argument: scheduler jobs wrap their body in `priority_scope(...)`.
+"""
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_SCHEDULED = 1
+PRIORITY_BACKFILL = 2
+PRIORITY_NAMES = ("interactive", "scheduled", "backfill")
+
+# Share of the burst that a class may not consume (kept for higher classes).
+PRIORITY_RESERVE = (0.0, 0.25, 0.5)
+PRIORITY_TIMEOUT_SECONDS = (8.0, 60.0, 300.0)
+
+HOST_BUDGETS: Dict[str, Dict[str, float]] = {
+    "yahoo": {"rate_per_sec": 2.0, "burst": 10},
+    "stooq": {"rate_per_sec": 1.0, "burst": 5},
+    "cboe": {"rate_per_sec": 2.0, "burst": 6},
+    "cftc": {"rate_per_sec": 1.0, "burst": 4},
+    "barchart": {"rate_per_sec": 0.5, "burst": 4},
+    "coingecko": {"rate_per_sec": 0.5, "burst": 5},
+    "tradingview": {"rate_per_sec": 0.5, "burst": 3},
+    "default": {"rate_per_sec": 5.0, "burst": 20},
+}
+HOST_ALIASES = {
+    "query1.finance.yahoo.com": "yahoo",
+    "query2.finance.yahoo.com": "yahoo",
+    "finance.yahoo.com": "yahoo",
+    "stooq.com": "stooq",
+    "cdn.cboe.com": "cboe",
+    "www.cftc.gov": "cftc",
+    "www.barchart.com": "barchart",
+    "api.coingecko.com": "coingecko",
+    "scanner.tradingview.com": "tradingview",
+}
+COOLDOWN_BASE_SECONDS = 2.0
+COOLDOWN_MAX_SECONDS = 60.0
+
+_PRIORITY: contextvars.ContextVar[int] = contextvars.ContextVar("upstream_priority", default=PRIORITY_INTERACTIVE)
+
+
+class _HostBucket:
+    def __init__(self, name: str, rate_per_sec: float, burst: float):
+        self.name = name
+        self.rate = max(float(rate_per_sec), 1e-6)
+        self.burst = max(float(burst), 1.0)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.cooldown_until = 0.0
+        self.backoff = 0.0
+        self.cond = threading.Condition()
+        self.waiting = [0, 0, 0]
+        self.granted = [0, 0, 0]
+        self.wait_seconds = [0.0, 0.0, 0.0]
+        self.max_wait_seconds = [0.0, 0.0, 0.0]
+        self.timeouts = [0, 0, 0]
+        self.throttled = 0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.burst, self.tokens + (elapsed * self.rate))
+            self.updated = now
+
+    def _needed(self, priority: int, cost: float) -> float:
+        return cost + (self.burst * PRIORITY_RESERVE[priority])
+
+    def _can_take(self, priority: int, cost: float, now: float) -> bool:
+        if now < self.cooldown_until:
+            return False
+        if any(self.waiting[p] for p in range(priority)):
+            return False
+        return self.tokens + 1e-9 >= min(self._needed(priority, cost), self.burst)
+
+    def acquire(self, priority: int, cost: float, timeout: float) -> bool:
+        start = time.monotonic()
+        deadline = start + max(0.0, timeout)
+        cost = min(max(float(cost), 0.0), self.burst)
+        with self.cond:
+            self.waiting[priority] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._can_take(priority, cost, now):
+                        self.tokens -= cost
+                        waited = now - start
+                        self.granted[priority] += 1
+                        self.wait_seconds[priority] += waited
+                        self.max_wait_seconds[priority] = max(self.max_wait_seconds[priority], waited)
+                        return True
+                    if now >= deadline:
+                        self.timeouts[priority] += 1
+                        return False
+                    shortfall = min(self._needed(priority, cost), self.burst) - self.tokens
+                    pause = max(shortfall / self.rate, self.cooldown_until - now, 0.01)
+                    self.cond.wait(min(pause, deadline - now))
+            finally:
+                self.waiting[priority] -= 1
+                self.cond.notify_all()
+
+    def throttled_by_upstream(self, retry_after: Optional[float]) -> None:
+        with self.cond:
+            self.throttled += 1
+            self.backoff = min(COOLDOWN_MAX_SECONDS, (self.backoff * 2.0) or COOLDOWN_BASE_SECONDS)
+            pause = max(float(retry_after or 0.0), self.backoff)
+            self.cooldown_until = max(self.cooldown_until, time.monotonic() + pause)
+            self.tokens = 0.0
+            self.cond.notify_all()
+
+    def succeeded(self) -> None:
+        if self.backoff:
+            with self.cond:
+                self.backoff = 0.0
+
+    def status(self) -> Dict[str, Any]:
+        with self.cond:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                "rate_per_sec": self.rate,
+                "burst": self.burst,
+                "tokens": round(self.tokens, 3),
+                "cooldown_remaining_seconds": round(max(0.0, self.cooldown_until - now), 3),
+                "throttled_429": self.throttled,
+                "classes": {
+                    PRIORITY_NAMES[p]: {
+                        "granted": self.granted[p],
+                        "queued": self.waiting[p],
+                        "timeouts": self.timeouts[p],
+                        "avg_wait_ms": round((self.wait_seconds[p] / self.granted[p]) * 1000.0, 2) if self.granted[p] else 0.0,
+                        "max_wait_ms": round(self.max_wait_seconds[p] * 1000.0, 2),
+                    }
+                    for p in range(len(PRIORITY_NAMES))
+                },
+            }
+
+
+_BUCKETS: Dict[str, _HostBucket] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def host_key(url_or_host: str) -> str:
+    """Map a URL, hostname or budget name to its budget key."""
+    text = str(url_or_host or "").strip().lower()
+    if text in HOST_BUDGETS:
+        return text
+    host = urlparse(text).hostname if "://" in text else text
+    return HOST_ALIASES.get(host or "", "default")
+
+
+def _bucket(host: str) -> _HostBucket:
+    key = host_key(host)
+    bucket = _BUCKETS.get(key)
+    if bucket is None:
+        with _REGISTRY_LOCK:
+            bucket = _BUCKETS.get(key)
+            if bucket is None:
+                budget = HOST_BUDGETS.get(key, HOST_BUDGETS["default"])
+                bucket = _HostBucket(key, budget["rate_per_sec"], budget["burst"])
+                _BUCKETS[key] = bucket
+    return bucket
+
+
+def current_priority() -> int:
+    return _PRIORITY.get()
+
+
+@contextmanager
+def priority_scope(priority: int):
+    """Run the enclosed upstream calls under `priority` (context-local, thread/task safe)."""
+    token = _PRIORITY.set(int(priority))
+    try:
+        yield
+    finally:
+        _PRIORITY.reset(token)
+
+
+def acquire_budget(
+    host: str,
+    cost: float = 1.0,
+    priority: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> bool:
+    """
+    Block until `cost` tokens are available for `host` under the current priority.
+    Returns False when the class timeout expires; callers treat that as an upstream miss.
+    """
+    priority = current_priority() if priority is None else int(priority)
+    priority = min(max(priority, 0), len(PRIORITY_NAMES) - 1)
+    timeout = PRIORITY_TIMEOUT_SECONDS[priority] if timeout is None else float(timeout)
+    return _bucket(host).acquire(priority, cost, timeout)
+
+
+def try_acquire_budget(host: str, cost: float = 1.0, priority: Optional[int] = None) -> bool:
+    return acquire_budget(host, cost=cost, priority=priority, timeout=0.0)
+
+
+def report_throttled(host: str, retry_after: Any = None) -> None:
+    """Upstream answered 429: cool the host down for every caller (`retry_after` may be a raw header)."""
+    try:
+        seconds = max(0.0, float(retry_after)) if retry_after is not None else None
+    except (TypeError, ValueError):
+        seconds = None  # HTTP-date form: fall back to exponential backoff
+    _bucket(host).throttled_by_upstream(seconds)
+
+
+def report_success(host: str) -> None:
+    _bucket(host).succeeded()
+
+
+def limiter_status(hosts: Optional[List[str]] = None) -> Dict[str, Any]:
+    keys = [host_key(h) for h in hosts] if hosts else sorted(_BUCKETS)
+    return {
+        "status": "ok",
+        "priorities": list(PRIORITY_NAMES),
+        "hosts": {key: _bucket(key).status() for key in keys},
+    }
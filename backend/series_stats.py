@@ -0,0 +1,314 @@
+"""
+series_stats.py
+
+NumPy kernels for the descriptive statistics of daily history series
+(smart money positioning, 10y historical analysis).
+- same contract as the list loops they replace: empty or too-short inputs give 0.0,
+  sample standard deviation (n - 1), correlations clamped to [-1, 1] and 0.0 for a
+  flat series, linear-interpolated quantiles over the finite values, returns that
+  skip a day when either close is non-positive
+- inputs are lists or float64 arrays: one conversion per call, no per-element Python;
+  entries float() cannot parse count as 0.0, as `_safe_float` does
+- deviations and correlations use numpy's pairwise sums, so they match the sequential
+  loops to ~1e-12 relative; means of lists, quantiles, drawdowns and returns are
+  bit-identical
+- `RollingMoments`: prefix sums over a paired sample, so the mean, volatility,
+  correlation and beta of any window cost O(1) (rolling series: one vectorized pass)
+"""
+from __future__ import annotations
+
+import math
+from typing import Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+FloatSeq = Sequence[Any]
+
+
+def _to_float(value: Any, default: float = 0.0) -> float:
+    try:
+        if value is None:
+            return float(default)
+        return float(value)
+    except Exception:
+        return float(default)
+
+
+def _to_int(value: Any) -> int:
+    try:
+        return int(float(value))
+    except Exception:
+        return 0
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return max(low, min(high, value))
+
+
+def as_floats(values: FloatSeq) -> np.ndarray:
+    """1-D float64 array of `values` (returned as-is when it already is one)."""
+    if isinstance(values, np.ndarray) and values.dtype == np.float64 and values.ndim == 1:
+        return values
+    try:
+        arr = np.asarray(values, dtype=np.float64)
+        # NaN may come from None (-> 0.0 in the list helpers): take the exact path then.
+        if arr.ndim == 1 and not np.isnan(arr).any():
+            return arr
+    except (TypeError, ValueError):
+        pass
+    return np.array([_to_float(value) for value in values], dtype=np.float64)
+
+
+def mean(values: FloatSeq) -> float:
+    if len(values) == 0:
+        return 0.0
+    if not isinstance(values, np.ndarray):
+        # builtins.sum over a list already runs in C; converting would cost more.
+        return sum(values) / len(values)
+    return float(values.sum() / values.size)
+
+
+def stddev(values: FloatSeq) -> float:
+    """Sample standard deviation (n - 1)."""
+    if len(values) < 2:
+        return 0.0
+    arr = as_floats(values)
+    dev = arr - arr.mean()
+    var = float(np.dot(dev, dev)) / max(1, arr.size - 1)
+    return math.sqrt(max(var, 0.0))
+
+
+def pearson_corr(xs: FloatSeq, ys: FloatSeq) -> float:
+    """Correlation over the common prefix; 0.0 below 3 points or for a flat series."""
+    if len(xs) < 3 or len(ys) < 3:
+        return 0.0
+    n = min(len(xs), len(ys))
+    x = as_floats(xs)[:n]
+    y = as_floats(ys)[:n]
+    dx = x - x.mean()
+    dy = y - y.mean()
+    vx = float(np.dot(dx, dx))
+    vy = float(np.dot(dy, dy))
+    if vx <= 1e-12 or vy <= 1e-12:
+        return 0.0
+    return _clamp(float(np.dot(dx, dy)) / math.sqrt(vx * vy), -1.0, 1.0)
+
+
+def quantile(values: FloatSeq, q: float) -> float:
+    """Linear interpolation between order statistics; partial sort (O(n)) instead of a full sort."""
+    arr = as_floats(values)
+    clean = arr[np.isfinite(arr)]
+    if clean.size == 0:
+        return 0.0
+    q_clamped = _clamp(_to_float(q, 0.5), 0.0, 1.0)
+    if clean.size == 1:
+        return float(clean[0])
+    pos = q_clamped * (clean.size - 1)
+    lo = int(math.floor(pos))
+    hi = int(math.ceil(pos))
+    if lo == hi:
+        return float(np.partition(clean, lo)[lo])
+    ordered = np.partition(clean, (lo, hi))
+    frac = pos - lo
+    return (float(ordered[lo]) * (1.0 - frac)) + (float(ordered[hi]) * frac)
+
+
+def _tail(arr: np.ndarray, periods: int) -> np.ndarray:
+    return arr if arr.size <= periods else arr[-periods:]
+
+
+def daily_returns(closes: FloatSeq, periods: int) -> np.ndarray:
+    """Close-to-close returns over the last `periods` closes."""
+    src = _tail(as_floats(closes), periods)
+    prev, curr = src[:-1], src[1:]
+    keep = ~((prev <= 0.0) | (curr <= 0.0))
+    return curr[keep] / prev[keep] - 1.0
+
+
+def dated_returns(closes: FloatSeq, timestamps: FloatSeq, periods: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Close-to-close returns over the last `periods` rows, with each return day's epoch seconds."""
+    px = as_floats(closes)
+    ts = as_floats(timestamps)
+    if px.size > periods:
+        px = px[-periods:]
+        ts = ts[-periods:]
+    n = min(px.size, ts.size)
+    px, ts = px[:n], ts[:n]
+    keep = ~((px[:-1] <= 0.0) | (px[1:] <= 0.0))
+    days = np.where(np.isfinite(ts[1:][keep]), ts[1:][keep], 0.0).astype(np.int64)
+    return px[1:][keep] / px[:-1][keep] - 1.0, days
+
+
+def utc_weekdays(epoch_seconds: np.ndarray) -> np.ndarray:
+    """Monday = 0, as datetime.weekday() (1970-01-01 was a Thursday)."""
+    return (epoch_seconds // 86400 + 3) % 7
+
+
+def utc_months(epoch_seconds: np.ndarray) -> np.ndarray:
+    """1..12, as datetime.month."""
+    return epoch_seconds.astype("datetime64[s]").astype("datetime64[M]").astype(np.int64) % 12 + 1
+
+
+def paired_returns(closes_a: FloatSeq, closes_b: FloatSeq) -> Tuple[np.ndarray, np.ndarray]:
+    """Same-day returns of two aligned close series, on days valid for both."""
+    ra, rb, _ = paired_return_rows(closes_a, closes_b)
+    return ra, rb
+
+
+def paired_return_rows(closes_a: FloatSeq, closes_b: FloatSeq) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """`paired_returns` plus the row of each return day in the input series."""
+    a = as_floats(closes_a)
+    b = as_floats(closes_b)
+    keep = ~((a[:-1] <= 0.0) | (a[1:] <= 0.0) | (b[:-1] <= 0.0) | (b[1:] <= 0.0))
+    rows = np.flatnonzero(keep) + 1
+    return a[1:][keep] / a[:-1][keep] - 1.0, b[1:][keep] / b[:-1][keep] - 1.0, rows
+
+
+class RollingMoments:
+    """
+    Prefix sums of x, y, x², y² and xy over a paired sample, built once; the moments of
+    any window [start, stop) are then differences of two prefix entries.
+    - samples are centered on the full-sample mean first, which keeps the window
+      differences of the squared sums well conditioned (matches the direct kernels
+      to ~1e-12 relative)
+    - same contract as `mean` / `stddev` / `pearson_corr` on the window slice; a window
+      holding a non-finite sample has NaN mean / volatility and 0.0 correlation / beta
+    - `rows`: position of each sample in the source rows (e.g. the return day of
+      `paired_return_rows`), so windows can be given in source rows via `since_row`
+    - single-series form (`ys` omitted) for rolling means and volatilities
+    """
+
+    __slots__ = ("size", "rows", "_x0", "_y0", "_sums", "_bad")
+
+    def __init__(self, xs: FloatSeq, ys: Optional[FloatSeq] = None, rows: Optional[FloatSeq] = None):
+        x = as_floats(xs)
+        y = x if ys is None else as_floats(ys)
+        n = min(x.size, y.size)
+        x, y = x[:n], y[:n]
+        bad = ~(np.isfinite(x) & np.isfinite(y))
+        if bad.any():
+            x = np.where(bad, 0.0, x)
+            y = np.where(bad, 0.0, y)
+        self.size = n
+        self.rows = np.arange(n) if rows is None else np.asarray(rows, dtype=np.int64)[:n]
+        self._x0 = float(x.mean()) if n else 0.0
+        self._y0 = float(y.mean()) if n else 0.0
+        dx = x - self._x0
+        dy = y - self._y0
+        sums = np.zeros((5, n + 1))
+        np.cumsum(dx, out=sums[0, 1:])
+        np.cumsum(dy, out=sums[1, 1:])
+        np.cumsum(dx * dx, out=sums[2, 1:])
+        np.cumsum(dy * dy, out=sums[3, 1:])
+        np.cumsum(dx * dy, out=sums[4, 1:])
+        self._sums = sums
+        self._bad = np.concatenate(([0], np.cumsum(bad))) if bad.any() else None
+
+    def _bounds(self, starts: Any, window: Optional[int]) -> Tuple[np.ndarray, np.ndarray]:
+        lo = np.clip(np.asarray(starts, dtype=np.int64), 0, self.size)
+        if window is None:
+            return lo, np.full(lo.shape, self.size, dtype=np.int64)
+        return lo, np.clip(lo + int(window), lo, self.size)
+
+    def _window(self, lo: np.ndarray, hi: np.ndarray):
+        sums = self._sums[:, hi] - self._sums[:, lo]
+        count = (hi - lo).astype(np.float64)
+        safe = np.maximum(count, 1.0)
+        sx, sy, sxx, syy, sxy = sums
+        # Squared deviations from the window mean; clipped at 0 against rounding.
+        vx = np.maximum(sxx - sx * sx / safe, 0.0)
+        vy = np.maximum(syy - sy * sy / safe, 0.0)
+        cov = sxy - sx * sy / safe
+        bad = np.zeros(lo.shape, dtype=bool) if self._bad is None else self._bad[hi] > self._bad[lo]
+        return count, sx, sy, vx, vy, cov, bad
+
+    def means(self, starts: Any, window: Optional[int] = None) -> np.ndarray:
+        """Mean of x over each window [start, start + window) (to the end when `window` is None)."""
+        count, sx, _, _, _, _, bad = self._window(*self._bounds(starts, window))
+        out = self._x0 + sx / np.maximum(count, 1.0)
+        out[count <= 0] = 0.0
+        out[bad] = np.nan
+        return out
+
+    def stddevs(self, starts: Any, window: Optional[int] = None) -> np.ndarray:
+        """Sample standard deviation (n - 1) of x over each window."""
+        count, _, _, vx, _, _, bad = self._window(*self._bounds(starts, window))
+        out = np.sqrt(vx / np.maximum(count - 1.0, 1.0))
+        out[count < 2] = 0.0
+        out[bad] = np.nan
+        return out
+
+    def corrs(self, starts: Any, window: Optional[int] = None) -> np.ndarray:
+        """Correlation of x and y over each window; 0.0 below 3 points or for a flat window."""
+        count, _, _, vx, vy, cov, bad = self._window(*self._bounds(starts, window))
+        flat = (count < 3) | (vx <= 1e-12) | (vy <= 1e-12) | bad
+        out = np.clip(cov / np.sqrt(np.where(flat, 1.0, vx * vy)), -1.0, 1.0)
+        out[flat] = 0.0
+        return out
+
+    def betas(self, starts: Any, window: Optional[int] = None) -> np.ndarray:
+        """Regression slope of x on y over each window; 0.0 below 3 points or for a flat y."""
+        count, _, _, _, vy, cov, bad = self._window(*self._bounds(starts, window))
+        flat = (count < 3) | (vy <= 1e-12) | bad
+        out = cov / np.where(flat, 1.0, vy)
+        out[flat] = 0.0
+        return out
+
+    def _span(self, start: int, stop: Optional[int]) -> Optional[int]:
+        return None if stop is None else max(0, int(stop) - int(start))
+
+    def mean(self, start: int = 0, stop: Optional[int] = None) -> float:
+        return float(self.means([start], self._span(start, stop))[0])
+
+    def stddev(self, start: int = 0, stop: Optional[int] = None) -> float:
+        return float(self.stddevs([start], self._span(start, stop))[0])
+
+    def corr(self, start: int = 0, stop: Optional[int] = None) -> float:
+        return float(self.corrs([start], self._span(start, stop))[0])
+
+    def beta(self, start: int = 0, stop: Optional[int] = None) -> float:
+        return float(self.betas([start], self._span(start, stop))[0])
+
+    def since_row(self, row: int) -> int:
+        """Index of the first sample at or after source row `row`."""
+        return int(np.searchsorted(self.rows, row, side="left"))
+
+    def rolling_corr(self, window: int, step: int = 1) -> np.ndarray:
+        """Correlation of every `window`-sample window, one every `step` samples."""
+        starts = np.arange(0, max(1, self.size - window + 1), max(1, step))
+        return self.corrs(starts, window)
+
+
+def max_drawdown(closes: FloatSeq, periods: int) -> float:
+    """Deepest close-to-running-peak decline over the last `periods` closes (<= 0.0)."""
+    src = _tail(as_floats(closes), periods)
+    if src.size < 3 or math.isnan(src[0]):
+        return 0.0
+    # fmax skips NaN closes the way the `c > peak` comparison does.
+    peak = np.fmax.accumulate(src)
+    valid = peak > 0.0
+    if not valid.any():
+        return 0.0
+    drawdowns = src[valid] / peak[valid] - 1.0
+    drawdowns = drawdowns[~np.isnan(drawdowns)]
+    return min(0.0, float(drawdowns.min())) if drawdowns.size else 0.0
+
+
+def cagr(closes: FloatSeq, timestamps: FloatSeq, periods: int) -> float:
+    """Annualized growth between the close `periods` rows back and the last one."""
+    if len(closes) <= periods or len(timestamps) <= periods:
+        return 0.0
+    start = _to_float(closes[-1 - periods])
+    end = _to_float(closes[-1])
+    t0 = _to_int(timestamps[-1 - periods])
+    t1 = _to_int(timestamps[-1])
+    if start <= 0.0 or end <= 0.0 or t1 <= t0:
+        return 0.0
+    years = (t1 - t0) / (365.25 * 86400.0)
+    if years <= 0.0:
+        return 0.0
+    try:
+        return (end / start) ** (1.0 / years) - 1.0
+    except Exception:
+        return 0.0
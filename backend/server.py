@@ -1,5 +1,6 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, status, Body, Header, Form
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request, UploadFile, File, status, Body, Header, Form
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -8,7 +9,7 @@ import logging
 import json
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import uuid
 from datetime import datetime, timezone, timedelta, date
 from zoneinfo import ZoneInfo
@@ -18,10 +19,12 @@ from PyPDF2 import PdfReader
 import io
 import random
 import math
+import numpy as np
+import pandas as pd
 import yfinance as yf
 import requests
-import csv
-from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, wraps
 import asyncio
 import google.generativeai as genai
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
@@ -35,7 +38,39 @@ from collection_control import (
     status_payload as collection_status_payload,
 )
 from persistence_guard import archive_event, lake_status, run_maintenance
+from breadth_history import (
+    history_status as breadth_history_status,
+    merge_prices as merge_breadth_prices,
+    price_history as stored_breadth_prices,
+    readings as breadth_readings,
+    record_reading as record_breadth_reading,
+)
+from cot_feed import get_cot_snapshot, next_release_at as next_cot_release_at, refresh_if_due as refresh_cot_if_due
+from cot_history import append_snapshot as append_cot_history, get_positioning as get_cot_positioning
+from gamma_exposure import compute_gamma_profile, profile_flip as gamma_profile_flip
+from market_data import market_provider
+from market_stream import StreamHub
+from rate_limiter import (
+    PRIORITY_BACKFILL,
+    PRIORITY_SCHEDULED,
+    acquire_budget,
+    current_priority,
+    host_key,
+    limiter_status,
+    priority_scope,
+    report_throttled,
+)
 from svp_live_store import ingest_live_snapshot, get_live_svp_pair, get_live_svp_status
+from ttl_cache import DEFAULT_KEY, TTLCache, cache_status
+from http_cache import ETagCache, http_cache_status
+import shared_cache
+import cache_warmer
+from deep_research_30 import CACHE_TTL_SECONDS as DEEP_RESEARCH_CACHE_TTL_SECONDS
+from smart_money_positioning import (
+    CACHE_TTL_SECONDS as SMART_MONEY_CACHE_TTL_SECONDS,
+    cached_positioning_age,
+    select_sections as select_smart_money_sections,
+)
 from tv_screenshot_store import save_screenshot, get_latest as get_latest_tv_screenshot, get_recent as get_recent_tv_screenshots, get_status as get_tv_screenshot_status
 
 ROOT_DIR = Path(__file__).parent
@@ -1302,7 +1337,6 @@ import urllib.parse as urllib_parse
 import re
 import json
 
-_breadth_cache = {"data": None, "timestamp": None}
 
 ALLOWED_MARKET_HOSTS = {"www.barchart.com", "query1.finance.yahoo.com"}
 
@@ -1317,6 +1351,7 @@ def _validated_external_url(url: str, allowed_hosts: set) -> str:
 BREADTH_REFRESH_INTERVAL_HOURS = 4
 BREADTH_REFRESH_INTERVAL_MINUTES = (BREADTH_REFRESH_INTERVAL_HOURS * 60) + 1
 BREADTH_CACHE_TTL = BREADTH_REFRESH_INTERVAL_MINUTES * 60
+_breadth_cache = TTLCache("market_breadth", ttl_seconds=BREADTH_CACHE_TTL, stale_seconds=BREADTH_CACHE_TTL)
 BREADTH_TIMEFRAME = "4h"
 BREADTH_INTRADAY_FETCH = {
     "range": "6mo",
@@ -1327,6 +1362,10 @@ BREADTH_INTRADAY_FALLBACK = {
     "interval": "1d",
 }
 BREADTH_RESAMPLE_HOURS = 4
+# Once the local price store covers the window, refreshes only fetch this recent range.
+BREADTH_INCREMENTAL_RANGE = "1mo"
+BREADTH_INCREMENTAL_MAX_GAP_DAYS = 20
+BREADTH_FETCH_WORKERS = 8
 BREADTH_WINDOWS = {
     "ma_fast": 50,
     "ma_slow": 200,
@@ -1367,11 +1406,15 @@ def _fetch_barchart_indicator_value(symbol: str):
         f"https://www.barchart.com/stocks/quotes/{encoded_symbol}",
         ALLOWED_MARKET_HOSTS,
     )
+    if not acquire_budget("barchart"):
+        return None
     response = requests.get(
         url,
         headers={"User-Agent": "Mozilla/5.0 (compatible; Karion/1.0)"},
         timeout=15,
     )
+    if response.status_code == 429:
+        report_throttled("barchart", response.headers.get("Retry-After"))
     response.raise_for_status()
     html = response.text
 
@@ -1411,7 +1454,12 @@ def _fetch_index_price_history(
     index_symbol: str,
     max_points: int = BREADTH_HISTORY_POINTS,
     range_param: str = BREADTH_INTRADAY_FETCH["range"]
-):
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    (points resampled to BREADTH_RESAMPLE_HOURS buckets, intraday). `intraday` is False
+    when the intraday fetch failed and the points are BREADTH_INTRADAY_FALLBACK daily
+    closes, which must not be persisted next to the 4h buckets.
+    """
     encoded_symbol = urllib_parse.quote(index_symbol, safe="")
     url = _validated_external_url(
         f"https://query1.finance.yahoo.com/v8/finance/chart/{encoded_symbol}"
@@ -1420,19 +1468,27 @@ def _fetch_index_price_history(
     )
 
     try:
+        if not acquire_budget(host_key(url)):
+            raise RuntimeError("upstream budget exhausted")
         response = requests.get(
             url,
             headers={"User-Agent": "Mozilla/5.0 (compatible; Karion/1.0)"},
             timeout=20,
         )
+        if response.status_code == 429:
+            report_throttled(host_key(url), response.headers.get("Retry-After"))
         response.raise_for_status()
         payload = response.json()
+        intraday = True
     except Exception:
+        intraday = False
         fallback_url = _validated_external_url(
             f"https://query1.finance.yahoo.com/v8/finance/chart/{encoded_symbol}"
             f"?range={BREADTH_INTRADAY_FALLBACK['range']}&interval={BREADTH_INTRADAY_FALLBACK['interval']}",
             ALLOWED_MARKET_HOSTS,
         )
+        if not acquire_budget(host_key(fallback_url)):
+            return [], False
         fallback_response = requests.get(
             fallback_url,
             headers={"User-Agent": "Mozilla/5.0 (compatible; Karion/1.0)"},
@@ -1443,7 +1499,7 @@ def _fetch_index_price_history(
 
     result = (payload or {}).get("chart", {}).get("result", [])
     if not result:
-        return []
+        return [], intraday
     row = result[0]
     timestamps = row.get("timestamp") or []
     closes = (((row.get("indicators") or {}).get("quote") or [{}])[0].get("close") or [])
@@ -1460,7 +1516,7 @@ def _fetch_index_price_history(
             continue
 
     if not points:
-        return []
+        return [], intraday
 
     points.sort(key=lambda p: p["dt"])
     bucketed = {}
@@ -1479,7 +1535,7 @@ def _fetch_index_price_history(
 
     if len(resampled) > max_points:
         resampled = resampled[-max_points:]
-    return resampled
+    return resampled, intraday
 
 
 def _moving_average(values: List[float], window: int):
@@ -1611,10 +1667,83 @@ def _build_modeled_breadth_history(current_ma50: float, current_ma200: float, pr
     return modeled
 
 
-def _build_breadth_index_payload(index_key: str):
+def _load_breadth_prices(index_key: str, max_points: int, full_range: str) -> List[Dict[str, Any]]:
+    """Bucketed price history from the local store, topped up with only the recent range when it is warm."""
+    stored = stored_breadth_prices(index_key, max_points)
+    range_param = full_range
+    if len(stored) >= max_points:
+        try:
+            last = datetime.strptime(stored[-1]["date"], "%Y-%m-%d %H:%M").replace(tzinfo=timezone.utc)
+            if datetime.now(timezone.utc) - last < timedelta(days=BREADTH_INCREMENTAL_MAX_GAP_DAYS):
+                range_param = BREADTH_INCREMENTAL_RANGE
+        except (TypeError, ValueError):
+            pass
+    try:
+        fetched, intraday = _fetch_index_price_history(
+            BREADTH_SYMBOL_MAP[index_key]["price_symbol"],
+            max_points=max_points,
+            range_param=range_param,
+        )
+    except Exception:
+        fetched, intraday = [], False
+    if intraday:
+        # Daily fallback closes are served for this build only, never stored as 4h buckets.
+        merge_breadth_prices(index_key, fetched)
+    return stored_breadth_prices(index_key, max_points) or fetched
+
+
+def _model_breadth_gap(
+    price_history: List[Dict], start: int, stop: int, left: Optional[Dict], right: Dict
+) -> List[Dict]:
+    """
+    Modeled readings for the unobserved buckets price_history[start:stop]. Between two
+    readings they are interpolated; a leading gap runs the price model backwards from
+    the first reading after it.
+    """
+    if left is None:
+        segment = _build_modeled_breadth_history(
+            right["above_ma50_pct"], right["above_ma200_pct"], price_history[start:stop + 1]
+        )
+        return segment[: stop - start]
+    span = stop - start + 1
+    modeled = []
+    for offset, point in enumerate(price_history[start:stop], start=1):
+        weight = offset / span
+        modeled.append({
+            "date": point["date"],
+            "price": point["price"],
+            "above_ma50_pct": round(left["above_ma50_pct"] + (right["above_ma50_pct"] - left["above_ma50_pct"]) * weight, 2),
+            "above_ma200_pct": round(left["above_ma200_pct"] + (right["above_ma200_pct"] - left["above_ma200_pct"]) * weight, 2),
+        })
+    return modeled
+
+
+def _merge_breadth_history(index_key: str, ma50_pct: float, ma200_pct: float, price_history: List[Dict]):
+    """Observed readings from the breadth store; only the buckets never observed are modeled around them."""
+    observed = breadth_readings(index_key)
+    live = {"above_ma50_pct": ma50_pct, "above_ma200_pct": ma200_pct}
+    history = []
+    gap_start = None
+    left = None
+    for idx, point in enumerate(price_history + [None]):
+        reading = observed.get(point["date"]) if point is not None else None
+        if point is not None and not reading:
+            if gap_start is None:
+                gap_start = idx
+            continue
+        if gap_start is not None:
+            # A trailing gap closes on the live reading.
+            anchor = reading or live
+            history.extend({**row, "observed": False} for row in _model_breadth_gap(price_history, gap_start, idx, left, anchor))
+            gap_start = None
+        if point is not None:
+            history.append({"date": point["date"], "price": point["price"], **reading, "observed": True})
+            left = reading
+    return history
+
+
+def _build_breadth_index_payload(index_key: str, ma50_raw: Optional[Dict], ma200_raw: Optional[Dict], price_history: List[Dict]):
     config = BREADTH_SYMBOL_MAP[index_key]
-    ma50_raw = _fetch_barchart_indicator_value(config["ma50"])
-    ma200_raw = _fetch_barchart_indicator_value(config["ma200"])
     if not ma50_raw or not ma200_raw:
         return None
 
@@ -1625,17 +1754,19 @@ def _build_breadth_index_payload(index_key: str):
     ma200_count = int(round((ma200_pct / 100.0) * total))
     as_of_time = ma50_raw.get("trade_time") or ma200_raw.get("trade_time") or ""
     as_of_date = as_of_time[:10] if as_of_time else None
-    price_history = []
-    modeled_history = []
+    history = []
     latest_price = None
 
-    try:
-        price_history = _fetch_index_price_history(config["price_symbol"], max_points=BREADTH_HISTORY_POINTS)
-    except Exception:
-        price_history = []
+    # The reading describes the market as of the latest price bar.
+    if price_history:
+        bucket = price_history[-1]["date"]
+    else:
+        now = datetime.now(timezone.utc)
+        bucket = now.replace(hour=now.hour - (now.hour % BREADTH_RESAMPLE_HOURS), minute=0, second=0, microsecond=0).strftime("%Y-%m-%d %H:%M")
+    record_breadth_reading(index_key, bucket, ma50_pct, ma200_pct)
 
     if price_history:
-        modeled_history = _build_modeled_breadth_history(ma50_pct, ma200_pct, price_history)
+        history = _merge_breadth_history(index_key, ma50_pct, ma200_pct, price_history)
         latest_price = price_history[-1]["price"]
 
     payload = {
@@ -1650,27 +1781,18 @@ def _build_breadth_index_payload(index_key: str):
         "missing_examples": [],
         "latest_price": latest_price,
     }
-    if modeled_history:
-        payload["history"] = modeled_history
+    if history:
+        payload["history"] = history
+        payload["history_observed_points"] = sum(1 for row in history if row["observed"])
     return payload
 
 
-def _build_price_proxy_breadth_payload(index_key: str):
+def _build_price_proxy_breadth_payload(index_key: str, price_history: List[Dict]):
     config = BREADTH_SYMBOL_MAP[index_key]
     total = int(config.get("total_components", 100))
-    price_symbol = config.get("price_symbol")
-    if not price_symbol:
+    if not config.get("price_symbol"):
         return None
 
-    try:
-        price_history = _fetch_index_price_history(
-            price_symbol,
-            max_points=BREADTH_PRICE_HISTORY_POINTS,
-            range_param=BREADTH_INTRADAY_FALLBACK["range"]
-        )
-    except Exception:
-        price_history = []
-
     history = _build_price_proxy_history(price_history, max_points=BREADTH_HISTORY_POINTS)
     if not history:
         return None
@@ -1700,12 +1822,38 @@ def _build_price_proxy_breadth_payload(index_key: str):
 
 
 def _fetch_market_breadth_payload():
-    sp_payload = _build_breadth_index_payload("SP500")
-    nas_payload = _build_breadth_index_payload("NAS100")
-    if not sp_payload or not nas_payload:
-        raise RuntimeError("Unable to fetch market breadth indicators")
-    xau_payload = _build_price_proxy_breadth_payload("XAUUSD")
-    eur_payload = _build_price_proxy_breadth_payload("EURUSD")
+    priority = current_priority()
+
+    def _scoped(fn, *args, **kwargs):
+        with priority_scope(priority):
+            return fn(*args, **kwargs)
+
+    # All Barchart indicators and price histories are independent: fetch them together.
+    with ThreadPoolExecutor(max_workers=BREADTH_FETCH_WORKERS) as pool:
+        indicators = {}
+        prices = {}
+        for key, cfg in BREADTH_SYMBOL_MAP.items():
+            if cfg.get("kind") == "index_indicator":
+                indicators[key] = (
+                    pool.submit(_scoped, _fetch_barchart_indicator_value, cfg["ma50"]),
+                    pool.submit(_scoped, _fetch_barchart_indicator_value, cfg["ma200"]),
+                )
+                prices[key] = pool.submit(_scoped, _load_breadth_prices, key, BREADTH_HISTORY_POINTS, BREADTH_INTRADAY_FETCH["range"])
+            else:
+                prices[key] = pool.submit(_scoped, _load_breadth_prices, key, BREADTH_PRICE_HISTORY_POINTS, BREADTH_INTRADAY_FALLBACK["range"])
+
+        def _result(future):
+            try:
+                return future.result()
+            except Exception:
+                return None
+
+        sp_payload = _build_breadth_index_payload("SP500", *(_result(f) for f in indicators["SP500"]), _result(prices["SP500"]) or [])
+        nas_payload = _build_breadth_index_payload("NAS100", *(_result(f) for f in indicators["NAS100"]), _result(prices["NAS100"]) or [])
+        if not sp_payload or not nas_payload:
+            raise RuntimeError("Unable to fetch market breadth indicators")
+        xau_payload = _build_price_proxy_breadth_payload("XAUUSD", _result(prices["XAUUSD"]) or [])
+        eur_payload = _build_price_proxy_breadth_payload("EURUSD", _result(prices["EURUSD"]) or [])
 
     symbols_meta = {}
     for key, cfg in BREADTH_SYMBOL_MAP.items():
@@ -1740,9 +1888,6 @@ def _fetch_market_breadth_payload():
 
 @api_router.get("/market/breadth")
 async def get_market_breadth():
-    global _breadth_cache
-    now = datetime.now(timezone.utc)
-
     def _ensure_breadth_thresholds(payload: Dict[str, Any]) -> Dict[str, Any]:
         if not isinstance(payload, dict):
             return payload
@@ -1753,26 +1898,25 @@ async def get_market_breadth():
         source.setdefault("thresholds", BREADTH_REGIME_THRESHOLDS)
         return payload
 
-    if _breadth_cache["data"] and _breadth_cache["timestamp"]:
-        age = (now - _breadth_cache["timestamp"]).total_seconds()
-        if age < BREADTH_CACHE_TTL:
-            return _ensure_breadth_thresholds(_breadth_cache["data"])
-
     try:
-        payload = _fetch_market_breadth_payload()
-        _breadth_cache = {"data": payload, "timestamp": now}
-        return _ensure_breadth_thresholds(payload)
+        payload = await _breadth_cache.aget(DEFAULT_KEY, _fetch_market_breadth_payload)
     except Exception as exc:
-        if _breadth_cache["data"] and _breadth_cache["timestamp"]:
-            stale_age = int((now - _breadth_cache["timestamp"]).total_seconds())
+        stale = _breadth_cache.peek()
+        if stale:
             return {
-                **_ensure_breadth_thresholds(_breadth_cache["data"]),
+                **_ensure_breadth_thresholds(stale),
                 "cache_stale": True,
-                "cache_age_seconds": stale_age,
+                "cache_age_seconds": int(_breadth_cache.age() or 0),
                 "warning": f"breadth refresh failed: {str(exc)}",
             }
         raise HTTPException(status_code=503, detail="Market breadth temporarily unavailable")
 
+    age = _breadth_cache.age() or 0.0
+    if age >= BREADTH_CACHE_TTL:
+        # Served while the background refresh runs.
+        return {**_ensure_breadth_thresholds(payload), "cache_stale": True, "cache_age_seconds": int(age)}
+    return _ensure_breadth_thresholds(payload)
+
 
 @api_router.post("/market/svp/live")
 async def ingest_market_svp_live(payload: SVPLiveIngest, x_svp_secret: Optional[str] = Header(default=None)):
@@ -1782,8 +1926,7 @@ async def ingest_market_svp_live(payload: SVPLiveIngest, x_svp_secret: Optional[
 
     try:
         row = ingest_live_snapshot(payload.model_dump())
-        global _price_action_cache
-        _price_action_cache = {"data": None, "timestamp": None}
+        _price_action_cache.invalidate()
         archive_event("svp_live_ingest", {"status": "ok", "asset": row.get("asset"), "rome_day": row.get("rome_day")})
         return {"status": "ok", "saved": row}
     except ValueError as exc:
@@ -1864,17 +2007,33 @@ async def market_svp_screenshot_feed(asset: Optional[str] = None, limit: int = 2
 
 # ==================== MARKET DATA ====================
 
-# Cache for market data (refresh every 5 minutes)
-_market_cache = {"data": None, "timestamp": None}
-_vix_cache = {"data": None, "timestamp": None}
-_cot_live_cache = {"data": None, "timestamp": None}
-_options_flow_cache = {"data": None, "timestamp": None}
-_session_discretionary_cache = {"data": None, "timestamp": None}
-_price_action_cache = {"data": None, "timestamp": None}
 ROME_TZ = ZoneInfo("Europe/Rome")
 NEW_YORK_TZ = ZoneInfo("America/New_York")
 
 OPTIONS_FLOW_CACHE_TTL_SECONDS = 60
+
+# Endpoint payload caches: expired payloads are served for at most one more TTL while a
+# background refresh runs; past that, readers wait for (or fall back around) a fresh load.
+_market_cache = TTLCache("market_prices", ttl_seconds=120, stale_seconds=120)
+_vix_cache = TTLCache("vix", ttl_seconds=300, stale_seconds=300)
+_options_flow_cache = TTLCache(
+    "options_flow",
+    ttl_seconds=OPTIONS_FLOW_CACHE_TTL_SECONDS,
+    stale_seconds=OPTIONS_FLOW_CACHE_TTL_SECONDS,
+)
+_options_flow_baselines: Dict[str, Dict[str, Any]] = {}
+_session_discretionary_cache = TTLCache("session_discretionary", ttl_seconds=15 * 60)
+_price_action_cache = TTLCache("price_action", ttl_seconds=3 * 60)
+# Refresh-ahead for the inputs every /engine/cards rebuild reads (see cache_warmer).
+_warm_market_prices = cache_warmer.register_ttl_cache(_market_cache, lambda _max_age: _load_market_prices())
+_warm_vix = cache_warmer.register_ttl_cache(_vix_cache, lambda _max_age: _load_vix_data())
+_warm_options_flow = cache_warmer.register_ttl_cache(
+    _options_flow_cache, lambda max_age: _load_shared_options_flow_snapshot(max_age)
+)
+_warm_session_discretionary = cache_warmer.register_ttl_cache(
+    _session_discretionary_cache, lambda _max_age: _load_discretionary_context_map()
+)
+_warm_price_action = cache_warmer.register_ttl_cache(_price_action_cache, lambda _max_age: _load_price_action_context_map())
 OPTIONS_MIN_NOTIONAL_MILLION = 0.5
 
 OPTIONS_PROXY_MAP = {
@@ -1905,16 +2064,6 @@ def _to_int(value: Any, default: int = 0) -> int:
         return default
 
 
-def _find_cot_row(rows: List[List[str]], predicate) -> Optional[List[str]]:
-    for row in rows:
-        if not row:
-            continue
-        name = str(row[0]).upper()
-        if predicate(name):
-            return row
-    return None
-
-
 def _median(values: List[float]) -> float:
     vals = [float(v) for v in values if isinstance(v, (int, float)) and math.isfinite(float(v))]
     if not vals:
@@ -2130,13 +2279,12 @@ def build_price_action_context_map() -> Dict[str, Dict[str, Any]]:
     - intraday impulse and close location
     - rebalancing signals after one-sided intraday move
     """
-    global _price_action_cache
-    now = datetime.now(timezone.utc)
-    if _price_action_cache["data"] and _price_action_cache["timestamp"]:
-        age = (now - _price_action_cache["timestamp"]).total_seconds()
-        if age < 3 * 60:
-            return _price_action_cache["data"]
+    _warm_price_action.touch()
+    return _price_action_cache.get(DEFAULT_KEY, _load_price_action_context_map)
+
 
+def _load_price_action_context_map() -> Dict[str, Dict[str, Any]]:
+    now = datetime.now(timezone.utc)
     out: Dict[str, Dict[str, Any]] = {}
     symbols = {
         "NAS100": "NQ=F",
@@ -2524,8 +2672,6 @@ def build_price_action_context_map() -> Dict[str, Dict[str, Any]]:
     except Exception as e:
         logger.warning(f"Price-action context unavailable: {e}")
 
-    _price_action_cache["data"] = out
-    _price_action_cache["timestamp"] = now
     return out
 
 
@@ -2537,21 +2683,17 @@ def build_discretionary_context_map() -> Dict[str, Dict[str, Any]]:
     - conditional pattern (two prior range days -> expansion day odds)
     - reversal probability after expansion
     """
-    global _session_discretionary_cache
-    now = datetime.now(timezone.utc)
-    if _session_discretionary_cache["data"] and _session_discretionary_cache["timestamp"]:
-        age = (now - _session_discretionary_cache["timestamp"]).total_seconds()
-        if age < 15 * 60:
-            return _session_discretionary_cache["data"]
+    _warm_session_discretionary.touch()
+    return _session_discretionary_cache.get(DEFAULT_KEY, _load_discretionary_context_map)
 
+
+def _load_discretionary_context_map() -> Dict[str, Dict[str, Any]]:
     out: Dict[str, Dict[str, Any]] = {}
     try:
         from session_forensics import _load_rows  # Local module with bootstrapped + historical session rows
 
         raw_rows = _load_rows()
         if not isinstance(raw_rows, list) or not raw_rows:
-            _session_discretionary_cache["data"] = out
-            _session_discretionary_cache["timestamp"] = now
             return out
 
         target_assets = ("NAS100", "SP500", "XAUUSD", "EURUSD")
@@ -2747,8 +2889,6 @@ def build_discretionary_context_map() -> Dict[str, Dict[str, Any]]:
     except Exception as e:
         logger.warning(f"Discretionary context unavailable: {e}")
 
-    _session_discretionary_cache["data"] = out
-    _session_discretionary_cache["timestamp"] = now
     return out
 
 
@@ -2881,81 +3021,15 @@ def get_live_cot_snapshot() -> Dict[str, Any]:
     Sources:
     - Financial + Combined: FinComWk.txt
     - Futures only (for Gold MM): deafut.txt
+    Rows are cached on disk by cot_feed and refreshed only when a Friday release is due.
     """
-    global _cot_live_cache
-    now = datetime.now(timezone.utc)
-    if _cot_live_cache["data"] and _cot_live_cache["timestamp"]:
-        age = (now - _cot_live_cache["timestamp"]).total_seconds()
-        if age < 30 * 60:
-            return _cot_live_cache["data"]
-
-    out: Dict[str, Any] = {"symbols": {}, "source": "CFTC", "updated_at": now.isoformat()}
-
-    try:
-        fin_text = requests.get("https://www.cftc.gov/dea/newcot/FinComWk.txt", timeout=20).text
-        fin_rows = list(csv.reader(fin_text.splitlines()))
-
-        # Financial report: use Asset Manager Long/Short (columns 11/12), OI (7)
-        fin_targets = {
-            "NAS100": lambda n: ("NASDAQ-100 CONSOLIDATED" in n) and ("MICRO" not in n) and ("MINI" not in n),
-            "SP500": lambda n: ("S&P 500 CONSOLIDATED" in n) and ("MICRO" not in n) and ("E-MINI" not in n),
-            "EURUSD": lambda n: n.startswith("EURO FX - CHICAGO MERCANTILE EXCHANGE"),
-        }
-        for symbol, matcher in fin_targets.items():
-            row = _find_cot_row(fin_rows, matcher)
-            if not row or len(row) < 13:
-                continue
-            open_interest = _to_int(row[7], 0)
-            am_long = _to_int(row[11], 0)
-            am_short = _to_int(row[12], 0)
-            net = am_long - am_short
-            net_pct_oi = (net / open_interest * 100.0) if open_interest > 0 else 0.0
-            out["symbols"][symbol] = {
-                "as_of_date": str(row[2]).strip(),
-                "open_interest": open_interest,
-                "long": am_long,
-                "short": am_short,
-                "net": net,
-                "net_pct_oi": round(net_pct_oi, 2),
-                "participant": "asset_manager",
-                "report": "FinComWk",
-            }
-    except Exception as e:
-        logger.warning(f"CFTC FinComWk fetch failed: {e}")
-
-    try:
-        # Gold: use Disaggregated futures (Managed Money Long/Short columns 14/15), OI (7)
-        fut_text = requests.get("https://www.cftc.gov/dea/newcot/deafut.txt", timeout=20).text
-        fut_rows = list(csv.reader(fut_text.splitlines()))
-        gold_row = _find_cot_row(
-            fut_rows,
-            lambda n: ("GOLD - COMMODITY EXCHANGE INC." in n) and ("MICRO GOLD" not in n),
-        )
-        if gold_row and len(gold_row) >= 16:
-            open_interest = _to_int(gold_row[7], 0)
-            mm_long = _to_int(gold_row[14], 0)
-            mm_short = _to_int(gold_row[15], 0)
-            net = mm_long - mm_short
-            net_pct_oi = (net / open_interest * 100.0) if open_interest > 0 else 0.0
-            out["symbols"]["XAUUSD"] = {
-                "as_of_date": str(gold_row[2]).strip(),
-                "open_interest": open_interest,
-                "long": mm_long,
-                "short": mm_short,
-                "net": net,
-                "net_pct_oi": round(net_pct_oi, 2),
-                "participant": "managed_money",
-                "report": "deafut",
-            }
-    except Exception as e:
-        logger.warning(f"CFTC deafut fetch failed: {e}")
-
-    _cot_live_cache["data"] = out
-    _cot_live_cache["timestamp"] = now
-    return out
+    return get_cot_snapshot()
 
 def get_yf_ticker_safe(symbol: str, period: str = "5d", interval: str = "1d"):
     """Safely fetch data from yfinance with error handling"""
+    if not acquire_budget("yahoo"):
+        logger.warning(f"yfinance budget exhausted for {symbol}")
+        return None
     try:
         ticker = yf.Ticker(symbol)
         hist = ticker.history(period=period, interval=interval)
@@ -2978,20 +3052,6 @@ def _safe_pct_delta(current: float, previous: Optional[float]) -> float:
     return ((current - previous) / prev_abs) * 100.0
 
 
-def _norm_pdf(value: float) -> float:
-    return math.exp(-0.5 * value * value) / math.sqrt(2.0 * math.pi)
-
-
-def _bs_gamma(spot: float, strike: float, years_to_expiry: float, iv: float) -> float:
-    if spot <= 0 or strike <= 0 or years_to_expiry <= 0 or iv <= 0:
-        return 0.0
-    denom = iv * math.sqrt(years_to_expiry)
-    if denom <= 0:
-        return 0.0
-    d1 = (math.log(spot / strike) + (0.5 * iv * iv * years_to_expiry)) / denom
-    return _norm_pdf(d1) / (spot * denom)
-
-
 def _pick_primary_expiry(expiries: List[str]) -> Optional[str]:
     if not expiries:
         return None
@@ -3052,6 +3112,9 @@ def _compute_options_snapshot_row(
     target_spot: Optional[float] = None,
     previous: Optional[Dict[str, Any]] = None,
 ) -> Optional[Dict[str, Any]]:
+    # history + expiries + one chain
+    if not acquire_budget("yahoo", cost=3):
+        return None
     ticker = yf.Ticker(proxy_ticker)
     spot_hist = ticker.history(period="5d", interval="1d")
     if spot_hist is None or spot_hist.empty:
@@ -3142,89 +3205,70 @@ def _compute_options_snapshot_row(
     dte_days = max(1, raw_dte_days)
     years_to_expiry = max(dte_days / 365.0, 1.0 / 365.0)
 
-    call_by_strike: Dict[float, Dict[str, float]] = {}
-    for _, row in calls.iterrows():
-        strike = _safe_float(row.get("strike"), 0.0)
-        if strike <= 0:
-            continue
-        call_by_strike[strike] = {
-            "oi": max(_safe_float(row.get("openInterest"), 0.0), 0.0),
-            "iv": max(_safe_float(row.get("impliedVolatility"), 0.0), 0.0),
-        }
-
-    put_by_strike: Dict[float, Dict[str, float]] = {}
-    for _, row in puts.iterrows():
-        strike = _safe_float(row.get("strike"), 0.0)
-        if strike <= 0:
-            continue
-        put_by_strike[strike] = {
-            "oi": max(_safe_float(row.get("openInterest"), 0.0), 0.0),
-            "iv": max(_safe_float(row.get("impliedVolatility"), 0.0), 0.0),
-        }
+    def _chain_columns(frame, is_call: bool):
+        strikes = pd.to_numeric(frame["strike"], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+        oi_col = frame["openInterest"] if "openInterest" in frame else pd.Series(0.0, index=frame.index)
+        iv_col = frame["impliedVolatility"] if "impliedVolatility" in frame else pd.Series(0.0, index=frame.index)
+        return (
+            strikes,
+            np.full(strikes.size, is_call),
+            pd.to_numeric(oi_col, errors="coerce").fillna(0.0).to_numpy(dtype=float),
+            pd.to_numeric(iv_col, errors="coerce").fillna(0.0).to_numpy(dtype=float),
+        )
 
-    all_strikes = sorted(set(call_by_strike.keys()) | set(put_by_strike.keys()))
-    if not all_strikes:
+    # Whole chain (calls + puts) priced in one vectorized pass.
+    columns = [np.concatenate(parts) for parts in zip(_chain_columns(calls, True), _chain_columns(puts, False))]
+    gex = compute_gamma_profile(spot, *columns, years_to_expiry=years_to_expiry)
+    chain_profile = gex["profile"]
+    all_strikes = chain_profile["strike"]
+    if not all_strikes.size:
         return None
 
     # Keep a practical strike window around spot for cleaner GEX card rendering.
-    strike_window = [s for s in all_strikes if (spot * 0.80) <= s <= (spot * 1.20)]
-    if len(strike_window) < 8:
-        strike_window = sorted(all_strikes, key=lambda s: abs(s - spot))[:12]
-        strike_window = sorted(strike_window)
-
-    profile: List[Dict[str, float]] = []
-    total_call_raw = 0.0
-    total_put_raw = 0.0
-    total_net_raw = 0.0
-
-    for strike in strike_window:
-        call_row = call_by_strike.get(strike, {})
-        put_row = put_by_strike.get(strike, {})
-        call_oi = call_row.get("oi", 0.0)
-        put_oi = put_row.get("oi", 0.0)
-        call_iv = call_row.get("iv", 0.0) or 0.25
-        put_iv = put_row.get("iv", 0.0) or 0.25
-
-        call_gamma = _bs_gamma(spot, strike, years_to_expiry, call_iv)
-        put_gamma = _bs_gamma(spot, strike, years_to_expiry, put_iv)
-
-        call_gex_raw = call_gamma * call_oi * 100.0 * spot * spot * 0.01
-        put_gex_raw = -put_gamma * put_oi * 100.0 * spot * spot * 0.01
-        net_gex_raw = call_gex_raw + put_gex_raw
-
-        total_call_raw += abs(call_gex_raw)
-        total_put_raw += abs(put_gex_raw)
-        total_net_raw += net_gex_raw
-
-        profile.append(
-            {
-                "strike": round(strike * strike_scale, 4 if symbol == "EURUSD" else 2),
-                "put": round(put_gex_raw / 1000.0, 1),
-                "call": round(call_gex_raw / 1000.0, 1),
-                "net": round(net_gex_raw / 1000.0, 1),
-            }
-        )
-
+    in_window = (all_strikes >= spot * 0.80) & (all_strikes <= spot * 1.20)
+    if int(in_window.sum()) < 8:
+        nearest = np.argsort(np.abs(all_strikes - spot), kind="stable")[:12]
+        in_window = np.zeros(all_strikes.size, dtype=bool)
+        in_window[nearest] = True
+
+    strike_decimals = 4 if symbol == "EURUSD" else 2
+    window_call = chain_profile["call"][in_window]
+    window_put = chain_profile["put"][in_window]
+    window_net = chain_profile["net"][in_window]
+    total_call_raw = float(np.abs(window_call).sum())
+    total_put_raw = float(np.abs(window_put).sum())
+    total_net_raw = float(window_net.sum())
+
+    profile_strikes = np.round(all_strikes[in_window] * strike_scale, strike_decimals)
+    profile_call = np.round(window_call / 1000.0, 1)
+    profile_put = np.round(window_put / 1000.0, 1)
+    profile_net = np.round(window_net / 1000.0, 1)
+    profile: List[Dict[str, float]] = [
+        {"strike": float(k), "put": float(p), "call": float(c), "net": float(n)}
+        for k, p, c, n in zip(profile_strikes, profile_put, profile_call, profile_net)
+    ]
     if not profile:
         return None
 
-    sorted_profile = sorted(profile, key=lambda row: float(row["strike"]))
-    gamma_flip = None
-    for idx in range(len(sorted_profile) - 1):
-        current = _safe_float(sorted_profile[idx].get("net"), 0.0)
-        nxt = _safe_float(sorted_profile[idx + 1].get("net"), 0.0)
-        if current == 0:
-            gamma_flip = sorted_profile[idx]["strike"]
-            break
-        if (current > 0 and nxt < 0) or (current < 0 and nxt > 0):
-            w = abs(current) / max(abs(current) + abs(nxt), 1e-9)
-            left = _safe_float(sorted_profile[idx].get("strike"), 0.0)
-            right = _safe_float(sorted_profile[idx + 1].get("strike"), left)
-            gamma_flip = left + ((right - left) * w)
-            break
-    if gamma_flip is None:
-        closest = min(sorted_profile, key=lambda row: abs(_safe_float(row.get("net"), 0.0)))
-        gamma_flip = closest.get("strike")
+    gamma_flip = gamma_profile_flip(profile_strikes, profile_net)
+
+    def _scaled_level(level: Optional[float]) -> Optional[float]:
+        return None if level is None else round(level * strike_scale, strike_decimals)
+
+    gamma_levels = {
+        "zero_gamma": _scaled_level(gex["zero_gamma"]),
+        "call_wall": _scaled_level(gex["call_wall"]),
+        "put_wall": _scaled_level(gex["put_wall"]),
+        "net_gex_billion": round(gex["net_gex"] / 1_000_000_000.0, 4),
+        "dealer_delta_shares": round(gex["net_delta_shares"], 0),
+        "vanna_exposure_million": round(gex["net_vanna"] / 1_000_000.0, 3),
+        "contracts": gex["contracts"],
+        "strikes": int(all_strikes.size),
+    }
+    gamma_profile = [
+        {"strike": round(float(k) * strike_scale, strike_decimals), "call": round(float(c) / 1000.0, 1), "put": round(float(p) / 1000.0, 1), "net": round(float(n) / 1000.0, 1)}
+        for k, c, p, n in zip(all_strikes, chain_profile["call"], chain_profile["put"], chain_profile["net"])
+    ]
 
     magnitude = max(total_call_raw + total_put_raw, 1e-9)
     gamma_exposure = max(0.0, min(100.0, (abs(total_net_raw) / magnitude) * 100.0))
@@ -3254,22 +3298,50 @@ def _compute_options_snapshot_row(
         "gamma_billion": round(gamma_billion, 3),
         "gamma_flip": round(_safe_float(gamma_flip, 0.0), 4 if symbol == "EURUSD" else 2),
         "gex_profile": sorted(profile, key=lambda row: float(row["strike"]), reverse=True)[:12],
+        "gamma_levels": gamma_levels,
+        "gamma_profile": gamma_profile,
         "updated_at": datetime.now(timezone.utc).isoformat(),
         "source": "yfinance_option_chain",
     }
 
 
+class _OptionsFlowRefreshFailed(RuntimeError):
+    def __init__(self, warnings: List[str]):
+        super().__init__("live options refresh failed")
+        self.warnings = warnings
+
+
 def get_live_options_flow_snapshot() -> Dict[str, Any]:
-    global _options_flow_cache
-    now = datetime.now(timezone.utc)
-    if _options_flow_cache["data"] and _options_flow_cache["timestamp"]:
-        age = (now - _options_flow_cache["timestamp"]).total_seconds()
-        if age < OPTIONS_FLOW_CACHE_TTL_SECONDS:
-            return _options_flow_cache["data"]
+    _warm_options_flow.touch()
+    try:
+        return _options_flow_cache.get(DEFAULT_KEY, _load_shared_options_flow_snapshot)
+    except _OptionsFlowRefreshFailed as exc:
+        stale = dict(_options_flow_cache.peek() or {})
+        stale["stale"] = True
+        stale["stale_reason"] = "live options refresh failed"
+        stale["warnings"] = exc.warnings
+        return stale
 
-    prev_data = (_options_flow_cache.get("data") or {}).get("data", {})
+
+def _load_shared_options_flow_snapshot(max_age_seconds: Optional[float] = None) -> Dict[str, Any]:
+    # One worker scans the chains per TTL; the others adopt its snapshot and session baselines.
+    entry = shared_cache.compute(
+        "options_flow_snapshot",
+        OPTIONS_FLOW_CACHE_TTL_SECONDS,
+        lambda: {"payload": _load_live_options_flow_snapshot(), "baselines": dict(_options_flow_baselines)},
+        max_age_seconds=max_age_seconds,
+    )
+    if entry.origin == "shared":
+        _options_flow_baselines.update(entry.value.get("baselines") or {})
+    return entry.value["payload"]
+
+
+def _load_live_options_flow_snapshot() -> Dict[str, Any]:
+    now = datetime.now(timezone.utc)
+    previous = _options_flow_cache.peek()
+    prev_data = (previous or {}).get("data", {})
     session_day = now.astimezone(NEW_YORK_TZ).date().isoformat()
-    baseline_store = _options_flow_cache.setdefault("session_baseline", {})
+    baseline_store = _options_flow_baselines
     payload: Dict[str, Any] = {
         "data": {},
         "updated_at": now.isoformat(),
@@ -3277,7 +3349,7 @@ def get_live_options_flow_snapshot() -> Dict[str, Any]:
         "refresh_seconds": OPTIONS_FLOW_CACHE_TTL_SECONDS,
         "warnings": [],
     }
-    cached_prices = _market_cache.get("data") or {}
+    cached_prices = _market_cache.peek() or {}
 
     for symbol, proxy in OPTIONS_PROXY_MAP.items():
         try:
@@ -3353,76 +3425,25 @@ def get_live_options_flow_snapshot() -> Dict[str, Any]:
         except Exception as exc:
             payload["warnings"].append(f"{symbol}: {exc}")
 
-    if not payload["data"] and _options_flow_cache.get("data"):
-        stale = dict(_options_flow_cache["data"])
-        stale["stale"] = True
-        stale["stale_reason"] = "live options refresh failed"
-        stale["warnings"] = payload["warnings"]
-        return stale
-
-    _options_flow_cache["data"] = payload
-    _options_flow_cache["timestamp"] = now
+    if not payload["data"] and previous:
+        # Keep the last good snapshot cached; the caller re-serves it marked stale.
+        raise _OptionsFlowRefreshFailed(payload["warnings"])
     return payload
 
 @api_router.get("/market/vix")
 async def get_vix_data():
     """Get real VIX data from Yahoo Finance"""
-    global _vix_cache
-    now = datetime.now(timezone.utc)
-    
-    # Use cache if less than 5 minutes old
-    if _vix_cache["data"] and _vix_cache["timestamp"]:
-        age = (now - _vix_cache["timestamp"]).total_seconds()
-        if age < 300:  # 5 minutes
-            return _vix_cache["data"]
-    
+    _warm_vix.touch()
     try:
-        # Fetch VIX data
-        vix_hist = get_yf_ticker_safe("^VIX", period="5d", interval="1d")
-        
-        if vix_hist is not None and len(vix_hist) >= 2:
-            current = float(vix_hist['Close'].iloc[-1])
-            yesterday = float(vix_hist['Close'].iloc[-2])
-            change = ((current - yesterday) / yesterday) * 100
-            
-            # Determine direction
-            direction = "stable"
-            if change > 2:
-                direction = "rising"
-            elif change < -2:
-                direction = "falling"
-            
-            # Determine regime
-            regime = "neutral"
-            if current < 18:
-                regime = "risk-on"
-            elif current > 25:
-                regime = "risk-off"
-            
-            result = {
-                "current": round(current, 2),
-                "yesterday": round(yesterday, 2),
-                "change": round(change, 2),
-                "direction": direction,
-                "regime": regime,
-                "high_5d": round(float(vix_hist['High'].max()), 2),
-                "low_5d": round(float(vix_hist['Low'].min()), 2),
-                "timestamp": now.isoformat(),
-                "source": "yahoo_finance"
-            }
-            
-            _vix_cache["data"] = result
-            _vix_cache["timestamp"] = now
-            return result
-        else:
-            raise Exception("No VIX data available")
-            
+        return await _vix_cache.aget(DEFAULT_KEY, _load_vix_data)
     except Exception as e:
         logger.error(f"VIX fetch error: {e}")
+        now = datetime.now(timezone.utc)
 
         # Prefer stale cache over synthetic values so downstream analytics remain consistent.
-        if _vix_cache["data"]:
-            stale = dict(_vix_cache["data"])
+        cached = _vix_cache.peek()
+        if cached:
+            stale = dict(cached)
             stale["timestamp"] = now.isoformat()
             stale["cache_stale"] = True
             stale["warning"] = f"vix refresh failed: {str(e)}"
@@ -3444,18 +3465,51 @@ async def get_vix_data():
             "warning": f"vix unavailable: {str(e)}"
         }
 
+
+def _load_vix_data() -> Dict[str, Any]:
+    now = datetime.now(timezone.utc)
+    vix_hist = get_yf_ticker_safe("^VIX", period="5d", interval="1d")
+    if vix_hist is None or len(vix_hist) < 2:
+        raise Exception("No VIX data available")
+
+    current = float(vix_hist['Close'].iloc[-1])
+    yesterday = float(vix_hist['Close'].iloc[-2])
+    change = ((current - yesterday) / yesterday) * 100
+
+    # Determine direction
+    direction = "stable"
+    if change > 2:
+        direction = "rising"
+    elif change < -2:
+        direction = "falling"
+
+    # Determine regime
+    regime = "neutral"
+    if current < 18:
+        regime = "risk-on"
+    elif current > 25:
+        regime = "risk-off"
+
+    return {
+        "current": round(current, 2),
+        "yesterday": round(yesterday, 2),
+        "change": round(change, 2),
+        "direction": direction,
+        "regime": regime,
+        "high_5d": round(float(vix_hist['High'].max()), 2),
+        "low_5d": round(float(vix_hist['Low'].min()), 2),
+        "timestamp": now.isoformat(),
+        "source": "yahoo_finance"
+    }
+
 @api_router.get("/market/prices")
 async def get_market_prices():
     """Get real market prices from Yahoo Finance"""
-    global _market_cache
-    now = datetime.now(timezone.utc)
-    
-    # Use cache if less than 2 minutes old
-    if _market_cache["data"] and _market_cache["timestamp"]:
-        age = (now - _market_cache["timestamp"]).total_seconds()
-        if age < 120:
-            return _market_cache["data"]
-    
+    _warm_market_prices.touch()
+    return await _market_cache.aget(DEFAULT_KEY, _load_market_prices)
+
+
+def _load_market_prices() -> Dict[str, Any]:
     # Yahoo Finance symbols mapping
     symbols = {
         "XAUUSD": "GC=F",      # Gold Futures
@@ -3495,7 +3549,7 @@ async def get_market_prices():
         except Exception as e:
             logger.warning(f"Price fetch error for {display_name}: {e}")
             # Prefer stale symbol cache before deterministic static fallback.
-            cached_prices = _market_cache.get("data") or {}
+            cached_prices = _market_cache.peek() or {}
             cached_symbol = cached_prices.get(display_name)
             if isinstance(cached_symbol, dict):
                 stale_row = dict(cached_symbol)
@@ -3519,8 +3573,6 @@ async def get_market_prices():
                 "warning": f"price unavailable: {str(e)}"
             }
     
-    _market_cache["data"] = prices
-    _market_cache["timestamp"] = now
     return prices
 
 
@@ -3529,6 +3581,34 @@ async def get_market_options_flow():
     """Live options flow + GEX snapshot (cached, refreshed every ~60 seconds)."""
     return await asyncio.to_thread(get_live_options_flow_snapshot)
 
+
+# One poller per source feeds every stream subscriber; the endpoint caches above bound upstream calls.
+market_stream_hub = StreamHub()
+market_stream_hub.register("prices", get_market_prices, interval_seconds=15)
+market_stream_hub.register("vix", get_vix_data, interval_seconds=30)
+market_stream_hub.register("options_flow", get_market_options_flow, interval_seconds=OPTIONS_FLOW_CACHE_TTL_SECONDS)
+
+
+@api_router.get("/market/stream")
+async def stream_market_data(sources: Optional[str] = None):
+    """
+    SSE stream for prices, VIX and options flow.
+    Events: hello, snapshot (full payload per source), delta (changed fields only), heartbeat.
+    """
+    names = [s.strip() for s in sources.split(",") if s.strip()] if sources else None
+    if names and not set(names) & set(market_stream_hub.source_names):
+        raise HTTPException(status_code=400, detail=f"Unknown stream sources. Available: {market_stream_hub.source_names}")
+    return StreamingResponse(
+        market_stream_hub.subscribe(names),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@api_router.get("/market/stream/status")
+async def stream_market_status():
+    return market_stream_hub.status()
+
 # ==================== MULTI-SOURCE ENGINE (Hourly Analysis) ====================
 
 class AssetAnalysis(BaseModel):
@@ -4027,8 +4107,31 @@ async def get_api_health():
     }
 
 
+# Cards are a pure function of already-cached inputs (prices 120s, price action 3m, ...);
+# the encoded list is reused for this long before the inputs are re-read.
+ENGINE_CARDS_TTL_SECONDS = 60
+_engine_cards_etag = ETagCache("engine_cards", max_age_seconds=ENGINE_CARDS_TTL_SECONDS, reuse_seconds=ENGINE_CARDS_TTL_SECONDS)
+
+
+async def _refresh_engine_cards(_max_age_seconds: float) -> None:
+    _engine_cards_etag.put(DEFAULT_KEY, await _build_engine_cards())
+
+
+_warm_engine_cards = cache_warmer.register(
+    "engine_cards", ENGINE_CARDS_TTL_SECONDS, age=_engine_cards_etag.age, refresh=_refresh_engine_cards
+)
+
+
 @api_router.get("/engine/cards")
-async def get_engine_cards():
+async def get_engine_cards(request: Request):
+    _warm_engine_cards.touch()
+    frozen = _engine_cards_etag.get(DEFAULT_KEY)
+    if frozen is None:
+        frozen = _engine_cards_etag.put(DEFAULT_KEY, await _build_engine_cards())
+    return _engine_cards_etag.respond(request, frozen)
+
+
+async def _build_engine_cards() -> List[Dict[str, Any]]:
     now = datetime.now(timezone.utc)
     multi = await get_multi_source_analysis()
     prices = await get_market_prices()
@@ -4231,7 +4334,7 @@ async def get_strategy_catalog(current_user: str = Depends(get_current_user)):
 @api_router.get("/strategy/projections")
 async def get_strategy_projections(strategy_ids: Optional[str] = None, current_user: str = Depends(get_current_user)):
     now = datetime.now(timezone.utc)
-    cards = await get_engine_cards()
+    cards = await _build_engine_cards()
     catalog = STRATEGY_CATALOG_COMPAT
 
     requested: Optional[set] = None
@@ -4561,7 +4664,12 @@ def _empty_cot_row(symbol: str, now: datetime) -> Dict[str, Any]:
     }
 
 
-def _build_cot_entry_from_live(symbol: str, row: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+def _build_cot_entry_from_live(
+    symbol: str,
+    row: Dict[str, Any],
+    now: datetime,
+    positioning: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
     as_of_raw = str(row.get("as_of_date") or "").strip()
     try:
         as_of_dt = datetime.strptime(as_of_raw, "%Y-%m-%d").replace(tzinfo=timezone.utc)
@@ -4597,6 +4705,25 @@ def _build_cot_entry_from_live(symbol: str, row: Dict[str, Any], now: datetime)
     w1 = int(max(1, min(99, w0 - (6 if net_val > 0 else -6 if net_val < 0 else 0))))
     w2 = int(max(1, min(99, w0 - (10 if net_val > 0 else -10 if net_val < 0 else 0))))
     w3 = int(max(1, min(99, w0 - (14 if net_val > 0 else -14 if net_val < 0 else 0))))
+    net_change = 0
+    oi_change = 0
+
+    # Local CFTC history: real 52w percentiles instead of the tanh proxy above.
+    current_hist = positioning.get("current", {}) if isinstance(positioning, dict) else {}
+    if current_hist.get("as_of_date") == as_of_dt.strftime("%Y-%m-%d") and current_hist.get("net_pct_oi_percentile_52w") is not None:
+        percentile = int(max(1, min(99, round(current_hist["net_pct_oi_percentile_52w"]))))
+        crowding = int(max(30, min(98, abs(percentile - 50) * 2)))
+        squeeze_risk = int(max(20, min(95, 35 + (crowding * 0.55))))
+        net_change = _to_int(positioning.get("net_change"), 0)
+        oi_change = _to_int(positioning.get("oi_change"), 0)
+        weekly = [
+            _safe_float(p.get("net_pct_oi_percentile_52w"), float(percentile))
+            for p in (positioning.get("previous") or [])[-3:]
+            if p.get("net_pct_oi_percentile_52w") is not None
+        ]
+        weekly = ([weekly[0] if weekly else float(percentile)] * (3 - len(weekly))) + weekly
+        w3, w2, w1 = (int(max(1, min(99, round(v)))) for v in weekly)
+        w0 = percentile
 
     return {
         "symbol": symbol,
@@ -4611,7 +4738,7 @@ def _build_cot_entry_from_live(symbol: str, row: Dict[str, Any], now: datetime)
                 "long": long_val,
                 "short": short_val,
                 "net": net_val,
-                "net_change": 0,
+                "net_change": net_change,
                 "percentile_52w": percentile,
             }
         },
@@ -4621,7 +4748,7 @@ def _build_cot_entry_from_live(symbol: str, row: Dict[str, Any], now: datetime)
         "squeeze_risk": squeeze_risk,
         "driver_text": driver_text,
         "open_interest": open_interest,
-        "oi_change": 0,
+        "oi_change": oi_change,
         "rolling_bias": [
             {"label": "W-3", "value": w3, "isCurrent": False},
             {"label": "W-2", "value": w2, "isCurrent": False},
@@ -4638,12 +4765,8 @@ async def get_cot_data():
     live_snapshot = await asyncio.to_thread(get_live_cot_snapshot)
     symbols_live = live_snapshot.get("symbols", {}) if isinstance(live_snapshot, dict) else {}
 
-    # Calculate next release (Friday 15:30 ET / 21:30 CET)
-    days_to_friday = (4 - now.weekday()) % 7
-    if days_to_friday == 0 and now.hour >= 20:
-        days_to_friday = 7
-    next_release = now + timedelta(days=days_to_friday)
-    next_release = next_release.replace(hour=20, minute=30, second=0, microsecond=0)
+    # Next release (Friday 15:30 ET / 21:30 CET), DST-aware via the CFTC calendar
+    next_release = next_cot_release_at(now)
     countdown_hours = int((next_release - now).total_seconds() / 3600)
     countdown_days = countdown_hours // 24
     countdown_hours_remaining = countdown_hours % 24
@@ -4652,7 +4775,7 @@ async def get_cot_data():
     for symbol in ["NAS100", "SP500", "XAUUSD", "EURUSD"]:
         row = symbols_live.get(symbol)
         if isinstance(row, dict) and row:
-            out_data[symbol] = _build_cot_entry_from_live(symbol, row, now)
+            out_data[symbol] = _build_cot_entry_from_live(symbol, row, now, get_cot_positioning(symbol))
         else:
             out_data[symbol] = _empty_cot_row(symbol, now)
 
@@ -4681,9 +4804,13 @@ async def get_cot_symbol(symbol: str):
     live_snapshot = await asyncio.to_thread(get_live_cot_snapshot)
     symbols_live = live_snapshot.get("symbols", {}) if isinstance(live_snapshot, dict) else {}
     row = symbols_live.get(symbol)
+    positioning = get_cot_positioning(symbol)
     if isinstance(row, dict) and row:
-        return _build_cot_entry_from_live(symbol, row, now)
-    return _empty_cot_row(symbol, now)
+        out = _build_cot_entry_from_live(symbol, row, now, positioning)
+    else:
+        out = _empty_cot_row(symbol, now)
+    out["positioning_history"] = positioning
+    return out
 
 # ==================== RISK ANALYSIS ====================
 
@@ -5441,6 +5568,8 @@ async def run_backtest(params: BacktestRequest):
 
         def _fetch_and_run():
             import yfinance as yf
+            if not acquire_budget("yahoo"):
+                raise ValueError("Limite richieste Yahoo raggiunto, riprova tra poco")
             df = yf.download(ticker, period=period, interval=interval, progress=False, auto_adjust=True)
             if df.empty:
                 raise ValueError(f'Nessun dato per {ticker}')
@@ -5486,6 +5615,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def _with_priority(job, priority: int = PRIORITY_SCHEDULED):
+    """Run a background job under an upstream rate-limit class below interactive requests."""
+    if asyncio.iscoroutinefunction(job):
+        @wraps(job)
+        async def _async_runner(*args, **kwargs):
+            with priority_scope(priority):
+                return await job(*args, **kwargs)
+        return _async_runner
+
+    @wraps(job)
+    def _sync_runner(*args, **kwargs):
+        with priority_scope(priority):
+            return job(*args, **kwargs)
+    return _sync_runner
+
+
 @app.on_event("startup")
 async def startup_event():
     global client, db
@@ -5640,10 +5785,10 @@ async def startup_event():
         await generate_global_pulse()
         
     # Run once on startup
-    asyncio.get_event_loop().create_task(generate_global_pulse())
+    asyncio.get_event_loop().create_task(_with_priority(generate_global_pulse)())
         
     scheduler.add_job(
-        global_pulse_manager, 
+        _with_priority(global_pulse_manager), 
         IntervalTrigger(minutes=60), # Base check every 60 minutes
         id="global_pulse_manager",
         replace_existing=True
@@ -5700,7 +5845,7 @@ async def startup_event():
         deep_report = {}
         try:
             from deep_research_30 import build_deep_research_report
-            deep_report = build_deep_research_report()
+            deep_report = await asyncio.to_thread(build_deep_research_report)
         except Exception as exc:
             archive_event("collection_errors", {"job": "telemetry_snapshot_5m.deep_research", "error": str(exc)})
 
@@ -5729,6 +5874,17 @@ async def startup_event():
             archive_event("collection_errors", {"job": "data_lake_maintenance", "error": str(exc)})
             return {"status": "error", "error": str(exc)}
 
+    async def cot_release_refresh_job():
+        try:
+            result = await asyncio.to_thread(refresh_cot_if_due)
+            if any(v != "fresh" for v in result.get("reports", {}).values()):
+                result["history"] = await asyncio.to_thread(append_cot_history, get_live_cot_snapshot())
+                archive_event("system_events", {"event": "cot_release_refresh", "result": result})
+            return result
+        except Exception as exc:
+            archive_event("collection_errors", {"job": "cot_release_refresh", "error": str(exc)})
+            return {"status": "error", "error": str(exc)}
+
     async def session_daily_cycle_job():
         try:
             result = await asyncio.to_thread(run_daily_session_cycle)
@@ -5739,64 +5895,78 @@ async def startup_event():
             return {"status": "error", "error": str(exc)}
 
     scheduler.add_job(
-        guarded_forensics_evaluator,
+        _with_priority(guarded_forensics_evaluator),
         IntervalTrigger(hours=1), # Evaluate past predictions every hour
         id="forensics_evaluator",
         replace_existing=True
     )
     
     scheduler.add_job(
-        guarded_institutional_ingestion,
+        _with_priority(guarded_institutional_ingestion),
         IntervalTrigger(hours=24), # Scrape Institutional PDFs Daily
         id="institutional_ingestion",
         replace_existing=True
     )
 
     scheduler.add_job(
-        telemetry_snapshot_collector,
+        _with_priority(telemetry_snapshot_collector),
         IntervalTrigger(minutes=5),
         id="telemetry_snapshot_5m",
         replace_existing=True
     )
 
     # Kick matrix engine on startup so new snapshots begin evaluation immediately.
-    asyncio.get_event_loop().create_task(guarded_matrix_evaluations())
+    asyncio.get_event_loop().create_task(_with_priority(guarded_matrix_evaluations)())
     # Kick summary capture on startup so first snapshot is available immediately.
-    asyncio.get_event_loop().create_task(guarded_summary_capture())
+    asyncio.get_event_loop().create_task(_with_priority(guarded_summary_capture)())
     # Kick telemetry collector once on startup.
-    asyncio.get_event_loop().create_task(telemetry_snapshot_collector())
+    asyncio.get_event_loop().create_task(_with_priority(telemetry_snapshot_collector)())
     # Kick sessions engine on startup with short backfill to recover missed days after downtime.
-    asyncio.get_event_loop().create_task(asyncio.to_thread(run_recent_session_backfill, 3))
+    asyncio.get_event_loop().create_task(
+        asyncio.to_thread(_with_priority(run_recent_session_backfill, PRIORITY_BACKFILL), 3)
+    )
     scheduler.add_job(
-        guarded_matrix_evaluations,
+        _with_priority(cache_warmer.tick),
+        IntervalTrigger(seconds=cache_warmer.TICK_SECONDS), # Refresh-ahead for recently read caches
+        id="cache_warmer",
+        replace_existing=True
+    )
+    scheduler.add_job(
+        _with_priority(guarded_matrix_evaluations),
         IntervalTrigger(minutes=5), # Run Matrix daemon continuously (24/7)
         id="forensics_matrix_daemon",
         replace_existing=True
     )
     scheduler.add_job(
-        guarded_summary_capture,
+        _with_priority(guarded_summary_capture),
         IntervalTrigger(minutes=5), # Save summary + latest 5m candle every 5 minutes
         id="summary_capture_5m",
         replace_existing=True
     )
     scheduler.add_job(
-        run_end_session_summary_analysis,
+        _with_priority(run_end_session_summary_analysis),
         CronTrigger(hour=23, minute=59, timezone="Europe/Rome"), # Analyze daily after session close (Italy time)
         id="summary_end_session_analysis",
         replace_existing=True
     )
     scheduler.add_job(
-        data_lake_maintenance_job,
+        _with_priority(data_lake_maintenance_job),
         IntervalTrigger(minutes=30),
         id="data_lake_maintenance",
         replace_existing=True
     )
     scheduler.add_job(
-        session_daily_cycle_job,
+        _with_priority(session_daily_cycle_job),
         CronTrigger(hour=22, minute=10, timezone="Europe/Rome"),
         id="session_daily_cycle",
         replace_existing=True
     )
+    scheduler.add_job(
+        _with_priority(cot_release_refresh_job),
+        IntervalTrigger(minutes=30), # No-op between CFTC releases; conditional GET once a release is due
+        id="cot_release_refresh",
+        replace_existing=True
+    )
 
 # --- SENTINEL MONITORING ---
 @api_router.get("/system/status")
@@ -5812,9 +5982,27 @@ async def system_status(current_user: str = Depends(get_current_user)):
         "jobs": jobs,
         "collection_control": collection_status_payload(),
         "data_lake": lake_status(),
+        "rate_limits": limiter_status(),
+        "caches": cache_status(),
+        "http_cache": http_cache_status(),
+        "shared_cache": shared_cache.shared_cache_status(),
+        "cache_warmer": cache_warmer.cache_warmer_status(),
+        "breadth_history": breadth_history_status(),
         "timestamp": datetime.now(timezone.utc).isoformat()
     }
 
+@api_router.get("/system/rate-limits")
+async def system_rate_limits(current_user: str = Depends(get_current_user)):
+    return limiter_status()
+
+@api_router.get("/system/caches")
+async def system_caches(current_user: str = Depends(get_current_user)):
+    return cache_status()
+
+@api_router.get("/system/market-data/routing")
+async def system_market_data_routing(last: int = 20, current_user: str = Depends(get_current_user)):
+    return market_provider.routing_status(last=last)
+
 @api_router.get("/system/collection/status")
 async def collection_status(current_user: str = Depends(get_current_user)):
     return collection_status_payload()
@@ -6046,23 +6234,76 @@ async def save_matrix_snapshot(payload: dict = Body(...), current_user: str = De
         archive_event("collection_errors", {"job": "matrix_snapshot", "error": str(e)})
         raise HTTPException(status_code=500, detail=str(e))
 
+# Matches the forensics_matrix_daemon interval: evaluations change at most every 5 minutes.
+MATRIX_CACHE_MAX_AGE_SECONDS = 300
+_matrix_etag = ETagCache("research_matrix", max_age_seconds=MATRIX_CACHE_MAX_AGE_SECONDS)
+_deep_research_etag = ETagCache("research_deep_research", max_age_seconds=DEEP_RESEARCH_CACHE_TTL_SECONDS)
+_smart_money_etag = ETagCache("research_smart_money", max_age_seconds=SMART_MONEY_CACHE_TTL_SECONDS)
+# Session reports are rebuilt once per closed day; clients revalidate on the pipeline cadence.
+SESSIONS_CACHE_MAX_AGE_SECONDS = 300
+_sessions_etag = ETagCache("research_sessions", max_age_seconds=SESSIONS_CACHE_MAX_AGE_SECONDS)
+
+
+def _deep_research_age() -> Optional[float]:
+    # Version-keyed: the report never ages, it goes stale when evaluations or the UTC day move.
+    from deep_research_30 import report_is_current
+    return 0.0 if report_is_current() else None
+
+
+def _refresh_deep_research(_max_age_seconds: float) -> None:
+    from deep_research_30 import build_deep_research_report
+    build_deep_research_report()
+
+
+async def _refresh_smart_money(max_age_seconds: float) -> None:
+    from smart_money_positioning import build_positioning_entry
+
+    deep_report, multi_snapshot, projections = await _smart_money_inputs("cache_warmer")
+    result = await asyncio.to_thread(
+        build_positioning_entry, deep_report, multi_snapshot, projections, None, max_age_seconds
+    )
+    if not isinstance(result, tuple):
+        raise RuntimeError("degraded smart money payload, cached entry kept")
+
+
+# Local files only: rebuilt on a data version change even while collection is paused.
+_warm_deep_research = cache_warmer.register(
+    "deep_research", DEEP_RESEARCH_CACHE_TTL_SECONDS, age=_deep_research_age, refresh=_refresh_deep_research,
+    collection_bound=False,
+)
+_warm_smart_money = cache_warmer.register(
+    "smart_money", SMART_MONEY_CACHE_TTL_SECONDS, age=cached_positioning_age, refresh=_refresh_smart_money
+)
+
+
 @api_router.get("/research/matrix")
-async def get_matrix_evaluations(current_user: str = Depends(get_current_user)):
+async def get_matrix_evaluations(request: Request, current_user: str = Depends(get_current_user)):
     """Get the calculated MFE/MAE multi-dimensional matrix pipeline results."""
     import local_vault_matrix
     try:
-        data = local_vault_matrix.get_matrix_results()
-        return data
+        version = local_vault_matrix.evaluations_version()
+        frozen = _matrix_etag.get(version)
+        if frozen is None:
+            frozen = _matrix_etag.put(version, local_vault_matrix.get_matrix_results())
+        return _matrix_etag.respond(request, frozen)
     except Exception as e:
         logger.error(f"Error fetching matrix results: {e}")
         return []
 
 @api_router.get("/research/deep-research")
-async def get_deep_research(current_user: str = Depends(get_current_user)):
+async def get_deep_research(request: Request, current_user: str = Depends(get_current_user)):
     """Deep Research 3.0 statistical stack (signals, diversification, risk, temporal bias)."""
+    _warm_deep_research.touch()
     try:
         from deep_research_30 import build_deep_research_report
-        return build_deep_research_report()
+        # Off the loop: a miss may wait on another worker's build lock (shared_cache).
+        report = await asyncio.to_thread(build_deep_research_report)
+        # Every rebuild stamps a new generated_at; until the data version moves it is the same dict.
+        version = report.get("generated_at")
+        frozen = _deep_research_etag.get(version)
+        if frozen is None:
+            frozen = _deep_research_etag.put(version, report)
+        return _deep_research_etag.respond(request, frozen)
     except Exception as e:
         logger.error(f"Error fetching Deep Research 3.0 payload: {e}")
         return {
@@ -6157,51 +6398,102 @@ def _research_smart_money_fallback(message: str) -> Dict[str, Any]:
     }
 
 
-@api_router.get("/research/smart-money")
-async def get_research_smart_money(current_user: str = Depends(get_current_user)):
-    """Institutional Radar Positioning (UOA + sector rotation + cross-asset + macro filter)."""
-    _ = current_user
+async def _smart_money_inputs(current_user: str) -> Tuple[Dict[str, Any], Dict[str, Any], List[Dict[str, Any]]]:
+    """Deep research, multi-source and projection context; each degrades to empty on failure."""
+    try:
+        from deep_research_30 import build_deep_research_report
+
+        deep_report = await asyncio.to_thread(build_deep_research_report)
+    except Exception as exc:
+        logger.warning(f"Deep research context unavailable for smart-money: {exc}")
+        deep_report = {"signals": [], "risk_exposure": {}}
+
     try:
-        from smart_money_positioning import build_smart_money_positioning
+        multi_snapshot = await get_multi_source_analysis()
+    except Exception as exc:
+        logger.warning(f"Multi-source snapshot unavailable for smart-money: {exc}")
+        multi_snapshot = {}
 
-        try:
-            from deep_research_30 import build_deep_research_report
+    try:
+        projections_payload = await get_strategy_projections(strategy_ids=None, current_user=current_user)
+        projections = projections_payload.get("projections", []) if isinstance(projections_payload, dict) else []
+    except Exception as exc:
+        logger.warning(f"Strategy projections unavailable for smart-money: {exc}")
+        projections = []
 
-            deep_report = build_deep_research_report()
-        except Exception as exc:
-            logger.warning(f"Deep research context unavailable for smart-money: {exc}")
-            deep_report = {"signals": [], "risk_exposure": {}}
+    return (
+        deep_report if isinstance(deep_report, dict) else {},
+        multi_snapshot if isinstance(multi_snapshot, dict) else {},
+        projections if isinstance(projections, list) else [],
+    )
 
-        try:
-            multi_snapshot = await get_multi_source_analysis()
-        except Exception as exc:
-            logger.warning(f"Multi-source snapshot unavailable for smart-money: {exc}")
-            multi_snapshot = {}
 
+async def _research_smart_money_sections(sections: Tuple[str, ...], current_user: str) -> Dict[str, Any]:
+    try:
+        from smart_money_positioning import build_positioning_sections, cached_positioning_sections
+
+        cached = cached_positioning_sections(sections)
+        if cached is not None:
+            return cached
+        deep_report, multi_snapshot, projections = await _smart_money_inputs(current_user)
+        return await asyncio.to_thread(build_positioning_sections, deep_report, multi_snapshot, projections, sections)
+    except Exception as e:
+        logger.error(f"Error fetching smart money sections {','.join(sections)}: {e}")
+        fallback = _research_smart_money_fallback(str(e))
+        return {key: fallback[key] for key in ("status", "generated_at", *sections, "cache")}
+
+
+@api_router.get("/research/smart-money")
+async def get_research_smart_money(
+    request: Request, sections: Optional[str] = None, current_user: str = Depends(get_current_user)
+):
+    """
+    Institutional Radar Positioning (UOA + sector rotation + cross-asset + macro filter).
+    `sections=summary,theme_scores` builds and returns only those sections (cached per section).
+    """
+    _warm_smart_money.touch()
+    if sections is not None:
         try:
-            projections_payload = await get_strategy_projections(strategy_ids=None, current_user=current_user)
-            projections = projections_payload.get("projections", []) if isinstance(projections_payload, dict) else []
-        except Exception as exc:
-            logger.warning(f"Strategy projections unavailable for smart-money: {exc}")
-            projections = []
-
-        return await asyncio.to_thread(
-            build_smart_money_positioning,
-            deep_report if isinstance(deep_report, dict) else {},
-            multi_snapshot if isinstance(multi_snapshot, dict) else {},
-            projections if isinstance(projections, list) else [],
-        )
+            wanted = select_smart_money_sections(sections)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        return await _research_smart_money_sections(wanted, current_user)
+    try:
+        from smart_money_positioning import build_positioning_entry, cached_positioning_entry
+
+        # Cache hit: pre-encoded bytes, no context gathering and no re-serialization.
+        cached = cached_positioning_entry()
+        if cached is not None:
+            frozen, cache_meta = cached
+            return _smart_money_etag.respond(
+                request,
+                frozen,
+                max_age_seconds=cache_meta["ttl_seconds"] - cache_meta["age_seconds"],
+                cache=cache_meta,
+            )
+
+        deep_report, multi_snapshot, projections = await _smart_money_inputs(current_user)
+        result = await asyncio.to_thread(build_positioning_entry, deep_report, multi_snapshot, projections)
+        if isinstance(result, tuple):
+            frozen, cache_meta = result
+            return _smart_money_etag.respond(request, frozen, cache=cache_meta)
+        # Degraded payloads are not cached and go out without a validator.
+        return result
     except Exception as e:
         logger.error(f"Error fetching smart money payload: {e}")
         return _research_smart_money_fallback(str(e))
 
 
 @api_router.get("/research/sessions")
-async def get_research_sessions(current_user: str = Depends(get_current_user)):
+async def get_research_sessions(request: Request, current_user: str = Depends(get_current_user)):
     """SESSIONI payload for Research > Mappa Retroattiva sub-tab."""
     try:
-        from session_forensics import get_latest_session_report
-        return await asyncio.to_thread(get_latest_session_report)
+        from session_forensics import get_latest_session_report, latest_report_version
+        version = latest_report_version()
+        frozen = _sessions_etag.get(version)
+        if frozen is None:
+            frozen = _sessions_etag.put(version, await asyncio.to_thread(get_latest_session_report))
+        return _sessions_etag.respond(request, frozen)
     except Exception as e:
         logger.error(f"Error fetching SESSIONI payload: {e}")
         return {
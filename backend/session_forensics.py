@@ -13,6 +13,7 @@ from __future__ import annotations
 
 import json
 import math
+import threading
 from collections import Counter, defaultdict
 from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
@@ -21,6 +22,15 @@ from zoneinfo import ZoneInfo
 
 import requests
 
+try:
+    from . import shared_cache
+    from .rate_limiter import acquire_budget
+    from .ttl_cache import TTLCache
+except ImportError:  # pragma: no cover - script/local import fallback
+    import shared_cache
+    from rate_limiter import acquire_budget
+    from ttl_cache import TTLCache
+
 
 BASE_DIR = Path(__file__).parent
 SESSIONS_DIR = BASE_DIR / "data_sessions"
@@ -39,6 +49,7 @@ ROWS_FILE = SESSIONS_DIR / "session_daily_rows.json"
 REPORTS_FILE = SESSIONS_DIR / "session_reports.json"
 WEIGHTS_FILE = SESSIONS_DIR / "session_weights.json"
 KSH_HISTORY_FILE = SESSIONS_DIR / "ksh_history.json"
+DAY_CARDS_FILE = SESSIONS_DIR / "session_day_cards.json"
 
 ROME_TZ = ZoneInfo("Europe/Rome")
 ASSETS = ("NAS100", "SP500", "XAUUSD", "EURUSD")
@@ -211,15 +222,22 @@ def _corr_record(name: str, xs: List[float], ys: List[float]) -> Dict[str, Any]:
     }
 
 
-def _summaries_for_day(rome_day: str) -> List[Dict[str, Any]]:
+def _summaries_by_day() -> Dict[str, List[Dict[str, Any]]]:
     rows = _read_json(SUMMARIES_FILE, [])
     if not isinstance(rows, list):
-        return []
-    out = [row for row in rows if str(row.get("rome_day")) == rome_day]
-    out.sort(key=lambda r: str(r.get("ts_utc", "")))
+        return {}
+    out: Dict[str, List[Dict[str, Any]]] = {}
+    for row in rows:
+        out.setdefault(str(row.get("rome_day")), []).append(row)
+    for day_rows in out.values():
+        day_rows.sort(key=lambda r: str(r.get("ts_utc", "")))
     return out
 
 
+def _summaries_for_day(rome_day: str) -> List[Dict[str, Any]]:
+    return _summaries_by_day().get(rome_day, [])
+
+
 def _build_candles_by_asset(day_rows: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
     candles: Dict[str, List[Dict[str, Any]]] = {asset: [] for asset in ASSETS}
     for row in day_rows:
@@ -281,6 +299,8 @@ def _fetch_market_candles_for_day(rome_day: str, asset: str) -> List[Dict[str, A
         import yfinance as yf
     except Exception:
         return []
+    if not acquire_budget("yahoo"):
+        return []
     try:
         df = yf.download(tickers=ticker, period="10d", interval="5m", progress=False, auto_adjust=False)
     except Exception:
@@ -1969,6 +1989,7 @@ def run_daily_session_cycle(target_rome_day: Optional[str] = None) -> Dict[str,
     existing_rows = _load_rows()
     all_rows = _upsert_rows(existing_rows, rows_today)
     _save_rows(all_rows)
+    _forget_closed_day_cards(rome_day)
 
     historical_reference = [r for r in all_rows if str(r.get("rome_day")) < rome_day]
     _attach_historical_metrics(rows_today, historical_reference[-1000:])
@@ -2059,6 +2080,23 @@ def get_latest_session_report() -> Dict[str, Any]:
     return run_daily_session_cycle()
 
 
+def _file_stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def latest_report_version() -> Tuple[Any, ...]:
+    """
+    Change token for get_latest_session_report(): it only reads the reports / rows
+    files (and the Rome day when it has to rebuild), so an equal token means an
+    equal report.
+    """
+    return (_file_stamp(REPORTS_FILE), _file_stamp(ROWS_FILE), datetime.now(ROME_TZ).date().isoformat())
+
+
 def get_session_report_history(limit: int = 30) -> List[Dict[str, Any]]:
     reports = _read_json(REPORTS_FILE, [])
     if not isinstance(reports, list):
@@ -2077,8 +2115,68 @@ _SESSION_ORDER = ("sydney", "asian", "london", "ny")
 _SESSION_FLAGS = {"sydney": "🇦🇺", "asian": "🇯🇵", "london": "🇬🇧", "ny": "🇺🇸"}
 _SESSION_LABELS = {"sydney": "Sydney", "asian": "Asian", "london": "London", "ny": "New York"}
 
-_PIPELINE_CACHE: Dict[str, Any] = {"ts": None, "key": None, "payload": None}
 _PIPELINE_CACHE_TTL = 300  # 5 minutes
+PIPELINE_CACHE_MAX_ENTRIES = 32  # (asset, days, rome day) combinations kept hot
+_PIPELINE_CACHE = TTLCache(
+    "session_pipeline",
+    ttl_seconds=_PIPELINE_CACHE_TTL,
+    stale_seconds=0,
+    max_entries=PIPELINE_CACHE_MAX_ENTRIES,
+)
+
+# Cards of closed Rome days never change once every session has candles: memoized per
+# asset on disk, so a pipeline miss only rebuilds today. An entry records how many 5m
+# summaries it was built from and is rebuilt when more arrive; a session cycle for the
+# day drops it. Bump the version when the card builder changes.
+DAY_CARDS_MEMO_VERSION = 2
+DAY_CARDS_MAX_DAYS = 120
+_DAY_CARDS_LOCK = threading.Lock()
+_DAY_CARDS: Optional[Dict[str, Any]] = None
+
+
+def _day_cards_store() -> Dict[str, Any]:
+    global _DAY_CARDS
+    if _DAY_CARDS is None:
+        payload = _read_json(DAY_CARDS_FILE, {})
+        if not isinstance(payload, dict) or payload.get("version") != DAY_CARDS_MEMO_VERSION:
+            payload = {"version": DAY_CARDS_MEMO_VERSION, "assets": {}}
+        _DAY_CARDS = payload
+    return _DAY_CARDS
+
+
+def _closed_day_cards(asset: str) -> Dict[str, Dict[str, Any]]:
+    """rome_day -> {"day": day entry, "summary_rows": 5m summaries it was built from}."""
+    with _DAY_CARDS_LOCK:
+        return dict(_day_cards_store()["assets"].get(asset) or {})
+
+
+def _memoize_closed_day_cards(asset: str, days: Dict[str, Dict[str, Any]]) -> None:
+    with _DAY_CARDS_LOCK:
+        store = _day_cards_store()
+        by_day = store["assets"].setdefault(asset, {})
+        by_day.update(days)
+        for stale_day in sorted(by_day)[:-DAY_CARDS_MAX_DAYS]:
+            del by_day[stale_day]
+        _write_json(DAY_CARDS_FILE, store)
+
+
+def _forget_closed_day_cards(rome_day: str) -> None:
+    """Drops the memoized cards of `rome_day` for every asset (its data was rewritten)."""
+    with _DAY_CARDS_LOCK:
+        store = _day_cards_store()
+        dropped = [by_day.pop(rome_day) for by_day in store["assets"].values() if rome_day in by_day]
+        if dropped:
+            _write_json(DAY_CARDS_FILE, store)
+
+
+def _day_is_complete(cards: List[Dict[str, Any]]) -> bool:
+    """Every session of the day closed with candles behind its card."""
+    by_session = {card.get("session"): card for card in cards}
+    return all(
+        (by_session.get(sess) or {}).get("status") == "completed"
+        and int((by_session.get(sess) or {}).get("candle_count") or 0) > 0
+        for sess in _SESSION_ORDER
+    )
 
 
 def _classify_session_type(
@@ -2417,19 +2515,25 @@ def get_session_pipeline(asset: str = "EURUSD", days_history: int = 7) -> Dict[s
     """
     safe_asset = str(asset or "EURUSD").upper().strip()
     safe_days = max(1, min(int(days_history or 7), 14))
-    stats_lookback_days = 30
 
     now_rome = datetime.now(ROME_TZ)
     today_str = now_rome.date().isoformat()
     cache_key = (safe_asset, safe_days, today_str)
 
-    # Check cache
-    cache_ts = _PIPELINE_CACHE.get("ts")
-    cache_payload = _PIPELINE_CACHE.get("payload")
-    if isinstance(cache_ts, datetime) and isinstance(cache_payload, dict):
-        age = (datetime.now(timezone.utc) - cache_ts).total_seconds()
-        if age < _PIPELINE_CACHE_TTL and _PIPELINE_CACHE.get("key") == cache_key:
-            return cache_payload
+    def _load() -> Dict[str, Any]:
+        entry = shared_cache.compute(
+            "session_pipeline:" + ":".join(str(part) for part in cache_key),
+            _PIPELINE_CACHE_TTL,
+            lambda: _build_session_pipeline(safe_asset, safe_days, now_rome),
+        )
+        return entry.value
+
+    return _PIPELINE_CACHE.get(cache_key, _load)
+
+
+def _build_session_pipeline(safe_asset: str, safe_days: int, now_rome: datetime) -> Dict[str, Any]:
+    stats_lookback_days = 30
+    today_str = now_rome.date().isoformat()
 
     # Collect days to process: enough for requested output + 30d stats
     needed_days = max(safe_days, stats_lookback_days)
@@ -2448,11 +2552,19 @@ def get_session_pipeline(asset: str = "EURUSD", days_history: int = 7) -> Dict[s
     history_rows = _load_rows() or []
     asset_rows = [r for r in history_rows if str(r.get("asset", "")).upper() == safe_asset]
 
-    # Fetch candles for each day
+    # Fetch candles for each day (closed days come from the memo)
+    closed_days = _closed_day_cards(safe_asset)
+    summaries = _summaries_by_day()
+    newly_closed: Dict[str, Dict[str, Any]] = {}
     daily_cards_all: List[Dict[str, Any]] = []
     for rome_day in days_to_process:
         # Try 5m summaries first
-        day_summaries = _summaries_for_day(rome_day)
+        day_summaries = summaries.get(rome_day, [])
+        memo = closed_days.get(rome_day)
+        if rome_day < today_str and memo and len(day_summaries) <= memo["summary_rows"]:
+            daily_cards_all.append(memo["day"])
+            continue
+
         if day_summaries:
             by_asset = _build_candles_by_asset(day_summaries)
             candles = by_asset.get(safe_asset, [])
@@ -2468,12 +2580,17 @@ def get_session_pipeline(asset: str = "EURUSD", days_history: int = 7) -> Dict[s
             rome_day, safe_asset, candles, atr_weekly, asset_rows, now_rome
         )
         if cards:
-            daily_cards_all.append({
+            day_entry = {
                 "rome_day": rome_day,
                 "weekday": WEEKDAY_EN[datetime.fromisoformat(rome_day).weekday()],
                 "sessions": cards,
                 "atr_weekly_pips": round(atr_weekly * _pip_multiplier(safe_asset), 1),
-            })
+            }
+            daily_cards_all.append(day_entry)
+            if rome_day < today_str and _day_is_complete(cards):
+                newly_closed[rome_day] = {"day": day_entry, "summary_rows": len(day_summaries)}
+    if newly_closed:
+        _memoize_closed_day_cards(safe_asset, newly_closed)
 
     days_payload = daily_cards_all[-safe_days:] if safe_days > 0 else daily_cards_all
     today_payload = next((d for d in reversed(daily_cards_all) if d.get("rome_day") == today_str), None)
@@ -2535,10 +2652,6 @@ def get_session_pipeline(asset: str = "EURUSD", days_history: int = 7) -> Dict[s
         "today": today_payload,
         "session_type_stats_30d": session_type_pct,
     }
-
-    _PIPELINE_CACHE["ts"] = datetime.now(timezone.utc)
-    _PIPELINE_CACHE["key"] = cache_key
-    _PIPELINE_CACHE["payload"] = payload
     return payload
 
 
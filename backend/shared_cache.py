@@ -0,0 +1,352 @@
+"""
+shared_cache.py
+
+Cross-process result tier for expensive engines (smart money, deep research,
+session pipeline, options flow) when uvicorn runs several workers.
+- versioned entries: every publish bumps a per-key version and stamps a wall-clock
+  `stored_at`, so freshness means the same thing in every worker
+- single-flight across workers: the first worker to miss takes an advisory lock,
+  computes and publishes; the others wait on the lock and read the published entry
+- FileStore (default): one memory-mapped file per key under data/shared_cache, a
+  small JSON header line (schema / version / stored_at) followed by the pickled
+  value, replaced atomically; locks are fcntl.flock on a sibling .lock file, so a
+  crashed worker never leaves a stale lock behind
+- RedisStore: same contract on any Redis-compatible server (`redis` package is
+  optional); the client is injected, so tests use an in-process stand-in
+- every store failure degrades to "compute locally": the shared tier is an
+  optimization, never a dependency
+
+Configuration: SHARED_CACHE_BACKEND = file | redis | off, SHARED_CACHE_DIR,
+SHARED_CACHE_REDIS_URL.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import os
+import pickle
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, NamedTuple, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX runtime
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).parent
+DATA_DIR = BASE_DIR / "data"
+SHARED_CACHE_DIR = Path(os.environ.get("SHARED_CACHE_DIR") or DATA_DIR / "shared_cache")
+
+# Bump when a cached engine payload changes shape, so old entries are ignored.
+SCHEMA_VERSION = 1
+# Longest a worker waits for another worker's computation before computing itself.
+LOCK_WAIT_SECONDS = 180.0
+LOCK_POLL_SECONDS = 0.05
+# Redis locks expire on their own in case the holder dies mid-computation.
+LOCK_TTL_SECONDS = 600
+
+
+class SharedEntry(NamedTuple):
+    value: Any
+    version: int
+    stored_at: float  # epoch seconds
+    origin: str  # "shared" (published by any worker) | "computed" (by this call) | "local" (not published)
+
+    def age(self, now: Optional[float] = None) -> float:
+        return max(0.0, (now if now is not None else time.time()) - self.stored_at)
+
+
+def _safe_key(key: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", key)
+
+
+def _encode(value: Any, version: int, stored_at: float) -> bytes:
+    header = json.dumps({"schema": SCHEMA_VERSION, "version": version, "stored_at": stored_at}).encode("ascii")
+    return header + b"\n" + pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _decode_header(blob: Any) -> Optional[Dict[str, Any]]:
+    newline = blob.find(b"\n")
+    if newline <= 0:
+        return None
+    header = json.loads(bytes(blob[:newline]))
+    if header.get("schema") != SCHEMA_VERSION:
+        return None
+    header["offset"] = newline + 1
+    return header
+
+
+def _fresh(header: Optional[Dict[str, Any]], max_age_seconds: float) -> bool:
+    return header is not None and time.time() - float(header["stored_at"]) < max_age_seconds
+
+
+class FileStore:
+    name = "file"
+
+    def __init__(self, directory: Path = SHARED_CACHE_DIR):
+        self.directory = Path(directory)
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self.directory / f"{_safe_key(key)}{suffix}"
+
+    def read(self, key: str, max_age_seconds: float) -> Optional[SharedEntry]:
+        path = self._path(key, ".entry")
+        try:
+            with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                header = _decode_header(mapped)
+                if not _fresh(header, max_age_seconds):
+                    return None
+                with memoryview(mapped) as view:
+                    value = pickle.loads(view[header["offset"]:])
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            # mmap of an empty file (writer crashed before the first replace).
+            return None
+        return SharedEntry(value, int(header["version"]), float(header["stored_at"]), "shared")
+
+    def _current_version(self, path: Path) -> int:
+        try:
+            with open(path, "rb") as fh:
+                header = _decode_header(fh.readline())
+            return int(header["version"]) if header else 0
+        except (OSError, ValueError):
+            return 0
+
+    def write(self, key: str, value: Any, ttl_seconds: float) -> SharedEntry:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key, ".entry")
+        version = self._current_version(path) + 1
+        stored_at = time.time()
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(_encode(value, version, stored_at))
+        os.replace(tmp, path)
+        return SharedEntry(value, version, stored_at, "computed")
+
+    @contextmanager
+    def lock(self, key: str, wait_seconds: float) -> Iterator[bool]:
+        if fcntl is None:
+            yield False
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self._path(key, ".lock"), "a+b") as handle:
+            deadline = time.monotonic() + wait_seconds
+            acquired = False
+            while True:
+                try:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    acquired = True
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        break
+                    time.sleep(LOCK_POLL_SECONDS)
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+    def describe(self) -> Dict[str, Any]:
+        return {"backend": self.name, "path": str(self.directory), "locking": fcntl is not None}
+
+
+class RedisStore:
+    """
+    Any client exposing get / set(nx=, px=, ex=) / incr / delete (redis-py and
+    compatible servers such as Valkey, KeyDB, Dragonfly).
+    """
+
+    name = "redis"
+
+    def __init__(self, client: Any, prefix: str = "karion:shared:"):
+        self.client = client
+        self.prefix = prefix
+
+    def read(self, key: str, max_age_seconds: float) -> Optional[SharedEntry]:
+        blob = self.client.get(self.prefix + key)
+        if not blob:
+            return None
+        view = memoryview(blob)
+        header = _decode_header(blob)
+        if not _fresh(header, max_age_seconds):
+            return None
+        value = pickle.loads(view[header["offset"]:])
+        return SharedEntry(value, int(header["version"]), float(header["stored_at"]), "shared")
+
+    def write(self, key: str, value: Any, ttl_seconds: float) -> SharedEntry:
+        version = int(self.client.incr(self.prefix + key + ":version"))
+        stored_at = time.time()
+        self.client.set(self.prefix + key, _encode(value, version, stored_at), ex=max(1, int(ttl_seconds) + 1))
+        return SharedEntry(value, version, stored_at, "computed")
+
+    @contextmanager
+    def lock(self, key: str, wait_seconds: float) -> Iterator[bool]:
+        lock_key = self.prefix + key + ":lock"
+        token = uuid.uuid4().hex.encode("ascii")
+        deadline = time.monotonic() + wait_seconds
+        acquired = False
+        while True:
+            if self.client.set(lock_key, token, nx=True, px=LOCK_TTL_SECONDS * 1000):
+                acquired = True
+                break
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(LOCK_POLL_SECONDS)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                current = self.client.get(lock_key)
+                if current in (token, token.decode("ascii")):
+                    self.client.delete(lock_key)
+
+    def describe(self) -> Dict[str, Any]:
+        return {"backend": self.name, "prefix": self.prefix, "locking": True}
+
+
+def _default_store() -> Optional[Any]:
+    # Serverless instances share nothing worth locking for; opt in explicitly there.
+    default = "off" if os.environ.get("VERCEL") else "file"
+    backend = os.environ.get("SHARED_CACHE_BACKEND", default).strip().lower()
+    if backend in {"off", "none", "disabled"}:
+        return None
+    if backend == "redis":
+        url = os.environ.get("SHARED_CACHE_REDIS_URL", "").strip()
+        try:
+            import redis  # optional dependency
+
+            return RedisStore(redis.Redis.from_url(url or "redis://localhost:6379/0"))
+        except Exception as exc:
+            logger.warning(f"shared cache: redis unavailable ({exc}); falling back to file store")
+    return FileStore()
+
+
+_STORE: Optional[Any] = _default_store()
+_STATS_LOCK = threading.Lock()
+_STATS = {
+    "shared_hits": 0,
+    "computed": 0,
+    "waited_for_peer": 0,
+    "lock_timeouts": 0,
+    "unpublished": 0,
+    "store_errors": 0,
+}
+
+
+def configure(store: Optional[Any]) -> Optional[Any]:
+    """Swap the store (None disables the tier); returns the previous one."""
+    global _STORE
+    previous, _STORE = _STORE, store
+    return previous
+
+
+def _count(name: str) -> None:
+    with _STATS_LOCK:
+        _STATS[name] += 1
+
+
+def get(
+    key: str,
+    max_age_seconds: float,
+    accept: Optional[Callable[[Any], bool]] = None,
+) -> Optional[SharedEntry]:
+    """
+    Entry published by any worker within `max_age_seconds`, else None. `accept`
+    rejects entries built from other inputs (e.g. an older data version).
+    """
+    store = _STORE
+    if store is None:
+        return None
+    try:
+        entry = store.read(key, max_age_seconds)
+    except Exception as exc:
+        _count("store_errors")
+        logger.warning(f"shared cache read failed for {key}: {exc}")
+        return None
+    if entry is None or (accept is not None and not accept(entry.value)):
+        return None
+    _count("shared_hits")
+    return entry
+
+
+def publish(key: str, value: Any, ttl_seconds: float) -> SharedEntry:
+    store = _STORE
+    if store is not None:
+        try:
+            return store.write(key, value, ttl_seconds)
+        except Exception as exc:
+            _count("store_errors")
+            logger.warning(f"shared cache write failed for {key}: {exc}")
+    return SharedEntry(value, 0, time.time(), "local")
+
+
+def compute(
+    key: str,
+    ttl_seconds: float,
+    loader: Callable[[], Any],
+    publish_if: Optional[Callable[[Any], bool]] = None,
+    wait_seconds: float = LOCK_WAIT_SECONDS,
+    accept: Optional[Callable[[Any], bool]] = None,
+    max_age_seconds: Optional[float] = None,
+) -> SharedEntry:
+    """
+    Fresh published entry for `key`, computing it at most once across workers.
+    Results rejected by `publish_if` (e.g. degraded payloads) are returned to this
+    caller only, with origin "local". Loader exceptions propagate, nothing is published.
+    `max_age_seconds` (default `ttl_seconds`) narrows what counts as fresh, e.g. for
+    a refresh-ahead that must not adopt the entry it is replacing.
+    """
+    max_age = ttl_seconds if max_age_seconds is None else max_age_seconds
+    entry = get(key, max_age, accept)
+    if entry is not None:
+        return entry
+    store = _STORE
+    if store is None:
+        _count("computed")
+        return SharedEntry(loader(), 0, time.time(), "local")
+
+    try:
+        lock = store.lock(key, wait_seconds)
+        acquired = lock.__enter__()
+    except Exception as exc:
+        _count("store_errors")
+        logger.warning(f"shared cache lock failed for {key}: {exc}")
+        lock, acquired = None, False
+    try:
+        if acquired:
+            entry = get(key, max_age, accept)
+            if entry is not None:
+                _count("waited_for_peer")
+                return entry
+        elif lock is not None:
+            _count("lock_timeouts")
+        value = loader()
+        _count("computed")
+        if publish_if is not None and not publish_if(value):
+            _count("unpublished")
+            return SharedEntry(value, 0, time.time(), "local")
+        return publish(key, value, ttl_seconds)
+    finally:
+        if lock is not None:
+            lock.__exit__(None, None, None)
+
+
+def shared_cache_status() -> Dict[str, Any]:
+    store = _STORE
+    with _STATS_LOCK:
+        stats = dict(_STATS)
+    return {
+        "status": "ok" if store is not None else "disabled",
+        "store": store.describe() if store is not None else None,
+        "schema_version": SCHEMA_VERSION,
+        **stats,
+    }
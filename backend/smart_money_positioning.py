@@ -11,17 +11,36 @@ No heavy dataframe dependency is required in runtime.
 from __future__ import annotations
 
 from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import date, datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
 from urllib.parse import quote
-import copy
+import hashlib
 import math
-import re
+import multiprocessing
+import os
 import time
 
+import numpy as np
 import requests
 
+try:
+    from . import history_store, series_stats, shared_cache
+    from .history_series import Alignment, HistorySeries, ReturnPanel, align
+    from .frozen_payload import FrozenPayload, dumps as payload_dumps
+    from .option_chain import ChainCache, chain_size, decode_cboe_chain
+    from .rate_limiter import acquire_budget, current_priority, priority_scope, report_success, report_throttled
+    from .stage_graph import MISS, Stage, StageGraph, StageRun
+except ImportError:
+    import history_store
+    import series_stats
+    from history_series import Alignment, HistorySeries, ReturnPanel, align
+    import shared_cache
+    from frozen_payload import FrozenPayload, dumps as payload_dumps
+    from option_chain import ChainCache, chain_size, decode_cboe_chain
+    from rate_limiter import acquire_budget, current_priority, priority_scope, report_success, report_throttled
+    from stage_graph import MISS, Stage, StageGraph, StageRun
+
 
 THEMES: Tuple[str, ...] = (
     "DEFENSE",
@@ -169,9 +188,50 @@ BENCHMARK_TICKER = "SPY"
 HISTORY_RANGE = "12y"
 HISTORY_INTERVAL = "1d"
 CACHE_TTL_SECONDS = 300
+SHARED_CACHE_KEY = "smart_money_positioning"
+HISTORY_MIN_ROWS = 120
+HISTORY_REFRESH_MIN_SECONDS = 60
+HISTORY_FULL_RELOAD_GAP_DAYS = 30
+HISTORY_ANCHOR_TOLERANCE = 1e-4
 OPTIONS_EXPIRY_MAX_DAYS = 70
 OPTIONS_MAX_PER_TICKER = 24
 OPTIONS_MAX_ROWS = 80
+OPTIONS_CHAIN_TTL_SECONDS = 120  # CBOE delayed quotes; decoded chains are reused within this window
+STAGE_MAX_WORKERS = 4
+# Worker processes for the cpu_bound payload stages; 0 keeps them on the stage threads
+# (below ~100ms a stage costs less than pickling history_map over to a process).
+STAGE_PROCESSES = int(os.environ.get("SMART_MONEY_STAGE_PROCESSES", "0"))
+# Payload sections that can be requested on their own (`sections=`), each cached separately.
+SECTIONS = (
+    "summary",
+    "macro_filter",
+    "theme_scores",
+    "uoa_watchlist",
+    "sector_rotation",
+    "cross_asset_flags",
+    "news_lag_model",
+    "data_quality",
+    "explainability",
+    "regime_timeline",
+    "alert_engine",
+    "validation_lab",
+    "theme_drilldown",
+    "macro_event_overlay",
+    "lead_lag_radar",
+    "signal_decay_monitor",
+    "regime_switch_detector",
+    "counterfactual_lab",
+    "execution_risk_overlay",
+    "narrative_saturation_meter",
+    "historical_analysis_10y",
+)
+# Daily-bar analytics kept longer than the payload. Full refreshes reuse them while what
+# they read from other sections is unchanged (see `_SECTION_INPUT_KEYS`), so the 10y
+# analysis is rebuilt when the theme ranking or the day changes, not every refresh.
+SECTION_TTL_SECONDS = {
+    "regime_timeline": 3600,
+    "historical_analysis_10y": 6 * 3600,
+}
 
 MARKET_TICKERS = tuple(
     sorted(
@@ -183,8 +243,6 @@ MARKET_TICKERS = tuple(
     )
 )
 
-OPTION_RE = re.compile(r"^([A-Z]+)(\d{6})([CP])(\d{8})$")
-
 STOOQ_SYMBOL_MAP = {
     "SPY": "spy.us",
     "QQQ": "qqq.us",
@@ -207,7 +265,13 @@ _HTTP.headers.update(
     }
 )
 
+# Last full payload, frozen + JSON-encoded once; hits share it and only add the "cache" block.
 _CACHE: Dict[str, Any] = {"ts": None, "payload": None}
+_CHAIN_CACHE = ChainCache(OPTIONS_CHAIN_TTL_SECONDS)
+_STAGE_POOL: Dict[str, Any] = {"pool": None}
+# Per-section cache: name -> (built at, value, {input: key of the value it was built from}),
+# fed by full and `sections=` runs alike.
+_SECTION_CACHE: Dict[str, Tuple[datetime, Any, Dict[str, Any]]] = {}
 
 
 def _clamp(value: float, low: float, high: float) -> float:
@@ -257,34 +321,11 @@ def _direction_from_score(score: float) -> str:
     return "NEUTRAL"
 
 
-def _mean(values: List[float]) -> float:
-    if not values:
-        return 0.0
-    return sum(values) / len(values)
-
-
-def _stddev(values: List[float]) -> float:
-    if len(values) < 2:
-        return 0.0
-    m = _mean(values)
-    var = sum((x - m) ** 2 for x in values) / max(1, len(values) - 1)
-    return math.sqrt(max(var, 0.0))
-
-
-def _pearson_corr(xs: List[float], ys: List[float]) -> float:
-    if len(xs) < 3 or len(ys) < 3:
-        return 0.0
-    n = min(len(xs), len(ys))
-    x = xs[:n]
-    y = ys[:n]
-    mx = _mean(x)
-    my = _mean(y)
-    cov = sum((a - mx) * (b - my) for a, b in zip(x, y))
-    vx = sum((a - mx) ** 2 for a in x)
-    vy = sum((b - my) ** 2 for b in y)
-    if vx <= 1e-12 or vy <= 1e-12:
-        return 0.0
-    return _clamp(cov / math.sqrt(vx * vy), -1.0, 1.0)
+# Statistics kernels (numpy, see series_stats) under the names the builders use.
+_mean = series_stats.mean
+_stddev = series_stats.stddev
+_pearson_corr = series_stats.pearson_corr
+_quantile = series_stats.quantile
 
 
 def _series_period_return(series: Dict[str, List[float]], periods: int) -> float:
@@ -299,95 +340,32 @@ def _series_period_return(series: Dict[str, List[float]], periods: int) -> float
 
 
 def _series_cagr(series: Dict[str, List[float]], periods: int) -> float:
-    closes = series.get("close", [])
-    ts = series.get("timestamps", [])
-    if len(closes) <= periods or len(ts) <= periods:
-        return 0.0
-    start = _safe_float(closes[-1 - periods], 0.0)
-    end = _safe_float(closes[-1], 0.0)
-    t0 = _safe_int(ts[-1 - periods], 0)
-    t1 = _safe_int(ts[-1], 0)
-    if start <= 0.0 or end <= 0.0 or t1 <= t0:
-        return 0.0
-    years = (t1 - t0) / (365.25 * 86400.0)
-    if years <= 0.0:
-        return 0.0
-    try:
-        return (end / start) ** (1.0 / years) - 1.0
-    except Exception:
-        return 0.0
+    return series_stats.cagr(series.get("close", []), series.get("timestamps", []), periods)
 
 
 def _series_max_drawdown(series: Dict[str, List[float]], periods: int) -> float:
-    closes = [_safe_float(x, 0.0) for x in (series.get("close") or [])]
-    if len(closes) <= periods:
-        closes = closes[:]
-    else:
-        closes = closes[-periods:]
-    if len(closes) < 3:
-        return 0.0
-    peak = closes[0]
-    max_dd = 0.0
-    for c in closes:
-        if c > peak:
-            peak = c
-        if peak > 0:
-            dd = (c / peak) - 1.0
-            if dd < max_dd:
-                max_dd = dd
-    return max_dd
-
-
-def _series_daily_returns(series: Dict[str, List[float]], periods: int) -> List[float]:
-    closes = [_safe_float(x, 0.0) for x in (series.get("close") or [])]
-    if len(closes) <= periods:
-        src = closes
-    else:
-        src = closes[-periods:]
-    out: List[float] = []
-    for i in range(1, len(src)):
-        prev = _safe_float(src[i - 1], 0.0)
-        curr = _safe_float(src[i], 0.0)
-        if prev <= 0.0 or curr <= 0.0:
-            continue
-        out.append((curr / prev) - 1.0)
-    return out
+    return series_stats.max_drawdown(series.get("close") or [], periods)
+
+
+def _series_daily_returns(series: Dict[str, List[float]], periods: int) -> np.ndarray:
+    return series_stats.daily_returns(series.get("close") or [], periods)
+
+
+def _aligned_return_pairs(aligned: Alignment, periods: int) -> Tuple[np.ndarray, np.ndarray]:
+    ra, rb, _ = aligned.paired_returns(periods)
+    return ra, rb
+
+
+def _aligned_moments(aligned: Alignment, periods: int) -> series_stats.RollingMoments:
+    """Rolling moments of the return pairs over the last `periods` aligned rows (`rows`: row in that slice)."""
+    return series_stats.RollingMoments(*aligned.paired_returns(periods))
 
 
 def _series_corr(a: Dict[str, List[float]], b: Dict[str, List[float]], periods: int) -> float:
     aligned = _align_to_benchmark(a, b)
     if len(aligned) < 6:
         return 0.0
-    if len(aligned) > periods:
-        aligned = aligned[-periods:]
-    ra: List[float] = []
-    rb: List[float] = []
-    for i in range(1, len(aligned)):
-        a_prev = _safe_float(aligned[i - 1][1], 0.0)
-        a_cur = _safe_float(aligned[i][1], 0.0)
-        b_prev = _safe_float(aligned[i - 1][2], 0.0)
-        b_cur = _safe_float(aligned[i][2], 0.0)
-        if a_prev <= 0.0 or a_cur <= 0.0 or b_prev <= 0.0 or b_cur <= 0.0:
-            continue
-        ra.append((a_cur / a_prev) - 1.0)
-        rb.append((b_cur / b_prev) - 1.0)
-    return _pearson_corr(ra, rb)
-
-
-def _quantile(values: List[float], q: float) -> float:
-    clean = sorted([_safe_float(v, 0.0) for v in values if math.isfinite(_safe_float(v, 0.0))])
-    if not clean:
-        return 0.0
-    q_clamped = _clamp(_safe_float(q, 0.5), 0.0, 1.0)
-    if len(clean) == 1:
-        return clean[0]
-    pos = q_clamped * (len(clean) - 1)
-    lo = int(math.floor(pos))
-    hi = int(math.ceil(pos))
-    if lo == hi:
-        return clean[lo]
-    frac = pos - lo
-    return (clean[lo] * (1.0 - frac)) + (clean[hi] * frac)
+    return _pearson_corr(*_aligned_return_pairs(aligned, periods))
 
 
 def _two_tail_p_from_z(z_score: float) -> float:
@@ -399,22 +377,8 @@ def _series_return_pairs(
     series_a: Dict[str, List[float]],
     series_b: Dict[str, List[float]],
     periods: int,
-) -> Tuple[List[float], List[float]]:
-    aligned = _align_to_benchmark(series_a, series_b)
-    if len(aligned) > periods:
-        aligned = aligned[-periods:]
-    ra: List[float] = []
-    rb: List[float] = []
-    for i in range(1, len(aligned)):
-        a_prev = _safe_float(aligned[i - 1][1], 0.0)
-        a_cur = _safe_float(aligned[i][1], 0.0)
-        b_prev = _safe_float(aligned[i - 1][2], 0.0)
-        b_cur = _safe_float(aligned[i][2], 0.0)
-        if a_prev <= 0.0 or a_cur <= 0.0 or b_prev <= 0.0 or b_cur <= 0.0:
-            continue
-        ra.append((a_cur / a_prev) - 1.0)
-        rb.append((b_cur / b_prev) - 1.0)
-    return ra, rb
+) -> Tuple[np.ndarray, np.ndarray]:
+    return _aligned_return_pairs(_align_to_benchmark(series_a, series_b), periods)
 
 
 def _corr_significance_label(abs_corr: float, p_value: float) -> str:
@@ -432,19 +396,25 @@ def _series_corr_with_stats(
     series_b: Dict[str, List[float]],
     periods: int,
 ) -> Dict[str, float]:
-    ra, rb = _series_return_pairs(series_a, series_b, periods)
-    n = min(len(ra), len(rb))
+    return _moments_corr_with_stats(_aligned_moments(_align_to_benchmark(series_a, series_b), periods))
+
+
+def _moments_corr_with_stats(moments: series_stats.RollingMoments, start: int = 0) -> Dict[str, float]:
+    n = moments.size - start
+    return _corr_with_stats(moments.corr(start) if n >= 8 else 0.0, n)
+
+
+def _corr_with_stats(corr: float, n: int) -> Dict[str, float]:
     if n < 8:
         return {
             "corr": 0.0,
-            "sample_days": float(n),
+            "sample_days": float(max(0, n)),
             "t_stat": 0.0,
             "z_score": 0.0,
             "p_value": 1.0,
             "abs_corr": 0.0,
         }
 
-    corr = _pearson_corr(ra, rb)
     denom = max(1e-9, 1.0 - (corr * corr))
     t_stat = corr * math.sqrt(max(1.0, (n - 2) / denom))
     z_score = abs(corr) * math.sqrt(max(1.0, n - 3))
@@ -466,39 +436,55 @@ def _series_rolling_corr(
     window: int = 252,
     step: int = 21,
 ) -> List[float]:
-    ra, rb = _series_return_pairs(series_a, series_b, periods)
-    n = min(len(ra), len(rb))
+    return _moments_rolling_corr(_aligned_moments(_align_to_benchmark(series_a, series_b), periods), window, step)
+
+
+def _moments_rolling_corr(moments: series_stats.RollingMoments, window: int = 252, step: int = 21) -> List[float]:
+    """Window correlations every `step` return days, plus the latest window when the steps miss it."""
+    n = moments.size
     if n < max(12, window):
         return []
-    out: List[float] = []
+    out = moments.rolling_corr(window, step).tolist()
     last_start = max(0, n - window)
-    for start in range(0, max(1, n - window + 1), max(1, step)):
-        out.append(_pearson_corr(ra[start : start + window], rb[start : start + window]))
     if not out or last_start > 0:
-        tail_corr = _pearson_corr(ra[last_start:last_start + window], rb[last_start:last_start + window])
+        tail_corr = moments.corr(last_start, last_start + window)
         if not out or abs(out[-1] - tail_corr) > 1e-6:
             out.append(tail_corr)
     return out
 
 
+def _panel_corr(panel: ReturnPanel, a: str, b: str, periods: int) -> float:
+    if a not in panel or b not in panel:
+        return 0.0
+    return float(panel.stats(periods).corr[panel.index(a), panel.index(b)])
+
+
+def _panel_corr_with_stats(panel: ReturnPanel, a: str, b: str, periods: int) -> Dict[str, float]:
+    if a not in panel or b not in panel:
+        return _corr_with_stats(0.0, 0)
+    stats = panel.stats(periods)
+    i, j = panel.index(a), panel.index(b)
+    return _corr_with_stats(float(stats.corr[i, j]), int(stats.count[i, j]))
+
+
+def _panel_moments(panel: ReturnPanel, a: str, b: str, periods: int) -> series_stats.RollingMoments:
+    """Rolling moments of the pair's common return days, for rolling-window views."""
+    if a not in panel or b not in panel:
+        return series_stats.RollingMoments(np.empty(0), np.empty(0))
+    return series_stats.RollingMoments(*panel.pair_returns(a, b, periods))
+
+
 def _series_vs_vix_regime_test(
     asset_series: Dict[str, List[float]],
     vix_series: Dict[str, List[float]],
     periods: int,
 ) -> Dict[str, float]:
-    aligned = _align_to_benchmark(asset_series, vix_series)
-    if len(aligned) > periods:
-        aligned = aligned[-periods:]
-    returns: List[float] = []
-    vix_levels: List[float] = []
-    for i in range(1, len(aligned)):
-        prev_px = _safe_float(aligned[i - 1][1], 0.0)
-        cur_px = _safe_float(aligned[i][1], 0.0)
-        vix_level = _safe_float(aligned[i][2], 0.0)
-        if prev_px <= 0.0 or cur_px <= 0.0 or vix_level <= 0.0:
-            continue
-        returns.append((cur_px / prev_px) - 1.0)
-        vix_levels.append(vix_level)
+    aligned = _align_to_benchmark(asset_series, vix_series).tail(periods)
+    px = aligned.close
+    vix = aligned.bench_close
+    keep = ~((px[:-1] <= 0.0) | (px[1:] <= 0.0) | (vix[1:] <= 0.0))
+    returns = px[1:][keep] / px[:-1][keep] - 1.0
+    vix_levels = vix[1:][keep]
 
     n = min(len(returns), len(vix_levels))
     if n < 40:
@@ -513,11 +499,11 @@ def _series_vs_vix_regime_test(
 
     high_cut = _quantile(vix_levels, 0.75)
     low_cut = _quantile(vix_levels, 0.25)
-    high_bucket = [r for r, v in zip(returns, vix_levels) if v >= high_cut]
-    low_bucket = [r for r, v in zip(returns, vix_levels) if v <= low_cut]
+    high_bucket = returns[vix_levels >= high_cut]
+    low_bucket = returns[vix_levels <= low_cut]
 
-    high_mean = _mean(high_bucket) if high_bucket else 0.0
-    low_mean = _mean(low_bucket) if low_bucket else 0.0
+    high_mean = _mean(high_bucket) if len(high_bucket) else 0.0
+    low_mean = _mean(low_bucket) if len(low_bucket) else 0.0
     spread = high_mean - low_mean
 
     std_high = _stddev(high_bucket)
@@ -536,62 +522,30 @@ def _series_vs_vix_regime_test(
     }
 
 
-def _series_weekday_profile(series: Dict[str, List[float]], periods: int) -> Dict[str, Dict[str, float]]:
-    closes = [_safe_float(x, 0.0) for x in (series.get("close") or [])]
-    ts = [_safe_int(x, 0) for x in (series.get("timestamps") or [])]
-    if len(closes) > periods:
-        closes = closes[-periods:]
-        ts = ts[-periods:]
-    bucket = defaultdict(list)
-    for i in range(1, min(len(closes), len(ts))):
-        prev = _safe_float(closes[i - 1], 0.0)
-        cur = _safe_float(closes[i], 0.0)
-        if prev <= 0.0 or cur <= 0.0:
-            continue
-        wd = datetime.fromtimestamp(ts[i], tz=timezone.utc).weekday()
-        bucket[wd].append((cur / prev) - 1.0)
+def _calendar_profile(returns: np.ndarray, buckets: np.ndarray, keys: range) -> Dict[str, Dict[str, float]]:
     out: Dict[str, Dict[str, float]] = {}
-    for wd in range(5):
-        vals = bucket.get(wd, [])
-        n = len(vals)
+    for key in keys:
+        vals = returns[buckets == key]
+        n = int(vals.size)
         if n <= 0:
-            out[str(wd)] = {"samples": 0, "mean_pct": 0.0, "win_rate_pct": 0.0}
+            out[str(key)] = {"samples": 0, "mean_pct": 0.0, "win_rate_pct": 0.0}
         else:
-            out[str(wd)] = {
+            out[str(key)] = {
                 "samples": n,
-                "mean_pct": round(_mean(vals) * 100.0, 4),
-                "win_rate_pct": round((sum(1 for v in vals if v > 0) / n) * 100.0, 2),
+                "mean_pct": round(_mean(vals.tolist()) * 100.0, 4),
+                "win_rate_pct": round((int(np.count_nonzero(vals > 0)) / n) * 100.0, 2),
             }
     return out
 
 
+def _series_weekday_profile(series: Dict[str, List[float]], periods: int) -> Dict[str, Dict[str, float]]:
+    returns, days = series_stats.dated_returns(series.get("close") or [], series.get("timestamps") or [], periods)
+    return _calendar_profile(returns, series_stats.utc_weekdays(days), range(5))
+
+
 def _series_month_profile(series: Dict[str, List[float]], periods: int) -> Dict[str, Dict[str, float]]:
-    closes = [_safe_float(x, 0.0) for x in (series.get("close") or [])]
-    ts = [_safe_int(x, 0) for x in (series.get("timestamps") or [])]
-    if len(closes) > periods:
-        closes = closes[-periods:]
-        ts = ts[-periods:]
-    bucket = defaultdict(list)
-    for i in range(1, min(len(closes), len(ts))):
-        prev = _safe_float(closes[i - 1], 0.0)
-        cur = _safe_float(closes[i], 0.0)
-        if prev <= 0.0 or cur <= 0.0:
-            continue
-        m = datetime.fromtimestamp(ts[i], tz=timezone.utc).month
-        bucket[m].append((cur / prev) - 1.0)
-    out: Dict[str, Dict[str, float]] = {}
-    for m in range(1, 13):
-        vals = bucket.get(m, [])
-        n = len(vals)
-        if n <= 0:
-            out[str(m)] = {"samples": 0, "mean_pct": 0.0, "win_rate_pct": 0.0}
-        else:
-            out[str(m)] = {
-                "samples": n,
-                "mean_pct": round(_mean(vals) * 100.0, 4),
-                "win_rate_pct": round((sum(1 for v in vals if v > 0) / n) * 100.0, 2),
-            }
-    return out
+    returns, days = series_stats.dated_returns(series.get("close") or [], series.get("timestamps") or [], periods)
+    return _calendar_profile(returns, series_stats.utc_months(days), range(1, 13))
 
 
 def _series_return(series: Dict[str, List[float]], periods: int) -> float:
@@ -623,24 +577,40 @@ def _series_volume_ratio(series: Dict[str, List[float]], window: int = 30) -> fl
     return curr / ma
 
 
-def _fetch_history_series(symbol: str, warnings: List[str]) -> Dict[str, List[float]]:
+def _fetch_history_with_source(symbol: str, warnings: List[str]) -> Tuple[Dict[str, List[float]], str]:
     stooq_symbol = STOOQ_SYMBOL_MAP.get(symbol)
     if stooq_symbol:
         stooq_series = _fetch_stooq_series(stooq_symbol, warnings)
-        if len(stooq_series.get("close", [])) >= 120:
-            return stooq_series
+        if len(stooq_series.get("close", [])) >= HISTORY_MIN_ROWS:
+            return stooq_series, "stooq"
 
-    return _fetch_yahoo_series(symbol, warnings)
+    return _fetch_yahoo_series(symbol, warnings), "yahoo"
 
 
-def _fetch_stooq_series(stooq_symbol: str, warnings: List[str]) -> Dict[str, List[float]]:
+def _fetch_history_series(symbol: str, warnings: List[str]) -> Dict[str, List[float]]:
+    return _fetch_history_with_source(symbol, warnings)[0]
+
+
+def _fetch_stooq_series(
+    stooq_symbol: str,
+    warnings: List[str],
+    start_day: Optional[date] = None,
+) -> Dict[str, List[float]]:
     url = f"https://stooq.com/q/d/l/?s={quote(stooq_symbol, safe='')}&i=d"
+    if start_day is not None:
+        end_day = datetime.now(timezone.utc).date() + timedelta(days=1)
+        url += f"&d1={start_day.strftime('%Y%m%d')}&d2={end_day.strftime('%Y%m%d')}"
+    if not acquire_budget("stooq"):
+        warnings.append(f"stooq rate budget exhausted {stooq_symbol}")
+        return {"timestamps": [], "close": [], "volume": []}
     try:
         response = _HTTP.get(url, timeout=18)
     except Exception as exc:
         warnings.append(f"stooq request failed {stooq_symbol}: {exc}")
         return {"timestamps": [], "close": [], "volume": []}
 
+    if response.status_code == 429:
+        report_throttled("stooq")
     if response.status_code != 200:
         warnings.append(f"stooq bad status {stooq_symbol}: {response.status_code}")
         return {"timestamps": [], "close": [], "volume": []}
@@ -676,7 +646,12 @@ def _fetch_stooq_series(stooq_symbol: str, warnings: List[str]) -> Dict[str, Lis
     }
 
 
-def _fetch_yahoo_series(symbol: str, warnings: List[str]) -> Dict[str, List[float]]:
+def _fetch_yahoo_series(
+    symbol: str,
+    warnings: List[str],
+    period1: Optional[int] = None,
+    events: Optional[List[str]] = None,
+) -> Dict[str, List[float]]:
     encoded = quote(symbol, safe="")
     params = {
         "range": HISTORY_RANGE,
@@ -684,10 +659,18 @@ def _fetch_yahoo_series(symbol: str, warnings: List[str]) -> Dict[str, List[floa
         "includePrePost": "false",
         "events": "div,splits",
     }
+    if period1 is not None:
+        params.pop("range")
+        params["period1"] = str(int(period1))
+        params["period2"] = str(int(time.time()) + 86400)
     last_status = None
     for host in ("query1.finance.yahoo.com", "query2.finance.yahoo.com"):
         url = f"https://{host}/v8/finance/chart/{encoded}"
         for attempt in range(3):
+            # Shared Yahoo budget: a 429 cools down every caller, not just this loop.
+            if not acquire_budget("yahoo"):
+                warnings.append(f"history rate budget exhausted {symbol}")
+                return {"timestamps": [], "close": [], "volume": []}
             try:
                 response = _HTTP.get(url, params=params, timeout=18)
             except Exception as exc:
@@ -696,10 +679,11 @@ def _fetch_yahoo_series(symbol: str, warnings: List[str]) -> Dict[str, List[floa
 
             last_status = response.status_code
             if response.status_code == 429:
-                time.sleep(0.2 * (attempt + 1))
+                report_throttled("yahoo", _safe_float(response.headers.get("Retry-After"), 0.0))
                 continue
             if response.status_code != 200:
                 continue
+            report_success("yahoo")
 
             try:
                 payload = response.json()
@@ -721,6 +705,14 @@ def _fetch_yahoo_series(symbol: str, warnings: List[str]) -> Dict[str, List[floa
                     continue
                 rows.append((int(ts), _safe_float(close, 0.0), _safe_float(vol, 0.0)))
 
+            if events is not None and period1 is not None:
+                # Splits/dividends inside the incremental window invalidate stored bars.
+                for kind in ("splits", "dividends"):
+                    for event in ((result.get("events") or {}).get(kind) or {}).values():
+                        event_ts = _safe_int((event or {}).get("date"), 0)
+                        if event_ts > int(period1):
+                            events.append(f"{kind}:{event_ts}")
+
             rows.sort(key=lambda x: x[0])
             if rows:
                 return {
@@ -736,12 +728,109 @@ def _fetch_yahoo_series(symbol: str, warnings: List[str]) -> Dict[str, List[floa
     return {"timestamps": [], "close": [], "volume": []}
 
 
+def _close_at(series: Dict[str, List[float]], ts: float) -> Optional[float]:
+    timestamps = series.get("timestamps", [])
+    closes = series.get("close", [])
+    for idx in range(len(timestamps) - 1, -1, -1):
+        t = float(timestamps[idx])
+        if t == float(ts):
+            return _safe_float(closes[idx], 0.0)
+        if t < float(ts):
+            break
+    return None
+
+
+def _refresh_history_series(symbol: str, warnings: List[str], now: Optional[datetime] = None) -> Dict[str, List[float]]:
+    """
+    Daily history from the local store, refreshed by fetching only the bars since the
+    last closed stored bar (anchor). A full reload happens on cold store, long gaps,
+    split/dividend events or when the anchor close no longer matches (re-adjusted history).
+    """
+    now = now or datetime.now(timezone.utc)
+    stored = history_store.load_series(symbol)
+    reload_reason = "cold_store"
+
+    if stored:
+        series, meta = stored
+        source = str(meta.get("source") or "")
+        closes = series.get("close", [])
+        timestamps = series.get("timestamps", [])
+        last_ts = _safe_float(timestamps[-1], 0.0) if timestamps else 0.0
+        refreshed_at = _safe_float(meta.get("refreshed_at_ts"), 0.0)
+        gap_seconds = now.timestamp() - last_ts
+
+        if len(closes) < HISTORY_MIN_ROWS or source not in ("stooq", "yahoo"):
+            reload_reason = "short_history"
+        elif gap_seconds > HISTORY_FULL_RELOAD_GAP_DAYS * 86400:
+            reload_reason = "stale_gap"
+        elif (now.timestamp() - refreshed_at) < HISTORY_REFRESH_MIN_SECONDS:
+            return series
+        else:
+            # Anchor on the last closed bar: the final stored bar may be an intraday partial.
+            anchor_idx = max(0, len(timestamps) - 2)
+            anchor_ts = _safe_float(timestamps[anchor_idx], 0.0)
+            anchor_close = _safe_float(closes[anchor_idx], 0.0)
+            local_warnings: List[str] = []
+            events: List[str] = []
+            if source == "stooq" and STOOQ_SYMBOL_MAP.get(symbol):
+                anchor_day = datetime.fromtimestamp(anchor_ts, tz=timezone.utc).date()
+                fresh = _fetch_stooq_series(STOOQ_SYMBOL_MAP[symbol], local_warnings, start_day=anchor_day)
+            else:
+                fresh = _fetch_yahoo_series(symbol, local_warnings, period1=int(anchor_ts), events=events)
+
+            if not fresh.get("close"):
+                warnings.extend(local_warnings)
+                warnings.append(f"history increment unavailable {symbol}: serving stored bars")
+                return series
+
+            fresh_anchor = _close_at(fresh, anchor_ts)
+            if events:
+                reload_reason = "corporate_action"
+            elif fresh_anchor is None or anchor_close <= 0.0:
+                reload_reason = "anchor_missing"
+            elif abs((fresh_anchor / anchor_close) - 1.0) > HISTORY_ANCHOR_TOLERANCE:
+                reload_reason = "anchor_mismatch"
+            else:
+                merged = history_store.splice_tail(series, fresh, anchor_ts)
+                meta_out = dict(meta)
+                meta_out["refreshed_at_utc"] = now.isoformat()
+                meta_out["refreshed_at_ts"] = now.timestamp()
+                meta_out["incremental_refreshes"] = _safe_int(meta.get("incremental_refreshes"), 0) + 1
+                history_store.save_series(symbol, merged, meta_out)
+                return merged
+
+    full, source = _fetch_history_with_source(symbol, warnings)
+    if full.get("close"):
+        previous_meta = stored[1] if stored else {}
+        history_store.save_series(
+            symbol,
+            full,
+            {
+                "source": source,
+                "refreshed_at_utc": now.isoformat(),
+                "refreshed_at_ts": now.timestamp(),
+                "full_reload_at_utc": now.isoformat(),
+                "reload_reason": reload_reason,
+                "full_reloads": _safe_int(previous_meta.get("full_reloads"), 0) + 1,
+                "incremental_refreshes": 0,
+            },
+        )
+        return full
+    if stored:
+        warnings.append(f"history reload failed {symbol}: serving stored bars")
+        return stored[0]
+    return full
+
+
 def _download_history_map(tickers: Tuple[str, ...], warnings: List[str]) -> Dict[str, Dict[str, List[float]]]:
     history_map: Dict[str, Dict[str, List[float]]] = {}
 
+    priority = current_priority()
+
     def _worker(symbol: str) -> Tuple[str, Dict[str, List[float]], List[str]]:
         local_warnings: List[str] = []
-        series = _fetch_history_series(symbol, local_warnings)
+        with priority_scope(priority):
+            series = _refresh_history_series(symbol, local_warnings)
         return symbol, series, local_warnings
 
     max_workers = max(1, min(8, len(tickers)))
@@ -756,7 +845,7 @@ def _download_history_map(tickers: Tuple[str, ...], warnings: List[str]) -> Dict
                 continue
             warnings.extend(local_warnings)
             if series.get("close"):
-                history_map[ticker] = series
+                history_map[ticker] = HistorySeries.of(series)
 
     return history_map
 
@@ -764,25 +853,17 @@ def _download_history_map(tickers: Tuple[str, ...], warnings: List[str]) -> Dict
 def _align_to_benchmark(
     symbol_series: Dict[str, List[float]],
     benchmark_series: Dict[str, List[float]],
-) -> List[Tuple[int, float, float, float]]:
-    ts_s = [_safe_int(t, 0) for t in symbol_series.get("timestamps", [])]
-    close_s = [_safe_float(c, 0.0) for c in symbol_series.get("close", [])]
-    vol_s = [_safe_float(v, 0.0) for v in symbol_series.get("volume", [])]
-
-    ts_b = [_safe_int(t, 0) for t in benchmark_series.get("timestamps", [])]
-    close_b = [_safe_float(c, 0.0) for c in benchmark_series.get("close", [])]
-
-    rows: List[Tuple[int, float, float, float]] = []
-    bi = 0
-    last_bench = None
-    for idx, ts in enumerate(ts_s):
-        while bi < len(ts_b) and ts_b[bi] <= ts:
-            last_bench = close_b[bi]
-            bi += 1
-        if last_bench is None:
-            continue
-        rows.append((ts, close_s[idx], _safe_float(last_bench, 0.0), vol_s[idx]))
-    return rows
+) -> Alignment:
+    """Symbol rows with the latest benchmark close at or before each; memoized per HistorySeries pair."""
+    return align(symbol_series, benchmark_series)
+
+
+def _aligned_close_by_ts(
+    symbol_series: Dict[str, List[float]],
+    benchmark_series: Dict[str, List[float]],
+) -> Dict[int, float]:
+    aligned = _align_to_benchmark(symbol_series, benchmark_series)
+    return dict(zip(aligned.timestamps.tolist(), aligned.close.tolist()))
 
 
 def _historical_validation(
@@ -805,62 +886,40 @@ def _historical_validation(
             "edge_score": 50.0,
         }
 
-    close = [_safe_float(row[1], 0.0) for row in aligned]
-    bench = [_safe_float(row[2], 0.0) for row in aligned]
-    volume = [_safe_float(row[3], 0.0) for row in aligned]
-
-    acc_sample = 0
-    dist_sample = 0
-    acc_hit_5 = 0
-    acc_hit_20 = 0
-    dist_hit_5 = 0
-    dist_hit_20 = 0
-    baseline_hit_20 = 0
-    baseline_sample_20 = 0
-
-    valid_count = 0
-    for i in range(50, n - 20):
-        c = close[i]
-        c20 = close[i - 20]
-        b = bench[i]
-        b20 = bench[i - 20]
-        if c <= 0 or c20 <= 0 or b <= 0 or b20 <= 0:
-            continue
-
-        ma50 = _mean(close[i - 49:i + 1])
-        if ma50 <= 0:
-            continue
-
-        vol_ma = _mean(volume[i - 29:i + 1]) if i >= 29 else _mean(volume[:i + 1])
-        vol_ratio = (volume[i] / vol_ma) if vol_ma > 0 else 1.0
-
-        rel20 = (c / c20 - 1.0) - (b / b20 - 1.0)
-        trend = (c / ma50) - 1.0
-        fwd5 = (close[i + 5] / c) - 1.0
-        fwd20 = (close[i + 20] / c) - 1.0
-
-        baseline_sample_20 += 1
-        if fwd20 > 0:
-            baseline_hit_20 += 1
-
-        valid_count += 1
-
-        accum_cond = rel20 > 0 and trend > 0 and vol_ratio >= 1.03
-        dist_cond = rel20 < 0 and trend < 0 and vol_ratio >= 1.03
-
-        if accum_cond:
-            acc_sample += 1
-            if fwd5 > 0:
-                acc_hit_5 += 1
-            if fwd20 > 0:
-                acc_hit_20 += 1
-
-        if dist_cond:
-            dist_sample += 1
-            if fwd5 < 0:
-                dist_hit_5 += 1
-            if fwd20 < 0:
-                dist_hit_20 += 1
+    close = aligned.close
+    bench = aligned.bench_close
+    volume = aligned.volume
+
+    # Days 50 .. n-21: 50d trend, 30d volume average and 5d / 20d forward returns all defined.
+    idx = np.arange(50, n - 20)
+    c = close[idx]
+    c20 = close[idx - 20]
+    b = bench[idx]
+    b20 = bench[idx - 20]
+    ma50 = series_stats.RollingMoments(close).means(idx - 49, 50)
+    vol_ma = series_stats.RollingMoments(volume).means(idx - 29, 30)
+    valid = ~((c <= 0) | (c20 <= 0) | (b <= 0) | (b20 <= 0) | (ma50 <= 0))
+    c, c20, b, b20, ma50, vol_ma, idx = (arr[valid] for arr in (c, c20, b, b20, ma50, vol_ma, idx))
+
+    vol_ratio = np.ones(idx.size)
+    np.divide(volume[idx], vol_ma, out=vol_ratio, where=vol_ma > 0)
+    rel20 = (c / c20 - 1.0) - (b / b20 - 1.0)
+    trend = (c / ma50) - 1.0
+    fwd5 = (close[idx + 5] / c) - 1.0
+    fwd20 = (close[idx + 20] / c) - 1.0
+
+    valid_count = int(idx.size)
+    baseline_sample_20 = valid_count
+    baseline_hit_20 = int(np.count_nonzero(fwd20 > 0))
+
+    accum = (rel20 > 0) & (trend > 0) & (vol_ratio >= 1.03)
+    dist = (rel20 < 0) & (trend < 0) & (vol_ratio >= 1.03)
+    acc_sample = int(np.count_nonzero(accum))
+    acc_hit_5 = int(np.count_nonzero(accum & (fwd5 > 0)))
+    acc_hit_20 = int(np.count_nonzero(accum & (fwd20 > 0)))
+    dist_sample = int(np.count_nonzero(dist))
+    dist_hit_5 = int(np.count_nonzero(dist & (fwd5 < 0)))
+    dist_hit_20 = int(np.count_nonzero(dist & (fwd20 < 0)))
 
     def _rate(hits: int, sample: int, default: float = 0.5) -> float:
         if sample <= 0:
@@ -1225,12 +1284,17 @@ def _build_macro_filter(
 
 def _fetch_cboe_options(symbol: str, warnings: List[str]) -> List[Dict[str, Any]]:
     url = f"https://cdn.cboe.com/api/global/delayed_quotes/options/{quote(symbol, safe='')}.json"
+    if not acquire_budget("cboe"):
+        warnings.append(f"options rate budget exhausted {symbol}")
+        return []
     try:
         response = _HTTP.get(url, timeout=20)
     except Exception as exc:
         warnings.append(f"options request failed {symbol}: {exc}")
         return []
 
+    if response.status_code == 429:
+        report_throttled("cboe")
     if response.status_code != 200:
         warnings.append(f"options bad status {symbol}: {response.status_code}")
         return []
@@ -1244,106 +1308,91 @@ def _fetch_cboe_options(symbol: str, warnings: List[str]) -> List[Dict[str, Any]
     return ((payload.get("data") or {}).get("options") or [])
 
 
-def _parse_option_symbol(symbol: str) -> Optional[Tuple[date, str, float]]:
-    match = OPTION_RE.match(str(symbol or ""))
-    if not match:
-        return None
-    yy_mm_dd = match.group(2)
-    side_raw = match.group(3)
-    strike_raw = match.group(4)
-
-    year = 2000 + _safe_int(yy_mm_dd[0:2], 0)
-    month = _safe_int(yy_mm_dd[2:4], 0)
-    day = _safe_int(yy_mm_dd[4:6], 0)
-    try:
-        expiry = date(year, month, day)
-    except Exception:
-        return None
-
-    side = "CALL" if side_raw == "C" else "PUT"
-    strike = _safe_int(strike_raw, 0) / 1000.0
-    return expiry, side, strike
+def _get_cboe_chain(ticker: str, warnings: List[str]) -> Dict[str, np.ndarray]:
+    """Decoded (columnar) CBOE chain for `ticker`, cached for OPTIONS_CHAIN_TTL_SECONDS."""
+    return _CHAIN_CACHE.get(ticker, lambda: _fetch_cboe_options(ticker, warnings))
 
 
 def _process_cboe_options(
-    options: List[Dict[str, Any]],
+    options: Any,
     ticker: str,
     spot: float,
     now: datetime,
     themes: Tuple[str, ...],
 ) -> List[Dict[str, Any]]:
+    """Score a chain (decoded columns or raw CBOE rows); every filter/score is a vector op."""
     rows: List[Dict[str, Any]] = []
-    if not options or spot <= 0:
+    if spot <= 0:
+        return rows
+    chain = options if isinstance(options, dict) else decode_cboe_chain(options or [])
+    if not chain_size(chain):
         return rows
 
-    for option in options:
-        volume = _safe_float(option.get("volume"), 0.0)
-        if volume <= 0:
-            continue
-
-        parsed = _parse_option_symbol(option.get("option", ""))
-        if not parsed:
-            continue
-
-        expiry, side, strike = parsed
-        dte = (expiry - now.date()).days
-        if dte < 2 or dte > OPTIONS_EXPIRY_MAX_DAYS:
-            continue
-        if strike <= 0:
-            continue
-
+    volume = chain["volume"]
+    strike = chain["strike"]
+    dte = (chain["expiry"] - np.datetime64(now.date(), "D")).astype(np.int64)
+    keep = (
+        (volume > 0)
+        & (dte >= 2)
+        & (dte <= OPTIONS_EXPIRY_MAX_DAYS)
+        & (strike > 0)
         # keep practical strikes only
-        if strike < spot * 0.55 or strike > spot * 1.45:
-            continue
-
-        oi = max(_safe_float(option.get("open_interest"), 0.0), 1.0)
-        bid = _safe_float(option.get("bid"), 0.0)
-        ask = _safe_float(option.get("ask"), 0.0)
-        last = _safe_float(option.get("last_trade_price"), 0.0)
-        iv = _safe_float(option.get("iv"), 0.0)
-
-        mid = ((bid + ask) / 2.0) if (bid > 0 and ask > 0) else max(last, bid, ask, 0.0)
-        if mid <= 0.0:
-            continue
-
-        spread = max(ask - bid, 0.0)
-        rel_fill = ((last - mid) / (spread / 2.0)) if spread > 1e-9 else 0.0
-        rel_fill = _clamp(rel_fill, -1.8, 1.8)
-
-        volume_oi_ratio = volume / oi
-        premium = max(last, mid) * volume * 100.0
-        urgency = _clamp((abs(rel_fill) * 0.45) + (volume_oi_ratio / 8.0) + (premium / 2000000.0), 0.0, 1.0)
-
-        moneyness = abs((strike / max(spot, 1e-9)) - 1.0)
-        is_otm = (side == "CALL" and strike > spot) or (side == "PUT" and strike < spot)
-
-        anomaly_score = _clamp(
-            min(volume_oi_ratio / 6.0, 1.0) * 34.0
-            + min(premium / 1500000.0, 1.0) * 28.0
-            + urgency * 18.0
-            + (10.0 if (is_otm and dte <= 30 and moneyness <= 0.12) else 0.0)
-            + min(iv / 1.5, 1.0) * 10.0,
-            0.0,
-            99.5,
-        )
-
-        quality_score = 0.0
-        if volume_oi_ratio >= 2.0:
-            quality_score += 28.0
-        if premium >= 300000:
-            quality_score += 24.0
-        if abs(rel_fill) >= 0.30:
-            quality_score += 16.0
-        if 7 <= dte <= 45:
-            quality_score += 16.0
-        if is_otm:
-            quality_score += 8.0
-        if volume >= 200:
-            quality_score += 8.0
-        quality_score = _clamp(quality_score, 0.0, 100.0)
-
-        is_footprint = bool(anomaly_score >= 58.0 and quality_score >= 48.0 and premium >= 150000.0)
+        & (strike >= spot * 0.55)
+        & (strike <= spot * 1.45)
+    )
+    bid, ask, last = chain["bid"], chain["ask"], chain["last"]
+    mid = np.where((bid > 0) & (ask > 0), (bid + ask) / 2.0, np.maximum.reduce([last, bid, ask, np.zeros_like(last)]))
+    keep &= mid > 0.0
+    idx = np.flatnonzero(keep)
+    if not idx.size:
+        return rows
 
+    volume, strike, dte, mid = volume[idx], strike[idx], dte[idx], mid[idx]
+    bid, ask, last = bid[idx], ask[idx], last[idx]
+    is_call = chain["is_call"][idx]
+    iv = chain["iv"][idx]
+    oi = np.maximum(chain["open_interest"][idx], 1.0)
+
+    spread = np.maximum(ask - bid, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rel_fill = np.where(spread > 1e-9, (last - mid) / (spread / 2.0), 0.0)
+    rel_fill = np.clip(rel_fill, -1.8, 1.8)
+    abs_fill = np.abs(rel_fill)
+
+    volume_oi_ratio = volume / oi
+    premium = np.maximum(last, mid) * volume * 100.0
+    urgency = np.clip((abs_fill * 0.45) + (volume_oi_ratio / 8.0) + (premium / 2000000.0), 0.0, 1.0)
+
+    moneyness = np.abs((strike / max(spot, 1e-9)) - 1.0)
+    is_otm = np.where(is_call, strike > spot, strike < spot)
+
+    anomaly_score = np.clip(
+        np.minimum(volume_oi_ratio / 6.0, 1.0) * 34.0
+        + np.minimum(premium / 1500000.0, 1.0) * 28.0
+        + urgency * 18.0
+        + np.where(is_otm & (dte <= 30) & (moneyness <= 0.12), 10.0, 0.0)
+        + np.minimum(iv / 1.5, 1.0) * 10.0,
+        0.0,
+        99.5,
+    )
+    quality_score = np.clip(
+        np.where(volume_oi_ratio >= 2.0, 28.0, 0.0)
+        + np.where(premium >= 300000, 24.0, 0.0)
+        + np.where(abs_fill >= 0.30, 16.0, 0.0)
+        + np.where((dte >= 7) & (dte <= 45), 16.0, 0.0)
+        + np.where(is_otm, 8.0, 0.0)
+        + np.where(volume >= 200, 8.0, 0.0),
+        0.0,
+        100.0,
+    )
+    is_footprint = (anomaly_score >= 58.0) & (quality_score >= 48.0) & (premium >= 150000.0)
+
+    # Only the top rows become dicts; stable sort keeps chain order among equal (rounded) scores.
+    top = np.argsort(-np.round(anomaly_score, 2), kind="stable")[:OPTIONS_MAX_PER_TICKER]
+    expiry = chain["expiry"][idx]
+    for i in top.tolist():
+        side = "CALL" if is_call[i] else "PUT"
+        quality = round(float(quality_score[i]), 2)
         rows.append(
             {
                 "ticker": ticker,
@@ -1351,27 +1400,25 @@ def _process_cboe_options(
                 "themes": list(themes),
                 "bias": "BULLISH" if side == "CALL" else "BEARISH",
                 "option_side": side,
-                "expiry": expiry.isoformat(),
-                "dte": dte,
-                "is_footprint": is_footprint,
-                "anomaly_score": round(anomaly_score, 2),
-                "quality_score": round(quality_score, 2),
+                "expiry": str(expiry[i]),
+                "dte": int(dte[i]),
+                "is_footprint": bool(is_footprint[i]),
+                "anomaly_score": round(float(anomaly_score[i]), 2),
+                "quality_score": quality,
                 "metrics": {
-                    "volume_oi_ratio": round(volume_oi_ratio, 2),
-                    "sweep_ratio": round(urgency, 2),
-                    "aggressive_fill_pct": round(_clamp(50.0 + abs(rel_fill) * 33.0, 0.0, 100.0), 1),
+                    "volume_oi_ratio": round(float(volume_oi_ratio[i]), 2),
+                    "sweep_ratio": round(float(urgency[i]), 2),
+                    "aggressive_fill_pct": round(_clamp(50.0 + float(abs_fill[i]) * 33.0, 0.0, 100.0), 1),
                     "call_put_skew": 1.0 if side == "CALL" else -1.0,
-                    "block_premium_usd": int(max(0.0, round(premium))),
-                    "quality_score": round(quality_score, 2),
-                    "dte": int(dte),
-                    "moneyness_pct": round(moneyness * 100.0, 2),
-                    "iv": round(iv, 4),
+                    "block_premium_usd": int(max(0.0, round(float(premium[i])))),
+                    "quality_score": quality,
+                    "dte": int(dte[i]),
+                    "moneyness_pct": round(float(moneyness[i]) * 100.0, 2),
+                    "iv": round(float(iv[i]), 4),
                 },
             }
         )
-
-    rows.sort(key=lambda row: row.get("anomaly_score", 0.0), reverse=True)
-    return rows[:OPTIONS_MAX_PER_TICKER]
+    return rows
 
 
 def _build_uoa_watchlist(
@@ -1380,6 +1427,7 @@ def _build_uoa_watchlist(
     warnings: List[str],
 ) -> List[Dict[str, Any]]:
     rows: List[Dict[str, Any]] = []
+    priority = current_priority()
 
     def _worker(ticker: str) -> Tuple[List[Dict[str, Any]], List[str]]:
         local_warnings: List[str] = []
@@ -1388,10 +1436,11 @@ def _build_uoa_watchlist(
         spot = _series_last(history_map.get(ticker) or {})
         if spot <= 0:
             return local_rows, local_warnings
-        options = _fetch_cboe_options(ticker, local_warnings)
-        if not options:
+        with priority_scope(priority):
+            chain = _get_cboe_chain(ticker, local_warnings)
+        if not chain_size(chain):
             return local_rows, local_warnings
-        local_rows.extend(_process_cboe_options(options, ticker, spot, now, themes))
+        local_rows.extend(_process_cboe_options(chain, ticker, spot, now, themes))
         return local_rows, local_warnings
 
     max_workers = max(1, min(6, len(OPTIONS_UNIVERSE)))
@@ -1840,11 +1889,11 @@ def _build_regime_timeline(
     if len(spy_ts) < 40 or len(spy_close) < 40:
         return {"status": "insufficient", "rows": [], "summary": {}}
 
-    aligned_qqq = {int(ts): close for ts, close, _, _ in _align_to_benchmark(qqq, spy)}
-    aligned_vix = {int(ts): close for ts, close, _, _ in _align_to_benchmark(vix, spy)}
-    aligned_gold = {int(ts): close for ts, close, _, _ in _align_to_benchmark(gold, spy)}
-    aligned_usd = {int(ts): close for ts, close, _, _ in _align_to_benchmark(usd, spy)}
-    aligned_btc = {int(ts): close for ts, close, _, _ in _align_to_benchmark(btc, spy)}
+    aligned_qqq = _aligned_close_by_ts(qqq, spy)
+    aligned_vix = _aligned_close_by_ts(vix, spy)
+    aligned_gold = _aligned_close_by_ts(gold, spy)
+    aligned_usd = _aligned_close_by_ts(usd, spy)
+    aligned_btc = _aligned_close_by_ts(btc, spy)
 
     rows: List[Dict[str, Any]] = []
     for i in range(25, len(spy_ts)):
@@ -2637,17 +2686,16 @@ def _build_historical_analysis_10y(
     now: datetime,
     history_map: Dict[str, Dict[str, List[float]]],
     theme_scores: List[Dict[str, Any]],
+    return_panel: Optional[ReturnPanel] = None,
 ) -> Dict[str, Any]:
+    if return_panel is None:
+        return_panel = ReturnPanel.build(history_map, BENCHMARK_TICKER)
     lookback_1y = 252
     lookback_3y = 756
     lookback_5y = 1260
     lookback_10y = 2520
 
-    spy = history_map.get("SPY") or {}
     vix = history_map.get("^VIX") or {}
-    gold = history_map.get("GLD") or {}
-    usd = history_map.get("UUP") or {}
-    btc = history_map.get("BTC-USD") or {}
 
     ranked_themes = [str(row.get("theme", "")).upper() for row in (theme_scores or [])]
     theme_order: List[str] = []
@@ -2672,8 +2720,9 @@ def _build_historical_analysis_10y(
         dd_10y = _series_max_drawdown(series, lookback_10y)
 
         daily_10y = _series_daily_returns(series, lookback_10y)
-        vol_10y = _stddev(daily_10y) * math.sqrt(252.0) if daily_10y else 0.0
-        win_1d = (sum(1 for x in daily_10y if x > 0) / len(daily_10y)) * 100.0 if daily_10y else 0.0
+        up_days_10y = int(np.count_nonzero(daily_10y > 0.0))
+        vol_10y = _stddev(daily_10y) * math.sqrt(252.0) if len(daily_10y) else 0.0
+        win_1d = (up_days_10y / len(daily_10y)) * 100.0 if len(daily_10y) else 0.0
 
         ret_20d_10y = []
         src = [_safe_float(x, 0.0) for x in closes[-lookback_10y:]]
@@ -2691,14 +2740,16 @@ def _build_historical_analysis_10y(
         best_month = max(month_profile.items(), key=lambda kv: _safe_float((kv[1] or {}).get("mean_pct"), 0.0))
         worst_month = min(month_profile.items(), key=lambda kv: _safe_float((kv[1] or {}).get("mean_pct"), 0.0))
 
-        corr_spy_10y = _series_corr(series, spy, lookback_10y)
-        corr_spy_1y = _series_corr(series, spy, lookback_1y)
-        corr_vix_10y = _series_corr(series, vix, lookback_10y)
-        corr_gold_10y = _series_corr(series, gold, lookback_10y)
-        corr_usd_10y = _series_corr(series, usd, lookback_10y)
-        corr_btc_5y = _series_corr(series, btc, lookback_5y)
-        corr_spy_stats = _series_corr_with_stats(series, spy, lookback_10y)
-        rolling_spy_corr = _series_rolling_corr(series, spy, lookback_10y, window=252, step=21)
+        corr_spy_10y = _panel_corr(return_panel, proxy, "SPY", lookback_10y)
+        corr_spy_1y = _panel_corr(return_panel, proxy, "SPY", lookback_1y)
+        corr_vix_10y = _panel_corr(return_panel, proxy, "^VIX", lookback_10y)
+        corr_gold_10y = _panel_corr(return_panel, proxy, "GLD", lookback_10y)
+        corr_usd_10y = _panel_corr(return_panel, proxy, "UUP", lookback_10y)
+        corr_btc_5y = _panel_corr(return_panel, proxy, "BTC-USD", lookback_5y)
+        corr_spy_stats = _panel_corr_with_stats(return_panel, proxy, "SPY", lookback_10y)
+        rolling_spy_corr = _moments_rolling_corr(
+            _panel_moments(return_panel, proxy, "SPY", lookback_10y), window=252, step=21
+        )
         rolling_spy_std = _stddev(rolling_spy_corr)
         rolling_spy_latest = rolling_spy_corr[-1] if rolling_spy_corr else corr_spy_1y
         corr_stability_score = _clamp(
@@ -2713,17 +2764,17 @@ def _build_historical_analysis_10y(
         else:
             corr_stability_state = "UNSTABLE"
 
-        daily_mean = _mean(daily_10y) if daily_10y else 0.0
+        daily_mean = _mean(daily_10y) if len(daily_10y) else 0.0
         daily_std = _stddev(daily_10y)
         trend_t_stat = (daily_mean / (daily_std / math.sqrt(max(1, len(daily_10y))))) if daily_std > 1e-12 else 0.0
         trend_p = _two_tail_p_from_z(trend_t_stat)
 
-        win_ratio = (sum(1 for x in daily_10y if x > 0.0) / max(1, len(daily_10y))) if daily_10y else 0.0
-        win_rate_z = ((win_ratio - 0.5) / math.sqrt(0.25 / max(1, len(daily_10y)))) if daily_10y else 0.0
+        win_ratio = (up_days_10y / max(1, len(daily_10y))) if len(daily_10y) else 0.0
+        win_rate_z = ((win_ratio - 0.5) / math.sqrt(0.25 / max(1, len(daily_10y)))) if len(daily_10y) else 0.0
         win_rate_p = _two_tail_p_from_z(win_rate_z)
 
-        tail_5 = _quantile(daily_10y, 0.05) * 100.0 if daily_10y else 0.0
-        tail_95 = _quantile(daily_10y, 0.95) * 100.0 if daily_10y else 0.0
+        tail_5 = _quantile(daily_10y, 0.05) * 100.0 if len(daily_10y) else 0.0
+        tail_95 = _quantile(daily_10y, 0.95) * 100.0 if len(daily_10y) else 0.0
 
         vix_regime = _series_vs_vix_regime_test(series, vix, lookback_10y)
         vix_spread = _safe_float(vix_regime.get("spread_daily_pct"), 0.0)
@@ -2822,13 +2873,13 @@ def _build_historical_analysis_10y(
         sb = history_map.get(b) or {}
         if not sa.get("close") or not sb.get("close"):
             continue
-        c10_stats = _series_corr_with_stats(sa, sb, lookback_10y)
-        c1_stats = _series_corr_with_stats(sa, sb, lookback_1y)
+        c10_stats = _panel_corr_with_stats(return_panel, a, b, lookback_10y)
+        c1_stats = _panel_corr_with_stats(return_panel, a, b, lookback_1y)
         c10 = _safe_float(c10_stats.get("corr"), 0.0)
         c1 = _safe_float(c1_stats.get("corr"), 0.0)
         corr_delta = c1 - c10
         p10 = _safe_float(c10_stats.get("p_value"), 1.0)
-        rolling_corr = _series_rolling_corr(sa, sb, lookback_10y, window=252, step=21)
+        rolling_corr = _moments_rolling_corr(_panel_moments(return_panel, a, b, lookback_10y), window=252, step=21)
         rolling_std = _stddev(rolling_corr)
         rolling_latest = rolling_corr[-1] if rolling_corr else c1
         rolling_min = min(rolling_corr) if rolling_corr else c10
@@ -3284,148 +3335,541 @@ def _build_degraded_payload(
     }
 
 
+def _adopt_entry(entry: "shared_cache.SharedEntry") -> None:
+    _CACHE["ts"] = datetime.fromtimestamp(entry.stored_at, tz=timezone.utc)
+    _CACHE["payload"] = entry.value
+
+
+def cached_positioning_age(now: Optional[datetime] = None) -> Optional[float]:
+    """Seconds since this worker's cached payload was built (None when empty)."""
+    cache_ts = _CACHE.get("ts")
+    if not isinstance(cache_ts, datetime) or _CACHE.get("payload") is None:
+        return None
+    return ((now or datetime.now(timezone.utc)) - cache_ts).total_seconds()
+
+
+def _entry_meta(now: datetime, max_age_seconds: float = CACHE_TTL_SECONDS) -> Optional[Dict[str, Any]]:
+    age = cached_positioning_age(now)
+    if age is None or age >= max_age_seconds:
+        return None
+    return {"hit": True, "age_seconds": int(max(0.0, age)), "ttl_seconds": CACHE_TTL_SECONDS}
+
+
+def cached_positioning_entry(
+    now: Optional[datetime] = None,
+    max_age_seconds: float = CACHE_TTL_SECONDS,
+) -> Optional[Tuple[FrozenPayload, Dict[str, Any]]]:
+    """
+    (FrozenPayload, cache block) while a fresh payload exists in this worker or was
+    published by another one, else None.
+    """
+    now = now or datetime.now(timezone.utc)
+    meta = _entry_meta(now, max_age_seconds)
+    if meta is None:
+        shared = shared_cache.get(SHARED_CACHE_KEY, max_age_seconds)
+        if shared is None:
+            return None
+        _adopt_entry(shared)
+        meta = _entry_meta(now, max_age_seconds)
+        if meta is None:
+            return None
+    return _CACHE["payload"], meta
+
+
+def get_cached_positioning(now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+    """Fresh cached payload (read-only nested values shared with the cache), or None."""
+    entry = cached_positioning_entry(now)
+    if entry is None:
+        return None
+    frozen, meta = entry
+    return frozen.view(cache=meta)
+
+
+def build_positioning_entry(
+    deep_report: Dict[str, Any],
+    multi_snapshot: Dict[str, Any],
+    projections: List[Dict[str, Any]],
+    now: Optional[datetime] = None,
+    max_age_seconds: float = CACHE_TTL_SECONDS,
+) -> Union[Tuple[FrozenPayload, Dict[str, Any]], Dict[str, Any]]:
+    """
+    (FrozenPayload, cache block) for a cached or freshly computed payload, or the
+    degraded / partial payload dict (never cached). Across workers the 12y analysis runs once:
+    the others wait for it and adopt the published payload. A `max_age_seconds`
+    below the TTL rebuilds an entry ahead of its expiry (cache warmer).
+    """
+    now = now or datetime.now(timezone.utc)
+    cached = cached_positioning_entry(now, max_age_seconds)
+    if cached is not None:
+        return cached
+
+    entry = shared_cache.compute(
+        SHARED_CACHE_KEY,
+        CACHE_TTL_SECONDS,
+        lambda: _compute_positioning(deep_report, multi_snapshot, projections, now),
+        publish_if=lambda value: isinstance(value, FrozenPayload),
+        max_age_seconds=max_age_seconds,
+    )
+    if not isinstance(entry.value, FrozenPayload):
+        return entry.value
+    _adopt_entry(entry)
+    if entry.origin == "shared":
+        return entry.value, {"hit": True, "age_seconds": int(entry.age()), "ttl_seconds": CACHE_TTL_SECONDS}
+    _CACHE["ts"] = now
+    return entry.value, {"hit": False, "age_seconds": 0, "ttl_seconds": CACHE_TTL_SECONDS}
+
+
 def build_smart_money_positioning(
     deep_report: Dict[str, Any],
     multi_snapshot: Dict[str, Any],
     projections: List[Dict[str, Any]],
     now: Optional[datetime] = None,
 ) -> Dict[str, Any]:
+    result = build_positioning_entry(deep_report, multi_snapshot, projections, now)
+    if isinstance(result, tuple):
+        frozen, meta = result
+        return frozen.view(cache=meta)
+    return result
+
+
+def _build_summary(
+    theme_scores: List[Dict[str, Any]],
+    macro_filter: Dict[str, Any],
+    cross_asset_flags: List[Dict[str, Any]],
+    uoa_watchlist: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    top_theme = theme_scores[0] if theme_scores else {}
+    top_three = theme_scores[:3]
+
+    global_score = (
+        sum(_safe_float(row.get("composite_score"), 0.0) for row in top_three) / max(len(top_three), 1)
+        if top_three
+        else 0.0
+    )
+    global_aggressive = (
+        sum(_safe_float(row.get("aggressive_score"), 0.0) for row in top_three) / max(len(top_three), 1)
+        if top_three
+        else 0.0
+    )
+    global_conservative = (
+        sum(_safe_float(row.get("conservative_score"), 0.0) for row in top_three) / max(len(top_three), 1)
+        if top_three
+        else 0.0
+    )
+    global_barbell = (
+        sum(_safe_float(row.get("barbell_score"), 0.0) for row in top_three) / max(len(top_three), 1)
+        if top_three
+        else 0.0
+    )
+
+    if global_score >= 74:
+        global_state = "INSTITUTIONAL_POSITIONING_STRONG"
+    elif global_score >= 60:
+        global_state = "POSITIONING_BUILDING"
+    elif global_score >= 46:
+        global_state = "EARLY_SIGNAL_CLUSTER"
+    else:
+        global_state = "NO_CLEAR_CLUSTER"
+
+    active_flags = [row for row in cross_asset_flags if row.get("active")]
+
+    return {
+        "global_score": round(global_score, 2),
+        "aggressive_score": round(global_aggressive, 2),
+        "conservative_score": round(global_conservative, 2),
+        "barbell_score": round(global_barbell, 2),
+        "state": global_state,
+        "top_theme": top_theme.get("theme"),
+        "top_theme_score": top_theme.get("composite_score"),
+        "macro_regime": macro_filter.get("regime"),
+        "active_cross_asset_flags": len(active_flags),
+        "uoa_events": len(uoa_watchlist),
+        "message": (
+            f"Smart money cluster su {top_theme.get('theme', 'N/A')} | "
+            f"barbell {round(_safe_float(top_theme.get('barbell_score'), 0.0), 1)} "
+            f"(agg {round(_safe_float(top_theme.get('aggressive_score'), 0.0), 1)} / "
+            f"cons {round(_safe_float(top_theme.get('conservative_score'), 0.0), 1)}) "
+            f"in regime macro {macro_filter.get('regime', 'MIXED')}."
+        ),
+    }
+
+
+def _build_uoa_stage(
+    history_map: Dict[str, Dict[str, List[float]]],
+    now: datetime,
+    warnings: List[str],
+    signals: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    return _inject_deep_signal_proxies(signals, _build_uoa_watchlist(history_map, now, warnings))
+
+
+def _build_return_panel(history_map: Dict[str, Dict[str, List[float]]]) -> ReturnPanel:
+    return ReturnPanel.build(history_map, BENCHMARK_TICKER)
+
+
+def _positioning_graph(
+    now: datetime,
+    multi_snapshot: Dict[str, Any],
+    projections: List[Dict[str, Any]],
+) -> StageGraph:
+    """
+    Payload builders as stages over the seed context (history_map, now, warnings, signals,
+    overlay, multi_snapshot, deep_report). Each section stage falls back to its degraded
+    payload block, so a failing builder only blanks its own section. Built per run, so the
+    fallbacks see this run's inputs.
+    """
+
+    def _section(name: str):
+        def _fallback(values: Dict[str, Any], exc: BaseException) -> Any:
+            return _build_degraded_payload(now, multi_snapshot, projections, f"{name} failed: {exc}")[name]
+
+        return _fallback
+
+    def stage(name: str, fn: Any, inputs: Tuple[str, ...], cpu_bound: bool = False, fallback: Any = None) -> Stage:
+        return Stage(name, fn, inputs, fallback=fallback or _section(name), cpu_bound=cpu_bound)
+
+    return StageGraph(
+        [
+            stage("return_panel", _build_return_panel, ("history_map",), fallback=lambda values, exc: None),
+            stage("uoa_watchlist", _build_uoa_stage, ("history_map", "now", "warnings", "signals")),
+            stage("theme_uoa", _aggregate_uoa_by_theme, ("uoa_watchlist",), fallback=lambda values, exc: {}),
+            stage("sector_rotation", _build_sector_rotation, ("history_map",), cpu_bound=True),
+            stage("cross_asset_flags", _build_cross_asset_flags, ("history_map",)),
+            stage(
+                "macro_filter",
+                _build_macro_filter,
+                ("multi_snapshot", "overlay", "cross_asset_flags", "history_map", "now"),
+            ),
+            stage(
+                "theme_scores",
+                _aggregate_theme_scores,
+                ("theme_uoa", "sector_rotation", "cross_asset_flags", "macro_filter"),
+            ),
+            stage("news_lag_model", _build_news_lag_model, ("theme_scores", "now")),
+            stage(
+                "data_quality",
+                _build_data_quality,
+                ("now", "history_map", "uoa_watchlist", "cross_asset_flags", "warnings"),
+            ),
+            stage("explainability", _build_explainability, ("theme_scores", "macro_filter")),
+            stage("regime_timeline", _build_regime_timeline, ("history_map", "now"), cpu_bound=True),
+            stage("alert_engine", _build_alert_engine, ("now", "theme_scores", "cross_asset_flags", "macro_filter")),
+            stage("validation_lab", _build_validation_lab, ("theme_scores",)),
+            stage("theme_drilldown", _build_theme_drilldown, ("theme_scores", "uoa_watchlist", "cross_asset_flags")),
+            stage("macro_event_overlay", _build_macro_event_overlay, ("now", "macro_filter", "cross_asset_flags")),
+            stage("lead_lag_radar", _build_lead_lag_radar, ("now", "theme_scores", "news_lag_model")),
+            stage(
+                "signal_decay_monitor",
+                _build_signal_decay_monitor,
+                ("now", "theme_scores", "news_lag_model", "macro_filter"),
+            ),
+            stage(
+                "regime_switch_detector",
+                _build_regime_switch_detector,
+                ("now", "regime_timeline", "cross_asset_flags", "macro_filter"),
+            ),
+            stage("counterfactual_lab", _build_counterfactual_lab, ("now", "theme_scores", "macro_filter")),
+            stage(
+                "execution_risk_overlay",
+                _build_execution_risk_overlay,
+                ("now", "theme_scores", "uoa_watchlist", "macro_filter"),
+            ),
+            stage(
+                "narrative_saturation_meter",
+                _build_narrative_saturation_meter,
+                ("now", "theme_scores", "deep_report", "macro_filter"),
+            ),
+            stage(
+                "historical_analysis_10y",
+                _build_historical_analysis_10y,
+                ("now", "history_map", "theme_scores", "return_panel"),
+                cpu_bound=True,
+            ),
+            stage("summary", _build_summary, ("theme_scores", "macro_filter", "cross_asset_flags", "uoa_watchlist")),
+        ]
+    )
+
+
+def _stage_process_pool() -> Optional[ProcessPoolExecutor]:
+    """Shared spawn-context pool for `cpu_bound` stages; None unless STAGE_PROCESSES > 0."""
+    if STAGE_PROCESSES <= 0:
+        return None
+    pool = _STAGE_POOL.get("pool")
+    if pool is None:
+        pool = _STAGE_POOL["pool"] = ProcessPoolExecutor(
+            max_workers=STAGE_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return pool
+
+
+def _stage_context(
+    deep_report: Dict[str, Any],
+    multi_snapshot: Dict[str, Any],
+    history_map: Dict[str, Dict[str, List[float]]],
+    now: datetime,
+    warnings: List[str],
+) -> Dict[str, Any]:
+    """Seed values of `_positioning_graph`."""
+    return {
+        "history_map": history_map,
+        "now": now,
+        "warnings": warnings,
+        "signals": list(deep_report.get("signals") or []),
+        "overlay": deep_report.get("risk_exposure") or {},
+        "multi_snapshot": multi_snapshot,
+        "deep_report": deep_report,
+    }
+
+
+def _section_ttl(name: str) -> int:
+    return SECTION_TTL_SECONDS.get(name, CACHE_TTL_SECONDS)
+
+
+def _theme_ranking(theme_scores: List[Dict[str, Any]]) -> Tuple[str, ...]:
+    return tuple(str(row.get("theme", "")).upper() for row in (theme_scores or []))
+
+
+# What a section actually reads from an input, where that is less than the whole value:
+# the 10y analysis only orders themes by the ranking and profiles the current day.
+_SECTION_INPUT_KEYS: Dict[Tuple[str, str], Any] = {
+    ("historical_analysis_10y", "theme_scores"): _theme_ranking,
+    ("historical_analysis_10y", "now"): lambda now: now.date().isoformat(),
+}
+
+
+def _input_key(name: str, dep: str, value: Any) -> Any:
+    narrow = _SECTION_INPUT_KEYS.get((name, dep))
+    if narrow is not None:
+        return narrow(value)
+    return hashlib.blake2b(payload_dumps(value), digest_size=16).hexdigest()
+
+
+def _section_inputs(graph: StageGraph, name: str) -> List[str]:
+    """
+    Inputs a cached `name` is keyed on: the sections it reads, directly or through
+    intermediate stages, plus seeds with a narrowed key. Other seeds (history) age out
+    with the section TTL.
+    """
+    out: List[str] = []
+    seen: Set[str] = set()
+    stack = list(graph.stages[name].inputs)
+    while stack:
+        dep = stack.pop()
+        if dep in seen:
+            continue
+        seen.add(dep)
+        if dep in SECTIONS or (name, dep) in _SECTION_INPUT_KEYS:
+            out.append(dep)
+        elif dep in graph.stages:
+            stack.extend(graph.stages[dep].inputs)
+    return sorted(out)
+
+
+def _fresh_entries(now: datetime) -> Dict[str, Tuple[datetime, Any, Dict[str, Any]]]:
+    """Cached sections within their TTL whose input sections are cached, fresh and unchanged."""
+    entries = dict(_SECTION_CACHE)
+    fresh: Dict[str, bool] = {}
+
+    def _is_fresh(name: str) -> bool:
+        if name not in fresh:
+            entry = entries.get(name)
+            fresh[name] = (
+                entry is not None
+                and (now - entry[0]).total_seconds() < _section_ttl(name)
+                and all(
+                    _input_key(name, dep, now) == key
+                    if dep == "now"
+                    else dep in entries and _is_fresh(dep) and _input_key(name, dep, entries[dep][1]) == key
+                    for dep, key in entry[2].items()
+                )
+            )
+        return fresh[name]
+
+    return {name: entry for name, entry in entries.items() if _is_fresh(name)}
+
+
+def _fresh_sections(names: Iterable[str], now: datetime) -> Dict[str, Any]:
+    entries = _fresh_entries(now)
+    return {name: entries[name][1] for name in names if name in entries}
+
+
+def _section_reuse(now: datetime):
+    """`reuse` callback for StageGraph.run: long-lived sections built from the same inputs."""
+    entries = dict(_SECTION_CACHE)
+
+    def _reuse(name: str, values: Dict[str, Any]) -> Any:
+        entry = entries.get(name)
+        if name not in SECTION_TTL_SECONDS or entry is None:
+            return MISS
+        if (now - entry[0]).total_seconds() >= _section_ttl(name):
+            return MISS
+        if all(dep in values and _input_key(name, dep, values[dep]) == key for dep, key in entry[2].items()):
+            return entry[1]
+        return MISS
+
+    return _reuse
+
+
+def _store_sections(graph: StageGraph, run: StageRun, now: datetime) -> None:
+    """Caches the sections built in `run`, except failed ones and anything downstream of them."""
+    tainted = set(run.errors)
+    for name in graph.plan():
+        if any(dep in tainted for dep in graph.stages[name].inputs):
+            tainted.add(name)
+    for name in run.durations_ms:
+        if name in SECTIONS and name not in tainted:
+            values = {**run.outputs, "now": now}
+            basis = {dep: _input_key(name, dep, values[dep]) for dep in _section_inputs(graph, name)}
+            _SECTION_CACHE[name] = (now, run.outputs[name], basis)
+
+
+def select_sections(raw: str) -> Tuple[str, ...]:
+    """Comma-separated section names, deduplicated in request order. ValueError on unknown ones."""
+    names = list(dict.fromkeys(part.strip() for part in str(raw or "").split(",") if part.strip()))
+    unknown = [name for name in names if name not in SECTIONS]
+    if unknown:
+        raise ValueError(f"unknown sections: {', '.join(unknown)}")
+    if not names:
+        raise ValueError("no sections requested")
+    return tuple(names)
+
+
+def _sections_payload(status: str, now: datetime, values: Dict[str, Any], computed: List[str]) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {"status": status, "generated_at": now.isoformat()}
+    payload.update(values)
+    payload["cache"] = {
+        "hit": not computed,
+        "computed": computed,
+        "ttl_seconds": {name: _section_ttl(name) for name in values},
+    }
+    return payload
+
+
+def cached_positioning_sections(
+    sections: Sequence[str],
+    now: Optional[datetime] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    The requested sections when each is fresh in the section cache, or else all of them
+    from a fresh full payload; None when something has to be built.
+    """
     now = now or datetime.now(timezone.utc)
+    values = _fresh_sections(sections, now)
+    if len(values) < len(sections):
+        entry = cached_positioning_entry(now)
+        if entry is None:
+            return None
+        data = entry[0].view()
+        values = {name: data[name] for name in sections}
+    return _sections_payload("active", now, {name: values[name] for name in sections}, [])
 
-    cache_ts = _CACHE.get("ts")
-    cache_payload = _CACHE.get("payload")
-    if isinstance(cache_ts, datetime) and cache_payload:
-        age = (now - cache_ts).total_seconds()
-        if age < CACHE_TTL_SECONDS:
-            payload = copy.deepcopy(cache_payload)
-            payload["cache"] = {"hit": True, "age_seconds": int(age), "ttl_seconds": CACHE_TTL_SECONDS}
-            return payload
 
+def build_positioning_sections(
+    deep_report: Dict[str, Any],
+    multi_snapshot: Dict[str, Any],
+    projections: List[Dict[str, Any]],
+    sections: Sequence[str],
+    now: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    Only `sections` (see `select_sections`): fresh cached sections stand in for their
+    stages, only the builders the rest depend on run, and history is downloaded only
+    when one of them reads it. Degraded results are returned but not cached.
+    """
+    now = now or datetime.now(timezone.utc)
+    cached = cached_positioning_sections(sections, now)
+    if cached is not None:
+        return cached
+
+    warnings: List[str] = []
+    graph = _positioning_graph(now, multi_snapshot, projections)
+    seed = _fresh_sections(SECTIONS, now)
+    history_map: Dict[str, Dict[str, List[float]]] = {}
+    if any("history_map" in graph.stages[name].inputs for name in graph.plan(sections, available=seed)):
+        history_map = _download_history_map(MARKET_TICKERS, warnings)
+        if not history_map:
+            degraded = _build_degraded_payload(now, multi_snapshot, projections, "unable to load historical market data")
+            values = {name: seed.get(name, degraded[name]) for name in sections}
+            return _sections_payload("degraded", now, values, [name for name in sections if name not in seed])
+
+    run = graph.run(
+        {**_stage_context(deep_report, multi_snapshot, history_map, now, warnings), **seed},
+        targets=sections,
+        max_workers=STAGE_MAX_WORKERS,
+        process_pool=_stage_process_pool(),
+        reuse=_section_reuse(now),
+    )
+    _store_sections(graph, run, now)
+    payload = _sections_payload(
+        "degraded" if run.errors else "active",
+        now,
+        {name: run.outputs[name] for name in sections},
+        list(run.durations_ms) + list(run.errors),
+    )
+    payload["stages"] = {
+        "timings_ms": {name: round(ms, 2) for name, ms in run.durations_ms.items()},
+        "errors": dict(run.errors),
+        "reused": list(run.reused),
+        "warnings": warnings[:10],
+    }
+    return payload
+
+
+def _compute_positioning(
+    deep_report: Dict[str, Any],
+    multi_snapshot: Dict[str, Any],
+    projections: List[Dict[str, Any]],
+    now: datetime,
+) -> Union[FrozenPayload, Dict[str, Any]]:
     warnings: List[str] = []
-    signals = list(deep_report.get("signals") or [])
-    overlay = deep_report.get("risk_exposure") or {}
 
     try:
         history_map = _download_history_map(MARKET_TICKERS, warnings)
         if not history_map:
             return _build_degraded_payload(now, multi_snapshot, projections, "unable to load historical market data")
-
-        uoa_watchlist = _build_uoa_watchlist(history_map, now, warnings)
-        uoa_watchlist = _inject_deep_signal_proxies(signals, uoa_watchlist)
-        theme_uoa = _aggregate_uoa_by_theme(uoa_watchlist)
-
-        sector_rotation = _build_sector_rotation(history_map)
-        cross_asset_flags = _build_cross_asset_flags(history_map)
-        macro_filter = _build_macro_filter(
-            multi_snapshot=multi_snapshot,
-            overlay=overlay,
-            cross_asset_flags=cross_asset_flags,
-            history_map=history_map,
-            now=now,
-        )
-
-        theme_scores = _aggregate_theme_scores(
-            theme_uoa=theme_uoa,
-            sector_rotation=sector_rotation,
-            cross_asset_flags=cross_asset_flags,
-            macro_filter=macro_filter,
-        )
-        lag_model = _build_news_lag_model(theme_scores, now)
-        data_quality = _build_data_quality(now, history_map, uoa_watchlist, cross_asset_flags, warnings)
-        explainability = _build_explainability(theme_scores, macro_filter)
-        regime_timeline = _build_regime_timeline(history_map, now)
-        alert_engine = _build_alert_engine(now, theme_scores, cross_asset_flags, macro_filter)
-        validation_lab = _build_validation_lab(theme_scores)
-        theme_drilldown = _build_theme_drilldown(theme_scores, uoa_watchlist, cross_asset_flags)
-        macro_event_overlay = _build_macro_event_overlay(now, macro_filter, cross_asset_flags)
-        lead_lag_radar = _build_lead_lag_radar(now, theme_scores, lag_model)
-        signal_decay_monitor = _build_signal_decay_monitor(now, theme_scores, lag_model, macro_filter)
-        regime_switch_detector = _build_regime_switch_detector(now, regime_timeline, cross_asset_flags, macro_filter)
-        counterfactual_lab = _build_counterfactual_lab(now, theme_scores, macro_filter)
-        execution_risk_overlay = _build_execution_risk_overlay(now, theme_scores, uoa_watchlist, macro_filter)
-        narrative_saturation_meter = _build_narrative_saturation_meter(now, theme_scores, deep_report, macro_filter)
-        historical_analysis_10y = _build_historical_analysis_10y(now, history_map, theme_scores)
-
-        top_theme = theme_scores[0] if theme_scores else {}
-        top_three = theme_scores[:3]
-
-        global_score = (
-            sum(_safe_float(row.get("composite_score"), 0.0) for row in top_three) / max(len(top_three), 1)
-            if top_three
-            else 0.0
-        )
-        global_aggressive = (
-            sum(_safe_float(row.get("aggressive_score"), 0.0) for row in top_three) / max(len(top_three), 1)
-            if top_three
-            else 0.0
-        )
-        global_conservative = (
-            sum(_safe_float(row.get("conservative_score"), 0.0) for row in top_three) / max(len(top_three), 1)
-            if top_three
-            else 0.0
+        graph = _positioning_graph(now, multi_snapshot, projections)
+        run = graph.run(
+            _stage_context(deep_report, multi_snapshot, history_map, now, warnings),
+            max_workers=STAGE_MAX_WORKERS,
+            process_pool=_stage_process_pool(),
+            reuse=_section_reuse(now),
         )
-        global_barbell = (
-            sum(_safe_float(row.get("barbell_score"), 0.0) for row in top_three) / max(len(top_three), 1)
-            if top_three
-            else 0.0
-        )
-
-        if global_score >= 74:
-            global_state = "INSTITUTIONAL_POSITIONING_STRONG"
-        elif global_score >= 60:
-            global_state = "POSITIONING_BUILDING"
-        elif global_score >= 46:
-            global_state = "EARLY_SIGNAL_CLUSTER"
-        else:
-            global_state = "NO_CLEAR_CLUSTER"
-
-        active_flags = [row for row in cross_asset_flags if row.get("active")]
+        _store_sections(graph, run, now)
+        sections = run.outputs
+        for name, error in run.errors.items():
+            warnings.append(f"stage {name} degraded: {error}")
+        uoa_watchlist = sections["uoa_watchlist"]
+        data_quality = dict(sections["data_quality"])
+        data_quality["stage_timings_ms"] = {name: round(ms, 2) for name, ms in run.durations_ms.items()}
+        data_quality["stage_errors"] = dict(run.errors)
+        data_quality["stage_reused"] = sorted(run.reused)
         active_projection_assets = [p.get("asset") for p in (projections or [])[:6] if p.get("asset")]
 
-        summary = {
-            "global_score": round(global_score, 2),
-            "aggressive_score": round(global_aggressive, 2),
-            "conservative_score": round(global_conservative, 2),
-            "barbell_score": round(global_barbell, 2),
-            "state": global_state,
-            "top_theme": top_theme.get("theme"),
-            "top_theme_score": top_theme.get("composite_score"),
-            "macro_regime": macro_filter.get("regime"),
-            "active_cross_asset_flags": len(active_flags),
-            "uoa_events": len(uoa_watchlist),
-            "message": (
-                f"Smart money cluster su {top_theme.get('theme', 'N/A')} | "
-                f"barbell {round(_safe_float(top_theme.get('barbell_score'), 0.0), 1)} "
-                f"(agg {round(_safe_float(top_theme.get('aggressive_score'), 0.0), 1)} / "
-                f"cons {round(_safe_float(top_theme.get('conservative_score'), 0.0), 1)}) "
-                f"in regime macro {macro_filter.get('regime', 'MIXED')}."
-            ),
-        }
-
         payload = {
             "status": "active",
             "generated_at": now.isoformat(),
-            "summary": summary,
-            "macro_filter": macro_filter,
-            "theme_scores": theme_scores,
+            "summary": sections["summary"],
+            "macro_filter": sections["macro_filter"],
+            "theme_scores": sections["theme_scores"],
             "uoa_watchlist": uoa_watchlist,
-            "sector_rotation": sector_rotation,
-            "cross_asset_flags": cross_asset_flags,
-            "news_lag_model": lag_model,
+            "sector_rotation": sections["sector_rotation"],
+            "cross_asset_flags": sections["cross_asset_flags"],
+            "news_lag_model": sections["news_lag_model"],
             "data_quality": data_quality,
-            "explainability": explainability,
-            "regime_timeline": regime_timeline,
-            "alert_engine": alert_engine,
-            "validation_lab": validation_lab,
-            "theme_drilldown": theme_drilldown,
-            "macro_event_overlay": macro_event_overlay,
-            "lead_lag_radar": lead_lag_radar,
-            "signal_decay_monitor": signal_decay_monitor,
-            "regime_switch_detector": regime_switch_detector,
-            "counterfactual_lab": counterfactual_lab,
-            "execution_risk_overlay": execution_risk_overlay,
-            "narrative_saturation_meter": narrative_saturation_meter,
-            "historical_analysis_10y": historical_analysis_10y,
+            "explainability": sections["explainability"],
+            "regime_timeline": sections["regime_timeline"],
+            "alert_engine": sections["alert_engine"],
+            "validation_lab": sections["validation_lab"],
+            "theme_drilldown": sections["theme_drilldown"],
+            "macro_event_overlay": sections["macro_event_overlay"],
+            "lead_lag_radar": sections["lead_lag_radar"],
+            "signal_decay_monitor": sections["signal_decay_monitor"],
+            "regime_switch_detector": sections["regime_switch_detector"],
+            "counterfactual_lab": sections["counterfactual_lab"],
+            "execution_risk_overlay": sections["execution_risk_overlay"],
+            "narrative_saturation_meter": sections["narrative_saturation_meter"],
+            "historical_analysis_10y": sections["historical_analysis_10y"],
             "active_projection_assets": active_projection_assets,
             "data_coverage": {
                 "history_period": HISTORY_RANGE,
@@ -3462,8 +3906,10 @@ def build_smart_money_positioning(
             "cache": {"hit": False, "age_seconds": 0, "ttl_seconds": CACHE_TTL_SECONDS},
         }
 
-        _CACHE["ts"] = now
-        _CACHE["payload"] = copy.deepcopy(payload)
-        return payload
+        if run.errors:
+            # Fallback sections stand in for failed stages: serve this caller, never cache.
+            payload["status"] = "partial"
+            return payload
+        return FrozenPayload(payload, exclude=("cache",))
     except Exception as exc:
         return _build_degraded_payload(now, multi_snapshot, projections, f"runtime failure: {exc}")
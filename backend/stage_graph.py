@@ -0,0 +1,155 @@
+"""
+stage_graph.py
+
+Small dependency-graph executor for multi-stage payload builders.
+- each Stage declares its inputs (seed context values or other stages' outputs, passed
+  positionally in that order) and produces one output under its own name
+- a stage starts as soon as its inputs exist: independent stages run concurrently on a
+  thread pool (context variables such as the upstream priority carry over); stages
+  marked `cpu_bound` go to a process pool when one is supplied (function and inputs
+  must then be picklable)
+- a failing stage with a `fallback` yields `fallback(values, exc)` instead and its
+  dependents run on that, so one broken section does not take the payload down; a
+  stage without fallback is critical and its error propagates
+- `targets` runs only the stages those outputs need; a seed value named after a stage
+  (e.g. a cached section) stands in for that stage, which then does not run
+- a `reuse(name, values)` callback is asked once a stage's inputs exist and may return
+  a cached output for them instead of `MISS`; reused stages are listed, not timed
+- per-stage durations (ms, measured where the stage ran) and errors come with the outputs
+"""
+from __future__ import annotations
+
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+
+class Stage:
+    __slots__ = ("name", "fn", "inputs", "fallback", "cpu_bound")
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[..., Any],
+        inputs: Sequence[str] = (),
+        fallback: Optional[Callable[[Dict[str, Any], BaseException], Any]] = None,
+        cpu_bound: bool = False,
+    ):
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.fallback = fallback
+        self.cpu_bound = cpu_bound
+
+
+# Returned by a `reuse` callback when the stage has to run.
+MISS = object()
+
+
+class StageRun(NamedTuple):
+    outputs: Dict[str, Any]
+    durations_ms: Dict[str, float]
+    errors: Dict[str, str]
+    reused: Tuple[str, ...] = ()
+
+
+def _timed_call(fn: Callable[..., Any], args: Tuple[Any, ...]) -> Tuple[Any, float]:
+    # Module level so process pools can pickle it.
+    started = time.perf_counter()
+    value = fn(*args)
+    return value, (time.perf_counter() - started) * 1000.0
+
+
+class StageGraph:
+    def __init__(self, stages: Iterable[Stage]):
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"duplicate stage {stage.name}")
+            self.stages[stage.name] = stage
+
+    def plan(self, targets: Optional[Iterable[str]] = None, available: Iterable[str] = ()) -> List[str]:
+        """Stages to run for `targets` (default: all), each after its dependencies; `available` ones are skipped."""
+        wanted = list(self.stages) if targets is None else list(targets)
+        order: List[str] = []
+        state: Dict[str, int] = {name: 2 for name in available}  # 1 visiting, 2 done
+
+        def _visit(name: str) -> None:
+            if name not in self.stages or state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"stage cycle through {name}")
+            state[name] = 1
+            for dep in self.stages[name].inputs:
+                _visit(dep)
+            state[name] = 2
+            order.append(name)
+
+        for name in wanted:
+            if name not in self.stages:
+                raise KeyError(f"unknown stage {name}")
+            _visit(name)
+        return order
+
+    def run(
+        self,
+        context: Dict[str, Any],
+        targets: Optional[Iterable[str]] = None,
+        max_workers: int = 4,
+        process_pool: Optional[Executor] = None,
+        reuse: Optional[Callable[[str, Dict[str, Any]], Any]] = None,
+    ) -> StageRun:
+        order = self.plan(targets, available=context)
+        values: Dict[str, Any] = dict(context)
+        for name in order:
+            missing = [dep for dep in self.stages[name].inputs if dep not in self.stages and dep not in values]
+            if missing:
+                raise KeyError(f"stage {name} needs {', '.join(missing)}")
+
+        pending = list(order)
+        running: Dict[Future, str] = {}
+        durations: Dict[str, float] = {}
+        errors: Dict[str, str] = {}
+        reused: List[str] = []
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="stage") as pool:
+            try:
+                while pending or running:
+                    for name in [n for n in pending if all(dep in values for dep in self.stages[n].inputs)]:
+                        stage = self.stages[name]
+                        pending.remove(name)
+                        cached = MISS if reuse is None else reuse(name, values)
+                        if cached is not MISS:
+                            values[name] = cached
+                            reused.append(name)
+                            continue
+                        args = tuple(values[dep] for dep in stage.inputs)
+                        if stage.cpu_bound and process_pool is not None:
+                            future = process_pool.submit(_timed_call, stage.fn, args)
+                        else:
+                            future = pool.submit(contextvars.copy_context().run, _timed_call, stage.fn, args)
+                        running[future] = name
+                    if not running:
+                        continue  # everything ready was reused; its dependents may be ready now
+                    done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name = running.pop(future)
+                        stage = self.stages[name]
+                        try:
+                            values[name], durations[name] = future.result()
+                        except Exception as exc:
+                            if stage.fallback is None:
+                                raise
+                            errors[name] = f"{type(exc).__name__}: {exc}"
+                            values[name] = stage.fallback(values, exc)
+            except BaseException:
+                for future in running:
+                    future.cancel()
+                raise
+        outputs = {name: values[name] for name in self.stages if name in values}
+        return StageRun(
+            outputs,
+            {name: durations[name] for name in order if name in durations},
+            errors,
+            tuple(reused),
+        )
@@ -20,6 +20,11 @@ from zoneinfo import ZoneInfo
 import pandas as pd
 import yfinance as yf
 
+try:
+    from .rate_limiter import acquire_budget
+except ImportError:  # pragma: no cover - script/local import fallback
+    from rate_limiter import acquire_budget
+
 logger = logging.getLogger("summary_forensics")
 
 DATA_DIR = Path(__file__).parent / "data_summaries"
@@ -117,6 +122,8 @@ def _normalize_ohlc_frame(df, ticker: Optional[str] = None):
 
 def _latest_5m_candle(ticker: str) -> Dict:
     # Small fetch window keeps runtime light.
+    if not acquire_budget("yahoo"):
+        return {}
     df = yf.download(
         tickers=ticker,
         period="2d",
@@ -316,6 +323,8 @@ def _eval_after_summary(direction: str, start_price: Optional[float], candles_df
 
 def _fetch_5m_window(ticker: str, start_utc: datetime, end_utc: datetime):
     # Fetch a compact window and slice locally for stability across yfinance versions.
+    if not acquire_budget("yahoo"):
+        return None
     df = yf.download(
         tickers=ticker,
         period="7d",
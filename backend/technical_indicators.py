@@ -0,0 +1,269 @@
+"""
+technical_indicators.py
+
+In-process technical indicator engine (replaces remote TradingView TA lookups).
+- vectorized RSI / MACD / stochastics / CCI / Williams %R / momentum / ATR on OHLC arrays
+- TradingView-style votes: oscillators + SMA/EMA(10..200) price-vs-average
+- recommendation semantics match tradingview_ta (Recommend.All thresholds)
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+RSI_PERIOD = 14
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGNAL = 9
+STOCH_K = 14
+STOCH_SMOOTH = 3
+CCI_PERIOD = 20
+WILLIAMS_PERIOD = 14
+MOMENTUM_PERIOD = 10
+ATR_PERIOD = 14
+MA_PERIODS = (10, 20, 30, 50, 100, 200)
+
+BUY = "BUY"
+SELL = "SELL"
+NEUTRAL = "NEUTRAL"
+
+
+def _as_array(values: Sequence[float]) -> np.ndarray:
+    return np.asarray(values, dtype=float)
+
+
+def _ema(values: np.ndarray, span: int) -> np.ndarray:
+    return pd.Series(values).ewm(span=span, adjust=False).mean().to_numpy()
+
+
+def _wilder(values: np.ndarray, period: int) -> np.ndarray:
+    return pd.Series(values).ewm(alpha=1.0 / period, adjust=False).mean().to_numpy()
+
+
+def _ema_last(values: np.ndarray, span: int) -> float:
+    """Last value of `_ema` as one dot product (only the vote needs it)."""
+    alpha = 2.0 / (span + 1.0)
+    n = values.size
+    weights = alpha * (1.0 - alpha) ** np.arange(n - 1, -1, -1)
+    weights[0] = (1.0 - alpha) ** (n - 1)  # seed term: adjust=False starts from the first value
+    return float(np.dot(weights, values))
+
+
+def _rolling(values: np.ndarray, period: int, how: str) -> np.ndarray:
+    out = np.full(values.size, np.nan)
+    if values.size >= period:
+        windows = np.lib.stride_tricks.sliding_window_view(values, period)
+        out[period - 1:] = getattr(windows, how)(axis=1)
+    return out
+
+
+def rsi(close: Sequence[float], period: int = RSI_PERIOD) -> np.ndarray:
+    """Wilder RSI; the first `period` values are NaN."""
+    close = _as_array(close)
+    delta = np.diff(close, prepend=np.nan)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    gain[0] = loss[0] = 0.0
+    avg_gain = _wilder(gain[1:], period)
+    avg_loss = _wilder(loss[1:], period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        out = np.where(avg_loss == 0, 100.0, 100.0 - (100.0 / (1.0 + rs)))
+    out = np.concatenate([[np.nan], out])
+    out[:period] = np.nan
+    return out
+
+
+def macd(
+    close: Sequence[float],
+    fast: int = MACD_FAST,
+    slow: int = MACD_SLOW,
+    signal: int = MACD_SIGNAL,
+) -> Tuple[np.ndarray, np.ndarray]:
+    close = _as_array(close)
+    line = _ema(close, fast) - _ema(close, slow)
+    return line, _ema(line, signal)
+
+
+def stochastic(
+    high: Sequence[float],
+    low: Sequence[float],
+    close: Sequence[float],
+    period: int = STOCH_K,
+    smooth: int = STOCH_SMOOTH,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Slow stochastic (%K smoothed, %D = SMA of %K), as shown by TradingView Stoch(14,3,3)."""
+    high, low, close = _as_array(high), _as_array(low), _as_array(close)
+    hh = _rolling(high, period, "max")
+    ll = _rolling(low, period, "min")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        raw = np.where(hh > ll, (close - ll) / (hh - ll) * 100.0, 50.0)
+    raw[np.isnan(hh)] = np.nan
+    k = _rolling(raw, smooth, "mean")
+    return k, _rolling(k, smooth, "mean")
+
+
+def cci(high: Sequence[float], low: Sequence[float], close: Sequence[float], period: int = CCI_PERIOD) -> np.ndarray:
+    tp = (_as_array(high) + _as_array(low) + _as_array(close)) / 3.0
+    sma = _rolling(tp, period, "mean")
+    mad = np.full_like(tp, np.nan)
+    if tp.size >= period:
+        windows = np.lib.stride_tricks.sliding_window_view(tp, period)
+        mad[period - 1:] = np.abs(windows - windows.mean(axis=1, keepdims=True)).mean(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(mad > 0, (tp - sma) / (0.015 * mad), 0.0)
+    out[np.isnan(mad)] = np.nan
+    return out
+
+
+def williams_r(
+    high: Sequence[float],
+    low: Sequence[float],
+    close: Sequence[float],
+    period: int = WILLIAMS_PERIOD,
+) -> np.ndarray:
+    hh = _rolling(_as_array(high), period, "max")
+    ll = _rolling(_as_array(low), period, "min")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(hh > ll, (hh - _as_array(close)) / (hh - ll) * -100.0, -50.0)
+    out[np.isnan(hh)] = np.nan
+    return out
+
+
+def momentum(close: Sequence[float], period: int = MOMENTUM_PERIOD) -> np.ndarray:
+    close = _as_array(close)
+    out = np.full_like(close, np.nan)
+    out[period:] = close[period:] - close[:-period]
+    return out
+
+
+def atr(high: Sequence[float], low: Sequence[float], close: Sequence[float], period: int = ATR_PERIOD) -> np.ndarray:
+    """Simple-average true range (same definition as the price feed's ATR)."""
+    high, low, close = _as_array(high), _as_array(low), _as_array(close)
+    prev_close = np.concatenate([[np.nan], close[:-1]])
+    tr = np.nanmax(np.vstack([high - low, np.abs(high - prev_close), np.abs(low - prev_close)]), axis=0)
+    return _rolling(tr, period, "mean")
+
+
+def recommend_from_value(value: float) -> str:
+    """tradingview_ta Compute.Recommend thresholds."""
+    if value < -0.5:
+        return "STRONG_SELL"
+    if value < -0.1:
+        return SELL
+    if value <= 0.1:
+        return NEUTRAL
+    if value <= 0.5:
+        return BUY
+    return "STRONG_BUY"
+
+
+def _ma_vote(ma_value: float, price: float) -> str:
+    if ma_value < price:
+        return BUY
+    if ma_value > price:
+        return SELL
+    return NEUTRAL
+
+
+def _oscillator_votes(values: Dict[str, Tuple[float, float]]) -> Dict[str, str]:
+    """Each entry is (current, previous); rules mirror tradingview_ta Compute.*."""
+    votes: Dict[str, str] = {}
+    r, r1 = values["rsi"]
+    if not np.isnan(r1):
+        votes["RSI"] = BUY if (r < 30 and r1 < r) else SELL if (r > 70 and r1 > r) else NEUTRAL
+    (k, k1), (d, d1) = values["stoch_k"], values["stoch_d"]
+    if not np.isnan(d1):
+        if k < 20 and d < 20 and k > d and k1 < d1:
+            votes["Stoch.K"] = BUY
+        elif k > 80 and d > 80 and k < d and k1 > d1:
+            votes["Stoch.K"] = SELL
+        else:
+            votes["Stoch.K"] = NEUTRAL
+    c, c1 = values["cci"]
+    if not np.isnan(c1):
+        votes["CCI"] = BUY if (c < -100 and c > c1) else SELL if (c > 100 and c < c1) else NEUTRAL
+    m, s = values["macd"]
+    votes["MACD"] = BUY if m > s else SELL if m < s else NEUTRAL
+    mom, mom1 = values["momentum"]
+    if not np.isnan(mom1):
+        votes["Mom"] = BUY if mom > mom1 else SELL if mom < mom1 else NEUTRAL
+    w, _ = values["williams_r"]
+    if not np.isnan(w):
+        votes["W.R"] = BUY if w < -80 else SELL if w > -20 else NEUTRAL
+    return votes
+
+
+def _group_value(votes: Dict[str, str]) -> float:
+    if not votes:
+        return 0.0
+    buys = sum(1 for v in votes.values() if v == BUY)
+    sells = sum(1 for v in votes.values() if v == SELL)
+    return (buys - sells) / len(votes)
+
+
+def compute_technicals(
+    high: Sequence[float],
+    low: Sequence[float],
+    close: Sequence[float],
+) -> Dict[str, Any]:
+    """
+    Compute the fields previously taken from TradingView (rsi, macd, stoch_k, recommendation,
+    buy/sell votes) plus ATR and the individual votes, from one OHLC bar set.
+    """
+    high, low, close = _as_array(high), _as_array(low), _as_array(close)
+    if close.size < 2:
+        return {}
+    price = float(close[-1])
+    rsi_v = rsi(close)
+    macd_line, macd_signal = macd(close)
+    stoch_k, stoch_d = stochastic(high, low, close)
+    cci_v = cci(high, low, close)
+    wr_v = williams_r(high, low, close)
+    mom_v = momentum(close)
+    atr_v = atr(high, low, close)
+
+    def _pair(arr: np.ndarray) -> Tuple[float, float]:
+        return float(arr[-1]), float(arr[-2])
+
+    oscillators = _oscillator_votes(
+        {
+            "rsi": _pair(rsi_v),
+            "stoch_k": _pair(stoch_k),
+            "stoch_d": _pair(stoch_d),
+            "cci": _pair(cci_v),
+            "macd": (float(macd_line[-1]), float(macd_signal[-1])),
+            "momentum": _pair(mom_v),
+            "williams_r": _pair(wr_v),
+        }
+    )
+    moving_averages: Dict[str, str] = {}
+    for period in MA_PERIODS:
+        if close.size >= period:
+            moving_averages[f"SMA{period}"] = _ma_vote(float(close[-period:].mean()), price)
+            moving_averages[f"EMA{period}"] = _ma_vote(_ema_last(close, period), price)
+
+    all_votes = list(oscillators.values()) + list(moving_averages.values())
+    recommend_value = (_group_value(oscillators) + _group_value(moving_averages)) / 2.0
+
+    def _clean(value: float, default: float) -> float:
+        return default if np.isnan(value) else round(value, 6)
+
+    return {
+        "rsi": _clean(float(rsi_v[-1]), 50.0),
+        "macd": _clean(float(macd_line[-1]), 0.0),
+        "macd_signal": _clean(float(macd_signal[-1]), 0.0),
+        "stoch_k": _clean(float(stoch_k[-1]), 50.0),
+        "stoch_d": _clean(float(stoch_d[-1]), 50.0),
+        "atr": _clean(float(atr_v[-1]), price * 0.01),
+        "recommendation": recommend_from_value(recommend_value),
+        "recommend_value": round(recommend_value, 4),
+        "buy_votes": sum(1 for v in all_votes if v == BUY),
+        "sell_votes": sum(1 for v in all_votes if v == SELL),
+        "neutral_votes": sum(1 for v in all_votes if v == NEUTRAL),
+        "votes": {"oscillators": oscillators, "moving_averages": moving_averages},
+        "bars": int(close.size),
+    }
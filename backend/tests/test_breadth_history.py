@@ -0,0 +1,139 @@
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+import breadth_history
+import server
+
+
+def _set_tmp_store(monkeypatch, tmp_path):
+    monkeypatch.setattr(breadth_history, "HISTORY_FILE", tmp_path / "breadth_history.json")
+    monkeypatch.setattr(breadth_history, "_STORE", None)
+
+
+def _buckets(n, end=None):
+    end = end or datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    end = end.replace(hour=end.hour - (end.hour % 4))
+    return [(end - timedelta(hours=4 * (n - 1 - i))).strftime("%Y-%m-%d %H:%M") for i in range(n)]
+
+
+def test_store_upserts_and_persists(monkeypatch, tmp_path):
+    _set_tmp_store(monkeypatch, tmp_path)
+    assert breadth_history.record_reading("SP500", "2026-01-02 12:00", 61.234, 55.0) is True
+    assert breadth_history.record_reading("SP500", "2026-01-02 08:00", 60.0, 54.0) is True
+    assert breadth_history.record_reading("SP500", "2026-01-02 12:00", 62.0, 56.0) is False
+    assert breadth_history.merge_prices("SP500", [{"date": "2026-01-02 12:00", "price": 6000.0}, {"date": None, "price": 1.0}]) == 1
+
+    monkeypatch.setattr(breadth_history, "_STORE", None)  # reload from disk
+    readings = breadth_history.readings("SP500")
+    assert list(readings) == ["2026-01-02 08:00", "2026-01-02 12:00"]
+    assert readings["2026-01-02 12:00"] == {"above_ma50_pct": 62.0, "above_ma200_pct": 56.0}
+    assert breadth_history.price_history("SP500", 10) == [{"date": "2026-01-02 12:00", "price": 6000.0}]
+    assert breadth_history.history_status()["indices"]["SP500"]["readings"] == 2
+
+
+def test_breadth_fetch_runs_concurrently_and_models_only_missing_points(monkeypatch, tmp_path):
+    _set_tmp_store(monkeypatch, tmp_path)
+    active, peak, lock = [0], [0], threading.Lock()
+    ranges = []
+
+    def _barchart(symbol):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return {"pct": 64.0 if "FI" in symbol else 58.0, "trade_time": "2026-01-02T16:00:00"}
+
+    def _prices(symbol, max_points, range_param):
+        ranges.append((symbol, range_param))
+        return [{"date": d, "price": 100.0 + i} for i, d in enumerate(_buckets(max_points))], True
+
+    modeled_calls = []
+    real_model = server._build_modeled_breadth_history
+
+    def _model(*args):
+        modeled_calls.append(1)
+        return real_model(*args)
+
+    monkeypatch.setattr(server, "_fetch_barchart_indicator_value", _barchart)
+    monkeypatch.setattr(server, "_fetch_index_price_history", _prices)
+    monkeypatch.setattr(server, "_build_modeled_breadth_history", _model)
+
+    payload = server._fetch_market_breadth_payload()
+    assert peak[0] >= 4
+    sp = payload["indices"]["SP500"]
+    assert sp["above_ma50"]["pct"] == 64.0 and len(sp["history"]) == server.BREADTH_HISTORY_POINTS
+    assert sp["history_observed_points"] == 1 and sp["history"][-1]["observed"] is True
+    assert sp["history"][-1]["above_ma50_pct"] == 64.0
+    assert {"XAUUSD", "EURUSD"} <= set(payload["indices"])
+    assert len(modeled_calls) == 2
+
+    # Warm store: only the recent range is refetched.
+    ranges.clear()
+    server._fetch_market_breadth_payload()
+    assert {r for _, r in ranges} == {server.BREADTH_INCREMENTAL_RANGE}
+
+    # Every bucket observed: the price model is skipped entirely.
+    modeled_calls.clear()
+    for bucket in _buckets(server.BREADTH_HISTORY_POINTS):
+        breadth_history.record_reading("SP500", bucket, 50.0, 50.0)
+        breadth_history.record_reading("NAS100", bucket, 50.0, 50.0)
+    payload = server._fetch_market_breadth_payload()
+    assert modeled_calls == []
+    assert payload["indices"]["NAS100"]["history_observed_points"] == server.BREADTH_HISTORY_POINTS
+
+
+def test_daily_fallback_prices_are_not_persisted(monkeypatch, tmp_path):
+    _set_tmp_store(monkeypatch, tmp_path)
+    daily = [{"date": f"2026-01-{day:02d} 00:00", "price": 6000.0 + day} for day in range(1, 11)]
+    monkeypatch.setattr(server, "_fetch_index_price_history", lambda symbol, max_points, range_param: (daily, False))
+
+    assert server._load_breadth_prices("SP500", 10, "6mo") == daily
+    assert breadth_history.price_history("SP500", 10) == []
+
+    intraday = [{"date": "2026-01-10 12:00", "price": 6010.5}]
+    monkeypatch.setattr(server, "_fetch_index_price_history", lambda symbol, max_points, range_param: (intraday, True))
+    assert server._load_breadth_prices("SP500", 10, "6mo") == intraday
+    # The store holds 4h buckets only; a later daily fallback does not displace them.
+    monkeypatch.setattr(server, "_fetch_index_price_history", lambda symbol, max_points, range_param: (daily, False))
+    assert server._load_breadth_prices("SP500", 10, "6mo") == intraday
+
+
+def test_merge_models_only_the_unobserved_buckets(monkeypatch, tmp_path):
+    _set_tmp_store(monkeypatch, tmp_path)
+    buckets = _buckets(8)
+    prices = [{"date": d, "price": 100.0 + i} for i, d in enumerate(buckets)]
+    # Observed: 2, 3 and 6; gaps at 0-1 (leading), 4-5 (between readings) and 7 (trailing).
+    for idx, (ma50, ma200) in {2: (40.0, 30.0), 3: (44.0, 32.0), 6: (56.0, 38.0)}.items():
+        breadth_history.record_reading("SP500", buckets[idx], ma50, ma200)
+
+    model_segments = []
+    real_model = server._build_modeled_breadth_history
+
+    def _model(ma50, ma200, segment):
+        model_segments.append([p["date"] for p in segment])
+        return real_model(ma50, ma200, segment)
+
+    monkeypatch.setattr(server, "_build_modeled_breadth_history", _model)
+    history = server._merge_breadth_history("SP500", 60.0, 40.0, prices)
+
+    assert [row["date"] for row in history] == buckets
+    assert [row["observed"] for row in history] == [False, False, True, True, False, False, True, False]
+    assert [(row["above_ma50_pct"], row["above_ma200_pct"]) for row in history if row["observed"]] == [
+        (40.0, 30.0),
+        (44.0, 32.0),
+        (56.0, 38.0),
+    ]
+    # Only the leading gap runs the price model, anchored on the first reading after it.
+    assert model_segments == [buckets[:3]]
+    assert [row["above_ma50_pct"] for row in history[4:6]] == [48.0, 52.0]
+    assert (history[7]["above_ma50_pct"], history[7]["above_ma200_pct"]) == (58.0, 39.0)
@@ -0,0 +1,67 @@
+import asyncio
+
+from backend import cache_warmer
+from backend.ttl_cache import TTLCache
+
+
+def _tick():
+    async def _run():
+        tasks = await cache_warmer.tick()
+        await asyncio.gather(*tasks)
+        return len(tasks)
+
+    return asyncio.run(_run())
+
+
+def test_refreshes_read_entries_ahead_of_expiry_and_honors_pause(monkeypatch):
+    monkeypatch.setattr(cache_warmer, "_REGISTRY", {})
+    collection = [(True, "active")]
+    monkeypatch.setattr(cache_warmer, "can_collect_now", lambda: collection[0])
+
+    cache = TTLCache("warm_test", ttl_seconds=120)
+    calls = []
+
+    def _loader(max_age):
+        calls.append(max_age)
+        return len(calls)
+
+    target = cache_warmer.register_ttl_cache(cache, _loader)
+    idle = cache_warmer.register("idle", 60, age=lambda: None, refresh=lambda max_age: calls.append("idle"))
+
+    # Never read: nothing to keep warm.
+    assert _tick() == 0
+    target.touch()
+    assert target.stats["cold_reads"] == 1
+    cache.set("latest", 0)
+    target.touch()
+    assert target.stats["warm_reads"] == 1
+
+    # Fresh entry: left alone until its remaining lifetime drops below the lead.
+    assert _tick() == 0 and calls == []
+    cache._entries["latest"] = (cache._entries["latest"][0] - 110, 0)
+    collection[0] = (False, "market_closed")
+    assert _tick() == 0 and target.stats["paused_skips"] == 1
+
+    collection[0] = (True, "active")
+    assert _tick() == 1
+    assert cache.peek() == 1 and cache.age() < 1
+    assert calls == [120 - target.lead_seconds()]
+    status = cache_warmer.cache_warmer_status()["targets"]["warm_test"]
+    assert status["refreshes"] == 1 and status["recompute_ms"]["last"] is not None
+    assert status["warm_ratio"] == 0.5 and not idle.active()
+
+
+def test_failed_refresh_keeps_current_entry(monkeypatch):
+    monkeypatch.setattr(cache_warmer, "_REGISTRY", {})
+    monkeypatch.setattr(cache_warmer, "can_collect_now", lambda: (True, "active"))
+    cache = TTLCache("warm_failing", ttl_seconds=60)
+    cache.set("latest", "old")
+
+    def _loader(max_age):
+        raise RuntimeError("upstream down")
+
+    target = cache_warmer.register_ttl_cache(cache, _loader)
+    target.touch()
+    cache._entries["latest"] = (cache._entries["latest"][0] - 59, "old")
+    assert _tick() == 1
+    assert cache.peek() == "old" and target.stats["errors"] == 1 and not target.status()["inflight"]
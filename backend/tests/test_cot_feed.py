@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+
+from backend import cot_feed as feed
+
+
+FIN_LINES = [
+    '"NASDAQ-100 STOCK INDEX (MINI) - CHICAGO MERCANTILE EXCHANGE",260224,2026-02-24,209742,CME,00,209,1000,0,0,0,900,100',
+    '"NASDAQ-100 CONSOLIDATED - CHICAGO MERCANTILE EXCHANGE",260224,2026-02-24,209742,CME,00,209,250000,0,0,0,120000,20000',
+    '"S&P 500 CONSOLIDATED - CHICAGO MERCANTILE EXCHANGE",260224,2026-02-24,13874+,CME,00,13874+,2000000,0,0,0,900000,300000',
+    '"EURO FX - CHICAGO MERCANTILE EXCHANGE",260224,2026-02-24,099741,CME,00,099,700000,0,0,0,400000,100000',
+]
+FUT_LINES = [
+    '"GOLD - COMMODITY EXCHANGE INC.",260224,2026-02-24,088691,CMX,00,088,500000,0,0,0,0,0,0,200000,50000',
+]
+
+
+class _FakeResponse:
+    def __init__(self, status_code=200, lines=None, headers=None):
+        self.status_code = status_code
+        self._lines = lines or []
+        self.headers = headers or {}
+        self.encoding = "utf-8"
+        self.lines_read = 0
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def iter_lines(self, decode_unicode=False):
+        for line in self._lines:
+            self.lines_read += 1
+            yield line
+
+    def close(self):
+        pass
+
+
+def _set_tmp_cache(tmp_path: Path):
+    feed.CACHE_FILE = tmp_path / "cot_live_cache.json"
+    feed._STATE = None
+
+
+def _install_fake_get(monkeypatch, status_code=200):
+    calls = []
+
+    def _fake_get(url, headers=None, timeout=None, stream=False):
+        calls.append({"url": url, "headers": dict(headers or {})})
+        lines = FIN_LINES if url.endswith("FinComWk.txt") else FUT_LINES
+        return _FakeResponse(status_code, lines, {"Last-Modified": "Fri, 27 Feb 2026 20:30:00 GMT"})
+
+    monkeypatch.setattr(feed.requests, "get", _fake_get)
+    return calls
+
+
+def test_release_calendar_is_friday_1530_new_york():
+    # Wednesday -> previous Friday release, next Friday release
+    now = datetime(2026, 3, 4, 12, 0, tzinfo=timezone.utc)
+    assert feed.last_release_at(now) == datetime(2026, 2, 27, 20, 30, tzinfo=timezone.utc)
+    assert feed.next_release_at(now) == datetime(2026, 3, 6, 20, 30, tzinfo=timezone.utc)
+    # After US DST switch the release is 19:30 UTC
+    later = datetime(2026, 3, 20, 19, 45, tzinfo=timezone.utc)
+    assert feed.last_release_at(later) == datetime(2026, 3, 20, 19, 30, tzinfo=timezone.utc)
+    assert feed.expected_as_of_date(now) == "2026-02-24"
+
+
+def test_match_report_lines_skips_mini_and_stops_early():
+    response = _FakeResponse(lines=FIN_LINES + ['"UNRELATED",x'] * 50)
+    matched = feed.match_report_lines(response.iter_lines(), feed.COT_REPORTS["FinComWk"]["targets"])
+    assert set(matched) == {"NAS100", "SP500", "EURUSD"}
+    assert matched["NAS100"][7] == "250000"
+    assert response.lines_read == len(FIN_LINES)
+
+
+def test_snapshot_served_from_cache_between_releases(tmp_path, monkeypatch):
+    _set_tmp_cache(tmp_path)
+    calls = _install_fake_get(monkeypatch)
+
+    now = datetime(2026, 2, 28, 10, 0, tzinfo=timezone.utc)
+    snap = feed.get_cot_snapshot(now)
+    assert len(calls) == 2
+    assert snap["symbols"]["NAS100"]["net"] == 100000
+    assert snap["symbols"]["XAUUSD"]["participant"] == "managed_money"
+    assert feed.CACHE_FILE.exists()
+
+    # Cold process, same week: rows come from disk, no network.
+    feed._STATE = None
+    later = datetime(2026, 3, 4, 10, 0, tzinfo=timezone.utc)
+    snap_2 = feed.get_cot_snapshot(later)
+    assert len(calls) == 2
+    assert snap_2["symbols"]["EURUSD"]["net_pct_oi"] == round(300000 / 700000 * 100.0, 2)
+
+
+def test_due_release_sends_conditional_request(tmp_path, monkeypatch):
+    _set_tmp_cache(tmp_path)
+    _install_fake_get(monkeypatch)
+    feed.refresh_if_due(datetime(2026, 2, 28, 10, 0, tzinfo=timezone.utc))
+
+    calls = _install_fake_get(monkeypatch, status_code=304)
+    result = feed.refresh_if_due(datetime(2026, 3, 6, 21, 0, tzinfo=timezone.utc))
+    assert result["reports"] == {"FinComWk": "not_modified", "deafut": "not_modified"}
+    assert all(c["headers"].get("If-Modified-Since") for c in calls)
+    snap = feed._snapshot_from_state(feed._load_state(), datetime(2026, 3, 6, 21, 0, tzinfo=timezone.utc))
+    assert snap["symbols"]["SP500"]["long"] == 900000
+
+
+
+def test_concurrent_stale_reads_start_one_background_refresh(tmp_path, monkeypatch):
+    import threading
+
+    _set_tmp_cache(tmp_path)
+    _install_fake_get(monkeypatch)
+    feed.refresh_if_due(datetime(2026, 2, 28, 10, 0, tzinfo=timezone.utc))
+    due = datetime(2026, 3, 6, 21, 0, tzinfo=timezone.utc)
+    barrier = threading.Barrier(8)
+    readers = [threading.Thread(target=lambda: (barrier.wait(), feed.get_cot_snapshot(due))) for _ in range(8)]
+
+    started = []
+
+    class _PendingRefresh:
+        # Never runs, so the refresh stays in flight while the readers race.
+        def __init__(self, target=None, name=None, daemon=None):
+            self.name = name
+
+        def start(self):
+            started.append(self.name)
+
+    monkeypatch.setattr(feed.threading, "Thread", _PendingRefresh)
+    try:
+        for reader in readers:
+            reader.start()
+        for reader in readers:
+            reader.join()
+    finally:
+        feed._REFRESH_INFLIGHT.release()
+    assert started == ["cot-refresh"]
+
+
+def test_snapshot_is_served_while_a_refresh_downloads(tmp_path, monkeypatch):
+    import threading
+
+    _set_tmp_cache(tmp_path)
+    _install_fake_get(monkeypatch)
+    fresh = datetime(2026, 2, 28, 10, 0, tzinfo=timezone.utc)
+    feed.refresh_if_due(fresh)
+
+    in_fetch, release = threading.Event(), threading.Event()
+
+    def _slow_get(url, headers=None, timeout=None, stream=False):
+        in_fetch.set()
+        release.wait(10)
+        return _FakeResponse(304)
+
+    monkeypatch.setattr(feed.requests, "get", _slow_get)
+    refresher = threading.Thread(target=feed.refresh_if_due, kwargs={"now": fresh, "force": True})
+    refresher.start()
+    try:
+        assert in_fetch.wait(5)
+        snapshots = []
+        reader = threading.Thread(target=lambda: snapshots.append(feed.get_cot_snapshot(fresh)))
+        reader.start()
+        reader.join(2)
+        assert not reader.is_alive(), "reader blocked behind the CFTC download"
+        assert snapshots[0]["symbols"]["SP500"]["long"] == 900000
+    finally:
+        release.set()
+        refresher.join(10)
+    assert feed._load_state()["reports"]["FinComWk"]["last_status"] == "not_modified"
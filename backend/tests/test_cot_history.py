@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import zipfile
+from datetime import date, timedelta
+from pathlib import Path
+
+from backend import cot_history as history
+
+
+HEADER = '"Market_and_Exchange_Names","As_of_Date_In_Form_YYMMDD","Report_Date_as_YYYY-MM-DD","CFTC_Contract_Market_Code"'
+
+
+def _set_tmp_store(tmp_path: Path):
+    history.HISTORY_FILE = tmp_path / "cot_history.json"
+    history.ARCHIVE_DIR = tmp_path / "cot_archives"
+    history._STORE = None
+    history._DATE_INDEX.clear()
+
+
+def _fin_line(day: date, am_long: int, am_short: int, oi: int = 1_000_000) -> str:
+    return (
+        f'"NASDAQ-100 CONSOLIDATED - CHICAGO MERCANTILE EXCHANGE",{day:%y%m%d},{day.isoformat()},209742,CME,00,209,'
+        f"{oi},0,0,0,{am_long},{am_short}"
+    )
+
+
+def _write_archive(tmp_path: Path, weeks: int) -> Path:
+    start = date(2023, 1, 3)
+    lines = [HEADER]
+    for i in range(weeks):
+        lines.append(_fin_line(start + timedelta(days=7 * i), 100_000 + (i * 1_000), 50_000))
+    path = tmp_path / "com_fin_txt_2023.zip"
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("FinComYY.txt", "\n".join(lines))
+    return path
+
+
+def test_archive_ingest_builds_indexes_once(tmp_path):
+    _set_tmp_store(tmp_path)
+    archive = _write_archive(tmp_path, weeks=60)
+
+    result = history.ingest_archive_file(archive)
+    assert result["report"] == "FinComWk"
+    assert result["weeks"] == {"NAS100": 60}
+    assert history.ingest_archive_file(archive)["status"] == "skipped"
+
+    pos = history.get_positioning("NAS100")
+    assert pos["history_weeks"] == 60
+    assert pos["current"]["net"] == 100_000 + (59 * 1_000) - 50_000
+    # Monotonic rising net: latest week sits at the top of the 52w window.
+    assert pos["current"]["net_percentile_52w"] > 98.0
+    assert pos["current"]["net_zscore_52w"] > 1.5
+    assert pos["extreme_52w"] == "extreme_long"
+    assert pos["current"]["net_pct_oi_percentile_156w"] is None
+    assert pos["net_change"] == 1_000
+    assert len(pos["previous"]) == 4
+
+
+def test_weekly_append_and_point_lookup(tmp_path):
+    _set_tmp_store(tmp_path)
+    history.ingest_archive_file(_write_archive(tmp_path, weeks=30))
+    last_day = history.get_positioning("NAS100")["current"]["as_of_date"]
+    next_day = (date.fromisoformat(last_day) + timedelta(days=7)).isoformat()
+
+    snapshot = {
+        "symbols": {
+            "NAS100": {
+                "as_of_date": next_day,
+                "open_interest": 1_000_000,
+                "long": 10_000,
+                "short": 60_000,
+                "net": -50_000,
+                "net_pct_oi": -5.0,
+                "participant": "asset_manager",
+                "report": "FinComWk",
+            }
+        }
+    }
+    assert history.append_snapshot(snapshot)["appended"] == {"NAS100": 1}
+    assert history.append_snapshot(snapshot)["appended"] == {"NAS100": 0}
+
+    history._STORE = None  # reload from disk
+    pos = history.get_positioning("NAS100")
+    assert pos["current"]["as_of_date"] == next_day
+    assert pos["extreme_52w"] == "extreme_short"
+    older = history.get_positioning("NAS100", as_of_date=last_day)
+    assert older["current"]["net"] == 100_000 + (29 * 1_000) - 50_000
+    assert history.get_positioning("NAS100", as_of_date="1999-01-05") is None
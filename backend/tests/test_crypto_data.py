@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from backend import crypto_data
+
+
+def _fresh_state(monkeypatch):
+    monkeypatch.setattr(crypto_data, "_CACHES", {name: crypto_data._cache(name) for name in crypto_data.FRESH_TTL_SECONDS})
+    monkeypatch.setattr(crypto_data, "_BATCHER", crypto_data.MarketsBatcher(window_seconds=0.01))
+    monkeypatch.setattr(crypto_data, "_STALE_FALLBACKS", {name: 0 for name in crypto_data.FRESH_TTL_SECONDS})
+    monkeypatch.setattr(crypto_data, "acquire_budget", lambda *args, **kwargs: True)
+
+
+def test_failed_refresh_falls_back_to_last_good_payload(monkeypatch):
+    _fresh_state(monkeypatch)
+    responses = [{"data": {"active_cryptocurrencies": 1}}]
+
+    async def _request(path, params=None):
+        if not responses:
+            raise RuntimeError("upstream down")
+        return responses.pop(0)
+
+    monkeypatch.setattr(crypto_data, "_request", _request)
+    cache = crypto_data._CACHES["global"]
+
+    async def _run():
+        assert await crypto_data.get_global() == {"active_cryptocurrencies": 1}
+        # Past the stale window too: the failed load still serves the last good payload.
+        cache.ttl_seconds = cache.stale_seconds = 0.0
+        return await crypto_data.get_global()
+
+    assert asyncio.run(_run()) == {"active_cryptocurrencies": 1}
+    status = crypto_data.crypto_cache_status()["caches"]["global"]
+    assert status["errors"] == 1 and status["stale_fallbacks"] == 1
+
+
+def test_concurrent_misses_coalesce_into_one_call(monkeypatch):
+    _fresh_state(monkeypatch)
+    calls = []
+
+    async def _request(path, params=None):
+        calls.append(path)
+        await asyncio.sleep(0.01)
+        return {"data": {"active_cryptocurrencies": 1}}
+
+    monkeypatch.setattr(crypto_data, "_request", _request)
+
+    async def _run():
+        return await asyncio.gather(*(crypto_data.get_global() for _ in range(10)))
+
+    results = asyncio.run(_run())
+    assert calls == ["/global"]
+    assert all(r == {"active_cryptocurrencies": 1} for r in results)
+    stats = crypto_data._CACHES["global"].status()
+    assert stats["misses"] == 1 and stats["coalesced"] == 9
+
+
+def test_coin_lookups_batch_through_markets_ids(monkeypatch):
+    _fresh_state(monkeypatch)
+    calls = []
+
+    async def _request(path, params=None):
+        calls.append((path, dict(params or {})))
+        if params.get("ids"):
+            return [{"id": coin_id, "current_price": 1.0} for coin_id in params["ids"].split(",") if coin_id != "nope"]
+        return [{"id": "bitcoin", "current_price": 2.0}]
+
+    monkeypatch.setattr(crypto_data, "_request", _request)
+
+    async def _run():
+        await crypto_data.get_top_markets()
+        rows = await crypto_data.get_coins(["ethereum", "solana", "bitcoin", "nope", "solana"])
+        with pytest.raises(crypto_data.UnknownCoin):
+            await crypto_data.get_coin("nope")
+        return rows
+
+    rows = asyncio.run(_run())
+    assert [row["id"] for row in rows] == ["ethereum", "solana", "bitcoin"]
+    # bitcoin came from the top-30 rows; the rest shared one ids= request.
+    id_calls = [params["ids"] for path, params in calls if params.get("ids")]
+    assert id_calls[0] == "ethereum,nope,solana"
+    assert crypto_data._BATCHER.status()["batches"] == len(id_calls)
+
+
+def test_budget_denial_is_counted_and_surfaces_without_cache(monkeypatch):
+    _fresh_state(monkeypatch)
+    monkeypatch.setattr(crypto_data, "acquire_budget", lambda *args, **kwargs: False)
+    before = crypto_data._UPSTREAM_STATS["budget_denied"]
+
+    with pytest.raises(crypto_data.CryptoDataUnavailable):
+        asyncio.run(crypto_data.get_chart("bitcoin", 7))
+
+    status = crypto_data.crypto_cache_status()
+    assert status["upstream"]["budget_denied"] == before + 1
+    assert status["calls_per_minute_budget"] == 30
+    assert status["caches"]["charts"]["entries"] == 0
+
+
+def test_large_batch_requests_one_page_with_every_id(monkeypatch):
+    _fresh_state(monkeypatch)
+    calls = []
+
+    async def _request(path, params=None):
+        calls.append(dict(params))
+        ids = params["ids"].split(",")
+        # CoinGecko pages /coins/markets: rows past per_page (default 100) are not returned.
+        return [{"id": coin_id} for coin_id in ids[: int(params.get("per_page", 100))]]
+
+    monkeypatch.setattr(crypto_data, "_request", _request)
+    coin_ids = [f"coin-{i:03d}" for i in range(180)]
+
+    rows = asyncio.run(crypto_data.get_coins(coin_ids))
+
+    assert [row["id"] for row in rows] == coin_ids
+    assert len(calls) == 1
+    assert calls[0]["per_page"] == 180 and calls[0]["page"] == 1
+
+
+def test_coin_route_defaults_to_the_full_document(monkeypatch):
+    from backend import crypto_service
+
+    _fresh_state(monkeypatch)
+    calls = []
+
+    async def _request(path, params=None):
+        calls.append((path, dict(params or {})))
+        if path == "/coins/markets":
+            return [{"id": "bitcoin", "current_price": 1.0}]
+        return {"id": "bitcoin", "description": {"en": "..."}, "tickers": []}
+
+    monkeypatch.setattr(crypto_data, "_request", _request)
+
+    full = asyncio.run(crypto_service.get_coin_details("bitcoin"))
+    row = asyncio.run(crypto_service.get_coin_details("bitcoin", summary=True))
+
+    assert full["tickers"] == [] and "description" in full
+    assert calls[0] == ("/coins/bitcoin", crypto_data.COIN_DOCUMENT_PARAMS)
+    assert row == {"id": "bitcoin", "current_price": 1.0}
@@ -0,0 +1,43 @@
+import sys
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+import deep_research_30
+import local_vault_matrix
+import shared_cache
+
+
+def test_report_is_rebuilt_only_when_the_data_version_changes(monkeypatch, tmp_path):
+    loads = []
+    version = [(1, 100)]
+
+    def _evaluations():
+        loads.append(1)
+        return []
+
+    monkeypatch.setattr(shared_cache, "_STORE", shared_cache.FileStore(tmp_path))
+    monkeypatch.setattr(deep_research_30, "_CACHE", {"version": None, "payload": None})
+    monkeypatch.setattr(local_vault_matrix, "evaluations_version", lambda: version[0])
+    monkeypatch.setattr(local_vault_matrix, "get_matrix_evaluations", _evaluations)
+    monkeypatch.setattr(local_vault_matrix, "get_matrix_results", lambda: {})
+
+    first = deep_research_30.build_deep_research_report()
+    assert first["status"] == "collecting"
+    assert deep_research_30.build_deep_research_report() is first
+    assert len(loads) == 1
+
+    # Another worker with an empty local cache adopts the published report.
+    monkeypatch.setattr(deep_research_30, "_CACHE", {"version": None, "payload": None})
+    adopted = deep_research_30.build_deep_research_report()
+    assert adopted["generated_at"] == first["generated_at"] and len(loads) == 1
+
+    version[0] = (2, 180)
+    rebuilt = deep_research_30.build_deep_research_report()
+    assert len(loads) == 2 and rebuilt["generated_at"] >= first["generated_at"]
+
+    deep_research_30.build_deep_research_report(force_refresh=True)
+    assert len(loads) == 3
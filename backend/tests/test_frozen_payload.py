@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import copy
+import json
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from backend import smart_money_positioning as smp
+from backend.frozen_payload import FrozenPayload, freeze, thaw
+
+
+def _large_payload():
+    rows = [{"ticker": f"T{i}", "scores": [float(j) for j in range(40)], "meta": {"n": i}} for i in range(3000)]
+    return {
+        "generated_at": "2026-01-02T00:00:00+00:00",
+        **{f"section_{k}": {"rows": rows, "summary": {"count": len(rows)}} for k in range(20)},
+        "numpy_value": np.float64(1.5),
+        "cache": {"hit": False, "age_seconds": 0, "ttl_seconds": 10},
+    }
+
+
+def test_frozen_structure_is_read_only_and_thaws():
+    frozen = freeze({"a": [1, {"b": 2}], "c": {"d": [3]}})
+    with pytest.raises(TypeError):
+        frozen["x"] = 1
+    with pytest.raises(TypeError):
+        frozen["c"].update({"e": 1})
+    assert isinstance(frozen["a"], tuple) and copy.copy(frozen) is frozen
+    mutable = copy.deepcopy(frozen)
+    mutable["c"]["d"].append(4)
+    assert thaw(frozen) == {"a": [1, {"b": 2}], "c": {"d": [3]}}
+
+
+def test_json_splice_matches_full_encoding():
+    payload = FrozenPayload(_large_payload(), exclude=("cache",))
+    meta = {"hit": True, "age_seconds": 3, "ttl_seconds": 10}
+    decoded = json.loads(payload.json(cache=meta))
+    assert decoded["cache"] == meta and "cache" not in payload.data
+    assert decoded["numpy_value"] == 1.5
+    assert decoded["section_3"]["rows"][7] == {"ticker": "T7", "scores": [float(j) for j in range(40)], "meta": {"n": 7}}
+    assert json.loads(FrozenPayload({"x": float("nan")}).json()) == {"x": None}
+
+
+def test_smart_money_hit_shares_payload_without_copying(monkeypatch):
+    now = datetime(2026, 1, 2, 12, 0, tzinfo=timezone.utc)
+    frozen = FrozenPayload(_large_payload(), exclude=("cache",))
+    monkeypatch.setattr(smp, "_CACHE", {"ts": now, "payload": frozen})
+    monkeypatch.setattr(smp.shared_cache, "_STORE", None)
+
+    hit = smp.get_cached_positioning(now + timedelta(seconds=5))
+    cached, meta = smp.cached_positioning_entry(now + timedelta(seconds=5))
+    chunks = cached.json_chunks(cache=meta)
+
+    # Nothing is copied: the view shares the frozen sections, the chunks the encoded body.
+    assert cached is frozen
+    assert hit["section_0"] is frozen.data["section_0"]
+    assert isinstance(chunks[0], memoryview) and chunks[0].obj is frozen.body
+    body = b"".join(chunks)
+    assert hit["cache"] == {"hit": True, "age_seconds": 5, "ttl_seconds": smp.CACHE_TTL_SECONDS}
+    assert body.startswith(frozen.body[:-1]) and json.loads(body)["cache"]["hit"] is True
+    assert smp.get_cached_positioning(now + timedelta(seconds=smp.CACHE_TTL_SECONDS)) is None
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from backend import gamma_exposure as gx
+
+
+def _scalar_gamma(spot, strike, years, iv):
+    denom = iv * math.sqrt(years)
+    d1 = (math.log(spot / strike) + (0.5 * iv * iv * years)) / denom
+    return math.exp(-0.5 * d1 * d1) / math.sqrt(2.0 * math.pi) / (spot * denom)
+
+
+def _scalar_flip(strikes, net):
+    for idx in range(len(strikes) - 1):
+        if net[idx] == 0:
+            return strikes[idx]
+        if (net[idx] > 0 and net[idx + 1] < 0) or (net[idx] < 0 and net[idx + 1] > 0):
+            w = abs(net[idx]) / max(abs(net[idx]) + abs(net[idx + 1]), 1e-9)
+            return strikes[idx] + ((strikes[idx + 1] - strikes[idx]) * w)
+    return strikes[min(range(len(net)), key=lambda i: abs(net[i]))]
+
+
+def _chain(spot=500.0, seed=11):
+    rng = np.random.default_rng(seed)
+    strikes = np.arange(400.0, 601.0, 5.0)
+    call_oi = rng.integers(100, 5000, strikes.size) * np.exp(-((strikes - 540.0) / 30.0) ** 2)
+    put_oi = rng.integers(100, 5000, strikes.size) * np.exp(-((strikes - 470.0) / 30.0) ** 2)
+    return (
+        np.concatenate([strikes, strikes]),
+        np.concatenate([np.ones(strikes.size, bool), np.zeros(strikes.size, bool)]),
+        np.concatenate([call_oi, put_oi]),
+        np.concatenate([np.full(strikes.size, 0.2), np.full(strikes.size, 0.0)]),
+    )
+
+
+def test_greeks_match_scalar_black_scholes():
+    strikes = np.array([80.0, 100.0, 125.0, 0.0])
+    greeks = gx.bs_greeks(100.0, strikes, 0.25, np.array([0.3, 0.2, 0.5, 0.2]), np.array([True, False, True, True]))
+    for i, (k, iv) in enumerate([(80.0, 0.3), (100.0, 0.2), (125.0, 0.5)]):
+        assert abs(greeks["gamma"][i] - _scalar_gamma(100.0, k, 0.25, iv)) < 1e-12
+    assert greeks["gamma"][3] == 0.0 and greeks["delta"][3] == 0.0
+    # Put delta = call delta - 1; ATM call delta slightly above 0.5 with zero rates.
+    assert -0.5 < greeks["delta"][1] < -0.45
+    x = np.linspace(-5, 5, 101)
+    assert np.max(np.abs(gx.norm_cdf(x) - np.array([0.5 * (1 + math.erf(v / math.sqrt(2))) for v in x]))) < 2e-7
+
+
+def test_profile_flip_matches_loop():
+    rng = np.random.default_rng(5)
+    for _ in range(200):
+        strikes = np.sort(rng.choice(np.arange(50.0, 150.0), 12, replace=False))
+        net = np.round(rng.normal(0, 5, 12), 0)
+        assert gx.profile_flip(strikes, net) == _scalar_flip(list(strikes), list(net))
+
+
+def test_profile_walls_and_zero_gamma():
+    strike, is_call, oi, iv = _chain()
+    out = gx.compute_gamma_profile(500.0, strike, is_call, oi, iv, years_to_expiry=30 / 365.0)
+    profile = out["profile"]
+    assert profile["strike"].size == 41
+    assert np.allclose(profile["net"], profile["call"] + profile["put"])
+    assert out["call_wall"] > 500.0 > out["put_wall"]
+    assert out["contracts"] == 82
+
+    # Total net GEX changes sign at the zero-gamma level.
+    level = out["zero_gamma"]
+    assert level is not None and 400.0 < level < 600.0
+
+    def _total(spot):
+        g = gx.bs_greeks(spot, strike, 30 / 365.0, np.where(iv > 0, iv, gx.DEFAULT_IV), is_call)["gamma"]
+        return gx.signed_gex(spot, g, oi, is_call).sum()
+
+    assert np.sign(_total(level - 2.0)) != np.sign(_total(level + 2.0))
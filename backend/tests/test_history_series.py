@@ -0,0 +1,135 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from backend import history_series
+from backend import smart_money_positioning as smp
+from backend.history_series import HistorySeries
+
+
+# Reference: the per-element merge walk HistorySeries alignment replaced, kept verbatim.
+def _ref_align(symbol_series, benchmark_series):
+    ts_s = [smp._safe_int(t, 0) for t in symbol_series.get("timestamps", [])]
+    close_s = [smp._safe_float(c, 0.0) for c in symbol_series.get("close", [])]
+    vol_s = [smp._safe_float(v, 0.0) for v in symbol_series.get("volume", [])]
+    ts_b = [smp._safe_int(t, 0) for t in benchmark_series.get("timestamps", [])]
+    close_b = [smp._safe_float(c, 0.0) for c in benchmark_series.get("close", [])]
+    rows = []
+    bi = 0
+    last_bench = None
+    for idx, ts in enumerate(ts_s):
+        while bi < len(ts_b) and ts_b[bi] <= ts:
+            last_bench = close_b[bi]
+            bi += 1
+        if last_bench is None:
+            continue
+        rows.append((ts, close_s[idx], smp._safe_float(last_bench, 0.0), vol_s[idx]))
+    return rows
+
+
+def _series(n, seed, start=16_203 * 86400, skip=0):
+    rng = np.random.default_rng(seed)
+    ts = [float(start + i * 86400) for i in range(n) if not skip or i % skip]
+    return {
+        "timestamps": ts,
+        "close": (50.0 * np.cumprod(1.0 + rng.normal(0.0, 0.01, len(ts)))).tolist(),
+        "volume": rng.uniform(1e5, 1e6, len(ts)).tolist(),
+    }
+
+
+def test_alignment_matches_merge_walk():
+    bench = _series(400, 0, skip=7)
+    cases = [
+        _series(400, 1),
+        _series(300, 2, start=1_400_000_000 - 50 * 86400, skip=5),  # starts before the benchmark
+        {"timestamps": ["1400000000", None, 1_400_172_800.5], "close": [1.0, None, "2.5"], "volume": [1, 2, 3]},
+        {"timestamps": [1_400_864_000.0, 1_400_000_000.0, 1_401_000_000.0], "close": [3.0, 1.0, 2.0], "volume": [0, 0, 0]},
+        {},
+    ]
+    for symbol in cases:
+        expected = _ref_align(symbol, bench)
+        assert history_series.align(symbol, bench).rows() == expected
+        assert HistorySeries.of(symbol).aligned_to(HistorySeries.of(bench)).rows() == expected
+
+
+def test_history_series_memoizes_alignment_and_returns():
+    raw_spy, raw_qqq = _series(2600, 3), _series(2600, 4, skip=11)
+    spy, qqq = HistorySeries.of(raw_spy), HistorySeries.of(raw_qqq)
+    assert HistorySeries.of(spy) is spy
+    assert list(qqq.get("close")) == raw_qqq["close"] and dict(qqq).keys() == raw_qqq.keys()
+
+    aligned = smp._align_to_benchmark(qqq, spy)
+    assert smp._align_to_benchmark(qqq, spy) is aligned
+    assert aligned.paired_returns(252) is aligned.paired_returns(252)
+    assert not aligned.close.flags.writeable
+    # A different benchmark object, even with equal data, is a different cache entry.
+    assert smp._align_to_benchmark(qqq, HistorySeries.of(raw_spy)) is not aligned
+    cached = smp._series_return_pairs(qqq, spy, 252)
+    fresh = smp._series_return_pairs(raw_qqq, raw_spy, 252)
+    assert [arr.tolist() for arr in cached] == [arr.tolist() for arr in fresh]
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        as_lists = _series(2600, 5)
+        list_bytes = tracemalloc.get_traced_memory()[0] - before
+        before = tracemalloc.get_traced_memory()[0]
+        as_arrays = HistorySeries.of(as_lists)
+        array_bytes = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    assert len(as_arrays.close) == 2600 and list_bytes > 3.5 * array_bytes
+
+
+def _common_returns(closes_a, closes_b):
+    ra, rb = [], []
+    for i in range(1, len(closes_a)):
+        pa, ca, pb, cb = closes_a[i - 1], closes_a[i], closes_b[i - 1], closes_b[i]
+        if None in (pa, ca, pb, cb) or min(pa, ca, pb, cb) <= 0.0:
+            continue
+        ra.append(ca / pa - 1.0)
+        rb.append(cb / pb - 1.0)
+    return np.array(ra), np.array(rb)
+
+
+def test_return_panel_matrices_match_pairwise_statistics():
+    spy = _series(900, 6, skip=7)  # benchmark calendar with gaps
+    late = _series(900, 7, start=16_503 * 86400)  # history starts mid-panel
+    gappy = _series(900, 8, skip=7)
+    gappy["close"][100:140] = [0.0] * 40
+    # Same trading days, stamped at the US open instead of midnight: matched by UTC day.
+    shifted = dict(gappy, timestamps=[t + 13.5 * 3600 for t in gappy["timestamps"]])
+    panel = history_series.ReturnPanel.build({"SPY": spy, "LATE": late, "GAPPY": gappy, "SHIFTED": shifted}, "SPY")
+    assert len(panel) == len(spy["timestamps"]) and not panel.valid[0].any()
+
+    by_day = {int(t // 86400): c for t, c in zip(late["timestamps"], late["close"])}
+    late_on_spy = [by_day.get(int(t // 86400)) for t in spy["timestamps"]]
+    columns = {"SPY": spy["close"], "LATE": late_on_spy, "GAPPY": gappy["close"], "SHIFTED": gappy["close"]}
+    for periods in (60, 252, 5000):
+        stats = panel.stats(periods)
+        assert panel.stats(periods) is stats
+        for a in columns:
+            for b in columns:
+                ca, cb = columns[a][-periods:], columns[b][-periods:]
+                ra, rb = _common_returns(ca, cb)
+                i, j = panel.index(a), panel.index(b)
+                assert stats.count[i, j] == len(ra)
+                assert stats.corr[i, j] == pytest.approx(np.corrcoef(ra, rb)[0, 1], rel=1e-9), (a, b, periods)
+                assert stats.cov[i, j] == pytest.approx(np.cov(ra, rb)[0, 1], rel=1e-9)
+                assert stats.beta[i, j] == pytest.approx(np.cov(ra, rb)[0, 1] / np.var(rb, ddof=1), rel=1e-9)
+                pa, pb, _ = panel.pair_returns(a, b, periods)
+                assert pa.tolist() == pytest.approx(ra.tolist(), rel=1e-12)
+
+    # A missing session and a history that stops early are not carried forward.
+    holes = dict(spy, timestamps=spy["timestamps"][:-30], close=spy["close"][:-30])
+    del holes["timestamps"][400], holes["close"][400]
+    partial = history_series.ReturnPanel.build({"SPY": spy, "HOLES": holes}, "SPY")
+    valid = partial.valid[:, partial.index("HOLES")]
+    assert not valid[400] and not valid[401] and valid[402]
+    assert not valid[-30:].any() and valid[-31]
+    assert partial.stats(5000).count[0, 1] == valid.sum() == len(spy["close"]) - 1 - 2 - 30
+
+    tiny = history_series.ReturnPanel.build({"SPY": _series(3, 9), "FLAT": {"timestamps": spy["timestamps"][:3], "close": [1.0] * 3}}, "SPY")
+    assert tiny.stats(252).corr.tolist() == [[0.0, 0.0], [0.0, 0.0]]
+    assert len(history_series.ReturnPanel.build({"QQQ": spy}, "SPY")) == 0
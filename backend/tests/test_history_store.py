@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+
+from backend import history_store as store
+from backend import smart_money_positioning as smp
+
+
+DAY = 86400.0
+START_TS = datetime(2025, 1, 1, 14, 30, tzinfo=timezone.utc).timestamp()
+
+
+def _set_tmp_dir(tmp_path: Path):
+    store.HISTORY_DIR = tmp_path / "data_history"
+    store.HISTORY_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def _series(n: int, start_close: float = 100.0):
+    return {
+        "timestamps": [START_TS + (i * DAY) for i in range(n)],
+        "close": [start_close + i for i in range(n)],
+        "volume": [1_000.0 + i for i in range(n)],
+    }
+
+
+def test_roundtrip_and_splice(tmp_path):
+    _set_tmp_dir(tmp_path)
+    series = _series(200)
+    meta = store.save_series("^VIX", series, {"source": "yahoo"})
+    assert meta["rows"] == 200
+
+    loaded, loaded_meta = store.load_series("^VIX")
+    assert loaded == series
+    assert loaded_meta["source"] == "yahoo"
+    # 3 float64 columns + small header: far smaller than JSON lists.
+    assert (store.HISTORY_DIR / "_VIX.bin").stat().st_size < (200 * 3 * 8) + 512
+
+    fresh = {"timestamps": [series["timestamps"][-1], series["timestamps"][-1] + DAY], "close": [999.0, 1000.0], "volume": [1.0, 2.0]}
+    merged = store.splice_tail(loaded, fresh, series["timestamps"][-1])
+    assert len(merged["close"]) == 201
+    assert merged["close"][-2:] == [999.0, 1000.0]
+    assert merged["close"][-3] == series["close"][-2]
+
+
+def test_refresh_appends_only_missing_bars(tmp_path, monkeypatch):
+    _set_tmp_dir(tmp_path)
+    base = _series(300)
+    full_calls = []
+    increment_calls = []
+
+    def _fake_full(symbol, warnings):
+        full_calls.append(symbol)
+        return base, "yahoo"
+
+    def _fake_yahoo(symbol, warnings, period1=None, events=None):
+        increment_calls.append(period1)
+        anchor_idx = base["timestamps"].index(float(period1))
+        return {
+            "timestamps": base["timestamps"][anchor_idx:] + [base["timestamps"][-1] + DAY],
+            "close": base["close"][anchor_idx:] + [500.0],
+            "volume": base["volume"][anchor_idx:] + [5.0],
+        }
+
+    monkeypatch.setattr(smp, "_fetch_history_with_source", _fake_full)
+    monkeypatch.setattr(smp, "_fetch_yahoo_series", _fake_yahoo)
+
+    now = datetime.fromtimestamp(base["timestamps"][-1] + (2 * DAY), tz=timezone.utc)
+    first = smp._refresh_history_series("QQQ", [], now=now)
+    assert full_calls == ["QQQ"] and len(first["close"]) == 300
+
+    later = datetime.fromtimestamp(now.timestamp() + 3600, tz=timezone.utc)
+    second = smp._refresh_history_series("QQQ", [], now=later)
+    assert full_calls == ["QQQ"]
+    assert increment_calls == [int(base["timestamps"][-2])]
+    assert len(second["close"]) == 301
+    assert second["close"][-1] == 500.0
+    assert store.load_series("QQQ")[1]["incremental_refreshes"] == 1
+
+
+def test_refresh_full_reload_on_corporate_action(tmp_path, monkeypatch):
+    _set_tmp_dir(tmp_path)
+    base = _series(300)
+    store.save_series("XLE", base, {"source": "yahoo", "refreshed_at_ts": 0.0})
+    full_calls = []
+
+    def _fake_full(symbol, warnings):
+        full_calls.append(symbol)
+        return _series(300, start_close=50.0), "yahoo"
+
+    def _fake_yahoo(symbol, warnings, period1=None, events=None):
+        events.append(f"splits:{int(period1) + 10}")
+        return {"timestamps": [float(period1)], "close": [base["close"][-2]], "volume": [1.0]}
+
+    monkeypatch.setattr(smp, "_fetch_history_with_source", _fake_full)
+    monkeypatch.setattr(smp, "_fetch_yahoo_series", _fake_yahoo)
+
+    now = datetime.fromtimestamp(base["timestamps"][-1] + DAY, tz=timezone.utc)
+    out = smp._refresh_history_series("XLE", [], now=now)
+    assert full_calls == ["XLE"]
+    assert out["close"][0] == 50.0
+    assert store.load_series("XLE")[1]["reload_reason"] == "corporate_action"
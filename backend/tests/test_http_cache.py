@@ -0,0 +1,112 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from starlette.requests import Request
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+import http_cache
+import local_vault_matrix
+import server
+
+
+def _request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def _body(response):
+    async def _read():
+        return b"".join([bytes(chunk) async for chunk in response.body_iterator])
+
+    return asyncio.run(_read())
+
+
+def test_etag_matching_follows_if_none_match_rules():
+    assert http_cache.etag_matches('"a", W/"b"', '"b"')
+    assert http_cache.etag_matches("*", '"x"')
+    assert not http_cache.etag_matches('"a"', '"b"')
+    assert not http_cache.etag_matches(None, '"b"')
+
+
+def test_versioned_payload_is_encoded_once_and_revalidates_with_304():
+    cache = http_cache.ETagCache("test_versioned", max_age_seconds=60)
+    assert cache.get(1) is None
+    frozen = cache.put(1, {"rows": [1, 2, 3]})
+    assert cache.get(1) is frozen and cache.get(2) is None
+
+    response = cache.respond(_request(), frozen, cache={"hit": True})
+    assert response.status_code == 200
+    assert response.headers["etag"] == f"W/{frozen.etag}"  # per-hit keys change the bytes
+    assert response.headers["cache-control"] == "private, max-age=60"
+    assert json.loads(_body(response)) == {"rows": [1, 2, 3], "cache": {"hit": True}}
+    assert cache.respond(_request(), frozen).headers["etag"] == frozen.etag
+    assert cache.respond(_request(response.headers["etag"]), frozen, cache={"hit": True}).status_code == 304
+
+    not_modified = cache.respond(_request(frozen.etag), frozen, max_age_seconds=12)
+    assert not_modified.status_code == 304 and not_modified.body == b""
+    assert not_modified.headers["etag"] == frozen.etag
+    assert not_modified.headers["cache-control"] == "private, max-age=12"
+    assert cache.status()["not_modified"] == 2 and cache.status()["encodes"] == 1
+
+
+def test_matrix_endpoint_skips_rebuild_until_evaluations_change(monkeypatch):
+    builds = []
+    version = [(1, 10)]
+
+    def _results():
+        builds.append(1)
+        return {"XAUUSD": {"t_1h": {"patterns": len(builds)}}}
+
+    monkeypatch.setattr(local_vault_matrix, "evaluations_version", lambda: version[0])
+    monkeypatch.setattr(local_vault_matrix, "get_matrix_results", _results)
+    server._matrix_etag.invalidate()
+
+    first = asyncio.run(server.get_matrix_evaluations(_request(), current_user="u"))
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == f"private, max-age={server.MATRIX_CACHE_MAX_AGE_SECONDS}"
+    again = asyncio.run(server.get_matrix_evaluations(_request(etag), current_user="u"))
+    assert again.status_code == 304 and builds == [1]
+
+    version[0] = (2, 11)
+    changed = asyncio.run(server.get_matrix_evaluations(_request(etag), current_user="u"))
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert json.loads(_body(changed)) == {"XAUUSD": {"t_1h": {"patterns": 2}}}
+
+
+def test_deep_research_build_runs_off_the_event_loop(monkeypatch):
+    import threading
+    import time
+
+    import deep_research_30
+
+    loop_threads = []
+
+    def _slow_build():
+        loop_threads.append(threading.current_thread())
+        time.sleep(0.3)  # e.g. waiting on another worker's build lock
+        return {"generated_at": "2026-01-01T00:00:00+00:00", "signals": []}
+
+    monkeypatch.setattr(deep_research_30, "build_deep_research_report", _slow_build)
+    server._deep_research_etag.invalidate()
+
+    async def _run():
+        ticks = []
+
+        async def _ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.02)
+
+        response, _ = await asyncio.gather(server.get_deep_research(_request(), current_user="u"), _ticker())
+        return response, ticks
+
+    response, ticks = asyncio.run(_run())
+    assert response.status_code == 200
+    assert loop_threads[0] is not threading.main_thread()
+    assert ticks[-1] - ticks[0] < 0.25  # the loop kept running during the build
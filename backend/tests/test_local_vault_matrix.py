@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import json
+import random
+
+from backend import local_vault_matrix as lvm
+
+
+_VALUES = ("BULLISH", "BEARISH", "NEUTRAL", "RISK_ON", "RISK_OFF", None)
+
+
+def _evaluations(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"e{i}",
+            "asset": rng.choice(("EURUSD", "XAUUSD")),
+            "timeframe": rng.choice(("t_1h", "t_24h")),
+            "hit": rng.random() < 0.55,
+            "mfe_pips": round(rng.uniform(0.0, 40.0), 2),
+            "mae_pips": round(rng.uniform(0.0, 30.0), 2),
+            "context": {field: rng.choice(_VALUES) for field, _ in lvm.FACTOR_KEYS},
+        }
+        for i in range(n)
+    ]
+
+
+def _full_rebuild(monkeypatch):
+    monkeypatch.setattr(lvm, "_MATRIX_STATE", {})
+    lvm._reset_matrix_state(lvm._MATRIX_STATE)
+    return lvm.get_matrix_results()
+
+
+def test_appended_evaluations_are_folded_in_incrementally(tmp_path, monkeypatch):
+    path = tmp_path / "evaluations.json"
+    monkeypatch.setattr(lvm, "EVALUATIONS_FILE", str(path))
+    monkeypatch.setattr(lvm, "_MATRIX_STATE", {})
+    lvm._reset_matrix_state(lvm._MATRIX_STATE)
+    evals = _evaluations(160)
+
+    seen = []
+    accumulate = lvm._accumulate_evaluation
+
+    def _counting(matrix, dirty, e):
+        seen.append(e["id"])
+        accumulate(matrix, dirty, e)
+
+    monkeypatch.setattr(lvm, "_accumulate_evaluation", _counting)
+
+    path.write_text(json.dumps(evals[:150]))
+    first = lvm.get_matrix_results()
+    assert len(seen) == 150
+    assert lvm.get_matrix_results() == first
+    assert len(seen) == 150  # unchanged file: nothing re-read
+
+    path.write_text(json.dumps(evals))
+    incremental = lvm.get_matrix_results()
+    assert seen[150:] == [e["id"] for e in evals[150:]]
+    state = lvm._MATRIX_STATE
+
+    monkeypatch.setattr(lvm, "_accumulate_evaluation", accumulate)
+    assert incremental == _full_rebuild(monkeypatch)
+    assert incremental["EURUSD"]["t_1h"]["coverage"]["patterns"] == len(incremental["EURUSD"]["t_1h"]["patterns"])
+    assert state["count"] == 160
+
+
+def test_rewritten_file_rebuilds_from_scratch(tmp_path, monkeypatch):
+    path = tmp_path / "evaluations.json"
+    monkeypatch.setattr(lvm, "EVALUATIONS_FILE", str(path))
+    monkeypatch.setattr(lvm, "_MATRIX_STATE", {})
+    lvm._reset_matrix_state(lvm._MATRIX_STATE)
+
+    path.write_text(json.dumps(_evaluations(120)))
+    lvm.get_matrix_results()
+    # More rows, but not an append of the previous content.
+    replaced = _evaluations(140, seed=11)
+    path.write_text(json.dumps(replaced))
+    rebuilt = lvm.get_matrix_results()
+
+    assert rebuilt == _full_rebuild(monkeypatch)
+    assert sum(row["sample_size"] for tf in rebuilt.values() for block in tf.values() for row in block["patterns"]) == 140
+
+    path.write_text("[]")
+    assert lvm.get_matrix_results() == {}
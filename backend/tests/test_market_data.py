@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+
+from backend import market_data as md
+
+
+def test_failover_and_health_ranking():
+    async def _run():
+        broken = md.StubProvider(fail=True)
+        healthy = md.StubProvider(prices={"NQ=F": 21000.0})
+        router = md.RoutedMarketDataProvider([("broken", broken), ("healthy", healthy)])
+
+        assert await router.get_price("NQ=F") == 21000.0
+        decision = router.routing_status()["decisions"][-1]
+        assert decision["primary"] == "broken" and decision["winner"] == "healthy"
+        assert decision["errors"]
+
+        # After one failure the broken provider ranks last and is no longer tried first.
+        await router.get_prices(["NQ=F", "ES=F"])
+        assert router.ranked()[0][0] == "healthy"
+        assert broken.calls == 1
+
+        # Legacy zero answers count as failures too.
+        class _Zero(md.StubProvider):
+            async def get_price(self, symbol):
+                return 0.0
+
+        router = md.RoutedMarketDataProvider([("zero", _Zero()), ("healthy", healthy)])
+        assert await router.get_price("NQ=F") == 21000.0
+
+    asyncio.run(_run())
+
+
+def test_hedged_request_when_primary_exceeds_p95():
+    async def _run():
+        primary = md.StubProvider(prices={"GC=F": 2650.0}, latency=0.01)
+        secondary = md.StubProvider(prices={"GC=F": 2651.0}, latency=0.01)
+        router = md.RoutedMarketDataProvider([("primary", primary), ("secondary", secondary)])
+
+        for _ in range(md.HEALTH_MIN_SAMPLES):
+            assert await router.get_price("GC=F") == 2650.0
+        assert secondary.calls == 0
+        assert router.health["primary"].latency_quantile(0.95) < 0.1
+
+        primary.latency = 0.5  # now far past its observed p95
+        assert await router.get_price("GC=F") == 2651.0
+        decision = router.routing_status()["decisions"][-1]
+        assert decision["hedged_to"] == "secondary" and decision["winner"] == "secondary"
+        assert decision["latency_ms"] < 400
+
+    asyncio.run(_run())
+
+
+def test_all_providers_failing_raises():
+    async def _run():
+        router = md.RoutedMarketDataProvider([("a", md.StubProvider(fail=True)), ("b", md.StubProvider(fail=True))])
+        try:
+            await router.get_historical_data("ES=F")
+        except md.ProviderError as exc:
+            assert "all providers failed" in str(exc)
+        else:
+            raise AssertionError("expected ProviderError")
+
+    asyncio.run(_run())
+
+
+def test_yfinance_history_runs_off_the_loop_and_surfaces_errors(monkeypatch):
+    import time
+
+    class _SlowTicker:
+        def __init__(self, symbol):
+            self.symbol = symbol
+
+        def history(self, interval=None, period=None):
+            time.sleep(0.5)
+            raise RuntimeError("yahoo 502")
+
+    monkeypatch.setattr(md.yf, "Ticker", _SlowTicker)
+    monkeypatch.setattr(md, "acquire_budget", lambda name: True)
+
+    async def _run():
+        yahoo = md.YFinanceProvider()
+        router = md.RoutedMarketDataProvider([("yahoo", yahoo), ("stub", md.StubProvider())], hedge_after_default=0.05)
+        started = time.monotonic()
+        assert await router.get_historical_data("ES=F", limit=3)
+        assert time.monotonic() - started < 0.4  # the hedge fired while yahoo was still blocked
+        assert router.routing_status()["decisions"][-1]["winner"] == "stub"
+
+        try:
+            await yahoo.get_historical_data("ES=F")
+        except md.ProviderError as exc:
+            assert "yahoo 502" in str(exc)
+        else:
+            raise AssertionError("expected ProviderError")
+
+    asyncio.run(_run())
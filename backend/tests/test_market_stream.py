@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+from backend import market_stream as stream
+
+
+def _parse(frame: str):
+    fields = dict(line.split(": ", 1) for line in frame.strip().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+def test_diff_payload_only_changed_fields():
+    old = {"NAS100": {"price": 1.0, "change": 0.1}, "SP500": {"price": 2.0}, "DOW": {"price": 3.0}}
+    new = {"NAS100": {"price": 1.5, "change": 0.1}, "SP500": {"price": 2.0}, "EURUSD": {"price": 1.08}}
+    assert stream.diff_payload(old, new) == {
+        "NAS100": {"price": 1.5},
+        "EURUSD": {"price": 1.08},
+        "DOW": None,
+    }
+    assert stream.diff_payload(new, dict(new)) == {}
+
+
+def test_shared_poller_snapshot_and_deltas():
+    async def _run():
+        calls = []
+        values = iter([{"vix": 20.0, "regime": "neutral"}] * 2 + [{"vix": 26.0, "regime": "neutral"}] * 100)
+
+        async def _fetch():
+            calls.append(1)
+            return dict(next(values))
+
+        hub = stream.StreamHub(heartbeat_seconds=0.2)
+        hub.register("vix", _fetch, interval_seconds=0.05)
+
+        subs = [hub.subscribe(["vix"]) for _ in range(5)]
+        frames = [[_parse(await sub.__anext__())] for sub in subs]
+        for sub, seen in zip(subs, frames):
+            seen.append(_parse(await sub.__anext__()))
+            seen.append(_parse(await sub.__anext__()))
+
+        for seen in frames:
+            assert [event for event, _ in seen] == ["hello", "snapshot", "delta"]
+            assert seen[1][1]["data"] == {"vix": 20.0, "regime": "neutral"}
+            assert seen[2][1]["changes"] == {"vix": 26.0}
+
+        # Five subscribers, one poller: polls track the interval, not the client count.
+        assert len(calls) <= 5
+        assert hub.status()["sources"]["vix"]["subscribers"] == 5
+
+        late = hub.subscribe(["vix"])
+        assert _parse(await late.__anext__())[0] == "hello"
+        event, data = _parse(await late.__anext__())
+        assert event == "snapshot" and data["data"]["vix"] == 26.0
+
+        for sub in subs + [late]:
+            await sub.aclose()
+        await asyncio.sleep(0.1)
+        status = hub.status()["sources"]["vix"]
+        assert status["subscribers"] == 0 and status["polling"] is False
+
+    asyncio.run(_run())
+
+
+def test_heartbeat_when_idle():
+    async def _run():
+        async def _fetch():
+            return {"price": 1.0}
+
+        hub = stream.StreamHub(heartbeat_seconds=0.05)
+        hub.register("prices", _fetch, interval_seconds=10)
+        sub = hub.subscribe()
+        events = [_parse(await sub.__anext__())[0] for _ in range(3)]
+        await sub.aclose()
+        assert events == ["hello", "snapshot", "heartbeat"]
+
+    asyncio.run(_run())
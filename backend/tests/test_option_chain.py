@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import random
+import re
+from datetime import date, datetime, timedelta, timezone
+
+from backend import option_chain
+from backend import smart_money_positioning as smp
+
+
+OPTION_RE = re.compile(r"^([A-Z]+)(\d{6})([CP])(\d{8})$")
+
+
+def _reference_rows(options, ticker, spot, now, themes):
+    """Scalar per-option loop the vectorized scan replaced (kept as the equality oracle)."""
+    rows = []
+    for option in options:
+        volume = smp._safe_float(option.get("volume"), 0.0)
+        if volume <= 0:
+            continue
+        match = OPTION_RE.match(str(option.get("option") or ""))
+        if not match:
+            continue
+        yymmdd = match.group(2)
+        try:
+            expiry = date(2000 + int(yymmdd[:2]), int(yymmdd[2:4]), int(yymmdd[4:6]))
+        except ValueError:
+            continue
+        side = "CALL" if match.group(3) == "C" else "PUT"
+        strike = int(match.group(4)) / 1000.0
+        dte = (expiry - now.date()).days
+        if dte < 2 or dte > smp.OPTIONS_EXPIRY_MAX_DAYS or strike <= 0:
+            continue
+        if strike < spot * 0.55 or strike > spot * 1.45:
+            continue
+        oi = max(smp._safe_float(option.get("open_interest"), 0.0), 1.0)
+        bid = smp._safe_float(option.get("bid"), 0.0)
+        ask = smp._safe_float(option.get("ask"), 0.0)
+        last = smp._safe_float(option.get("last_trade_price"), 0.0)
+        iv = smp._safe_float(option.get("iv"), 0.0)
+        mid = ((bid + ask) / 2.0) if (bid > 0 and ask > 0) else max(last, bid, ask, 0.0)
+        if mid <= 0.0:
+            continue
+        spread = max(ask - bid, 0.0)
+        rel_fill = smp._clamp(((last - mid) / (spread / 2.0)) if spread > 1e-9 else 0.0, -1.8, 1.8)
+        ratio = volume / oi
+        premium = max(last, mid) * volume * 100.0
+        urgency = smp._clamp((abs(rel_fill) * 0.45) + (ratio / 8.0) + (premium / 2000000.0), 0.0, 1.0)
+        moneyness = abs((strike / spot) - 1.0)
+        is_otm = (side == "CALL" and strike > spot) or (side == "PUT" and strike < spot)
+        anomaly = smp._clamp(
+            min(ratio / 6.0, 1.0) * 34.0
+            + min(premium / 1500000.0, 1.0) * 28.0
+            + urgency * 18.0
+            + (10.0 if (is_otm and dte <= 30 and moneyness <= 0.12) else 0.0)
+            + min(iv / 1.5, 1.0) * 10.0,
+            0.0,
+            99.5,
+        )
+        quality = 0.0
+        quality += 28.0 if ratio >= 2.0 else 0.0
+        quality += 24.0 if premium >= 300000 else 0.0
+        quality += 16.0 if abs(rel_fill) >= 0.30 else 0.0
+        quality += 16.0 if 7 <= dte <= 45 else 0.0
+        quality += 8.0 if is_otm else 0.0
+        quality += 8.0 if volume >= 200 else 0.0
+        rows.append(
+            {
+                "option_side": side,
+                "expiry": expiry.isoformat(),
+                "dte": dte,
+                "is_footprint": bool(anomaly >= 58.0 and quality >= 48.0 and premium >= 150000.0),
+                "anomaly_score": round(anomaly, 2),
+                "quality_score": round(quality, 2),
+                "premium": int(max(0.0, round(premium))),
+                "moneyness_pct": round(moneyness * 100.0, 2),
+            }
+        )
+    rows.sort(key=lambda row: row["anomaly_score"], reverse=True)
+    return rows[: smp.OPTIONS_MAX_PER_TICKER]
+
+
+def _synthetic_chain(n, today, seed=3):
+    rng = random.Random(seed)
+    options = []
+    for _ in range(n):
+        expiry = today + timedelta(days=rng.randint(-5, 90))
+        strike = round(rng.uniform(40.0, 160.0), 1)
+        bid = round(rng.uniform(0.0, 5.0), 2)
+        options.append(
+            {
+                "option": f"XLK{expiry:%y%m%d}{rng.choice('CP')}{int(strike * 1000):08d}",
+                "volume": rng.choice([0, 1, 50, 300, 5000, None]),
+                "open_interest": rng.choice([0, 10, 1000, "250", None]),
+                "bid": bid,
+                "ask": round(bid + rng.uniform(0.0, 0.5), 2) if rng.random() > 0.1 else 0,
+                "last_trade_price": round(rng.uniform(0.0, 6.0), 2),
+                "iv": round(rng.uniform(0.1, 2.0), 4),
+            }
+        )
+    options += [{"option": "BAD", "volume": 10}, {"option": "XLK250230C00100000", "volume": 10, "bid": 1, "ask": 2}]
+    return options
+
+
+def test_vectorized_scan_matches_scalar_loop():
+    now = datetime(2025, 1, 6, 15, 0, tzinfo=timezone.utc)
+    options = _synthetic_chain(3000, now.date())
+    expected = _reference_rows(options, "XLK", 100.0, now, ("AI_TECH",))
+    actual = smp._process_cboe_options(option_chain.decode_cboe_chain(options), "XLK", 100.0, now, ("AI_TECH",))
+
+    assert len(actual) == len(expected) == smp.OPTIONS_MAX_PER_TICKER
+    for got, want in zip(actual, expected):
+        assert got["option_side"] == want["option_side"]
+        assert got["expiry"] == want["expiry"] and got["dte"] == want["dte"]
+        assert got["anomaly_score"] == want["anomaly_score"]
+        assert got["quality_score"] == want["quality_score"]
+        assert got["is_footprint"] == want["is_footprint"]
+        assert got["metrics"]["block_premium_usd"] == want["premium"]
+        assert got["metrics"]["moneyness_pct"] == want["moneyness_pct"]
+
+
+def test_decode_drops_malformed_symbols_and_cache_reuses_chain():
+    chain = option_chain.decode_cboe_chain(
+        [
+            {"option": "GLD250117C00200000", "volume": "12", "bid": None},
+            {"option": "GLD250230P00200000", "volume": 1},
+            {"option": "gld250117C00200000", "volume": 1},
+            {"option": "GLD250117X00200000", "volume": 1},
+        ]
+    )
+    assert option_chain.chain_size(chain) == 1
+    assert str(chain["expiry"][0]) == "2025-01-17" and bool(chain["is_call"][0])
+    assert chain["strike"][0] == 200.0 and chain["volume"][0] == 12.0 and chain["bid"][0] == 0.0
+
+    cache = option_chain.ChainCache(ttl_seconds=60)
+    loads = []
+
+    def _loader():
+        loads.append(1)
+        return [{"option": "GLD250117C00200000", "volume": 1}]
+
+    first = cache.get("GLD", _loader)
+    assert cache.get("GLD", _loader) is first
+    assert loads == [1] and cache.status()["hits"] == 1
+    assert option_chain.chain_size(cache.get("UUP", lambda: [])) == 0
+    assert "UUP" not in cache.status()["tickers"]
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from backend import rate_limiter as limiter
+
+
+def _fresh_bucket(monkeypatch, rate: float = 20.0, burst: float = 4):
+    monkeypatch.setitem(limiter.HOST_BUDGETS, "testhost", {"rate_per_sec": rate, "burst": burst})
+    limiter._BUCKETS.pop("testhost", None)
+    return limiter._bucket("testhost")
+
+
+def test_reserve_keeps_tokens_for_interactive(monkeypatch):
+    bucket = _fresh_bucket(monkeypatch, rate=0.001, burst=4)
+    # Backfill may not drop below 50% of the burst.
+    assert limiter.try_acquire_budget("testhost", priority=limiter.PRIORITY_BACKFILL)
+    assert limiter.try_acquire_budget("testhost", priority=limiter.PRIORITY_BACKFILL)
+    assert not limiter.try_acquire_budget("testhost", priority=limiter.PRIORITY_BACKFILL)
+    # Interactive can still spend the reserve.
+    assert limiter.try_acquire_budget("testhost", priority=limiter.PRIORITY_INTERACTIVE)
+    assert limiter.try_acquire_budget("testhost", priority=limiter.PRIORITY_INTERACTIVE)
+    assert not limiter.try_acquire_budget("testhost", priority=limiter.PRIORITY_INTERACTIVE)
+    classes = bucket.status()["classes"]
+    assert classes["backfill"]["granted"] == 2 and classes["backfill"]["timeouts"] == 1
+    assert classes["interactive"]["granted"] == 2
+
+
+def test_lower_class_waits_behind_queued_interactive(monkeypatch):
+    _fresh_bucket(monkeypatch, rate=20.0, burst=1)
+    assert limiter.try_acquire_budget("testhost")
+    order = []
+
+    def _take(priority):
+        if limiter.acquire_budget("testhost", priority=priority, timeout=2.0):
+            order.append(priority)
+
+    interactive = threading.Thread(target=_take, args=(limiter.PRIORITY_INTERACTIVE,))
+    interactive.start()
+    time.sleep(0.01)
+    scheduled = threading.Thread(target=_take, args=(limiter.PRIORITY_SCHEDULED,))
+    scheduled.start()
+    interactive.join()
+    scheduled.join()
+    assert order[0] == limiter.PRIORITY_INTERACTIVE
+
+
+def test_priority_scope_and_429_cooldown(monkeypatch):
+    _fresh_bucket(monkeypatch, rate=1000.0, burst=5)
+    with limiter.priority_scope(limiter.PRIORITY_SCHEDULED):
+        assert limiter.current_priority() == limiter.PRIORITY_SCHEDULED
+        assert limiter.try_acquire_budget("testhost")
+    assert limiter.current_priority() == limiter.PRIORITY_INTERACTIVE
+
+    limiter.report_throttled("testhost", "Wed, 21 Oct 2015 07:28:00 GMT")
+    assert not limiter.try_acquire_budget("testhost")
+    status = limiter.limiter_status(["testhost"])["hosts"]["testhost"]
+    assert status["throttled_429"] == 1
+    assert status["cooldown_remaining_seconds"] > 0
+    assert status["classes"]["scheduled"]["granted"] == 1
+    assert limiter.host_key("https://query2.finance.yahoo.com/v8/finance/chart/SPY") == "yahoo"
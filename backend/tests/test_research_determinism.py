@@ -35,10 +35,8 @@ def test_market_fallbacks_are_not_simulated(monkeypatch):
         return None
 
     monkeypatch.setattr(server, "get_yf_ticker_safe", _no_data)
-    server._vix_cache["data"] = None
-    server._vix_cache["timestamp"] = None
-    server._market_cache["data"] = None
-    server._market_cache["timestamp"] = None
+    server._vix_cache.invalidate()
+    server._market_cache.invalidate()
 
     vix_payload = asyncio.run(server.get_vix_data())
     assert vix_payload.get("source") == "fallback_static"
@@ -49,3 +47,8 @@ def test_market_fallbacks_are_not_simulated(monkeypatch):
     for row in prices_payload.values():
         assert row.get("source") == "fallback_static"
         assert row.get("change") == 0.0
+
+
+def test_endpoint_caches_bound_their_stale_window():
+    for cache in (server._breadth_cache, server._market_cache, server._vix_cache, server._options_flow_cache):
+        assert cache.stale_seconds <= cache.ttl_seconds
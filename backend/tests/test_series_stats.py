@@ -0,0 +1,301 @@
+import math
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from backend import series_stats
+from backend import smart_money_positioning as smp
+
+
+# Reference: the list implementations series_stats replaced, kept verbatim.
+def _ref_mean(values):
+    if not values:
+        return 0.0
+    return sum(values) / len(values)
+
+
+def _ref_stddev(values):
+    if len(values) < 2:
+        return 0.0
+    m = _ref_mean(values)
+    var = sum((x - m) ** 2 for x in values) / max(1, len(values) - 1)
+    return math.sqrt(max(var, 0.0))
+
+
+def _ref_pearson_corr(xs, ys):
+    if len(xs) < 3 or len(ys) < 3:
+        return 0.0
+    n = min(len(xs), len(ys))
+    x = xs[:n]
+    y = ys[:n]
+    mx = _ref_mean(x)
+    my = _ref_mean(y)
+    cov = sum((a - mx) * (b - my) for a, b in zip(x, y))
+    vx = sum((a - mx) ** 2 for a in x)
+    vy = sum((b - my) ** 2 for b in y)
+    if vx <= 1e-12 or vy <= 1e-12:
+        return 0.0
+    return smp._clamp(cov / math.sqrt(vx * vy), -1.0, 1.0)
+
+
+def _ref_quantile(values, q):
+    clean = sorted([smp._safe_float(v, 0.0) for v in values if math.isfinite(smp._safe_float(v, 0.0))])
+    if not clean:
+        return 0.0
+    q_clamped = smp._clamp(smp._safe_float(q, 0.5), 0.0, 1.0)
+    if len(clean) == 1:
+        return clean[0]
+    pos = q_clamped * (len(clean) - 1)
+    lo = int(math.floor(pos))
+    hi = int(math.ceil(pos))
+    if lo == hi:
+        return clean[lo]
+    frac = pos - lo
+    return (clean[lo] * (1.0 - frac)) + (clean[hi] * frac)
+
+
+def _ref_daily_returns(series, periods):
+    closes = [smp._safe_float(x, 0.0) for x in (series.get("close") or [])]
+    src = closes if len(closes) <= periods else closes[-periods:]
+    out = []
+    for i in range(1, len(src)):
+        prev = smp._safe_float(src[i - 1], 0.0)
+        curr = smp._safe_float(src[i], 0.0)
+        if prev <= 0.0 or curr <= 0.0:
+            continue
+        out.append((curr / prev) - 1.0)
+    return out
+
+
+def _ref_max_drawdown(series, periods):
+    closes = [smp._safe_float(x, 0.0) for x in (series.get("close") or [])]
+    closes = closes[:] if len(closes) <= periods else closes[-periods:]
+    if len(closes) < 3:
+        return 0.0
+    peak = closes[0]
+    max_dd = 0.0
+    for c in closes:
+        if c > peak:
+            peak = c
+        if peak > 0:
+            dd = (c / peak) - 1.0
+            if dd < max_dd:
+                max_dd = dd
+    return max_dd
+
+
+def _ref_cagr(series, periods):
+    closes = series.get("close", [])
+    ts = series.get("timestamps", [])
+    if len(closes) <= periods or len(ts) <= periods:
+        return 0.0
+    start = smp._safe_float(closes[-1 - periods], 0.0)
+    end = smp._safe_float(closes[-1], 0.0)
+    t0 = smp._safe_int(ts[-1 - periods], 0)
+    t1 = smp._safe_int(ts[-1], 0)
+    if start <= 0.0 or end <= 0.0 or t1 <= t0:
+        return 0.0
+    years = (t1 - t0) / (365.25 * 86400.0)
+    if years <= 0.0:
+        return 0.0
+    return (end / start) ** (1.0 / years) - 1.0
+
+
+def _ref_return_pairs(series_a, series_b, periods):
+    aligned = smp._align_to_benchmark(series_a, series_b).rows()
+    if len(aligned) > periods:
+        aligned = aligned[-periods:]
+    ra, rb = [], []
+    for i in range(1, len(aligned)):
+        a_prev, a_cur = aligned[i - 1][1], aligned[i][1]
+        b_prev, b_cur = aligned[i - 1][2], aligned[i][2]
+        if a_prev <= 0.0 or a_cur <= 0.0 or b_prev <= 0.0 or b_cur <= 0.0:
+            continue
+        ra.append((a_cur / a_prev) - 1.0)
+        rb.append((b_cur / b_prev) - 1.0)
+    return ra, rb
+
+
+def _ref_calendar_profile(series, periods, bucket_of, keys):
+    closes = [smp._safe_float(x, 0.0) for x in (series.get("close") or [])]
+    ts = [smp._safe_int(x, 0) for x in (series.get("timestamps") or [])]
+    if len(closes) > periods:
+        closes = closes[-periods:]
+        ts = ts[-periods:]
+    bucket = defaultdict(list)
+    for i in range(1, min(len(closes), len(ts))):
+        prev, cur = closes[i - 1], closes[i]
+        if prev <= 0.0 or cur <= 0.0:
+            continue
+        bucket[bucket_of(datetime.fromtimestamp(ts[i], tz=timezone.utc))].append((cur / prev) - 1.0)
+    out = {}
+    for key in keys:
+        vals = bucket.get(key, [])
+        n = len(vals)
+        if n <= 0:
+            out[str(key)] = {"samples": 0, "mean_pct": 0.0, "win_rate_pct": 0.0}
+        else:
+            out[str(key)] = {
+                "samples": n,
+                "mean_pct": round(_ref_mean(vals) * 100.0, 4),
+                "win_rate_pct": round((sum(1 for v in vals if v > 0) / n) * 100.0, 2),
+            }
+    return out
+
+
+def _recorded_series(n, seed, base, with_gaps=False):
+    rng = np.random.default_rng(seed)
+    start_ts = int(datetime(2014, 1, 1, tzinfo=timezone.utc).timestamp())
+    closes = (base * np.cumprod(1.0 + rng.normal(0.0003, 0.012, n))).tolist()
+    if with_gaps:
+        for i in range(7, n, 97):
+            closes[i] = None if i % 2 else 0.0
+    return {
+        "timestamps": [float(start_ts + i * 86400) for i in range(n)],
+        "close": closes,
+        "volume": rng.uniform(5e5, 2e6, n).tolist(),
+    }
+
+
+SERIES = [_recorded_series(3000, seed, 50.0 + seed, with_gaps=seed % 2 == 1) for seed in range(4)]
+PERIODS = (0, 2, 5, 252, 756, 2520, 5000)
+EDGE_VALUES = ([], [1.0], [2.0, 2.0, 2.0], [0.5, None, float("nan"), 1.5, float("inf")], [3.0, -1.0, 2.0, 8.0])
+
+
+def _close(expected, actual):
+    assert actual == pytest.approx(expected, rel=1e-12, abs=1e-15)
+
+
+def test_scalar_kernels_match_list_implementations():
+    samples = [_ref_daily_returns(series, 2520) for series in SERIES]
+    for values in samples:
+        _close(_ref_mean(values), smp._mean(values))
+        _close(_ref_stddev(values), smp._stddev(values))
+        for q in (0.0, 0.05, 0.25, 0.5, 0.75, 0.95, 1.0, 1.7, None):
+            assert smp._quantile(values, q) == _ref_quantile(values, q)
+    for xs, ys in zip(samples, samples[1:]):
+        for window in (3, 21, 252, len(xs)):
+            _close(_ref_pearson_corr(xs[-window:], ys[-window:]), smp._pearson_corr(xs[-window:], ys[-window:]))
+    for values in EDGE_VALUES:
+        clean = [v for v in values if v is not None and math.isfinite(v)]
+        _close(_ref_stddev(clean), smp._stddev(clean))
+        assert smp._quantile(values, 0.3) == _ref_quantile(values, 0.3)
+    assert smp._pearson_corr([1.0, 1.0, 1.0, 1.0], [1.0, 2.0, 3.0, 4.0]) == 0.0
+    for values in samples:
+        _close(_ref_mean(values), smp._mean(np.asarray(values)))
+        _close(_ref_stddev(values), smp._stddev(np.asarray(values)))
+
+
+def test_series_kernels_match_list_implementations():
+    for series in SERIES:
+        for periods in PERIODS:
+            assert smp._series_daily_returns(series, periods).tolist() == _ref_daily_returns(series, periods)
+            assert smp._series_max_drawdown(series, periods) == _ref_max_drawdown(series, periods)
+            assert smp._series_cagr(series, periods) == _ref_cagr(series, periods)
+            assert smp._series_weekday_profile(series, periods) == _ref_calendar_profile(
+                series, periods, lambda day: day.weekday(), range(5)
+            )
+            assert smp._series_month_profile(series, periods) == _ref_calendar_profile(
+                series, periods, lambda day: day.month, range(1, 13)
+            )
+    for series_a, series_b in zip(SERIES, SERIES[1:]):
+        for periods in (5, 252, 2520):
+            ra, rb = smp._series_return_pairs(series_a, series_b, periods)
+            assert (ra.tolist(), rb.tolist()) == _ref_return_pairs(series_a, series_b, periods)
+    assert series_stats.max_drawdown([float("nan"), 2.0, 1.0, 3.0], 10) == 0.0
+    assert series_stats.max_drawdown([2.0, float("nan"), 1.0, 3.0], 10) == -0.5
+
+
+def _ref_rolling_corr(ra, rb, window, step):
+    n = min(len(ra), len(rb))
+    if n < max(12, window):
+        return []
+    out = []
+    last_start = max(0, n - window)
+    for start in range(0, max(1, n - window + 1), max(1, step)):
+        out.append(_ref_pearson_corr(ra[start : start + window], rb[start : start + window]))
+    if not out or last_start > 0:
+        tail_corr = _ref_pearson_corr(ra[last_start:last_start + window], rb[last_start:last_start + window])
+        if not out or abs(out[-1] - tail_corr) > 1e-6:
+            out.append(tail_corr)
+    return out
+
+
+def _ref_historical_counts(series_a, series_b):
+    aligned = smp._align_to_benchmark(series_a, series_b).rows()
+    close = [row[1] for row in aligned]
+    bench = [row[2] for row in aligned]
+    volume = [row[3] for row in aligned]
+    counts = defaultdict(int)
+    for i in range(50, len(aligned) - 20):
+        c, c20, b, b20 = close[i], close[i - 20], bench[i], bench[i - 20]
+        ma50 = _ref_mean(close[i - 49:i + 1])
+        if c <= 0 or c20 <= 0 or b <= 0 or b20 <= 0 or ma50 <= 0:
+            continue
+        vol_ma = _ref_mean(volume[i - 29:i + 1])
+        vol_ratio = (volume[i] / vol_ma) if vol_ma > 0 else 1.0
+        rel20 = (c / c20 - 1.0) - (b / b20 - 1.0)
+        trend = (c / ma50) - 1.0
+        fwd5 = (close[i + 5] / c) - 1.0
+        fwd20 = (close[i + 20] / c) - 1.0
+        counts["valid"] += 1
+        counts["base20"] += fwd20 > 0
+        if rel20 > 0 and trend > 0 and vol_ratio >= 1.03:
+            counts["acc"] += 1
+            counts["acc5"] += fwd5 > 0
+            counts["acc20"] += fwd20 > 0
+        if rel20 < 0 and trend < 0 and vol_ratio >= 1.03:
+            counts["dist"] += 1
+            counts["dist5"] += fwd5 < 0
+            counts["dist20"] += fwd20 < 0
+    return counts
+
+
+def test_rolling_moments_match_window_kernels():
+    for series_a, series_b in zip(SERIES, SERIES[1:]):
+        ra, rb = _ref_return_pairs(series_a, series_b, 2520)
+        moments = series_stats.RollingMoments(ra, rb)
+        for start, stop in ((0, len(ra)), (0, 2), (5, 8), (100, 352), (len(ra) - 21, len(ra))):
+            xs, ys = ra[start:stop], rb[start:stop]
+            _close(_ref_mean(xs), moments.mean(start, stop))
+            _close(_ref_stddev(xs), moments.stddev(start, stop))
+            assert moments.corr(start, stop) == pytest.approx(_ref_pearson_corr(xs, ys), rel=1e-9, abs=1e-12)
+            if len(xs) >= 3:
+                cov = sum((a - _ref_mean(xs)) * (b - _ref_mean(ys)) for a, b in zip(xs, ys))
+                var = sum((b - _ref_mean(ys)) ** 2 for b in ys)
+                assert moments.beta(start, stop) == pytest.approx(cov / var, rel=1e-9)
+        for window, step in ((252, 21), (63, 1), (12, 5), (len(ra), 21)):
+            expected = _ref_rolling_corr(ra, rb, window, step)
+            actual = smp._series_rolling_corr(series_a, series_b, 2520, window=window, step=step)
+            assert actual == pytest.approx(expected, rel=1e-9, abs=1e-12)
+
+        # Windows in aligned rows: the 1y tail of the 10y moments is the 1y correlation.
+        aligned = smp._align_to_benchmark(series_a, series_b)
+        moments_10y = smp._aligned_moments(aligned, 2520)
+        tail = moments_10y.since_row(min(len(aligned), 2520) - 252 + 1)
+        assert moments_10y.corr(tail) == pytest.approx(
+            _ref_pearson_corr(*_ref_return_pairs(series_a, series_b, 252)), rel=1e-9
+        )
+        for key in ("corr", "sample_days", "t_stat", "p_value"):
+            assert smp._moments_corr_with_stats(moments_10y, tail)[key] == pytest.approx(
+                smp._series_corr_with_stats(series_a, series_b, 252)[key], rel=1e-9
+            )
+
+    flat = series_stats.RollingMoments([1.0, 1.0, 1.0, 1.0], [1.0, 2.0, 3.0, 4.0])
+    assert flat.corr() == 0.0 and flat.beta() == 0.0 and flat.stddev() == 0.0
+    gappy = series_stats.RollingMoments([1.0, 2.0, float("nan"), 4.0, 5.0, 7.0])
+    assert math.isnan(gappy.mean(1, 4)) and gappy.mean(3, 6) == pytest.approx(16.0 / 3.0)
+    assert series_stats.RollingMoments([]).corr() == 0.0
+
+
+def test_historical_validation_matches_loop():
+    for series_a, series_b in zip(SERIES, SERIES[1:]):
+        counts = _ref_historical_counts(series_a, series_b)
+        out = smp._historical_validation(series_a, series_b, "ACCUMULATION")
+        assert out["sample_days"] == counts["valid"] > 0
+        assert out["accumulation_sample"] == counts["acc"] and out["distribution_sample"] == counts["dist"]
+        assert out["accumulation_hit_rate_20d"] == round(counts["acc20"] / counts["acc"] * 100.0, 2)
+        assert out["distribution_hit_rate_5d"] == round(counts["dist5"] / counts["dist"] * 100.0, 2)
+        assert out["baseline_hit_rate_20d"] == round(counts["base20"] / counts["valid"] * 100.0, 2)
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta, timezone
+
+from backend import session_forensics as sf
+
+
+def _candles(rome_day):
+    start = datetime.fromisoformat(rome_day).replace(tzinfo=sf.ROME_TZ)
+    out = []
+    for i in range(0, 22 * 12):
+        ts = (start + timedelta(minutes=5 * i)).astimezone(timezone.utc)
+        base = 1.1 + (i % 7) * 0.0004
+        out.append({"ts_utc": ts, "ts_rome": ts.astimezone(sf.ROME_TZ), "open": base, "high": base + 0.0006, "low": base - 0.0006, "close": base + 0.0002})
+    return out
+
+
+def test_pipeline_keeps_assets_hot_and_rebuilds_only_today(monkeypatch, tmp_path):
+    fetched = []
+
+    def _fetch(rome_day, asset):
+        fetched.append((asset, rome_day))
+        return _candles(rome_day)
+
+    monkeypatch.setattr(sf, "DAY_CARDS_FILE", tmp_path / "session_day_cards.json")
+    monkeypatch.setattr(sf, "_DAY_CARDS", None)
+    monkeypatch.setattr(sf.shared_cache, "_STORE", None)
+    monkeypatch.setattr(sf, "_summaries_by_day", lambda: {})
+    monkeypatch.setattr(sf, "_fetch_market_candles_for_day", _fetch)
+    monkeypatch.setattr(sf, "_load_rows", lambda: [])
+    sf._PIPELINE_CACHE.invalidate(all_keys=True)
+
+    eur = sf.get_session_pipeline("EURUSD", 7)
+    assert len(eur["days"]) == 7 and len(fetched) == 30
+    xau = sf.get_session_pipeline("XAUUSD", 7)
+    assert xau["asset"] == "XAUUSD" and len(fetched) == 60
+    # Switching back is an LRU hit, not a recompute.
+    assert sf.get_session_pipeline("EURUSD", 7) is eur and len(fetched) == 60
+
+    # Expired (or evicted) entry: closed days come from the persistent memo.
+    sf._PIPELINE_CACHE.invalidate(all_keys=True)
+    monkeypatch.setattr(sf, "_DAY_CARDS", None)  # reload from disk, as a restarted worker would
+    fetched.clear()
+    rebuilt = sf.get_session_pipeline("EURUSD", 7)
+    today = datetime.now(sf.ROME_TZ).date()
+    assert fetched == ([("EURUSD", today.isoformat())] if today.weekday() < 5 else [])
+    assert [d["sessions"] for d in rebuilt["days"][:-1]] == [d["sessions"] for d in eur["days"][:-1]]
+
+
+def test_only_complete_closed_days_are_memoized(monkeypatch, tmp_path):
+    day = "2026-03-03"
+    now_rome = datetime(2026, 3, 4, 12, 0, tzinfo=sf.ROME_TZ)
+    fetched, summaries = [], {}
+    truncated = [True]
+
+    def _fetch(rome_day, asset):
+        fetched.append(rome_day)
+        candles = _candles(rome_day)
+        # Run just after midnight: the delayed New York bars of `day` are not in yet.
+        return [c for c in candles if c["ts_rome"].hour < 14] if rome_day == day and truncated[0] else candles
+
+    monkeypatch.setattr(sf, "DAY_CARDS_FILE", tmp_path / "session_day_cards.json")
+    monkeypatch.setattr(sf, "_DAY_CARDS", None)
+    monkeypatch.setattr(sf, "_summaries_by_day", lambda: summaries)
+    monkeypatch.setattr(sf, "_fetch_market_candles_for_day", _fetch)
+    monkeypatch.setattr(sf, "_load_rows", lambda: [])
+
+    partial = sf._build_session_pipeline("EURUSD", 7, now_rome)
+    assert [c["session"] for c in partial["days"][-2]["sessions"]] == ["sydney", "asian", "london"]
+    assert day not in sf._closed_day_cards("EURUSD")
+
+    truncated[0] = False
+    fetched.clear()
+    full = sf._build_session_pipeline("EURUSD", 7, now_rome)
+    assert day in fetched and len(full["days"][-2]["sessions"]) == 4
+    fetched.clear()
+    sf._build_session_pipeline("EURUSD", 7, now_rome)
+    assert fetched == ["2026-03-04"]
+
+    # 5m summaries for the day arrive later: the memo entry is rebuilt from them.
+    summaries[day] = [
+        {"rome_day": day, "ts_utc": c["ts_utc"].isoformat(), "market_5m": {"EURUSD": {**c, "ts_utc": c["ts_utc"].isoformat(), "close": c["close"] + 0.01}}}
+        for c in _candles(day)
+    ]
+    rebuilt = sf._build_session_pipeline("EURUSD", 7, now_rome)
+    assert rebuilt["days"][-2]["sessions"][0]["close"] != full["days"][-2]["sessions"][0]["close"]
+    assert sf._closed_day_cards("EURUSD")[day]["summary_rows"] == len(summaries[day])
+
+    # A session cycle rewriting the day drops its cards for every asset.
+    sf._forget_closed_day_cards(day)
+    monkeypatch.setattr(sf, "_DAY_CARDS", None)
+    assert day not in sf._closed_day_cards("EURUSD") and "2026-03-02" in sf._closed_day_cards("EURUSD")
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from backend import shared_cache
+from backend import smart_money_positioning as smp
+from backend.frozen_payload import FrozenPayload
+
+
+class _FakeRedis:
+    """In-process stand-in for the subset of the Redis API RedisStore uses."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self._data.get(key)
+
+    def set(self, key, value, nx=False, px=None, ex=None):
+        with self._lock:
+            if nx and key in self._data:
+                return None
+            self._data[key] = value
+            return True
+
+    def incr(self, key):
+        with self._lock:
+            self._data[key] = int(self._data.get(key, 0)) + 1
+            return self._data[key]
+
+    def delete(self, key):
+        with self._lock:
+            return 1 if self._data.pop(key, None) is not None else 0
+
+
+def test_file_store_publishes_versioned_entries(tmp_path, monkeypatch):
+    store = shared_cache.FileStore(tmp_path)
+    monkeypatch.setattr(shared_cache, "_STORE", store)
+
+    first = shared_cache.publish("engine", {"a": 1}, ttl_seconds=60)
+    second = shared_cache.publish("engine", {"a": 2}, ttl_seconds=60)
+    assert (first.version, second.version) == (1, 2)
+
+    entry = shared_cache.get("engine", max_age_seconds=60)
+    assert entry.value == {"a": 2} and entry.version == 2 and entry.origin == "shared"
+    assert shared_cache.get("engine", max_age_seconds=0) is None
+    assert shared_cache.get("missing", max_age_seconds=60) is None
+
+
+def test_first_worker_computes_and_others_read_published_result(tmp_path, monkeypatch):
+    store = shared_cache.FileStore(tmp_path)
+    monkeypatch.setattr(shared_cache, "_STORE", store)
+    calls = []
+    results = []
+    start = threading.Barrier(4)
+
+    def _loader():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"rows": [1, 2, 3]}
+
+    def _worker():
+        start.wait()
+        results.append(shared_cache.compute("engine", 60, _loader, wait_seconds=5))
+
+    threads = [threading.Thread(target=_worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(entry.origin for entry in results) == ["computed", "shared", "shared", "shared"]
+    assert all(entry.value == {"rows": [1, 2, 3]} and entry.version == 1 for entry in results)
+
+
+def test_redis_adapter_with_local_stand_in(monkeypatch):
+    client = _FakeRedis()
+    store = shared_cache.RedisStore(client, prefix="t:")
+    monkeypatch.setattr(shared_cache, "_STORE", store)
+
+    with store.lock("engine", wait_seconds=0) as held:
+        assert held
+        with store.lock("engine", wait_seconds=0) as contended:
+            assert not contended
+    assert client.get("t:engine:lock") is None
+
+    entry = shared_cache.compute("engine", 60, lambda: [1, 2], publish_if=lambda value: len(value) > 5)
+    assert entry.origin == "local" and shared_cache.get("engine", 60) is None
+    entry = shared_cache.compute("engine", 60, lambda: [1, 2, 3, 4, 5, 6])
+    assert entry.origin == "computed" and entry.version == 1
+    assert shared_cache.get("engine", 60).value == [1, 2, 3, 4, 5, 6]
+
+
+def test_smart_money_adopts_payload_published_by_another_worker(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_cache, "_STORE", shared_cache.FileStore(tmp_path))
+    monkeypatch.setattr(smp, "_CACHE", {"ts": None, "payload": None})
+    frozen = FrozenPayload({"generated_at": "2026-01-02T00:00:00+00:00", "rows": [1, 2]}, exclude=("cache",))
+    shared_cache.publish(smp.SHARED_CACHE_KEY, frozen, smp.CACHE_TTL_SECONDS)
+
+    def _never(*args, **kwargs):
+        raise AssertionError("12y analysis must not run when a peer already published")
+
+    monkeypatch.setattr(smp, "_compute_positioning", _never)
+    adopted, meta = smp.build_positioning_entry({}, {}, [])
+    assert adopted.body == frozen.body and adopted.etag == frozen.etag
+    assert meta["hit"] is True and meta["ttl_seconds"] == smp.CACHE_TTL_SECONDS
+    assert smp.build_smart_money_positioning({}, {}, [])["rows"] == (1, 2)
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import json
+import math
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from backend import smart_money_positioning as smp
+from backend.stage_graph import MISS, Stage, StageGraph
+
+
+def _add(a, b):
+    return a + b
+
+
+def test_plan_orders_dependencies_and_prunes_to_targets():
+    graph = StageGraph(
+        [
+            Stage("total", _add, ("left", "right")),
+            Stage("left", _add, ("x", "y")),
+            Stage("right", _add, ("y", "y")),
+            Stage("unused", _add, ("x", "x")),
+        ]
+    )
+
+    order = graph.plan()
+    assert order.index("left") < order.index("total")
+    assert order.index("right") < order.index("total")
+    assert graph.plan(["total"]) == ["left", "right", "total"]
+    assert graph.plan(["total"], available=["left"]) == ["right", "total"]
+
+    run = graph.run({"x": 1, "y": 2}, targets=["total"])
+    assert run.outputs == {"total": 7, "left": 3, "right": 4}
+    assert list(run.durations_ms) == ["left", "right", "total"]
+    assert run.errors == {}
+
+    # A seeded output stands in for its stage.
+    assert graph.run({"x": 1, "y": 2, "left": 10}, targets=["total"]).outputs["total"] == 14
+
+    # A reused output stands in for its stage once the inputs exist; dependents still run.
+    cached = graph.run({"x": 1, "y": 2}, reuse=lambda name, values: 10 if name == "left" else MISS)
+    assert cached.outputs["total"] == 14 and cached.reused == ("left",)
+    assert "left" not in cached.durations_ms
+
+    with pytest.raises(KeyError):
+        graph.plan(["missing"])
+    with pytest.raises(ValueError):
+        StageGraph([Stage("a", _add, ("b", "b")), Stage("b", _add, ("a", "a"))]).plan()
+
+
+def test_independent_stages_run_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def _meet(value):
+        barrier.wait()  # deadlocks (BrokenBarrierError) unless both stages run at once
+        return value
+
+    graph = StageGraph([Stage("a", _meet, ("x",)), Stage("b", _meet, ("y",)), Stage("ab", _add, ("a", "b"))])
+    assert graph.run({"x": 1, "y": 2}, max_workers=2).outputs["ab"] == 3
+
+
+def test_failed_stage_falls_back_and_dependents_still_run():
+    def _boom(x):
+        raise RuntimeError("provider down")
+
+    graph = StageGraph(
+        [
+            Stage("bad", _boom, ("x",), fallback=lambda values, exc: -1),
+            Stage("good", _add, ("x", "x")),
+            Stage("after", _add, ("bad", "good")),
+        ]
+    )
+    run = graph.run({"x": 5})
+
+    assert run.outputs == {"bad": -1, "good": 10, "after": 9}
+    assert run.errors == {"bad": "RuntimeError: provider down"}
+    assert "bad" not in run.durations_ms
+
+
+def test_stage_without_fallback_is_critical():
+    def _boom(x):
+        raise RuntimeError("critical")
+
+    graph = StageGraph([Stage("bad", _boom, ("x",)), Stage("after", _add, ("bad", "x"))])
+    with pytest.raises(RuntimeError, match="critical"):
+        graph.run({"x": 1})
+
+
+def _history(n: int = 400):
+    start = int(datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp())
+    out = {}
+    for k, ticker in enumerate(smp.MARKET_TICKERS):
+        px, close = 50.0 + k, []
+        for i in range(n):
+            px *= 1.0 + 0.0003 + 0.002 * math.sin(i * (0.05 + 0.003 * k) + 0.1 * k)
+            close.append(px)
+        out[ticker] = {
+            "timestamps": [float(start + i * 86400) for i in range(n)],
+            "close": close,
+            "volume": [1e6 + 1e4 * (i % 7) for i in range(n)],
+        }
+    return out
+
+
+def _patch_sources(monkeypatch, history):
+    downloads = []
+
+    def _download(tickers, warnings):
+        downloads.append(len(tickers))
+        return history
+
+    monkeypatch.setattr(smp, "_download_history_map", _download)
+    monkeypatch.setattr(smp, "_build_uoa_watchlist", lambda history_map, now, warnings: [])
+    monkeypatch.setattr(smp, "_SECTION_CACHE", {})
+    monkeypatch.setattr(smp, "_CACHE", {"ts": None, "payload": None})
+    monkeypatch.setattr(smp.shared_cache, "_STORE", None)
+    return downloads
+
+
+def test_positioning_isolates_a_failing_section(monkeypatch):
+    _patch_sources(monkeypatch, _history())
+    now = datetime(2025, 2, 1, tzinfo=timezone.utc)
+    healthy = json.loads(smp._compute_positioning({}, {}, [], now).body)
+
+    def _boom(history_map, now):
+        raise RuntimeError("timeline broke")
+
+    monkeypatch.setattr(smp, "_build_regime_timeline", _boom)
+    monkeypatch.setattr(smp, "_SECTION_CACHE", {})
+    monkeypatch.setattr(smp, "_CACHE", {"ts": None, "payload": None})
+    payload = smp.build_smart_money_positioning({}, {}, [], now)
+
+    # Partial payloads go to this caller only: not adopted, not published.
+    assert payload["status"] == "partial"
+    assert smp.cached_positioning_entry(now) is None
+    assert payload["regime_timeline"] == {"status": "degraded", "rows": [], "summary": {}}
+    assert payload["data_quality"]["stage_errors"] == {"regime_timeline": "RuntimeError: timeline broke"}
+    assert "regime_timeline" not in payload["data_quality"]["stage_timings_ms"]
+    assert "historical_analysis_10y" in payload["data_quality"]["stage_timings_ms"]
+    assert any("regime_timeline" in warning for warning in payload["data_coverage"]["warnings"])
+    for section in ("summary", "theme_scores", "sector_rotation", "historical_analysis_10y"):
+        assert payload[section] == healthy[section]
+
+
+def test_select_sections_validates_names():
+    assert smp.select_sections(" summary,theme_scores,summary ") == ("summary", "theme_scores")
+    with pytest.raises(ValueError, match="bogus"):
+        smp.select_sections("summary,bogus")
+    with pytest.raises(ValueError):
+        smp.select_sections(" , ")
+
+
+def test_sections_run_only_their_stages_and_are_cached(monkeypatch):
+    downloads = _patch_sources(monkeypatch, _history())
+    now = datetime(2025, 2, 1, tzinfo=timezone.utc)
+
+    payload = smp.build_positioning_sections({}, {}, [], ("summary", "theme_scores"), now)
+    assert payload["status"] == "active"
+    assert set(payload) == {"status", "generated_at", "summary", "theme_scores", "cache", "stages"}
+    computed = set(payload["cache"]["computed"])
+    assert {"summary", "theme_scores", "macro_filter"} <= computed
+    assert computed.isdisjoint({"historical_analysis_10y", "regime_timeline", "counterfactual_lab", "return_panel"})
+    assert downloads == [len(smp.MARKET_TICKERS)]
+
+    # Served from the section cache: nothing rebuilt, history not downloaded again.
+    later = smp.cached_positioning_sections(("theme_scores",), datetime(2025, 2, 1, 0, 4, tzinfo=timezone.utc))
+    assert later["cache"]["hit"] is True
+    assert later["theme_scores"] == payload["theme_scores"]
+    assert smp.cached_positioning_sections(("theme_scores",), datetime(2025, 2, 1, 0, 6, tzinfo=timezone.utc)) is None
+
+    # Cached sections stand in for their stages: only the lab itself runs.
+    lab = smp.build_positioning_sections({}, {}, [], ("counterfactual_lab",), now)
+    assert lab["cache"]["computed"] == ["counterfactual_lab"]
+    assert downloads == [len(smp.MARKET_TICKERS)]
+
+
+def test_full_refresh_reuses_long_lived_sections_while_their_inputs_hold(monkeypatch):
+    _patch_sources(monkeypatch, _history())
+    now = datetime(2025, 2, 1, tzinfo=timezone.utc)
+    built = smp.build_positioning_sections({}, {}, [], ("regime_timeline", "historical_analysis_10y"), now)
+    basis = smp._SECTION_CACHE["historical_analysis_10y"][2]
+    assert set(basis) == {"now", "theme_scores"} and smp._SECTION_CACHE["regime_timeline"][2] == {}
+
+    # theme_scores is rebuilt, but the ranking the 10y analysis reads is unchanged.
+    refresh = json.loads(smp._compute_positioning({}, {}, [], datetime(2025, 2, 1, 0, 10, tzinfo=timezone.utc)).body)
+    assert refresh["data_quality"]["stage_reused"] == ["historical_analysis_10y", "regime_timeline"]
+    assert "historical_analysis_10y" not in refresh["data_quality"]["stage_timings_ms"]
+    assert "theme_scores" in refresh["data_quality"]["stage_timings_ms"]
+    assert refresh["historical_analysis_10y"] == json.loads(json.dumps(built["historical_analysis_10y"]))
+
+    # A new ranking rebuilds it.
+    aggregate = smp._aggregate_theme_scores
+    monkeypatch.setattr(smp, "_aggregate_theme_scores", lambda *args: list(reversed(aggregate(*args))))
+    reranked = json.loads(smp._compute_positioning({}, {}, [], datetime(2025, 2, 1, 0, 20, tzinfo=timezone.utc)).body)
+    assert reranked["data_quality"]["stage_reused"] == ["regime_timeline"]
+    assert "historical_analysis_10y" in reranked["data_quality"]["stage_timings_ms"]
+
+    # So does a new day, whose weekday/month profile it reports.
+    reuse = smp._section_reuse(datetime(2025, 2, 2, 1, 0, tzinfo=timezone.utc))
+    theme_scores = smp._SECTION_CACHE["theme_scores"][1]
+    values = {"theme_scores": theme_scores, "now": datetime(2025, 2, 2, 1, 0, tzinfo=timezone.utc)}
+    assert reuse("historical_analysis_10y", values) is MISS
+    same_day = smp._section_reuse(datetime(2025, 2, 1, 5, 0, tzinfo=timezone.utc))
+    values["now"] = datetime(2025, 2, 1, 5, 0, tzinfo=timezone.utc)
+    assert same_day("historical_analysis_10y", values) is smp._SECTION_CACHE["historical_analysis_10y"][1]
+
+
+def test_payload_ttl_sections_follow_their_input_builds(monkeypatch):
+    _patch_sources(monkeypatch, _history())
+    now = datetime(2025, 2, 1, tzinfo=timezone.utc)
+    smp.build_positioning_sections({}, {}, [], ("counterfactual_lab",), now)
+    assert smp._section_ttl("counterfactual_lab") == smp.CACHE_TTL_SECONDS
+    assert smp.cached_positioning_sections(("counterfactual_lab",), datetime(2025, 2, 1, 0, 4, tzinfo=timezone.utc))
+
+    # theme_scores rebuilt with different content: the lab built from the old one is dropped.
+    built_at, scores, basis = smp._SECTION_CACHE["theme_scores"]
+    smp._SECTION_CACHE["theme_scores"] = (built_at, list(reversed(scores)), basis)
+    assert smp.cached_positioning_sections(("counterfactual_lab",), datetime(2025, 2, 1, 0, 4, tzinfo=timezone.utc)) is None
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from backend import data_sources
+from backend import technical_indicators as ti
+
+
+def _reference_rsi(close, period=14):
+    gains, losses = [], []
+    for prev, cur in zip(close[:-1], close[1:]):
+        gains.append(max(cur - prev, 0.0))
+        losses.append(max(prev - cur, 0.0))
+    avg_gain, avg_loss = gains[0], losses[0]
+    for g, l in zip(gains[1:], losses[1:]):
+        avg_gain = (avg_gain * (period - 1) + g) / period
+        avg_loss = (avg_loss * (period - 1) + l) / period
+    return 100.0 - (100.0 / (1.0 + avg_gain / avg_loss))
+
+
+def _walk(n=400, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100.0 + np.cumsum(rng.normal(0.0, 1.0, n))
+    return close + 0.5, close - 0.5, close
+
+
+def test_indicators_match_reference_definitions():
+    high, low, close = _walk()
+    assert abs(ti.rsi(close)[-1] - _reference_rsi(list(close))) < 1e-9
+
+    line, signal = ti.macd(close)
+    ema = lambda s, span: pd.Series(s).ewm(span=span, adjust=False).mean().to_numpy()
+    assert np.allclose(line, ema(close, 12) - ema(close, 26))
+    assert abs(ti._ema_last(close, 200) - ema(close, 200)[-1]) < 1e-9
+
+    k, _ = ti.stochastic(high, low, close)
+    raw = [(close[i] - low[i - 13:i + 1].min()) / (high[i - 13:i + 1].max() - low[i - 13:i + 1].min()) * 100 for i in range(len(close) - 3, len(close))]
+    assert abs(k[-1] - np.mean(raw)) < 1e-9
+
+
+def test_recommendation_semantics():
+    assert ti.recommend_from_value(-0.8) == "STRONG_SELL"
+    assert ti.recommend_from_value(-0.3) == "SELL"
+    assert ti.recommend_from_value(0.0) == "NEUTRAL"
+    assert ti.recommend_from_value(0.3) == "BUY"
+    assert ti.recommend_from_value(0.8) == "STRONG_BUY"
+
+    close = np.linspace(100.0, 200.0, 300) + np.sin(np.arange(300))
+    out = ti.compute_technicals(close + 1.0, close - 1.0, close)
+    assert out["votes"]["moving_averages"] and set(out["votes"]["moving_averages"].values()) == {"BUY"}
+    assert out["recommendation"] in {"BUY", "STRONG_BUY"}
+    assert out["buy_votes"] > out["sell_votes"]
+    assert out["buy_votes"] + out["sell_votes"] + out["neutral_votes"] == 18
+
+
+def test_service_memoizes_until_new_bar(monkeypatch):
+    high, low, close = _walk()
+    index = pd.date_range("2026-01-01", periods=len(close), freq="h", tz="UTC")
+    bars = pd.DataFrame({"High": high, "Low": low, "Close": close}, index=index)
+    monkeypatch.setattr(data_sources, "_TA_MEMO", {})
+    calls = []
+    real = data_sources.compute_technicals
+
+    def _counting(*args):
+        calls.append(1)
+        return real(*args)
+
+    monkeypatch.setattr(data_sources, "compute_technicals", _counting)
+    service = data_sources.MarketDataService()
+    monkeypatch.setattr(service, "_fetch_ta_bars", lambda ticker: bars)
+
+    first = service._compute_local_technicals("^NDX")
+    assert first["technicals_source"] == "local" and first["rsi"] == round(float(ti.rsi(close)[-1]), 6)
+    assert service._compute_local_technicals("^NDX") is first
+    assert len(calls) == 1
+
+    bars = bars.iloc[:-1]
+    service._compute_local_technicals("^NDX")
+    assert len(calls) == 2
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backend.ttl_cache import TTLCache
+
+
+def test_concurrent_misses_share_one_load():
+    cache = TTLCache("test_single_flight", ttl_seconds=60)
+    calls = []
+    gate = threading.Event()
+
+    def _loader():
+        calls.append(1)
+        gate.wait(2)
+        return {"value": len(calls)}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("k", _loader))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    gate.set()
+    for t in threads:
+        t.join(2)
+
+    assert calls == [1]
+    assert len(results) == 8 and all(r is results[0] for r in results)
+    status = cache.status()
+    assert status["misses"] == 1 and status["coalesced"] == 7
+    assert cache.get("k", _loader) is results[0] and cache.status()["hits"] == 1
+
+
+def test_expired_entry_served_while_background_refresh_runs():
+    cache = TTLCache("test_swr", ttl_seconds=0.0, stale_seconds=60)
+    cache.set("k", "old")
+    gate = threading.Event()
+    calls = []
+
+    def _slow_refresh():
+        calls.append(1)
+        gate.wait(2)
+        return "new"
+
+    async def _run():
+        started = time.perf_counter()
+        first = await cache.aget("k", _slow_refresh)
+        second = await cache.aget("k", _slow_refresh)
+        return first, second, time.perf_counter() - started
+
+    first, second, elapsed = asyncio.run(_run())
+    assert (first, second) == ("old", "old") and elapsed < 0.5
+    gate.set()
+    for _ in range(100):
+        if cache.peek("k") == "new":
+            break
+        time.sleep(0.01)
+    assert cache.peek("k") == "new" and calls == [1]
+    status = cache.status()
+    assert status["stale_hits"] == 2 and status["refreshes"] == 1
+    assert status["refresh_latency_ms"]["last"] is not None
+
+
+def test_lru_eviction_and_loader_errors():
+    cache = TTLCache("test_lru", ttl_seconds=60, max_entries=2)
+    cache.get("a", lambda: 1)
+    cache.get("b", lambda: 2)
+    cache.get("a", lambda: 99)  # touch: "b" becomes least recently used
+    cache.get("c", lambda: 3)
+    assert cache.peek("b") is None and cache.peek("a") == 1
+    assert cache.status()["evictions"] == 1
+
+    def _boom():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        cache.get("d", _boom)
+    assert cache.status()["errors"] == 1 and cache.status()["inflight"] == 0
+    # Failed loads are not cached; the next caller retries.
+    assert cache.get("d", lambda: 4) == 4
+
+
+def test_async_loader_runs_on_the_callers_loop():
+    cache = TTLCache("test_async_loader", ttl_seconds=0.0, stale_seconds=60)
+    calls = []
+
+    async def _run():
+        loop = asyncio.get_running_loop()
+        release = asyncio.Event()
+
+        async def _loader():
+            assert asyncio.get_running_loop() is loop
+            calls.append(1)
+            if len(calls) > 1:
+                await release.wait()
+            return len(calls)
+
+        first = await asyncio.gather(*(cache.aget_async("k", _loader) for _ in range(5)))
+        assert first == [1] * 5
+        # Expired: callers get the old value at once while one refresh task runs.
+        assert await cache.aget_async("k", _loader) == 1
+        assert await cache.aget_async("k", _loader) == 1
+        await asyncio.sleep(0)
+        release.set()
+        for _ in range(3):
+            await asyncio.sleep(0)
+        assert cache.peek("k") == 2
+
+    asyncio.run(_run())
+    status = cache.status()
+    assert calls == [1, 1]
+    assert status["misses"] == 1 and status["coalesced"] == 4
+    assert status["stale_hits"] == 2 and status["refreshes"] == 1
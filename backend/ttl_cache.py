@@ -0,0 +1,264 @@
+"""
+ttl_cache.py
+
+In-process cache primitive for endpoint payloads.
+- per-key TTL with a stale-while-revalidate window: expired entries are served
+  immediately while one background refresh runs
+- single-flight loads: concurrent misses for a key wait on the one load already
+  in progress instead of starting their own
+- LRU eviction once `max_entries` is exceeded
+- usable from sync code (`get`) and from coroutines (`aget`, loader runs in a worker
+  thread so the event loop never blocks on upstream I/O; `aget_async` for coroutine
+  loaders that must run on the caller's event loop, e.g. an async request batcher)
+- `refresh()` reloads an entry before it expires (used by the cache warmer)
+- hit / stale / miss / coalesced counters and refresh latency per named cache
+
+Loaders signal "nothing usable" by raising; callers keep their own fallback
+policy (e.g. re-serving `peek()` with a stale marker).
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+
+DEFAULT_STALE_SECONDS = 3600.0
+REFRESH_WORKERS = 8
+# Key used by single-slot caches (one payload per endpoint).
+DEFAULT_KEY = "latest"
+
+_REGISTRY: Dict[str, "TTLCache"] = {}
+_REGISTRY_LOCK = threading.Lock()
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        with _REGISTRY_LOCK:
+            if _EXECUTOR is None:
+                _EXECUTOR = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix="ttl-cache")
+    return _EXECUTOR
+
+
+class TTLCache:
+    def __init__(
+        self,
+        name: str,
+        ttl_seconds: float,
+        stale_seconds: float = DEFAULT_STALE_SECONDS,
+        max_entries: int = 128,
+    ):
+        self.name = name
+        self.ttl_seconds = float(ttl_seconds)
+        self.stale_seconds = float(stale_seconds)
+        self.max_entries = int(max_entries)
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        # Strong references to running coroutine loads (the event loop only keeps weak ones).
+        self._tasks: Set[asyncio.Future] = set()
+        self.stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "refreshes": 0,
+            "errors": 0,
+            "evictions": 0,
+        }
+        self._latency = {"count": 0, "total": 0.0, "max": 0.0, "last": None}
+        with _REGISTRY_LOCK:
+            _REGISTRY[name] = self
+
+    # -- entries -------------------------------------------------------------
+
+    def peek(self, key: Hashable = DEFAULT_KEY) -> Optional[Any]:
+        """Last stored value regardless of age (None if never loaded)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[1] if entry else None
+
+    def age(self, key: Hashable = DEFAULT_KEY) -> Optional[float]:
+        with self._lock:
+            entry = self._entries.get(key)
+            return (time.monotonic() - entry[0]) if entry else None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._store(key, value)
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def invalidate(self, key: Hashable = DEFAULT_KEY, all_keys: bool = False) -> None:
+        with self._lock:
+            if all_keys:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    # -- loading -------------------------------------------------------------
+
+    def _run_loader(self, key: Hashable, loader: Callable[[], Any], future: Future) -> None:
+        started = time.perf_counter()
+        try:
+            value = loader()
+        except BaseException as exc:
+            self._load_failed(key, future, exc)
+            return
+        self._loaded(key, future, value, started)
+
+    async def _run_async_loader(self, key: Hashable, loader: Callable[[], Awaitable[Any]], future: Future) -> None:
+        started = time.perf_counter()
+        try:
+            value = await loader()
+        except BaseException as exc:
+            self._load_failed(key, future, exc)
+            return
+        self._loaded(key, future, value, started)
+
+    def _load_failed(self, key: Hashable, future: Future, exc: BaseException) -> None:
+        with self._lock:
+            self.stats["errors"] += 1
+            self._inflight.pop(key, None)
+        future.set_exception(exc)
+
+    def _loaded(self, key: Hashable, future: Future, value: Any, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._store(key, value)
+            self._inflight.pop(key, None)
+            self._latency["count"] += 1
+            self._latency["total"] += elapsed
+            self._latency["max"] = max(self._latency["max"], elapsed)
+            self._latency["last"] = elapsed
+        future.set_result(value)
+
+    def _lookup(self, key: Hashable) -> Tuple[str, Any]:
+        """
+        Classify a lookup under the lock:
+        ("value", v) served from cache, ("wait", future) join an in-flight load,
+        ("load", future) caller owns a new load, ("refresh", (v, future)) serve the
+        stale v and start the background load that owns `future`.
+        """
+        background = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = time.monotonic() - entry[0]
+                if age < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return "value", entry[1]
+                if age < self.ttl_seconds + self.stale_seconds:
+                    self.stats["stale_hits"] += 1
+                    if key in self._inflight:
+                        return "value", entry[1]
+                    self.stats["refreshes"] += 1
+                    background = Future()
+                    self._inflight[key] = background
+            if background is None:
+                if key in self._inflight:
+                    self.stats["coalesced"] += 1
+                    return "wait", self._inflight[key]
+                self.stats["misses"] += 1
+                future: Future = Future()
+                self._inflight[key] = future
+                return "load", future
+
+        # Nobody waits on a background refresh; keep its failure out of the "never retrieved" log.
+        background.add_done_callback(lambda f: f.exception())
+        return "refresh", (entry[1], background)
+
+    def _submit(self, key: Hashable, loader: Callable[[], Any], future: Future) -> None:
+        ctx = contextvars.copy_context()
+        _executor().submit(ctx.run, self._run_loader, key, loader, future)
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        state, payload = self._lookup(key)
+        if state == "refresh":
+            self._submit(key, loader, payload[1])
+            return payload[0]
+        if state == "value":
+            return payload
+        if state == "load":
+            self._run_loader(key, loader, payload)
+        return payload.result()
+
+    async def aget(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        state, payload = self._lookup(key)
+        if state == "refresh":
+            self._submit(key, loader, payload[1])
+            return payload[0]
+        if state == "value":
+            return payload
+        if state == "load":
+            self._submit(key, loader, payload)
+        # Shielded: a disconnecting client must not cancel a load other callers share.
+        return await asyncio.shield(asyncio.wrap_future(payload))
+
+    async def aget_async(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """`aget` for a coroutine-function loader, run as a task on the caller's event loop."""
+        state, payload = self._lookup(key)
+        if state == "value":
+            return payload
+        if state in ("load", "refresh"):
+            future = payload if state == "load" else payload[1]
+            task = asyncio.ensure_future(self._run_async_loader(key, loader, future))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            if state == "refresh":
+                return payload[0]
+        return await asyncio.shield(asyncio.wrap_future(payload))
+
+    def refresh(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Reload `key` now even if it is still fresh (refresh-ahead); joins a load already in flight."""
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                self.stats["refreshes"] += 1
+                future = Future()
+                self._inflight[key] = future
+        if owner:
+            self._run_loader(key, loader, future)
+        return future.result()
+
+    # -- metrics -------------------------------------------------------------
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            lookups = self.stats["hits"] + self.stats["stale_hits"] + self.stats["misses"] + self.stats["coalesced"]
+            count = self._latency["count"]
+            return {
+                "ttl_seconds": self.ttl_seconds,
+                "stale_seconds": self.stale_seconds,
+                "max_entries": self.max_entries,
+                "entries": len(self._entries),
+                "inflight": len(self._inflight),
+                "oldest_age_seconds": round(max((now - ts for ts, _ in self._entries.values()), default=0.0), 1),
+                "hit_ratio": round((self.stats["hits"] + self.stats["stale_hits"]) / lookups, 4) if lookups else None,
+                **self.stats,
+                "refresh_latency_ms": {
+                    "last": round(self._latency["last"] * 1000.0, 1) if self._latency["last"] is not None else None,
+                    "avg": round(self._latency["total"] / count * 1000.0, 1) if count else None,
+                    "max": round(self._latency["max"] * 1000.0, 1),
+                },
+            }
+
+
+def cache_status() -> Dict[str, Any]:
+    with _REGISTRY_LOCK:
+        caches = dict(_REGISTRY)
+    return {"status": "ok", "caches": {name: cache.status() for name, cache in sorted(caches.items())}}